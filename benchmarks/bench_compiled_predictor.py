@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import warnings
+
+import click
+import numpy as np
+import pandas as pd
+import pickle
+from sklearn import set_config
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.compiled_predictor import compile_predictor
+from src.inference_artifact import LinearModelArtifact, artifact_arrays
+from src.storage import read_table
+
+TARGET = "G3"
+
+
+def rows_per_second(predict, X: pd.DataFrame, repeat: int) -> float:
+    """Return the best throughput of ``predict`` on ``X`` over ``repeat`` runs."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+@click.command()
+@click.option('--pipeline-from', type=str, default="results/models/student_pipeline.pickle",
+              help="Path to the fit pipeline pickle file")
+@click.option('--data', type=str, default="data/processed/student_test.parquet",
+              help="Path to student records to score (.parquet, .arrow or .csv)")
+@click.option('--rows', type=int, default=1_000_000, help="Number of rows to score (data is tiled)")
+@click.option('--repeat', type=int, default=5, help="Timed runs per predictor; the best is reported")
+def main(pipeline_from: str, data: str, rows: int, repeat: int) -> None:
+    """Compare sklearn, artifact and compiled predictor throughput in rows/sec."""
+    warnings.filterwarnings('ignore')
+    set_config(transform_output="pandas")
+
+    with open(pipeline_from, 'rb') as f:
+        pipeline = pickle.load(f)
+    X = read_table(data).drop(columns=[TARGET], errors="ignore")
+    X = X.iloc[np.arange(rows) % len(X)].reset_index(drop=True)
+
+    artifact = LinearModelArtifact.from_arrays(artifact_arrays(pipeline))
+    compiled = compile_predictor(artifact)
+    np.testing.assert_allclose(compiled.predict(X), pipeline.predict(X), rtol=1e-9, atol=1e-9)
+
+    results = pd.DataFrame({
+        "predictor": ["sklearn pipeline", "numpy artifact", "compiled"],
+        "rows_per_sec": [
+            rows_per_second(pipeline.predict, X, repeat),
+            rows_per_second(artifact.predict, X, repeat),
+            rows_per_second(compiled.predict, X, repeat),
+        ],
+    })
+    results["speedup"] = results["rows_per_sec"] / results["rows_per_sec"].iloc[0]
+    print(f"Scoring {rows:,} rows (best of {repeat}):")
+    print(results.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import warnings
+
+import click
+import numpy as np
+import pandas as pd
+import pickle
+from sklearn import set_config
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.parallel import parallel_predict, parallel_transform
+from src.storage import read_table
+
+TARGET = "G3"
+
+
+def timed(func, *args) -> float:
+    """Return the wall-clock seconds of one call."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--pipeline-from', type=str, default="results/models/student_pipeline.pickle",
+              help="Path to the fit pipeline pickle file")
+@click.option('--data', type=str, default="data/processed/student_test.parquet",
+              help="Path to student records to score (.parquet, .arrow or .csv)")
+@click.option('--rows', type=int, default=2_000_000, help="Number of rows to process (data is tiled)")
+@click.option('--workers', type=int, multiple=True, default=(1, 2, 4, 8, 16, 32),
+              help="Worker counts to time (repeatable)")
+def main(pipeline_from: str, data: str, rows: int, workers: tuple) -> None:
+    """Report rows/sec of sharded preprocessing and scoring per worker count."""
+    warnings.filterwarnings('ignore')
+    set_config(transform_output="pandas")
+
+    with open(pipeline_from, 'rb') as f:
+        pipeline = pickle.load(f).best_estimator_
+    X = read_table(data).drop(columns=[TARGET], errors="ignore")
+    X = X.iloc[np.arange(rows) % len(X)].reset_index(drop=True)
+
+    results = []
+    for n in workers:
+        if n > os.cpu_count():
+            continue
+        results.append({
+            "workers": n,
+            "transform_rows_per_sec": rows / timed(parallel_transform, pipeline[:-1], X, n),
+            "predict_rows_per_sec": rows / timed(parallel_predict, pipeline, X, n),
+        })
+    results = pd.DataFrame(results)
+    results["predict_speedup"] = results["predict_rows_per_sec"] / results["predict_rows_per_sec"].iloc[0]
+    print(f"{rows:,} rows on {os.cpu_count()} cores:")
+    print(results.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+
+
+if __name__ == '__main__':
+    main()
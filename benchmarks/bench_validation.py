@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import warnings
+
+import click
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.fast_validation import FAILURE_CASE_COLUMNS, FastValidator
+from src.preprocess_data import create_schema
+
+
+def timed(func, df: pd.DataFrame) -> tuple:
+    """Return the wall-clock seconds of one lazy validation and its failure cases."""
+    start = time.perf_counter()
+    try:
+        func(df)
+        cases = None
+    except (pa.errors.SchemaErrors, ValueError) as error:
+        cases = error.failure_cases
+    return time.perf_counter() - start, cases
+
+
+def normalized(cases: pd.DataFrame) -> list:
+    """Failure cases as a sorted list of string tuples, for comparison."""
+    if cases is None:
+        return []
+    # pandera may reorder the columns and stores check_number as int or float
+    columns = [column for column in FAILURE_CASE_COLUMNS if column != "check_number"]
+    return sorted(tuple("" if pd.isna(value) else str(value) for value in row)
+                  for row in cases[columns].itertuples(index=False))
+
+
+@click.command()
+@click.option('--raw-data', type=str, default="data/raw/student-por.csv", help="Path to the raw student CSV")
+@click.option('--rows', type=int, default=1_000_000, help="Number of rows to validate (data is tiled)")
+@click.option('--corrupt', type=float, default=0.001, help="Fraction of rows given an invalid grade")
+@click.option('--seed', type=int, default=123, help="Random seed for the tiled grades and corruption")
+def main(raw_data: str, rows: int, corrupt: float, seed: int) -> None:
+    """Time pandera against the fast validator and check they report the same failures."""
+    warnings.filterwarnings('ignore')
+    raw = pd.read_csv(raw_data, sep=";")
+    schema = create_schema()
+    fast = FastValidator(schema)
+
+    rng = np.random.default_rng(seed)
+    df = raw.iloc[np.arange(rows) % len(raw)].reset_index(drop=True)
+    # fresh grades keep most tiled rows distinct, as in real data
+    for column in ("G1", "G2", "G3", "absences"):
+        df[column] = rng.integers(0, 21, rows)
+    bad = rng.choice(rows, size=int(rows * corrupt), replace=False)
+    invalid = df.copy()
+    invalid.loc[bad, "G1"] = 25
+    invalid.loc[bad[: len(bad) // 2], "Mjob"] = "pilot"
+
+    inputs = {"object strings": invalid, "compact dtypes": apply_dtype_plan(df, dtype_plan(schema))}
+    print(f"{rows:,} rows, {len(bad):,} corrupted")
+    for label, data in inputs.items():
+        pandera_seconds, pandera_cases = timed(lambda d: schema.validate(d, lazy=True), data)
+        fast_seconds, fast_cases = timed(fast.validate, data)
+        same = normalized(pandera_cases) == normalized(fast_cases)
+        n_cases = 0 if fast_cases is None else len(fast_cases)
+        print(f"{label:>15}: pandera {pandera_seconds:7.2f} s, fast {fast_seconds:6.2f} s "
+              f"({pandera_seconds / fast_seconds:5.1f}x), {n_cases:,} failure cases, "
+              f"{'identical' if same else 'DIFFERENT'}")
+
+
+if __name__ == '__main__':
+    main()
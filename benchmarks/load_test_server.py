@@ -0,0 +1,117 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import click
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.storage import read_table
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'src', 'serve_predictions.py')
+TARGET = "G3"
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(host: str, port: int, timeout: float = 60.0) -> None:
+    """Poll ``GET /health`` until the server answers or ``timeout`` expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not become healthy within {timeout} s.")
+
+
+def run_client(host: str, port: int, bodies: list) -> list:
+    """Send every body over one keep-alive connection; return the latencies."""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    latencies = []
+    for body in bodies:
+        start = time.perf_counter()
+        connection.request("POST", "/predict", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"POST /predict returned {response.status}")
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return latencies
+
+
+@click.command()
+@click.option('--url', type=str, default=None,
+              help="Base URL of a running server; if omitted one is started from --pipeline-from")
+@click.option('--pipeline-from', type=str, default="results/models/student_pipeline.pickle",
+              help="Model to serve when starting a local server")
+@click.option('--data', type=str, default="data/processed/student_test.parquet",
+              help="Table of student records used as request payloads (.parquet, .arrow or .csv)")
+@click.option('--requests', 'n_requests', type=int, default=2000, help="Total number of requests")
+@click.option('--concurrency', type=int, default=32, help="Number of concurrent clients")
+@click.option('--records-per-request', type=int, default=1, help="Student records per request")
+@click.option('--max-delay-ms', type=float, default=5.0, help="Batching window of the started server")
+def main(url: str, pipeline_from: str, data: str, n_requests: int, concurrency: int,
+         records_per_request: int, max_delay_ms: float) -> None:
+    """Fire concurrent /predict requests and report latency and throughput."""
+    records = read_table(data).drop(columns=[TARGET], errors="ignore").to_dict(orient="records")
+    rng = np.random.default_rng(123)
+    bodies = [
+        json.dumps([records[i] for i in rng.integers(len(records), size=records_per_request)])
+        for _ in range(n_requests)
+    ]
+
+    server = None
+    if url is None:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([
+            sys.executable, SERVER_SCRIPT, f"--pipeline-from={pipeline_from}",
+            f"--host={host}", f"--port={port}", f"--max-delay-ms={max_delay_ms}"
+        ], stdout=subprocess.DEVNULL)
+    else:
+        parsed = urlparse(url)
+        host, port = parsed.hostname, parsed.port or 80
+
+    try:
+        wait_until_healthy(host, port)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            shards = pool.map(run_client, [host] * concurrency, [port] * concurrency,
+                              [bodies[i::concurrency] for i in range(concurrency)])
+            latencies = np.concatenate([np.asarray(shard) for shard in shards])
+        elapsed = time.perf_counter() - start
+
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request("GET", "/metrics")
+        metrics = json.loads(connection.getresponse().read())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{n_requests} requests x {records_per_request} records, {concurrency} clients")
+    print(f"Client latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    print(f"Throughput: {n_requests / elapsed:,.0f} requests/sec, "
+          f"{n_requests * records_per_request / elapsed:,.0f} records/sec")
+    print(f"Server: {metrics['batches']} batches, {metrics['mean_batch_rows']:.1f} rows/batch, "
+          f"p50 {metrics['latency_p50_ms']:.2f} ms, p99 {metrics['latency_p99_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
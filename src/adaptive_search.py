@@ -0,0 +1,202 @@
+import math
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, check_cv
+
+from src.fold_cache import FoldTransformCache, fingerprint_frame
+
+
+class SuccessiveHalvingSearchCV(BaseEstimator):
+    """
+    Randomized search that drops poor candidates early by halving on folds.
+
+    Every sampled candidate is first scored on ``min_folds`` folds. Only the
+    best ``1 / factor`` of the candidates move on to the next rung, which
+    scores them on ``factor`` times as many folds, until the survivors have
+    seen every fold. Preprocessing runs through a ``FoldTransformCache``, so
+    each fold's preprocessor is fitted once per preprocessing configuration
+    and only the final estimator is refitted per candidate.
+
+    The search stops early, keeping what it has scored so far, when either
+    the wall-clock ``time_budget`` or the ``max_fits`` budget is exhausted.
+    The winner is the best candidate among those scored on the most folds.
+
+    Parameters
+    ----------
+    estimator : sklearn.pipeline.Pipeline
+        Pipeline whose last step is the model being tuned.
+    param_distributions : dict or list of dict
+        Search space in ``ParameterSampler`` format, e.g.
+        ``{"ridge__alpha": loguniform(1e-3, 1e3)}``.
+    n_candidates : int, optional
+        Number of candidates sampled for the first rung (default: 100).
+    cv : int or cross-validation generator, optional
+        Cross-validation strategy providing the folds (default: 10).
+    factor : int, optional
+        Elimination rate between rungs (default: 3).
+    min_folds : int, optional
+        Folds scored per candidate in the first rung (default: 2).
+    scoring : str, optional
+        sklearn scoring name (default: "neg_mean_absolute_error").
+    time_budget : float, optional
+        Wall-clock limit in seconds for the search, excluding the refit
+        (default: None, unlimited).
+    max_fits : int, optional
+        Maximum number of model fits (default: None, unlimited).
+    random_state : int, optional
+        Seed passed to ``ParameterSampler`` (default: None).
+    refit : bool, optional
+        Whether to refit the best pipeline on all data (default: True).
+    cache : FoldTransformCache, optional
+        Cache of fitted preprocessors and transformed folds (default: None,
+        a private cache).
+
+    Examples
+    --------
+    >>> search = SuccessiveHalvingSearchCV(
+    ...     make_pipeline(preprocessor, Ridge()),
+    ...     {"ridge__alpha": loguniform(1e-3, 1e3)},
+    ...     time_budget=30, max_fits=300
+    ... )
+    >>> search.fit(X_train, y_train).best_params_
+    {'ridge__alpha': 38.2...}
+    """
+
+    def __init__(self, estimator, param_distributions, n_candidates: int = 100, cv=10,
+                 factor: int = 3, min_folds: int = 2, scoring: str = "neg_mean_absolute_error",
+                 time_budget: float = None, max_fits: int = None, random_state: int = None,
+                 refit: bool = True, cache: FoldTransformCache = None) -> None:
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_candidates = n_candidates
+        self.cv = cv
+        self.factor = factor
+        self.min_folds = min_folds
+        self.scoring = scoring
+        self.time_budget = time_budget
+        self.max_fits = max_fits
+        self.random_state = random_state
+        self.refit = refit
+        self.cache = cache
+
+    def _budget_exhausted(self, start: float) -> bool:
+        if self.max_fits is not None and self.n_fits_ >= self.max_fits:
+            return True
+        return self.time_budget is not None and time.perf_counter() - start >= self.time_budget
+
+    def _score_on_fold(self, params: dict, X, y: np.ndarray, split: tuple,
+                       cache: FoldTransformCache, data_key: str, scorer) -> float:
+        pipeline = clone(self.estimator).set_params(**params)
+        train, test = split
+        _, X_train, X_test = cache.get_or_fit(pipeline[:-1], X, train, test, data_key=data_key)
+        model = pipeline[-1].fit(X_train, y[train])
+        self.n_fits_ += 1
+        return scorer(model, X_test, y[test])
+
+    def fit(self, X, y) -> "SuccessiveHalvingSearchCV":
+        """
+        Run successive halving within the budgets and refit the winner.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Raw feature frame accepted by the pipeline.
+        y : array-like
+            Target values.
+
+        Returns
+        -------
+        SuccessiveHalvingSearchCV
+            The fitted search object.
+
+        Raises
+        ------
+        ValueError
+            If the budget ran out before any candidate was scored.
+        """
+        start = time.perf_counter()
+        scorer = get_scorer(self.scoring)
+        candidates = list(ParameterSampler(
+            self.param_distributions, self.n_candidates, random_state=self.random_state
+        ))
+        y = np.asarray(y)
+        splits = list(check_cv(self.cv).split(X, y))
+        cache = self.cache if self.cache is not None else FoldTransformCache(max_entries=len(splits))
+        data_key = fingerprint_frame(X)
+
+        scores = np.full((len(candidates), len(splits)), np.nan)
+        last_rung = np.zeros(len(candidates), dtype=int)
+        survivors = np.arange(len(candidates))
+        self.n_fits_ = 0
+        self.stopped_early_ = False
+
+        rung, n_folds = 0, min(self.min_folds, len(splits))
+        while True:
+            for fold in range(n_folds):
+                for candidate in survivors:
+                    if not np.isnan(scores[candidate, fold]):
+                        continue
+                    if self._budget_exhausted(start):
+                        self.stopped_early_ = True
+                        break
+                    scores[candidate, fold] = self._score_on_fold(
+                        candidates[candidate], X, y, splits[fold], cache, data_key, scorer
+                    )
+                    last_rung[candidate] = rung
+                if self.stopped_early_:
+                    break
+            if self.stopped_early_ or n_folds == len(splits) or len(survivors) == 1:
+                break
+            means = np.nanmean(scores[survivors, :n_folds], axis=1)
+            n_keep = max(1, math.ceil(len(survivors) / self.factor))
+            survivors = survivors[np.argsort(-means, kind="stable")[:n_keep]]
+            rung, n_folds = rung + 1, min(n_folds * self.factor, len(splits))
+
+        self.elapsed_ = time.perf_counter() - start
+        self._store_results(candidates, scores, last_rung)
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
+
+    def _store_results(self, candidates: list, scores: np.ndarray, last_rung: np.ndarray) -> None:
+        n_resources = np.sum(~np.isnan(scores), axis=1)
+        if n_resources.max() == 0:
+            raise ValueError("The search budget ran out before any candidate was scored.")
+
+        scored = n_resources > 0
+        mean_scores = np.full(len(candidates), np.nan)
+        std_scores = np.full(len(candidates), np.nan)
+        mean_scores[scored] = np.nanmean(scores[scored], axis=1)
+        std_scores[scored] = np.nanstd(scores[scored], axis=1)
+
+        results = {"params": candidates}
+        for name in sorted({name for params in candidates for name in params}):
+            results[f"param_{name}"] = np.array(
+                [params.get(name) for params in candidates], dtype=object
+            )
+        for fold, fold_scores in enumerate(scores.T):
+            results[f"split{fold}_test_score"] = fold_scores
+        results["mean_test_score"] = mean_scores
+        results["std_test_score"] = std_scores
+        results["n_resources"] = n_resources
+        results["iter"] = last_rung
+
+        # As in sklearn's halving searches, candidates scored on more folds
+        # outrank those eliminated earlier; ties break on the mean score.
+        order = np.lexsort((-np.nan_to_num(mean_scores, nan=-np.inf), -n_resources))
+        ranks = np.empty(len(candidates), dtype=np.int32)
+        ranks[order] = np.arange(1, len(candidates) + 1)
+        results["rank_test_score"] = ranks
+
+        self.cv_results_ = results
+        self.n_splits_ = scores.shape[1]
+        self.best_index_ = int(order[0])
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(mean_scores[self.best_index_])
+
+    def predict(self, X) -> np.ndarray:
+        """Predict with the refitted best pipeline."""
+        return self.best_estimator_.predict(X)
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from src.inference_artifact import LinearModelArtifact, artifact_arrays
+
+
+class CompiledPredictor:
+    """
+    Linear pipeline folded into weights on the raw columns.
+
+    Because every preprocessing step of the student pipeline is affine, the
+    scalers can be folded into the Ridge coefficients and the intercept,
+    ``w_j * (x_j - offset_j) / scale_j = (w_j / scale_j) x_j - w_j offset_j / scale_j``,
+    and each one-hot encoded column becomes a lookup table holding the
+    weight of every category (zero for the dropped category and for unknown
+    categories that the encoder ignores). Prediction is then one dot product
+    over the numeric raw columns plus one gather per categorical column,
+    with no intermediate design matrix or DataFrame.
+
+    Use ``compile_predictor`` to build one.
+
+    Attributes
+    ----------
+    numeric_columns : list of str
+        Raw columns entering the dot product.
+    numeric_weights : np.ndarray
+        Folded weight of each numeric column.
+    intercept : float
+        Folded intercept.
+    lookups : list of dict
+        One entry per categorical column with its sorted categories, the
+        matching weights and whether unknown categories are ignored.
+    """
+
+    def __init__(self, numeric_columns: list, numeric_weights: np.ndarray, intercept: float,
+                 lookups: list) -> None:
+        self.numeric_columns = numeric_columns
+        self.numeric_weights = numeric_weights
+        self.intercept = intercept
+        self.lookups = lookups
+
+    @classmethod
+    def from_artifact(cls, artifact: LinearModelArtifact) -> "CompiledPredictor":
+        """
+        Fold an inference artifact's preprocessing into its weights.
+
+        Parameters
+        ----------
+        artifact : LinearModelArtifact
+            Loaded artifact.
+
+        Returns
+        -------
+        CompiledPredictor
+            Predictor operating on raw columns.
+        """
+        numeric = {}
+        intercept = artifact.intercept
+        lookups = []
+        position = 0
+
+        for block in artifact.blocks:
+            if block["kind"] == "onehot":
+                for j, column in enumerate(block["columns"]):
+                    categories = block["categories"][j]
+                    weights = np.zeros(len(categories))
+                    kept = np.delete(np.arange(len(categories)), block["drop"][j]) \
+                        if block["drop"][j] >= 0 else np.arange(len(categories))
+                    weights[kept] = artifact.coef[position:position + len(kept)]
+                    position += len(kept)
+
+                    order = np.argsort(categories)
+                    lookups.append({
+                        "column": column,
+                        "categories": categories[order],
+                        # trailing zero is the weight of an ignored unknown category
+                        "weights": np.append(weights[order], 0.0),
+                        "ignore_unknown": block["ignore_unknown"],
+                    })
+                continue
+
+            n_columns = len(block["columns"])
+            weights = artifact.coef[position:position + n_columns]
+            position += n_columns
+            if block["kind"] == "scale":
+                intercept -= float(np.sum(weights * block["offset"] / block["scale"]))
+                weights = weights / block["scale"]
+            for column, weight in zip(block["columns"], weights):
+                numeric[column] = numeric.get(column, 0.0) + weight
+
+        return cls(
+            numeric_columns=list(numeric),
+            numeric_weights=np.array(list(numeric.values()), dtype=float),
+            intercept=float(intercept),
+            lookups=lookups,
+        )
+
+    @staticmethod
+    def _codes(values, lookup: dict) -> np.ndarray:
+        """Map raw category values to positions in the lookup table."""
+        categories = lookup["categories"]
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            # reuse the column's own category codes; missing values (code -1)
+            # go to a trailing slot that is never a known category
+            codes = values.cat.codes.to_numpy().astype(np.intp)
+            uniques = np.append(values.cat.categories.to_numpy().astype(str), "nan")
+            codes[codes < 0] = len(uniques) - 1
+        else:
+            # resolve each distinct value once, then broadcast back to the rows
+            codes, uniques = pd.factorize(np.asarray(values), use_na_sentinel=False)
+            uniques = np.asarray(uniques).astype(str)
+        positions = np.clip(np.searchsorted(categories, uniques), 0, len(categories) - 1)
+        known = categories[positions] == uniques
+        if not known.all():
+            # only categories that occur in the data count as unknown
+            used = np.zeros(len(uniques), dtype=bool)
+            used[codes] = True
+            unknown = ~known & used
+            if unknown.any() and not lookup["ignore_unknown"]:
+                raise ValueError(
+                    f"Found unknown categories {sorted(set(uniques[unknown]))} in column '{lookup['column']}'."
+                )
+            positions[~known] = len(categories)
+        return positions[codes]
+
+    def predict(self, data) -> np.ndarray:
+        """
+        Predict the target for raw student records.
+
+        Parameters
+        ----------
+        data : pd.DataFrame or mapping
+            Raw feature columns.
+
+        Returns
+        -------
+        np.ndarray
+            Predictions, one per row.
+        """
+        numeric = np.column_stack([np.asarray(data[column], dtype=float) for column in self.numeric_columns])
+        predictions = numeric @ self.numeric_weights + self.intercept
+        for lookup in self.lookups:
+            predictions += lookup["weights"][self._codes(data[lookup["column"]], lookup)]
+        return predictions
+
+
+def compile_predictor(model) -> CompiledPredictor:
+    """
+    Compile a fitted pipeline, search object or artifact into a fused predictor.
+
+    Parameters
+    ----------
+    model : LinearModelArtifact, sklearn search object or Pipeline
+        A loaded artifact, or a fitted model accepted by ``artifact_arrays``.
+
+    Returns
+    -------
+    CompiledPredictor
+        Predictor that gives the same predictions as ``model.predict`` to
+        within floating-point tolerance.
+
+    Examples
+    --------
+    >>> predictor = compile_predictor(final_model_pipe)
+    >>> predictor.predict(student_test)
+    """
+    if not isinstance(model, LinearModelArtifact):
+        model = LinearModelArtifact.from_arrays(artifact_arrays(model))
+    return CompiledPredictor.from_artifact(model)
@@ -0,0 +1,434 @@
+import numpy as np
+import pandas as pd
+
+# --correlation-backend choices of fit_student_predictor.py
+CORRELATION_BACKENDS = ("deepchecks", "native")
+
+# rows used by default, the sample sizes of ppscore and of deepchecks'
+# FeatureFeatureCorrelation
+PPS_SAMPLE_ROWS = 5_000
+ASSOCIATION_SAMPLE_ROWS = 10_000
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    """Whether ppscore would one-hot encode ``series`` rather than split on its values."""
+    return (pd.api.types.is_bool_dtype(series) or pd.api.types.is_object_dtype(series)
+            or pd.api.types.is_string_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+def _codes(series: pd.Series) -> tuple:
+    """
+    Return ``(codes, values)`` for a column without missing values.
+
+    Numeric columns are coded by the rank of their distinct values, which are
+    returned sorted; categorical columns by category (``values`` is None).
+    """
+    if series.isna().any():
+        raise ValueError(f"Column '{series.name}' has missing values; validate the data first.")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), None
+    if _is_categorical(series):
+        return pd.factorize(series)[0].astype(np.int64), None
+    values, codes = np.unique(series.to_numpy(), return_inverse=True)
+    return codes.astype(np.int64), values
+
+
+def _sample(df: pd.DataFrame, sample_rows: int, seed: int) -> pd.DataFrame:
+    if sample_rows is None or len(df) <= sample_rows:
+        return df
+    rows = np.random.default_rng(seed).choice(len(df), size=sample_rows, replace=False)
+    return df.iloc[np.sort(rows)]
+
+
+def infer_task(y: pd.Series) -> str:
+    """
+    Return "classification" or "regression" for a target, as deepchecks infers it.
+
+    A numeric target with few distinct values (under 5% of ``max(rows,
+    1000)``, and at most 30 for whole numbers or 5 otherwise) is treated
+    as class labels, so the student grades (0-20) are a classification
+    target for deepchecks' ``FeatureLabelCorrelation``.
+
+    Parameters
+    ----------
+    y : pd.Series
+        Target column.
+
+    Returns
+    -------
+    str
+        "classification" or "regression".
+    """
+    if not pd.api.types.is_numeric_dtype(y) or pd.api.types.is_bool_dtype(y):
+        return "classification"
+    values = y.dropna().to_numpy(dtype=float)
+    n_unique = len(np.unique(values))
+    max_categories = 30 if np.all(values % 1 == 0) else 5
+    few = n_unique / max(len(values), 1000) < 0.05 and n_unique <= max_categories
+    return "classification" if few else "regression"
+
+
+def _kfold(n_rows: int, n_folds: int) -> np.ndarray:
+    """Fold of each position under an unshuffled ``KFold``."""
+    sizes = np.full(n_folds, n_rows // n_folds)
+    sizes[:n_rows % n_folds] += 1
+    return np.repeat(np.arange(n_folds), sizes)
+
+
+def _stratified_kfold(labels: np.ndarray, n_folds: int) -> np.ndarray:
+    """Fold of each position under an unshuffled ``StratifiedKFold``, reproducing its allocation."""
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    # classes are numbered by first appearance
+    encoded = np.argsort(np.argsort(first, kind="stable"))[inverse]
+    n_classes = len(first)
+    y_order = np.sort(encoded)
+    allocation = np.stack([np.bincount(y_order[i::n_folds], minlength=n_classes) for i in range(n_folds)])
+    folds = np.empty(len(labels), dtype=np.int64)
+    for label in range(n_classes):
+        folds[encoded == label] = np.repeat(np.arange(n_folds), allocation[:, label])
+    return folds
+
+
+def _nearest_seen(values: np.ndarray, seen: np.ndarray) -> np.ndarray:
+    """
+    For every distinct value, the index of the seen value a fitted tree routes it to.
+
+    A tree splits between consecutive training values at their midpoint and
+    sends ``x <= threshold`` left, so an unseen value lands with the closer
+    of its seen neighbours (the lower one on a tie). Like scikit-learn, the
+    values are compared in float32 and the midpoint is ``a / 2 + b / 2``.
+    """
+    values = values.astype(np.float32).astype(np.float64)
+    index = np.arange(len(values))
+    below = np.maximum.accumulate(np.where(seen, index, -1))
+    above = np.minimum.accumulate(np.where(seen, index, len(values))[::-1])[::-1]
+    has_below, has_above = below >= 0, above < len(values)
+    lower, upper = values[np.where(has_below, below, 0)], values[np.where(has_above, above, 0)]
+    midpoint = lower / 2 + upper / 2
+    midpoint = np.where(midpoint == upper, lower, midpoint)
+    go_below = has_below & (~has_above | (values <= midpoint))
+    return np.where(go_below, below, above)
+
+
+def _leaf_sources(coded: list, offsets: np.ndarray, seen: np.ndarray) -> np.ndarray:
+    """
+    Map each (fold, group) to the group whose prediction it receives.
+
+    Seen groups map to themselves, unseen numeric values to their nearest
+    seen value and unseen categories to -1 (the fold-level fallback).
+    """
+    sources = np.broadcast_to(np.arange(seen.shape[1]), seen.shape).copy()
+    sources[~seen] = -1
+    for (_, values), offset in zip(coded, offsets):
+        if values is None:
+            continue
+        block = slice(offset, offset + len(values))
+        for fold in np.flatnonzero((~seen[:, block]).any(axis=1)):
+            sources[fold, block] = offset + _nearest_seen(values, seen[fold, block])
+    return sources
+
+
+def _weighted_f1(truth: np.ndarray, predicted: np.ndarray, blocks: np.ndarray, n_blocks: int,
+                 n_classes: int) -> np.ndarray:
+    """
+    Support-weighted F1 of every column of ``predicted`` within every block of rows.
+
+    ``truth`` and ``blocks`` are per row, ``predicted`` is (rows, columns).
+    Returns a (blocks, columns) array, as ``f1_score(average="weighted")``.
+    """
+    n_columns = predicted.shape[1]
+    support = np.bincount(blocks * n_classes + truth, minlength=n_blocks * n_classes).reshape(n_blocks, 1, n_classes)
+    keys = ((blocks[:, None] * n_columns + np.arange(n_columns)) * n_classes + predicted).ravel()
+    size = n_blocks * n_columns * n_classes
+    predicted_counts = np.bincount(keys, minlength=size).reshape(n_blocks, n_columns, n_classes)
+    hits = np.bincount(keys, weights=(predicted == truth[:, None]).ravel(), minlength=size)
+    hits = hits.reshape(n_blocks, n_columns, n_classes)
+    denominator = support + predicted_counts
+    f1 = np.divide(2 * hits, denominator, out=np.zeros(hits.shape), where=denominator > 0)
+    return (f1 * support).sum(axis=2) / support.sum(axis=2)
+
+
+def predictive_power_scores(df: pd.DataFrame, target: str, task: str = "auto", n_folds: int = 4,
+                            sample_rows: int = PPS_SAMPLE_ROWS, seed: int = 0) -> pd.Series:
+    """
+    Approximate the Predictive Power Score of every feature, as deepchecks computes it.
+
+    Mirrors ppscore, which deepchecks' ``FeatureLabelCorrelation`` runs:
+    an unrestricted decision tree on the single feature is cross-validated
+    on ``n_folds`` folds of the shuffled rows (stratified for
+    classification) and compared with a naive baseline. For regression
+    ``PPS = max(0, 1 - MAE_model / MAE_median)``; for classification the
+    weighted F1 is rescaled between the better of predicting the most
+    common class or a shuffled copy of the target, and 1.
+
+    Such a tree predicts the mean target (or the majority class) of each
+    distinct training value, each category for categorical features. So
+    all features are scored at once from per-fold group counts of the
+    target (``np.bincount``) instead of fitting ``n_folds`` trees per
+    feature. Numeric values missing from a training fold are routed to the
+    nearest seen value, as the tree's midpoint thresholds would; unseen
+    categories get the fold's mean or majority class. Categorical features
+    that are unique per row score 0, as in ppscore.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Features and target, without missing values.
+    target : str
+        Target column.
+    task : {"auto", "regression", "classification"}, optional
+        "auto" (default) decides like deepchecks (``infer_task``).
+    n_folds : int, optional
+        Number of cross-validation folds (default: 4, as ppscore).
+    sample_rows : int, optional
+        Score a seeded sample of this many rows when ``df`` is larger
+        (default: 5,000, as ppscore); None scores every row.
+    seed : int, optional
+        Seed for the sample, the shuffle and the random baseline (default: 0).
+
+    Returns
+    -------
+    pd.Series
+        PPS in [0, 1] per feature, highest first.
+
+    Raises
+    ------
+    ValueError
+        If a column has missing values, or ``task`` is "regression" for a
+        non-numeric target.
+
+    Examples
+    --------
+    >>> predictive_power_scores(student_train, "G3").head(2)
+    G2    0.34
+    G1    0.16
+    """
+    df = _sample(df, sample_rows, seed)
+    task = infer_task(df[target]) if task == "auto" else task
+    if task == "regression" and not pd.api.types.is_numeric_dtype(df[target]):
+        raise ValueError(f"Target '{target}' must be numeric for regression.")
+    features = [column for column in df.columns if column != target]
+    n_rows = len(df)
+    zeros = pd.Series(0.0, index=features, dtype=float)
+    labels, classes = _codes(df[target])[0], None
+    if task == "classification":
+        classes = np.unique(labels, return_inverse=True)[1]  # sorted classes, as LabelEncoder
+        n_classes = classes.max() + 1
+        if not features or n_classes == 1 or n_classes == n_rows or n_rows < n_folds:
+            return zeros
+    elif not features or df[target].nunique() == 1 or n_rows < n_folds:
+        return zeros
+
+    # shuffle, then cut into folds as cross_val_score's default splitter does
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n_rows)
+    folds = np.empty(n_rows, dtype=np.int64)
+    folds[order] = _stratified_kfold(classes[order], n_folds) if task == "classification" else _kfold(n_rows, n_folds)
+    fold_sizes = np.bincount(folds, minlength=n_folds)
+
+    coded = [_codes(df[column]) for column in features]
+    sizes = np.array([codes.max() + 1 for codes, _ in coded])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    groups = np.column_stack([codes for codes, _ in coded]) + offsets  # (rows, features) global group ids
+    n_groups = int(sizes.sum())
+    fold_keys = (folds[:, None] * n_groups + groups).ravel()
+    fold_counts = np.bincount(fold_keys, minlength=n_folds * n_groups).reshape(n_folds, n_groups)
+    seen = fold_counts.sum(axis=0) - fold_counts > 0
+    sources = _leaf_sources(coded, offsets, seen)
+
+    if task == "regression":
+        y = df[target].to_numpy(dtype=float)
+        fold_sums = np.bincount(fold_keys, weights=np.repeat(y, len(features)), minlength=n_folds * n_groups)
+        fold_sums = fold_sums.reshape(n_folds, n_groups)
+        train_counts = fold_counts.sum(axis=0) - fold_counts
+        means = (fold_sums.sum(axis=0) - fold_sums) / np.maximum(train_counts, 1)
+        fallback = (y.sum() - np.bincount(folds, weights=y, minlength=n_folds)) / (n_rows - fold_sizes)
+        leaves = np.where(sources >= 0, np.take_along_axis(means, np.maximum(sources, 0), axis=1), fallback[:, None])
+        errors = np.abs(leaves[folds[:, None], groups] - y[:, None])
+        fold_mae = np.stack([np.bincount(folds, weights=errors[:, j], minlength=n_folds) for j in range(len(features))],
+                            axis=1) / fold_sizes[:, None]
+        model_mae = fold_mae.mean(axis=0)
+        naive_mae = np.abs(y - np.median(y)).mean()
+        scores = np.where(model_mae > naive_mae, 0.0, 1 - model_mae / naive_mae)
+    else:
+        # training counts of the (group, class) pairs that occur, sorted by group
+        pairs, pair_index = np.unique((groups * n_classes + classes[:, None]).ravel(), return_inverse=True)
+        pair_counts = np.bincount(np.repeat(folds, len(features)) * len(pairs) + pair_index,
+                                  minlength=n_folds * len(pairs)).reshape(n_folds, len(pairs))
+        train_pairs = pair_counts.sum(axis=0) - pair_counts
+        pair_group, pair_class = pairs // n_classes, pairs % n_classes
+        starts = np.flatnonzero(np.r_[True, np.diff(pair_group) > 0])
+        segment = np.cumsum(np.r_[False, np.diff(pair_group) > 0])
+        best = np.maximum.reduceat(train_pairs, starts, axis=1)
+        # the most frequent class of each group, the lowest on ties (as the tree's argmax)
+        candidates = np.where((train_pairs == best[:, segment]) & (train_pairs > 0), pair_class, n_classes)
+        majority = np.full((n_folds, n_groups), n_classes)
+        majority[:, pair_group[starts]] = np.minimum.reduceat(candidates, starts, axis=1)
+        fold_classes = np.stack([np.bincount(classes[folds != fold], minlength=n_classes).argmax()
+                                 for fold in range(n_folds)])
+        leaves = np.where(sources >= 0, np.take_along_axis(majority, np.maximum(sources, 0), axis=1),
+                          fold_classes[:, None])
+        predicted = leaves[folds[:, None], groups]
+        model_f1 = _weighted_f1(classes, predicted, folds, n_folds, n_classes).mean(axis=0)
+        baselines = np.column_stack([np.full(n_rows, np.bincount(classes).argmax()), classes[rng.permutation(n_rows)]])
+        baseline_f1 = _weighted_f1(classes, baselines, np.zeros(n_rows, dtype=np.int64), 1, n_classes).max()
+        scores = np.where(model_f1 < baseline_f1, 0.0, (model_f1 - baseline_f1) / (1 - baseline_f1))
+
+    unique_id = [values is None and size == n_rows for (_, values), size in zip(coded, sizes)]
+    scores[np.array(unique_id)] = 0.0
+    return pd.Series(scores, index=features).sort_values(ascending=False, kind="stable")
+
+
+def _average_ranks(codes: np.ndarray) -> np.ndarray:
+    """1-based ranks of the values coded by sorted ``codes``, ties sharing their average rank."""
+    counts = np.bincount(codes)
+    return (np.cumsum(counts) - (counts - 1) / 2)[codes]
+
+
+def _pearson(matrix: np.ndarray) -> np.ndarray:
+    """Pearson correlation between the columns of ``matrix``; NaN for constant columns."""
+    centered = matrix - matrix.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (centered.T @ centered) / np.outer(norms, norms)
+
+
+def _cramers_v(a: np.ndarray, b: np.ndarray) -> float:
+    """Cramér's V of two category code arrays, from their contingency table."""
+    a, b = np.unique(a, return_inverse=True)[1], np.unique(b, return_inverse=True)[1]
+    rows, columns = a.max() + 1, b.max() + 1
+    if min(rows, columns) < 2:
+        return np.nan
+    table = np.bincount(a * columns + b, minlength=rows * columns).reshape(rows, columns).astype(float)
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / len(a)
+    phi2 = ((table - expected) ** 2 / expected).sum() / len(a)
+    return np.sqrt(phi2 / (min(rows, columns) - 1))
+
+
+def _correlation_ratio(codes: np.ndarray, x: np.ndarray) -> float:
+    """Correlation ratio (eta) of numeric ``x`` grouped by category ``codes``."""
+    counts = np.bincount(codes)
+    means = np.bincount(codes, weights=x) / np.maximum(counts, 1)
+    total = ((x - x.mean()) ** 2).sum()
+    return np.sqrt((counts * (means - x.mean()) ** 2).sum() / total) if total > 0 else 0.0
+
+
+def association_matrix(df: pd.DataFrame, categorical_features: list = (),
+                       sample_rows: int = ASSOCIATION_SAMPLE_ROWS, seed: int = 0) -> pd.DataFrame:
+    """
+    Return the pairwise association between features.
+
+    Numeric pairs get their Spearman correlation (signed, computed as the
+    Pearson correlation of tie-averaged ranks, one matrix product for all
+    pairs), categorical pairs Cramér's V and numeric-categorical pairs the
+    correlation ratio, all computed over category codes. As in deepchecks'
+    ``FeatureFeatureCorrelation``, only numeric columns and those named in
+    ``categorical_features`` are included; the fit script names none, so
+    only numeric features are compared.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Features, without missing values.
+    categorical_features : list of str, optional
+        Columns to treat as categorical (default: none).
+    sample_rows : int, optional
+        Use a seeded sample of this many rows when ``df`` is larger
+        (default: 10,000, as deepchecks); None uses every row.
+    seed : int, optional
+        Seed for the sample (default: 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        Symmetric matrix, numeric features first, with NaN where a column
+        is constant.
+    """
+    df = _sample(df, sample_rows, seed)
+    categorical = [column for column in df.columns if column in set(categorical_features)]
+    numeric = [column for column in df.columns if column not in set(categorical)
+               and pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+    matrix = pd.DataFrame(np.nan, index=numeric + categorical, columns=numeric + categorical)
+    if numeric:
+        ranks = np.column_stack([_average_ranks(_codes(df[column])[0]) for column in numeric])
+        matrix.loc[numeric, numeric] = _pearson(ranks)
+    codes = {column: pd.factorize(df[column])[0] for column in categorical}
+    for i, first in enumerate(categorical):
+        for second in categorical[i:]:
+            matrix.loc[first, second] = matrix.loc[second, first] = _cramers_v(codes[first], codes[second])
+        for column in numeric:
+            eta = _correlation_ratio(codes[first], df[column].to_numpy(dtype=float))
+            matrix.loc[column, first] = matrix.loc[first, column] = eta
+    return matrix
+
+
+def correlated_pairs(matrix: pd.DataFrame, threshold: float) -> list:
+    """
+    Return the feature pairs associated above ``threshold``.
+
+    Like deepchecks' ``add_condition_max_number_of_pairs_above_threshold``,
+    values are compared signed and each pair is listed once, ordered by name.
+
+    Parameters
+    ----------
+    matrix : pd.DataFrame
+        Output of ``association_matrix``.
+    threshold : float
+        Association a pair must exceed to be reported.
+
+    Returns
+    -------
+    list of tuple of str
+        ``(first, second)`` pairs with ``first < second``.
+    """
+    above = matrix.to_numpy(dtype=float) > threshold
+    rows, columns = np.nonzero(above)
+    return sorted((matrix.index[i], matrix.columns[j]) for i, j in zip(rows, columns)
+                  if matrix.index[i] < matrix.columns[j])
+
+
+def correlation_failures(df: pd.DataFrame, target: str, pps_threshold: float = 0.9,
+                         correlation_threshold: float = 0.92, seed: int = 0) -> dict:
+    """
+    Run the fit script's correlation gates natively.
+
+    Equivalent to deepchecks' ``FeatureLabelCorrelation`` with
+    ``add_condition_feature_pps_less_than(pps_threshold)`` and
+    ``FeatureFeatureCorrelation`` with
+    ``add_condition_max_number_of_pairs_above_threshold(correlation_threshold)``
+    on a ``Dataset`` without categorical features, in milliseconds. Rows
+    are sampled as deepchecks samples them: 5,000 for the scores and 10,000
+    for the correlations.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Training data, features and target.
+    target : str
+        Target column.
+    pps_threshold : float, optional
+        A feature fails when its PPS is at least this (default: 0.9).
+    correlation_threshold : float, optional
+        A pair of numeric features fails when their Spearman correlation
+        exceeds this (default: 0.92).
+    seed : int, optional
+        Seed for the samples and the PPS folds (default: 0).
+
+    Returns
+    -------
+    dict
+        "feature_label": features whose PPS reaches ``pps_threshold``;
+        "feature_feature": pairs correlated above ``correlation_threshold``.
+        Both are empty when the data passes.
+
+    Examples
+    --------
+    >>> correlation_failures(student_train, "G3")
+    {'feature_label': [], 'feature_feature': []}
+    """
+    scores = predictive_power_scores(df, target, seed=seed)
+    matrix = association_matrix(df.drop(columns=[target]), seed=seed)
+    return {
+        "feature_label": [feature for feature, score in scores.items() if score >= pps_threshold],
+        "feature_feature": correlated_pairs(matrix, correlation_threshold),
+    }
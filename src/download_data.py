@@ -1,20 +1,516 @@
 # src/download_data.py
 import click
+import fnmatch
+import hashlib
+import io
+import json
 import os
-import pandas as pd
-import requests
-from io import BytesIO
-from zipfile import ZipFile
+import shutil
+import struct
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from zipfile import ZIP_STORED, ZipFile
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
 
-def read_zip(url: str, directory: str) -> None:
+# imported on first use, so --help starts fast
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+# bytes read from the network (and hashed) at a time when streaming
+CHUNK_SIZE = 1 << 20
+
+# times an interrupted streaming download is resumed before giving up
+DOWNLOAD_RETRIES = 3
+
+# seconds to wait for the server to answer or send the next chunk
+TIMEOUT = 60
+
+# archive members written at once; zlib and file writes release the GIL
+EXTRACT_WORKERS = 4
+
+
+def file_sha256(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Return the SHA-256 hex digest of a file, read in chunks.
+
+    Parameters
+    ----------
+    path : str
+        File to hash.
+    chunk_size : int, optional
+        Bytes read at a time (default: 1 MiB).
+
+    Returns
+    -------
+    str
+        Lowercase hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_archive(url: str, path: str, sha256: str = None, chunk_size: int = CHUNK_SIZE,
+                  retries: int = DOWNLOAD_RETRIES, validators: dict = None) -> bool:
+    """
+    Stream a file from a URL to disk, resuming partial downloads.
+
+    The response is written in ``chunk_size`` pieces to ``path + ".part"``,
+    so memory use does not grow with the file. If that partial file exists,
+    from an interrupted earlier run or a connection dropped during this one,
+    the download resumes from its end with an HTTP ``Range`` request. A
+    server that ignores ``Range`` sends the whole file, which then replaces
+    the partial one. The partial file is renamed to ``path`` only once it is
+    complete and, if ``sha256`` is given, verified.
+
+    With ``sha256``, an existing ``path`` with that digest is kept and
+    nothing is downloaded.
+
+    With ``validators`` (the "etag" and "last_modified" the server sent
+    with the existing ``path``), the request is conditional
+    (``If-None-Match`` / ``If-Modified-Since``). If the server answers 304
+    Not Modified, ``path`` is kept. After a download, ``validators`` is
+    updated in place with the new response's values. A download resumed
+    sends ``If-Range``, so a file changed on the server in between is sent
+    whole rather than spliced. Across runs, this uses the ``ETag`` or
+    ``Last-Modified`` saved next to the partial file
+    (``<path>.part.json``); a partial file without them is discarded,
+    unless ``sha256`` is given to catch a splice.
+
+    Parameters
+    ----------
+    url : str
+        URL of the file.
+    path : str
+        Where to write the file; its directory must exist.
+    sha256 : str, optional
+        Expected SHA-256 hex digest of the file.
+    chunk_size : int, optional
+        Bytes written at a time (default: 1 MiB).
+    retries : int, optional
+        How many times a dropped connection is resumed (default: 3).
+    validators : dict, optional
+        "etag" and/or "last_modified" of the existing ``path``; updated
+        in place.
+
+    Returns
+    -------
+    bool
+        True if the file was downloaded, False if the local copy matched
+        or the server reported it unchanged.
+
+    Raises
+    ------
+    ValueError
+        If the URL does not exist, or the downloaded file does not match
+        ``sha256`` (the partial file is then deleted).
+    requests.exceptions.RequestException
+        If the connection keeps failing after ``retries`` resumptions.
+
+    Examples
+    --------
+    >>> fetch_archive(
+    ...     "https://archive.ics.uci.edu/static/public/320/student+performance.zip",
+    ...     "data/raw/student+performance.zip"
+    ... )
+    True
+    """
+    expected = sha256.lower() if sha256 else None
+    if expected and os.path.exists(path) and file_sha256(path, chunk_size) == expected:
+        print(f"Up to date: {path} (SHA-256 matches)")
+        return False
+
+    partial = path + ".part"
+    partial_validators = partial + ".json"
+    attempt = 0
+    version = None
+    if os.path.exists(partial):
+        # a download left by an earlier run may only be resumed against the same version
+        try:
+            with open(partial_validators) as f:
+                saved = json.load(f)
+            version = saved.get("etag") or saved.get("last_modified")
+        except (OSError, ValueError):
+            pass
+        if version is None and not expected:
+            print(f"Discarding {partial}: its version is unknown")
+            os.remove(partial)
+    while True:
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        if offset and version:
+            headers["If-Range"] = version
+        elif not offset and validators and os.path.exists(path):
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+                if response.status_code == 304 and ("If-None-Match" in headers or "If-Modified-Since" in headers):
+                    print(f"Not modified: {url}")
+                    return False
+                if response.status_code == 416 and offset:
+                    # nothing left to send: complete if the server's size is ours
+                    if response.headers.get("Content-Range", "").endswith(f"/{offset}"):
+                        break
+                    os.remove(partial)
+                    continue
+                if response.status_code == 206 and not response.headers.get(
+                        "Content-Range", "").startswith(f"bytes {offset}-"):
+                    raise ValueError(f"The server resumed {url} at the wrong position.")
+                if response.status_code not in (200, 206):
+                    raise ValueError('The URL provided does not exist.')
+                if response.status_code == 200 or version is None:
+                    received = {"etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified")}
+                    version = received["etag"] or received["last_modified"]
+                    with open(partial_validators, "w") as f:
+                        json.dump(received, f)
+                if offset:
+                    resumed = response.status_code == 206
+                    print(f"Resuming {url} at byte {offset}" if resumed
+                          else f"Server sent the whole file; downloading {url} from the start")
+                with open(partial, "ab" if response.status_code == 206 else "wb") as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+            break
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as error:
+            attempt += 1
+            if attempt > retries:
+                raise
+            print(f"Download interrupted ({type(error).__name__}), resuming ({attempt}/{retries})...")
+
+    digest = file_sha256(partial, chunk_size)
+    if os.path.exists(partial_validators):
+        os.remove(partial_validators)
+    if expected and digest != expected:
+        os.remove(partial)
+        raise ValueError(f"Checksum mismatch for {url}: expected SHA-256 {expected}, got {digest}.")
+    os.replace(partial, path)
+    if validators is not None and version is not None:
+        validators.clear()
+        validators.update({key: value for key, value in received.items() if value})
+    print(f"Downloaded {path} (SHA-256 {digest})")
+    return True
+
+
+def _matches(name: str, members) -> bool:
+    """Whether a member name, or its base name, matches one of the ``members`` patterns (all if None)."""
+    if members is None:
+        return True
+    base = name.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(base, pattern) for pattern in members)
+
+
+def _open_source(source):
+    """Open a new, independent handle on a zip file given as a path or as bytes."""
+    return open(source, "rb") if isinstance(source, (str, os.PathLike)) else io.BytesIO(source)
+
+
+class _Window(io.RawIOBase):
+    """Read-only, seekable view of ``length`` bytes of ``raw`` starting at ``start``."""
+
+    def __init__(self, raw, start: int, length: int) -> None:
+        super().__init__()
+        self.raw, self.start, self.length, self.position = raw, start, length, 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}[whence]
+        self.position = max(0, base + offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.length - self.position)
+        if size <= 0:
+            return 0
+        self.raw.seek(self.start + self.position)
+        data = self.raw.read(size)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def _data_offset(handle, info) -> int:
+    """Position of a member's (stored) data in ``handle``, past its local file header."""
+    handle.seek(info.header_offset)
+    name_length, extra_length = struct.unpack("<HH", handle.read(30)[26:30])
+    return info.header_offset + 30 + name_length + extra_length
+
+
+def _destination(directory: str, name: str) -> str:
+    """Path a member is written to, refusing names that would leave ``directory``."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        raise ValueError(f"Refusing to extract archive member '{name}' outside the target directory.")
+    return os.path.join(directory, *parts)
+
+
+def _plan_extraction(source, members) -> tuple:
+    """
+    Find the members to extract without decompressing any nested archive.
+
+    Returns
+    -------
+    tuple of (dict, list)
+        The members to write from each archive that can be read in place,
+        by its ``(start, length)`` window in the source (None for the
+        source itself), and the ``(window, name)`` of each compressed
+        nested archive, whose members are found while streaming it.
+    """
+    addressable, streamed = defaultdict(list), []
+
+    def walk(archive, handle, window) -> None:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            nested = info.filename.lower().endswith(".zip")
+            # a nested archive is written only when asked for by name
+            if _matches(info.filename, members) and not (nested and members is None):
+                addressable[window].append(info.filename)
+            if not nested:
+                continue
+            if info.compress_type == ZIP_STORED:
+                start = (window[0] if window else 0) + _data_offset(handle, info)
+                inner = _Window(handle.raw if window else handle, start, info.file_size)
+                with ZipFile(inner) as inner_archive:
+                    walk(inner_archive, inner, (start, info.file_size))
+            else:
+                streamed.append((window, info.filename))
+
+    with _open_source(source) as handle, ZipFile(handle) as archive:
+        walk(archive, handle, None)
+    return addressable, streamed
+
+
+def _write_member(archive, name: str, directory: str) -> tuple:
+    """Stream one member to its destination through a ``.part`` file; return its name and path."""
+    path = _destination(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with archive.open(name) as member, open(path + ".part", "wb") as f:
+        shutil.copyfileobj(member, f, CHUNK_SIZE)
+    os.replace(path + ".part", path)
+    return name, path
+
+
+def _open_container(stack: ExitStack, source, window) -> ZipFile:
+    """Open the archive at ``window`` of the source on a new handle."""
+    handle = stack.enter_context(_open_source(source))
+    return stack.enter_context(ZipFile(_Window(handle, *window) if window else handle))
+
+
+def _batches(names: list, count: int) -> list:
+    """Split ``names`` into at most ``count`` contiguous batches of similar size."""
+    count = max(1, min(count, len(names)))
+    size, extra = divmod(len(names), count)
+    bounds = [i * size + min(i, extra) for i in range(count + 1)]
+    return [names[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _extract_names(source, window, names: list, directory: str) -> list:
+    """Write the named members of an archive read in place."""
+    with ExitStack() as stack:
+        archive = _open_container(stack, source, window)
+        return [_write_member(archive, name, directory) for name in names]
+
+
+def _stream_nested(archive, nested: str, directory: str, members) -> list:
+    """Write the matching members of a compressed nested archive (and of those nested in it), in order."""
+    written = []
+    with archive.open(nested) as f, ZipFile(f) as inner:
+        for info in inner.infolist():
+            if info.is_dir():
+                continue
+            is_archive = info.filename.lower().endswith(".zip")
+            if _matches(info.filename, members) and not (is_archive and members is None):
+                written.append(_write_member(inner, info.filename, directory))
+            if is_archive:
+                written.extend(_stream_nested(inner, info.filename, directory, members))
+    return written
+
+
+def _extract_stream(source, window, nested: str, directory: str, members) -> list:
+    """Open the archive holding ``nested`` on a new handle and stream its members out."""
+    with ExitStack() as stack:
+        return _stream_nested(_open_container(stack, source, window), nested, directory, members)
+
+
+def extract_members(source, directory: str, members: tuple = None, workers: int = EXTRACT_WORKERS) -> list:
+    """
+    Extract the files of a zip archive, and of the archives nested in it, in parallel.
+
+    Nested ``.zip`` members are not written to disk: their members are
+    streamed straight from the outer archive to their destinations. A
+    nested archive stored uncompressed is read in place, so its members
+    are split into about ``workers`` independent tasks, each opening the
+    archive once; the members of a compressed one are found and extracted
+    in a single pass over its stream, alongside the other tasks. Every file is written to a ``.part`` file first and
+    renamed when complete. As with ``ZipFile.extractall``, members keep
+    their path within their own archive.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Path of the zip file, or its content.
+    directory : str
+        Directory the members are written to.
+    members : tuple of str, optional
+        Names or glob patterns (e.g. "student-por.csv", "school-*.csv")
+        of the members to extract, matched against the full member name
+        and its base name; a nested archive named here is written as a
+        file too (default: None, every file except nested archives).
+    workers : int, optional
+        Tasks run at once (default: 4).
+
+    Returns
+    -------
+    list of str
+        Paths written, sorted.
+
+    Raises
+    ------
+    ValueError
+        If a pattern in ``members`` matches nothing (the members matching
+        the other patterns are still written), or a member name would be
+        written outside ``directory``.
+
+    Examples
+    --------
+    >>> extract_members("data/raw/student+performance.zip", "data/raw", members=["student-por.csv"])
+    ['data/raw/student-por.csv']
+    """
+    addressable, streamed = _plan_extraction(source, members)
+    # about ``workers`` batches per archive: each batch parses its central directory once
+    tasks = [partial(_extract_names, source, window, batch, directory)
+             for window, names in addressable.items() for batch in _batches(names, workers)]
+    tasks += [partial(_extract_stream, source, window, nested, directory, members) for window, nested in streamed]
+    if workers <= 1 or len(tasks) <= 1:
+        results = [task() for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+            results = list(executor.map(lambda task: task(), tasks))
+    written = [member for result in results for member in result]
+
+    for pattern in members or ():
+        if not any(_matches(name, [pattern]) for name, _ in written):
+            raise ValueError(f"No archive member matches '{pattern}'.")
+    return sorted(path for _, path in written)
+
+
+def _copy_members(extracted: str, directory: str, members: tuple) -> None:
+    """Copy the files of an extracted cache entry matching ``members`` into ``directory``."""
+    if members is None:
+        shutil.copytree(extracted, directory, dirs_exist_ok=True)
+        return
+    names = [os.path.relpath(os.path.join(root, name), extracted).replace(os.sep, "/")
+             for root, _, files in os.walk(extracted) for name in files]
+    for pattern in members:
+        if not any(_matches(name, [pattern]) for name in names):
+            raise ValueError(f"No archive member matches '{pattern}'.")
+    for name in names:
+        if _matches(name, members):
+            path = _destination(directory, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy2(os.path.join(extracted, name), path)
+
+
+def cached_download(url: str, cache_dir: str, sha256: str = None) -> tuple:
+    """
+    Download and extract a zip file through a persistent cache keyed by URL.
+
+    Each URL gets its own entry in ``cache_dir`` (named by the hash of the
+    URL) with the archive, its extracted files and a ``cache.json`` holding
+    the ``ETag`` and ``Last-Modified`` the server sent with it. When the
+    entry exists, the archive is revalidated with a conditional request
+    (see ``fetch_archive``). If the server reports it unchanged, the
+    extracted files are reused as they are; otherwise the new archive is
+    downloaded and extracted into the entry.
+
+    Parameters
+    ----------
+    url : str
+        URL of the zip file.
+    cache_dir : str
+        Cache directory, shared between runs (and e.g. mounted into CI
+        containers); created if missing.
+    sha256 : str, optional
+        Expected SHA-256 hex digest of the zip file.
+
+    Returns
+    -------
+    tuple of (str, bool)
+        Directory holding the extracted files, and whether the archive
+        was downloaded (False when the cached copy was reused).
+
+    Raises
+    ------
+    ValueError
+        If the URL does not exist or the archive does not match ``sha256``.
+    """
+    entry = os.path.join(cache_dir, hashlib.sha256(url.encode()).hexdigest()[:16])
+    archive = os.path.join(entry, os.path.basename(url))
+    extracted = os.path.join(entry, "extracted")
+    metadata_path = os.path.join(entry, "cache.json")
+    os.makedirs(entry, exist_ok=True)
+
+    metadata = {}
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    validators = dict(metadata.get("validators", {})) if metadata.get("url") == url else {}
+
+    downloaded = fetch_archive(url, archive, sha256=sha256, validators=validators)
+    if downloaded or not os.path.isdir(extracted):
+        # extract beside the entry and swap it in, so a failure keeps the old files
+        staging = extracted + ".new"
+        shutil.rmtree(staging, ignore_errors=True)
+        extract_members(archive, staging)
+        shutil.rmtree(extracted, ignore_errors=True)
+        os.replace(staging, extracted)
+        with open(metadata_path, "w") as f:
+            json.dump({"url": url, "validators": validators, "sha256": file_sha256(archive)}, f, indent=2)
+    else:
+        print(f"Reusing extracted files from {extracted}")
+    return extracted, downloaded
+
+
+def read_zip(url: str, directory: str, archive: str = None, sha256: str = None, cache_dir: str = None,
+             members: tuple = None) -> None:
     """
     Download and extract a zip file from a URL to a local directory.
 
     This function downloads a zip file from the specified URL and extracts
     its contents directly to the target directory using in-memory processing.
     It handles nested zip files (e.g., student+performance.zip containing
-    student.zip) and validates that the extracted CSV files are readable.
+    student.zip), whose members are streamed out without writing the nested
+    archive (see ``extract_members``), and validates that the extracted CSV
+    files are readable.
+
+    With ``archive`` (or ``sha256``), the zip file is instead streamed to
+    disk by ``fetch_archive``, which resumes interrupted downloads, checks
+    the SHA-256 and skips the download when the local copy matches. It is
+    then extracted from the file.
+
+    With ``cache_dir``, the download goes through ``cached_download``:
+    an unchanged archive (HTTP 304) is not downloaded again and its
+    extracted files are copied from the cache.
 
     Parameters
     ----------
@@ -23,6 +519,17 @@ def read_zip(url: str, directory: str) -> None:
     directory : str
         The local directory where files will be extracted.
         Must exist before calling this function.
+    archive : str, optional
+        Path to keep the downloaded zip file at. Defaults to the URL's file
+        name in ``directory`` when ``sha256`` is given; if neither is given,
+        the zip file is downloaded into memory.
+    sha256 : str, optional
+        Expected SHA-256 hex digest of the zip file.
+    cache_dir : str, optional
+        Persistent cache directory; ``archive`` is then not used.
+    members : tuple of str, optional
+        Names or glob patterns of the members to extract, e.g.
+        ("student-por.csv",) (default: None, every file).
 
     Returns
     -------
@@ -35,6 +542,8 @@ def read_zip(url: str, directory: str) -> None:
         If the URL does not exist (HTTP status != 200).
         If the URL does not point to a zip file.
         If the directory does not exist.
+        If the downloaded zip file does not match ``sha256``.
+        If a pattern in ``members`` matches no member.
         If extracted CSV files are not valid.
 
     Examples
@@ -54,20 +563,25 @@ def read_zip(url: str, directory: str) -> None:
     if not os.path.isdir(directory):
         raise ValueError('The directory provided does not exist.')
 
-    request = requests.get(url)
+    if sha256 and archive is None and cache_dir is None:
+        archive = os.path.join(directory, filename_from_url)
 
-    if request.status_code != 200:
-        raise ValueError('The URL provided does not exist.')
+    if cache_dir is not None:
+        extracted, _ = cached_download(url, cache_dir, sha256=sha256)
+        _copy_members(extracted, directory, members)
+    else:
+        if archive is None:
+            request = requests.get(url)
 
-    outer_zip_bytes = BytesIO(request.content)
+            if request.status_code != 200:
+                raise ValueError('The URL provided does not exist.')
 
-    with ZipFile(outer_zip_bytes, 'r') as outer_zip:
-        outer_zip.extractall(directory)
+            outer_zip_source = request.content
+        else:
+            fetch_archive(url, archive, sha256=sha256)
+            outer_zip_source = archive
 
-        if 'student.zip' in outer_zip.namelist():
-            inner_zip_bytes = BytesIO(outer_zip.read('student.zip'))
-            with ZipFile(inner_zip_bytes, 'r') as inner_zip:
-                inner_zip.extractall(directory)
+        extract_members(outer_zip_source, directory, members)
 
     csv_files = ["student-mat.csv", "student-por.csv"]
     for csv_file in csv_files:
@@ -83,13 +597,36 @@ def read_zip(url: str, directory: str) -> None:
 @click.command()
 @click.option('--url', type=str, help="URL of dataset to be downloaded")
 @click.option('--write-to', type=str, help="Path to directory where raw data will be written to")
-def main(url: str, write_to: str) -> None:
-    """Download data zip from the web and extract it to a local directory."""
-    try:
-        read_zip(url, write_to)
-    except ValueError:
-        os.makedirs(write_to)
-        read_zip(url, write_to)
+@click.option('--archive-to', type=str, default=None,
+              help="Stream the zip file to this path (resumable) instead of downloading it into memory")
+@click.option('--sha256', type=str, default=None,
+              help="Expected SHA-256 of the zip file; a matching local copy is not downloaded again")
+@click.option('--cache-dir', type=str, default=None, envvar='DATA_CACHE_DIR', show_envvar=True,
+              help="Persistent download cache; an archive the server reports unchanged is not downloaded "
+                   "or extracted again")
+@click.option('--members', type=str, multiple=True,
+              help="Extract only archive members with this name or glob pattern, e.g. student-por.csv; "
+                   "repeat for several (default: every file)")
+def main(url: str, write_to: str, archive_to: str, sha256: str, cache_dir: str, members: tuple) -> None:
+    """
+    Download data zip from the web and extract it to a local directory.
+
+    With ``--archive-to`` or ``--sha256`` the zip file is streamed to disk
+    in chunks, resumed with HTTP Range requests if interrupted and checked
+    against the SHA-256; see ``fetch_archive``. With ``--cache-dir`` (or
+    ``DATA_CACHE_DIR``) the archive and its extracted files are kept in a
+    cache and revalidated with conditional requests; see ``cached_download``.
+    ``--members`` limits the extraction to the named files; see
+    ``extract_members``.
+    """
+    os.makedirs(write_to, exist_ok=True)
+    options = {"members": members} if members else {}
+    if cache_dir:
+        read_zip(url, write_to, sha256=sha256, cache_dir=cache_dir, **options)
+    elif archive_to or sha256:
+        read_zip(url, write_to, archive=archive_to, sha256=sha256, **options)
+    else:
+        read_zip(url, write_to, **options)
     print("\nData download and extraction complete!")
 
 
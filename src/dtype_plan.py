@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# candidate integer dtypes, smallest first
+INTEGER_DTYPES = ("uint8", "int8", "uint16", "int16", "uint32", "int32", "int64")
+
+
+def smallest_int_dtype(min_value: int, max_value: int) -> str:
+    """
+    Return the smallest integer dtype holding every value in ``[min_value, max_value]``.
+
+    Parameters
+    ----------
+    min_value, max_value : int
+        Inclusive bounds of the column.
+
+    Returns
+    -------
+    str
+        NumPy dtype name, e.g. "uint8" for 0-100 and "int8" for -5-5.
+
+    Examples
+    --------
+    >>> smallest_int_dtype(0, 100)
+    'uint8'
+    """
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return dtype
+    raise ValueError(f"No integer dtype holds the range [{min_value}, {max_value}].")
+
+
+def dtype_plan(schema) -> dict:
+    """
+    Derive compact column dtypes from a pandera schema.
+
+    Integer columns with an ``in_range`` (``Check.between``) check get the
+    smallest integer dtype covering the range; string columns with an
+    ``isin`` check become a ``CategoricalDtype`` with the allowed values,
+    sorted so that category codes follow the order ``OneHotEncoder`` uses.
+    Columns without such a check are left out of the plan.
+
+    Parameters
+    ----------
+    schema : pa.DataFrameSchema
+        Schema such as ``preprocess_data.create_schema()``.
+
+    Returns
+    -------
+    dict
+        Mapping of column name to dtype (str or ``pd.CategoricalDtype``).
+
+    Examples
+    --------
+    >>> plan = dtype_plan(create_schema())
+    >>> plan["Medu"], plan["reason"]
+    ('uint8', CategoricalDtype(categories=['course', 'home', 'other', 'reputation'], ordered=False, ...))
+    """
+    plan = {}
+    for name, column in schema.columns.items():
+        dtype = str(column.dtype).lower()
+        for check in column.checks:
+            statistics = check.statistics or {}
+            if check.name == "in_range" and dtype.startswith("int"):
+                plan[name] = smallest_int_dtype(statistics["min_value"], statistics["max_value"])
+            elif check.name == "isin" and dtype in ("str", "string", "object"):
+                plan[name] = pd.CategoricalDtype(sorted(statistics["allowed_values"]))
+    return plan
+
+
+def apply_dtype_plan(df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    """
+    Cast the planned columns of ``df``, refusing any lossy conversion.
+
+    Columns of ``df`` that are not in the plan, and planned columns missing
+    from ``df``, are left alone.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Table to cast, e.g. after schema validation.
+    plan : dict
+        Output of ``dtype_plan``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Copy of ``df`` with compact dtypes.
+
+    Raises
+    ------
+    ValueError
+        If a value is missing, non-integral or out of range for its integer
+        dtype, or is not one of the categories of its categorical dtype.
+    """
+    casts = {}
+    for name, dtype in plan.items():
+        if name not in df.columns:
+            continue
+        values = df[name]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == dtype:
+                continue
+            unknown = set(values.dropna().unique()) - set(dtype.categories)
+            if unknown or values.isna().any():
+                raise ValueError(
+                    f"Cannot cast column '{name}' to a categorical: "
+                    f"values {sorted(map(str, unknown)) or ['<missing>']} are not in {list(dtype.categories)}."
+                )
+        elif values.dtype != dtype:
+            info = np.iinfo(dtype)
+            numeric = pd.to_numeric(values, errors="coerce")
+            if (numeric.isna().any() or (numeric % 1 != 0).any()
+                    or numeric.min() < info.min or numeric.max() > info.max):
+                raise ValueError(
+                    f"Cannot cast column '{name}' to {dtype}: values must be integers "
+                    f"in [{info.min}, {info.max}]."
+                )
+        else:
+            continue
+        casts[name] = dtype
+    return df.astype(casts) if casts else df.copy()
@@ -1,17 +1,72 @@
 import os
+import sys
 import warnings
 os.environ["PYTHONWARNINGS"] = "ignore"
 warnings.filterwarnings('ignore')
 
 import click
-import altair as alt
-import altair_ally as aly
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.dtype_plan import dtype_plan
+from src.preprocess_data import create_schema
+from src.rendering import FigureRenderer
+from src.storage import numeric_columns, read_table
+
+# imported on first use, so --help starts fast
+alt = lazy_import("altair")
+aly = lazy_import("altair_ally")
 
 TARGET = "G3"
 PASSING_GRADE = 10
 
+
+def save_target_distribution(path: str, grades: pd.DataFrame) -> None:
+    """
+    Save the histogram of G3, coloured by pass/fail (Figure 1).
+
+    Parameters
+    ----------
+    path : str
+        PNG file to write.
+    grades : pd.DataFrame
+        Frame with the G3 column.
+    """
+    target_plot = alt.Chart(grades).mark_bar().encode(
+        x=alt.X(TARGET, type='quantitative', bin=alt.Bin(maxbins=30)),
+        y=alt.Y('count()', scale=alt.Scale(domain=[0, 80])),
+        color=alt.Color(
+            "Grade:N",
+            scale=alt.Scale(
+                domain=["Pass", "Fail"],
+                range=["steelblue", "firebrick"]
+            )
+        )
+    ).transform_calculate(
+        Grade=alt.expr.if_(alt.datum[TARGET] >= PASSING_GRADE, "Pass", "Fail")
+    ).properties(
+        title="Distribution of the target feature (G3)",
+        width=400,
+        height=300
+    )
+    target_plot.save(path, scale_factor=2.0)
+
+
+def save_correlation_heatmap(path: str, features: pd.DataFrame) -> None:
+    """
+    Save the pairwise correlation heatmap of the features (Figure 2).
+
+    Parameters
+    ----------
+    path : str
+        PNG file to write.
+    features : pd.DataFrame
+        Numeric features, without G3.
+    """
+    aly.corr(features).save(path, scale_factor=2.0)
+
+
 @click.command()
 @click.option('--processed-training-data', type=str, help="Path to processed training data")
 @click.option('--plot-to', type=str, help="Path to directory where the plots will be written to")
@@ -27,7 +82,7 @@ def main(processed_training_data: str, plot_to: str) -> None:
     Parameters
     ----------
     processed_training_data : str
-        Path to the processed training data CSV file.
+        Path to the processed training data (.parquet, .arrow or .csv).
     plot_to : str
         Path to directory where plots will be saved as PNG files.
 
@@ -37,40 +92,27 @@ def main(processed_training_data: str, plot_to: str) -> None:
         The following files are saved to plot_to (results/figures/):
         - target_distribution.png
         - correlation_heatmap.png
+
+    Notes
+    -----
+    Both figures are rasterized at once by a ``rendering.FigureRenderer``,
+    which skips a figure whose data is unchanged since it was last saved.
     """
     aly.alt.data_transformers.enable('vegafusion')
 
     print(f"\nLoading data from {processed_training_data}...")
-    student_train = pd.read_csv(processed_training_data)
-    print(f"Loaded {len(student_train)} rows")
-
-    os.makedirs(plot_to, exist_ok=True)
-
-    print("\nCreating target distribution plot...")
-    target_plot = alt.Chart(student_train[[TARGET]]).mark_bar().encode(
-        x=alt.X(TARGET, type='quantitative', bin=alt.Bin(maxbins=30)),
-        y=alt.Y('count()', scale=alt.Scale(domain=[0, 80])),
-        color=alt.Color(
-            "Grade:N",
-            scale=alt.Scale(
-                domain=["Pass", "Fail"],
-                range=["steelblue", "firebrick"]
-            )
-        )
-    ).transform_calculate(
-        Grade=alt.expr.if_(alt.datum[TARGET] >= PASSING_GRADE, "Pass", "Fail")
-    ).properties(
-        title="Distribution of the target feature (G3)",
-        width=400,
-        height=300
+    # the heatmap only uses numeric columns; columnar files load just those
+    student_train = read_table(
+        processed_training_data,
+        columns=numeric_columns(processed_training_data),
+        dtypes=dtype_plan(create_schema())
     )
-    target_plot.save(os.path.join(plot_to, "target_distribution.png"), scale_factor=2.0)
-    print(f"Saved: {plot_to}/target_distribution.png")
+    print(f"Loaded {len(student_train)} rows")
 
-    print("\nCreating correlation heatmap...")
-    corr_plot = aly.corr(student_train.drop(columns=[TARGET]))
-    corr_plot.save(os.path.join(plot_to, "correlation_heatmap.png"), scale_factor=2.0)
-    print(f"Saved: {plot_to}/correlation_heatmap.png")
+    print("\nRendering target distribution plot and correlation heatmap...")
+    with FigureRenderer(plot_to) as renderer:
+        renderer.submit("target_distribution.png", save_target_distribution, student_train[[TARGET]])
+        renderer.submit("correlation_heatmap.png", save_correlation_heatmap, student_train.drop(columns=[TARGET]))
 
     print("\nEDA complete!")
 
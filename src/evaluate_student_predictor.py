@@ -1,43 +1,96 @@
 import click
 import os
+import sys
 import numpy as np
 import pandas as pd
-import pickle
-import matplotlib.pyplot as plt
-from sklearn import set_config
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import (
-    PredictionErrorDisplay,
-    mean_absolute_error,
-    mean_squared_error,
-    r2_score
-)
+
+# Make `src` importable so pipelines pickled with search objects from this
+# package (e.g. RidgePathSearchCV) can be unpickled when run as a script.
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.inference_artifact import LinearModelArtifact, load_artifact
+from src.parallel import parallel_predict
+from src.dtype_plan import dtype_plan
+from src.preprocess_data import create_schema
+from src.rendering import FigureRenderer
+from src.storage import load_object, read_table
+
+# imported on first use, so --help starts fast
+plt = lazy_import("matplotlib.pyplot")
+set_config = lazy_import("sklearn", "set_config")
+Pipeline = lazy_import("sklearn.pipeline", "Pipeline")
+PredictionErrorDisplay = lazy_import("sklearn.metrics", "PredictionErrorDisplay")
+mean_absolute_error = lazy_import("sklearn.metrics", "mean_absolute_error")
+mean_squared_error = lazy_import("sklearn.metrics", "mean_squared_error")
+r2_score = lazy_import("sklearn.metrics", "r2_score")
 
 TARGET = "G3"
 
 
+def save_prediction_error_plot(path: str, y_test: pd.Series, y_pred: np.ndarray) -> None:
+    """
+    Save the residuals against the predicted grades (Figure 6).
+
+    Parameters
+    ----------
+    path : str
+        PNG file to write.
+    y_test : pd.Series
+        Observed grades.
+    y_pred : np.ndarray
+        Predicted grades.
+    """
+    fig, ax = plt.subplots(figsize=(8, 6))
+    PredictionErrorDisplay.from_predictions(
+        y_test,
+        y_pred,
+        ax=ax,
+        scatter_kwargs={'alpha': 0.5, 's': 20}
+    )
+    ax.set_title('Residuals vs Predicted Values')
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+
+
 @click.command()
 @click.option('--test-data', type=str, help="Path to test data")
-@click.option('--pipeline-from', type=str, help="Path to the fit pipeline pickle file")
+@click.option('--pipeline-from', type=str,
+              help="Path to the fit pipeline pickle file or the .npz inference artifact")
 @click.option('--tables-to', type=str, help="Path to directory where table results will be written to")
 @click.option('--plot-to', type=str, help="Path to directory where plots will be written to")
 @click.option('--seed', type=int, help="Random seed", default=123)
-def main(test_data: str, pipeline_from: str, tables_to: str, plot_to: str, seed: int) -> None:
+@click.option('--workers', type=int, default=1,
+              help="Processes used to score the test set, sharding rows by range")
+@click.option('--plots/--no-plots', default=True, show_default=True,
+              help="Draw the prediction error plot; --no-plots writes only the tables")
+def main(test_data: str, pipeline_from: str, tables_to: str, plot_to: str, seed: int, workers: int,
+         plots: bool) -> None:
     """
     Evaluate the student grade predictor on test data and save results.
 
     Parameters
     ----------
     test_data : str
-        Path to the test data CSV file.
+        Path to the test data (.parquet, .arrow or .csv).
     pipeline_from : str
-        Path to the pickled pipeline object from training.
+        Path to the pickled pipeline object from training, or to the
+        NumPy-only inference artifact (.npz) written alongside it.
     tables_to : str
         Path to directory where table results will be written.
     plot_to : str
-        Path to directory where plots will be written.
+        Path to directory where plots will be written (unused with
+        ``--no-plots``).
     seed : int
         Random seed for reproducibility. Default is 123.
+    workers : int
+        Number of processes that score row-range shards of the test set.
+        Default is 1 (in-process).
+    plots : bool
+        Draw the prediction error plot. It is drawn in a background thread
+        while the tables are written, and skipped when the predictions are
+        unchanged since it was last saved (``rendering.FigureRenderer``).
+        Default is True.
 
     Returns
     -------
@@ -49,11 +102,13 @@ def main(test_data: str, pipeline_from: str, tables_to: str, plot_to: str, seed:
 
     # Read in data & pipeline object
     print(f"\nLoading test data from {test_data}...")
-    student_test = pd.read_csv(test_data)
+    student_test = read_table(test_data, dtypes=dtype_plan(create_schema()))
 
     print(f"Loading pipeline from {pipeline_from}...")
-    with open(pipeline_from, 'rb') as f:
-        final_model_pipe = pickle.load(f)
+    if pipeline_from.endswith(".npz"):
+        final_model_pipe = load_artifact(pipeline_from)
+    else:
+        final_model_pipe = load_object(pipeline_from)
 
     # Separate features and target
     X_test = student_test.drop(columns=[TARGET])
@@ -64,57 +119,56 @@ def main(test_data: str, pipeline_from: str, tables_to: str, plot_to: str, seed:
     print(f"Test set: {len(X_test)} samples")
 
     # Generate predictions
-    y_pred = final_model_pipe.predict(X_test)
-
-    # Compute metrics
-    mae = mean_absolute_error(y_test, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-    r2 = r2_score(y_test, y_pred)
-
-    print(f"Test MAE: {mae:.3f}")
-    print(f"Test RMSE: {rmse:.3f}")
-    print(f"Test R2: {r2:.3f}")
-
-    # Save test scores to results/tables/
-    os.makedirs(tables_to, exist_ok=True)
-    test_scores = pd.DataFrame({
-        'MAE': [mae],
-        'RMSE': [rmse],
-        'R2': [r2]
-    })
-    test_scores.to_csv(os.path.join(tables_to, "test_scores.csv"), index=False)
-    print(f"\nSaved test scores to {tables_to}/test_scores.csv")
-
-    # Extract and save top 5 ridge coefficients
-    # Get transformed feature names by applying preprocessing steps
-    preprocessing_steps = list(final_model_pipe.best_estimator_.named_steps.items())[:-1]
-    preprocessor_pipeline = Pipeline(preprocessing_steps)
-    X_test_transformed = preprocessor_pipeline.transform(X_test)
-    feature_names = X_test_transformed.columns
-
-    ridge_coeffs = pd.DataFrame(
-        data=final_model_pipe.best_estimator_.named_steps['ridge'].coef_,
-        index=feature_names,
-        columns=['Coefficient']
-    ).sort_values(by='Coefficient', key=abs, ascending=False).head(5)
-    ridge_coeffs.to_csv(os.path.join(tables_to, "top_coefficients.csv"))
-    print(f"Saved top 5 coefficients to {tables_to}/top_coefficients.csv")
-
-    # Create and save prediction error plot (Figure 6 - Residuals)
-    os.makedirs(plot_to, exist_ok=True)
-    fig, ax = plt.subplots(figsize=(8, 6))
-    PredictionErrorDisplay.from_estimator(
-        final_model_pipe,
-        X_test,
-        y_test,
-        ax=ax,
-        scatter_kwargs={'alpha': 0.5, 's': 20}
-    )
-    ax.set_title('Residuals vs Predicted Values')
-    plt.tight_layout()
-    plt.savefig(os.path.join(plot_to, "prediction_error.png"), dpi=150)
-    plt.close()
-    print(f"Saved prediction error plot to {plot_to}/prediction_error.png")
+    y_pred = parallel_predict(final_model_pipe, X_test, workers)
+
+    if plots:
+        # figures are drawn off the main thread, which only Agg supports
+        plt.switch_backend("agg")
+    with FigureRenderer(plot_to, enabled=plots) as renderer:
+        # Prediction error plot (Figure 6 - Residuals), drawn while the tables
+        # below are written; it reuses the predictions rather than scoring again
+        renderer.submit("prediction_error.png", save_prediction_error_plot, y_test, y_pred)
+
+        # Compute metrics
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+
+        print(f"Test MAE: {mae:.3f}")
+        print(f"Test RMSE: {rmse:.3f}")
+        print(f"Test R2: {r2:.3f}")
+
+        # Save test scores to results/tables/
+        os.makedirs(tables_to, exist_ok=True)
+        test_scores = pd.DataFrame({
+            'MAE': [mae],
+            'RMSE': [rmse],
+            'R2': [r2]
+        })
+        test_scores.to_csv(os.path.join(tables_to, "test_scores.csv"), index=False)
+        print(f"\nSaved test scores to {tables_to}/test_scores.csv")
+
+        # Extract and save top 5 ridge coefficients
+        # (an out-of-core fit keeps its model as an artifact)
+        artifact = getattr(final_model_pipe, "artifact_", final_model_pipe)
+        if isinstance(artifact, LinearModelArtifact):
+            feature_names = artifact.feature_names
+            coefficients = artifact.coef
+        else:
+            # Get transformed feature names by applying preprocessing steps
+            preprocessing_steps = list(final_model_pipe.best_estimator_.named_steps.items())[:-1]
+            preprocessor_pipeline = Pipeline(preprocessing_steps)
+            X_test_transformed = preprocessor_pipeline.transform(X_test)
+            feature_names = X_test_transformed.columns
+            coefficients = final_model_pipe.best_estimator_.named_steps['ridge'].coef_
+
+        ridge_coeffs = pd.DataFrame(
+            data=coefficients,
+            index=feature_names,
+            columns=['Coefficient']
+        ).sort_values(by='Coefficient', key=abs, ascending=False).head(5)
+        ridge_coeffs.to_csv(os.path.join(tables_to, "top_coefficients.csv"))
+        print(f"Saved top 5 coefficients to {tables_to}/top_coefficients.csv")
 
     print("\nModel evaluation complete!")
 
@@ -0,0 +1,301 @@
+import numpy as np
+import pandas as pd
+
+# --validator choices of the scripts that validate student data
+VALIDATORS = ("pandera", "fast")
+
+FAILURE_CASE_COLUMNS = ["schema_context", "column", "check", "check_number", "failure_case", "index"]
+
+# odd 64-bit multiplier for mixing per-column keys into a row key
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+class FastSchemaErrors(ValueError):
+    """
+    Raised by ``FastValidator.validate`` when the data fails the schema.
+
+    Attributes
+    ----------
+    failure_cases : pd.DataFrame
+        One row per failure, with the columns of pandera's
+        ``SchemaErrors.failure_cases``.
+    """
+
+    def __init__(self, failure_cases: pd.DataFrame) -> None:
+        self.failure_cases = failure_cases
+        counts = failure_cases.groupby(["column", "check"], dropna=False, sort=False).size()
+        summary = "\n".join(
+            f"  {column if isinstance(column, str) else '<frame>'}: {check} ({n} failure cases)"
+            for (column, check), n in counts.items()
+        )
+        super().__init__(f"Schema validation failed with {len(failure_cases)} failure cases:\n{summary}")
+
+
+def _row_key(columns: list) -> np.ndarray:
+    """Mix per-column uint64 keys into one uint64 key per row."""
+    key = np.zeros(len(columns[0]), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column_key in columns:
+            key = (key ^ column_key) * _MIX
+            key ^= key >> np.uint64(29)
+    return key
+
+
+class FastValidator:
+    """
+    Vectorized validator generated from a pandera ``DataFrameSchema``.
+
+    Column dtypes, nullability and the ``in_range`` / ``isin`` checks are
+    evaluated with NumPy comparisons, string columns through category codes
+    (one hash lookup per value, or none for Categorical input). The
+    schema's "Duplicate rows found." and "Empty rows found." frame checks
+    are replaced by a row hash over those codes and a null count; candidate
+    duplicates are confirmed exactly, so a hash collision can never produce
+    a false failure. Any other check is run through pandera itself.
+
+    Failures are collected lazily and reported with the same rows as
+    ``schema.validate(df, lazy=True)`` (row order may differ).
+
+    Parameters
+    ----------
+    schema : pa.DataFrameSchema
+        Schema to compile, e.g. ``preprocess_data.create_schema()``.
+
+    Examples
+    --------
+    >>> validator = FastValidator(create_schema())
+    >>> validator.validate(student_df)
+    """
+
+    def __init__(self, schema) -> None:
+        self.schema = schema
+        self.columns = {name: column for name, column in schema.columns.items()}
+        self.frame_checks = list(schema.checks)
+
+    @staticmethod
+    def _rows(column: str, check: str, check_number, series: pd.Series, failed: np.ndarray) -> list:
+        """Failure case rows for the values of ``series`` where ``failed`` is True."""
+        if not failed.any():
+            return []
+        cases = series[failed]
+        return [
+            {"schema_context": "Column", "column": column, "check": check, "check_number": check_number,
+             "failure_case": case, "index": label}
+            for case, label in zip(cases.tolist(), cases.index.tolist())
+        ]
+
+    def _validate_int(self, name: str, series: pd.Series, column, failures: list) -> tuple:
+        expected = str(column.dtype)
+        if str(series.dtype) != expected:
+            failures.append({"schema_context": "Column", "column": name, "check": f"dtype('{expected}')",
+                             "check_number": None, "failure_case": str(series.dtype), "index": None})
+        values = series.to_numpy()
+        null = series.isna().to_numpy() if series.dtype.kind not in "iub" else np.zeros(len(values), dtype=bool)
+
+        for number, check in enumerate(column.checks):
+            if check.name != "in_range":
+                failures.extend(self._pandera_check(name, series, check, number))
+                continue
+            stats = check.statistics
+            # like pandera, nulls are left to the nullable check
+            present = values[~null] if null.any() else values
+            try:
+                low = present >= stats["min_value"] if stats["include_min"] else present > stats["min_value"]
+                high = present <= stats["max_value"] if stats["include_max"] else present < stats["max_value"]
+            except TypeError as error:
+                failures.append({"schema_context": "Column", "column": name, "check": check.error,
+                                 "check_number": number, "failure_case": repr(error), "index": None})
+                continue
+            bad = np.zeros(len(values), dtype=bool)
+            bad[~null] = ~(low & high)
+            failures.extend(self._rows(name, check.error, number, series, bad))
+
+        if series.dtype.kind in "iu":
+            return values.astype(np.uint64, copy=False), null
+        return pd.util.hash_pandas_object(series, index=False).to_numpy(), null
+
+    def _validate_str(self, name: str, series: pd.Series, column, failures: list) -> tuple:
+        checks = list(enumerate(column.checks))
+        allowed = next((check.statistics["allowed_values"] for _, check in checks if check.name == "isin"), None)
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            own_codes = series.cat.codes.to_numpy()
+            null = own_codes < 0
+            # work on the (few) categories and index the per-row results by code
+            non_str = np.array([not isinstance(c, str) for c in categories] + [False], dtype=bool)
+            not_string = non_str[own_codes]
+            codes = own_codes
+            if allowed is not None:
+                codes = np.append(pd.Index(allowed).get_indexer(categories), -1)[own_codes]
+        else:
+            values = series.to_numpy()
+            if allowed is not None:
+                codes = pd.Categorical(values, categories=allowed).codes
+                # allowed values are never null, so only unmatched rows need an isna pass
+                null = np.zeros(len(values), dtype=bool)
+                unmatched = np.flatnonzero(codes < 0)
+                null[unmatched] = pd.isna(values[unmatched])
+            else:
+                codes = None
+                null = series.isna().to_numpy()
+            if series.dtype == object:
+                # only values outside the allowed set can be non-strings
+                suspect = np.flatnonzero(~null if codes is None else (codes < 0) & ~null)
+                not_string = np.zeros(len(values), dtype=bool)
+                not_string[suspect] = [not isinstance(v, str) for v in values[suspect]]
+            elif pd.api.types.is_string_dtype(series.dtype):
+                not_string = np.zeros(len(values), dtype=bool)
+            else:
+                not_string = ~null
+
+        failures.extend(self._rows(name, "dtype('str')", None, series, not_string))
+
+        for number, check in checks:
+            if check.name != "isin":
+                failures.extend(self._pandera_check(name, series, check, number))
+                continue
+            bad = (codes < 0) & ~null
+            failures.extend(self._rows(name, check.error, number, series, bad))
+
+        if codes is not None:
+            # codes of allowed values; out-of-set values share -1 and are
+            # told apart by the exact duplicate confirmation
+            return (codes.astype(np.int64) + 1).astype(np.uint64), null
+        return pd.util.hash_pandas_object(series, index=False).to_numpy(), null
+
+    @staticmethod
+    def _pandera_check(name: str, series: pd.Series, check, number: int) -> list:
+        result = check(series)
+        if result.check_passed:
+            return []
+        cases = result.failure_cases
+        return [
+            {"schema_context": "Column", "column": name, "check": check.error, "check_number": number,
+             "failure_case": case, "index": label}
+            for label, case in cases.items()
+        ]
+
+    def failure_cases(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return every failure case of ``df``, without raising.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data to validate.
+
+        Returns
+        -------
+        pd.DataFrame
+            Failure cases in pandera's format; empty if ``df`` is valid.
+        """
+        failures = []
+        keys = {}
+        nulls = {}
+        for name, column in self.columns.items():
+            if name not in df.columns:
+                failures.append({"schema_context": "DataFrameSchema", "column": None,
+                                 "check": "column_in_dataframe", "check_number": None,
+                                 "failure_case": name, "index": None})
+                continue
+            series = df[name]
+            column_failures = []
+            if str(column.dtype) in ("str", "string", "object"):
+                keys[name], nulls[name] = self._validate_str(name, series, column, column_failures)
+            else:
+                keys[name], nulls[name] = self._validate_int(name, series, column, column_failures)
+            null = nulls[name]
+            if not column.nullable:
+                failures.extend(self._rows(name, "not_nullable", None, series, null))
+            failures.extend(column_failures)
+
+        for number, check in enumerate(self.frame_checks):
+            if check.error == "Duplicate rows found.":
+                passed = not self._has_duplicates(df, keys)
+            elif check.error == "Empty rows found.":
+                passed = not self._has_empty_rows(df, nulls)
+            else:
+                passed = bool(check(df).check_passed)
+            if not passed:
+                failures.append({"schema_context": "DataFrameSchema", "column": None, "check": check.error,
+                                 "check_number": number, "failure_case": False, "index": None})
+
+        return pd.DataFrame(failures, columns=FAILURE_CASE_COLUMNS, dtype=object)
+
+    @staticmethod
+    def _has_empty_rows(df: pd.DataFrame, nulls: dict) -> bool:
+        empty = np.ones(len(df), dtype=bool)
+        for name in df.columns:
+            # stop as soon as no row can still be entirely null
+            if not empty.any():
+                return False
+            empty &= nulls[name] if name in nulls else df[name].isna().to_numpy()
+        return bool(empty.any())
+
+    @staticmethod
+    def _has_duplicates(df: pd.DataFrame, keys: dict) -> bool:
+        if len(df) < 2 or df.shape[1] == 0:
+            return False
+        # columns outside the schema take part in duplicate detection too
+        column_keys = [
+            keys[name] if name in keys else pd.util.hash_pandas_object(df[name], index=False).to_numpy()
+            for name in df.columns
+        ]
+        key = _row_key(column_keys)
+        sorted_key = np.sort(key)
+        repeated = sorted_key[1:][sorted_key[1:] == sorted_key[:-1]]
+        if len(repeated) == 0:
+            return False
+        candidates = np.isin(key, repeated)
+        # confirm exactly on the (few) rows whose hashes collide
+        return bool(df[candidates].duplicated().any())
+
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validate ``df`` lazily, like ``schema.validate(df, lazy=True)``.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data to validate.
+
+        Returns
+        -------
+        pd.DataFrame
+            ``df`` itself when it is valid.
+
+        Raises
+        ------
+        FastSchemaErrors
+            With every failure case, if any check fails.
+        """
+        cases = self.failure_cases(df)
+        if len(cases):
+            raise FastSchemaErrors(cases)
+        return df
+
+
+def schema_validator(schema, validator: str = "pandera"):
+    """
+    Return a function validating a DataFrame lazily against ``schema``.
+
+    Parameters
+    ----------
+    schema : pa.DataFrameSchema
+        Schema to validate against.
+    validator : {"pandera", "fast"}, optional
+        "pandera" runs ``schema.validate(df, lazy=True)`` and raises
+        ``SchemaErrors``; "fast" uses ``FastValidator`` and raises
+        ``FastSchemaErrors`` (default: "pandera").
+
+    Returns
+    -------
+    callable
+        Function of a DataFrame returning it when valid.
+    """
+    if validator == "fast":
+        return FastValidator(schema).validate
+    if validator == "pandera":
+        return lambda df: schema.validate(df, lazy=True)
+    raise ValueError(f"Unknown validator '{validator}'; expected one of {VALIDATORS}.")
@@ -1,23 +1,146 @@
 import os
+import sys
+import tempfile
 import warnings
 os.environ["PYTHONWARNINGS"] = "ignore"
 warnings.filterwarnings('ignore')
 
 import click
-import altair as alt
 import numpy as np
 import pandas as pd
-import pickle
-from deepchecks.tabular.checks import FeatureLabelCorrelation, FeatureFeatureCorrelation
-from deepchecks.tabular import Dataset
-from sklearn import set_config
-from sklearn.linear_model import Ridge
-from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import RandomizedSearchCV
-from scipy.stats import loguniform
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.correlation_checks import CORRELATION_BACKENDS, correlation_failures
+from src.fold_cache import FoldTransformCache, StatisticsCache, fingerprint_file
+from src.inference_artifact import export_artifact
+from src.dtype_plan import dtype_plan
+from src.preprocess_data import create_schema
+from src.rendering import FigureRenderer
+from src.storage import iter_table, load_object, read_table, save_object
+from src.streaming import hash_sample
+
+# imported on first use, so --help and unused code paths start fast
+alt = lazy_import("altair")
+FeatureLabelCorrelation = lazy_import("deepchecks.tabular.checks", "FeatureLabelCorrelation")
+FeatureFeatureCorrelation = lazy_import("deepchecks.tabular.checks", "FeatureFeatureCorrelation")
+Dataset = lazy_import("deepchecks.tabular", "Dataset")
+set_config = lazy_import("sklearn", "set_config")
+Ridge = lazy_import("sklearn.linear_model", "Ridge")
+make_pipeline = lazy_import("sklearn.pipeline", "make_pipeline")
+Memory = lazy_import("joblib", "Memory")
+RandomizedSearchCV = lazy_import("sklearn.model_selection", "RandomizedSearchCV")
+loguniform = lazy_import("scipy.stats", "loguniform")
+SuccessiveHalvingSearchCV = lazy_import("src.adaptive_search", "SuccessiveHalvingSearchCV")
+IncrementalRidgeCV = lazy_import("src.incremental", "IncrementalRidgeCV")
+RidgeLOOSearchCV = lazy_import("src.ridge_path_search", "RidgeLOOSearchCV")
+RidgePathSearchCV = lazy_import("src.ridge_path_search", "RidgePathSearchCV")
+
+# cross-validation scorers (the keys of ridge_path_search.SCORERS) and how they are reported
+SCORING_METRICS = {
+    "neg_mean_absolute_error": "MAE",
+    "neg_mean_squared_error": "MSE",
+    "neg_root_mean_squared_error": "RMSE",
+    "r2": "R2",
+}
 
 TARGET = "G3"
 
+# rows sampled for the correlation checks when the training data is streamed
+CORRELATION_SAMPLE_ROWS = 100_000
+
+
+def save_tuning_plot(path: str, accuracies_grid: pd.DataFrame, best_point_df: pd.DataFrame,
+                     metric: str = "MAE") -> None:
+    """
+    Save the cross-validated score against alpha, highlighting the best alpha.
+
+    Parameters
+    ----------
+    path : str
+        PNG file to write.
+    accuracies_grid : pd.DataFrame
+        One row per candidate, with "alpha" and "score" columns.
+    best_point_df : pd.DataFrame
+        The best candidate, with "alpha", "score" and "label" columns.
+    metric : str, optional
+        Name of the score, for the axis title (default: "MAE").
+    """
+    # 1. Base Chart (The line and all points)
+    base = alt.Chart(accuracies_grid, width=600).encode(
+        x=alt.X("alpha:Q", scale=alt.Scale(type='log'), title="Alpha (log scale)"),
+        y=alt.Y("score:Q", scale=alt.Scale(zero=False), title=f"Cross-validated {metric}")
+    )
+
+    line = base.mark_line(color="black")
+    points = base.mark_circle(color="black", size=30, opacity=0.75)
+
+    # 2. Highlight Layer (Red circle for the best point)
+    best_point = alt.Chart(best_point_df).mark_circle(
+        color="firebrick", 
+        size=60,
+        opacity=1
+    ).encode(
+        x="alpha:Q",
+        y="score:Q"
+    )
+
+    # 3. Text Annotation Layer 
+    best_text = alt.Chart(best_point_df).mark_text(
+        align='left', 
+        dx=-115,        
+        dy=-25,       
+        fontWeight='bold',
+        fontSize=13,
+        color='firebrick'
+    ).encode(
+        x="alpha:Q",
+        y="score:Q",
+        text="label:N" 
+    )
+
+    # Combine all layers and add the title
+    plot = (line + points + best_point + best_text).properties(
+        title="Hyperparameter Tuning Results: Optimal Alpha for Ridge Regression"
+    )
+
+    plot.save(path, scale_factor=2.0)
+
+
+def correlation_gates(student_train: pd.DataFrame, backend: str, seed: int) -> dict:
+    """
+    Run the feature-label and feature-feature correlation gates.
+
+    Parameters
+    ----------
+    student_train : pd.DataFrame
+        Training rows (or a sample of them) with the ``TARGET`` column.
+    backend : str
+        "deepchecks" or "native" (see ``--correlation-backend``).
+    seed : int
+        Seed of the native checks' sampling.
+
+    Returns
+    -------
+    dict
+        Whether the "feature_label" and the "feature_feature" gate passed.
+    """
+    if backend == "native":
+        failures = correlation_failures(student_train, TARGET, pps_threshold=0.9, correlation_threshold=0.92,
+                                        seed=seed)
+        return {"feature_label": not failures["feature_label"], "feature_feature": not failures["feature_feature"]}
+
+    student_train_ds = Dataset(student_train, label=TARGET, cat_features=[])
+
+    check_feat_lab_corr = FeatureLabelCorrelation().add_condition_feature_pps_less_than(0.9)
+    check_feat_lab_corr_result = check_feat_lab_corr.run(dataset=student_train_ds)
+
+    check_feat_feat_corr = FeatureFeatureCorrelation().add_condition_max_number_of_pairs_above_threshold(threshold=0.92, n_pairs=0)
+    check_feat_feat_corr_result = check_feat_feat_corr.run(dataset=student_train_ds)
+
+    return {"feature_label": check_feat_lab_corr_result.passed_conditions(),
+            "feature_feature": check_feat_feat_corr_result.passed_conditions()}
+
 
 @click.command()
 @click.option('--training-data', type=str, help="Path to training data")
@@ -25,27 +148,122 @@ TARGET = "G3"
 @click.option('--pipeline-to', type=str, help="Path to directory where the pipeline object will be written to")
 @click.option('--plot-to', type=str, help="Path to directory where the plot will be written to")
 @click.option('--seed', type=int, help="Random seed", default=123)
-def main(training_data: str, preprocessor: str, pipeline_to: str, plot_to: str, seed: int) -> None:
+@click.option('--search', type=click.Choice(["random", "ridge-path", "adaptive"]), default="random",
+              help="Tuning engine: brute-force RandomizedSearchCV, closed-form Ridge path "
+                   "or successive halving")
+@click.option('--fold-cache-size', type=int, default=32,
+              help="Maximum number of preprocessed CV folds kept in memory")
+@click.option('--cv-strategy', type=click.Choice(["kfold", "loo", "gcv"]), default="kfold",
+              help="Cross-validation: k-fold (see --n-folds), exact leave-one-out or generalized CV")
+@click.option('--time-budget', type=float, default=None,
+              help="Wall-clock limit in seconds for the adaptive search")
+@click.option('--max-fits', type=int, default=None,
+              help="Maximum number of model fits for the adaptive search")
+@click.option('--chunksize', type=int, default=None,
+              help="Fit out of core, streaming the training data in chunks of this many rows")
+@click.option('--alpha-range', type=(float, float), default=(1e-3, 1e3), show_default=True,
+              help="Bounds of the log-uniform distribution alpha is sampled from")
+@click.option('--n-folds', type=int, default=10, show_default=True, help="Number of cross-validation folds")
+@click.option('--scoring', type=click.Choice(list(SCORING_METRICS)), default="neg_mean_absolute_error",
+              show_default=True,
+              help="Score alpha is tuned on; with --chunksize, all but MAE are computed from cached statistics")
+@click.option('--stats-cache/--no-stats-cache', default=True,
+              help="With --chunksize, reuse the fold statistics cached next to best_params.csv")
+@click.option('--correlation-backend', type=click.Choice(CORRELATION_BACKENDS), default="deepchecks",
+              show_default=True,
+              help="Correlation gates: deepchecks checks, or the vectorized native equivalent (milliseconds)")
+@click.option('--plots/--no-plots', default=True, show_default=True,
+              help="Draw the tuning plot; --no-plots writes only the model files")
+def main(training_data: str, preprocessor: str, pipeline_to: str, plot_to: str, seed: int,
+         search: str, fold_cache_size: int, cv_strategy: str, time_budget: float,
+         max_fits: int, chunksize: int, alpha_range: tuple, n_folds: int, scoring: str, stats_cache: bool,
+         correlation_backend: str, plots: bool) -> None:
     """
     Fit a Ridge regression model to the training data and save the pipeline.
 
     Parameters
     ----------
     training_data : str
-        Path to the preprocessed training data CSV file.
+        Path to the preprocessed training data (.parquet, .arrow or .csv).
     preprocessor : str
         Path to the pickled preprocessor object.
     pipeline_to : str
         Path to directory where the pipeline object will be written.
     plot_to : str
-        Path to directory where the tuning plot will be written.
+        Path to directory where the tuning plot will be written (unused
+        with ``--no-plots``).
     seed : int
         Random seed for reproducibility. Default is 123.
+    search : str
+        Tuning engine. "random" refits Ridge for every candidate and fold,
+        with the preprocessor fitted once per fold and shared by all
+        candidates through an on-disk ``joblib.Memory`` cache; "ridge-path"
+        fits the preprocessor and factorizes the design matrix once per fold
+        and scores every alpha analytically. Both sample
+        the same candidates and return the same results. "adaptive" runs
+        successive halving over the folds and drops poor candidates early.
+        Default is "random".
+    fold_cache_size : int
+        Number of fitted fold preprocessors and transformed fold matrices
+        kept by the LRU cache of the "ridge-path" and "adaptive" engines;
+        only "adaptive" revisits folds, so only it reports cache hits.
+        Default is 32.
+    cv_strategy : str
+        "kfold" uses ``n_folds``-fold cross-validation with the selected
+        ``search`` engine. "loo" and "gcv" score every alpha by exact leave-one-out or
+        generalized cross-validation from the Ridge hat matrix, without
+        refitting; ``search`` is ignored. Default is "kfold".
+    time_budget : float
+        Wall-clock limit in seconds for the "adaptive" search. Default is
+        None (unlimited).
+    max_fits : int
+        Maximum number of model fits for the "adaptive" search. Default is
+        None (unlimited).
+    chunksize : int
+        If set, the training data is never loaded whole: it is streamed in
+        chunks of this many rows and the preprocessor and Ridge are fitted
+        incrementally by ``IncrementalRidgeCV`` on ``n_folds`` hash-assigned folds;
+        ``search`` and ``cv_strategy`` are ignored and the correlation
+        checks run on a uniform sample of ``CORRELATION_SAMPLE_ROWS`` rows.
+        Default is None (in memory).
+    alpha_range : tuple of float
+        Lower and upper bound of the log-uniform alpha distribution. Default
+        is (1e-3, 1e3).
+    n_folds : int
+        Number of folds for "kfold" cross-validation; with ``chunksize`` it
+        must divide 120. Default is 10.
+    scoring : str
+        Cross-validation score alpha is tuned on: "neg_mean_absolute_error"
+        (default), "neg_mean_squared_error", "neg_root_mean_squared_error"
+        or "r2". It is reported as MAE, MSE, RMSE or R2 in the output, the
+        tuning plot and ``best_params.csv`` (``best_cv_mae`` etc.).
+    stats_cache : bool
+        With ``chunksize``, keep the per-fold preprocessor statistics and
+        Gram matrices in ``fold_statistics.pickle`` next to
+        ``best_params.csv``, and the verdict of the correlation checks in
+        ``correlation_checks.pickle``. A later run on the same training file,
+        preprocessor and seed reuses both without reading the data (or with
+        a single scoring pass for MAE), whatever its alpha range, fold count
+        or ``scoring``. Default is True.
+    correlation_backend : str
+        How to run the feature-label (PPS < 0.9) and feature-feature (no
+        pair of features with Spearman correlation above 0.92) gates:
+        "deepchecks" (default) runs deepchecks' ``FeatureLabelCorrelation``
+        and ``FeatureFeatureCorrelation``; "native" runs
+        ``correlation_checks.correlation_failures``, which applies the same
+        thresholds with vectorized NumPy on samples of the same size.
+    plots : bool
+        Draw the tuning plot. It is drawn in a background thread while the
+        model files are saved, and skipped when the CV results are
+        unchanged since it was last saved (``rendering.FigureRenderer``).
+        Default is True.
 
     Returns
     -------
     None
-        Saves the fitted pipeline and tuning plot.
+        Saves the fitted pipeline (student_pipeline.pickle), a NumPy-only
+        inference artifact (student_model.npz), best_params.csv and the
+        tuning plot.
 
     Raises
     ------
@@ -57,68 +275,154 @@ def main(training_data: str, preprocessor: str, pipeline_to: str, plot_to: str,
 
     # Read in data & preprocessor
     print(f"\nLoading training data from {training_data}...")
-    student_train = pd.read_csv(training_data)
-    student_preprocessor = pickle.load(open(preprocessor, "rb"))
+    plan = dtype_plan(create_schema())
+    student_preprocessor = load_object(preprocessor)
+    data_key = fingerprint_file(training_data) if chunksize and stats_cache else None
+    gates, gate_cache, gate_key = None, None, None
+    if chunksize:
+        def read_chunks():
+            return iter_table(training_data, chunksize, dtypes=plan)
+        if data_key is not None:
+            # the verdict depends only on the data and the sample, not on the tuning settings
+            gate_cache = StatisticsCache(os.path.join(pipeline_to, "correlation_checks.pickle"))
+            gate_key = gate_cache.make_key(data_key, student_preprocessor, TARGET, seed, correlation_backend,
+                                           CORRELATION_SAMPLE_ROWS)
+            gates = gate_cache.load(gate_key)
+        if gates is None:
+            student_train = hash_sample(read_chunks(), CORRELATION_SAMPLE_ROWS, seed)
+    else:
+        student_train = read_table(training_data, dtypes=plan)
 
     # Validate training data for anomalous correlations
     print("\nValidating data for anomalous correlations...")
-    student_train_ds = Dataset(student_train, label=TARGET, cat_features=[])
-
-    check_feat_lab_corr = FeatureLabelCorrelation().add_condition_feature_pps_less_than(0.9)
-    check_feat_lab_corr_result = check_feat_lab_corr.run(dataset=student_train_ds)
-
-    check_feat_feat_corr = FeatureFeatureCorrelation().add_condition_max_number_of_pairs_above_threshold(threshold=0.92, n_pairs=0)
-    check_feat_feat_corr_result = check_feat_feat_corr.run(dataset=student_train_ds)
-
-    if not check_feat_lab_corr_result.passed_conditions():
+    if gates is not None:
+        print("Reusing the cached correlation check results")
+    else:
+        gates = correlation_gates(student_train, correlation_backend, seed)
+        if gate_cache is not None:
+            gate_cache.save(gate_key, gates)
+
+    if not gates["feature_label"]:
         raise ValueError("Feature-Label correlation exceeds the maximum acceptable threshold.")
 
-    if not check_feat_feat_corr_result.passed_conditions():
+    if not gates["feature_feature"]:
         raise ValueError("Feature-feature correlation exceeds the maximum acceptable threshold.")
 
     print("Correlation checks passed!")
 
     # Tune model (find optimal alpha for Ridge using cross-validation)
     print("\nTuning Ridge hyperparameters...")
-    ridge = Ridge()
-    student_tune_pipe = make_pipeline(student_preprocessor, ridge)
-
     param_dist = {
-        "ridge__alpha": loguniform(1e-3, 1e3),
+        "ridge__alpha": loguniform(*alpha_range),
     }
 
-    cv = 10
-    student_tune_search = RandomizedSearchCV(
-        estimator=student_tune_pipe,
-        param_distributions=param_dist,
-        n_iter=100,
-        cv=cv,
-        scoring="neg_mean_absolute_error",
-        n_jobs=-1,
-        random_state=seed
-    )
+    cv = n_folds
+    fold_cache = FoldTransformCache(max_entries=fold_cache_size)
+    if chunksize:
+        statistics_cache = StatisticsCache(os.path.join(pipeline_to, "fold_statistics.pickle")) if stats_cache else None
+        student_tune_search = IncrementalRidgeCV(
+            preprocessor=student_preprocessor,
+            param_distributions=param_dist,
+            n_iter=100,
+            cv=cv,
+            scoring=scoring,
+            random_state=seed,
+            cache=statistics_cache
+        )
+    elif cv_strategy in ("loo", "gcv"):
+        student_tune_search = RidgeLOOSearchCV(
+            preprocessor=student_preprocessor,
+            param_distributions=param_dist,
+            n_iter=100,
+            mode=cv_strategy,
+            scoring=scoring,
+            random_state=seed
+        )
+    elif search == "ridge-path":
+        student_tune_search = RidgePathSearchCV(
+            preprocessor=student_preprocessor,
+            param_distributions=param_dist,
+            n_iter=100,
+            cv=cv,
+            scoring=scoring,
+            random_state=seed,
+            cache=fold_cache
+        )
+    elif search == "adaptive":
+        student_tune_search = SuccessiveHalvingSearchCV(
+            estimator=make_pipeline(student_preprocessor, Ridge()),
+            param_distributions=param_dist,
+            n_candidates=100,
+            cv=cv,
+            scoring=scoring,
+            time_budget=time_budget,
+            max_fits=max_fits,
+            random_state=seed,
+            cache=fold_cache
+        )
+    else:
+        ridge = Ridge()
+        # the preprocessor does not depend on alpha: its fit on each fold is
+        # cached on disk, where every joblib worker of the search finds it
+        preprocessor_memory = tempfile.TemporaryDirectory(prefix="preprocessor-cache-")
+        student_tune_pipe = make_pipeline(student_preprocessor, ridge,
+                                          memory=Memory(preprocessor_memory.name, verbose=0))
+        student_tune_search = RandomizedSearchCV(
+            estimator=student_tune_pipe,
+            param_distributions=param_dist,
+            n_iter=100,
+            cv=cv,
+            scoring=scoring,
+            n_jobs=-1,
+            random_state=seed
+        )
 
-    student_fit = student_tune_search.fit(
-        student_train.drop(columns=[TARGET]),
-        student_train[TARGET]
-    )
+    if chunksize:
+        student_fit = student_tune_search.fit(read_chunks, TARGET, data_key=data_key)
+    else:
+        student_fit = student_tune_search.fit(
+            student_train.drop(columns=[TARGET]),
+            student_train[TARGET]
+        )
+        if search == "random" and cv_strategy == "kfold":
+            # the saved pipeline must not point at the deleted cache directory
+            student_fit.estimator.set_params(memory=None)
+            student_fit.best_estimator_.set_params(memory=None)
+            n_misses = sum("output.pkl" in files for _, _, files in os.walk(preprocessor_memory.name))
+            n_fits = len(student_fit.cv_results_["mean_test_score"]) * cv + 1
+            preprocessor_memory.cleanup()
 
     best_alpha = student_fit.best_params_["ridge__alpha"]
-    best_score = -student_fit.best_score_
+    metric = SCORING_METRICS[scoring]
+    # sklearn maximizes negated errors; report them as positive
+    sign = -1 if scoring.startswith("neg_") else 1
+    best_score = sign * student_fit.best_score_
     print(f"Best alpha: {best_alpha:.4f}")
-    print(f"Best CV MAE: {best_score:.3f}")
-
-    print(f"\nSaving model...")
-
-    # Save pipeline
-    os.makedirs(pipeline_to, exist_ok=True)
-    with open(os.path.join(pipeline_to, "student_pipeline.pickle"), 'wb') as f:
-        pickle.dump(student_fit, f)
-    print(f"Saved pipeline to {pipeline_to}/student_pipeline.pickle")
-
-    # Create and save hyperparameter tuning plot
-    os.makedirs(plot_to, exist_ok=True)
+    print(f"Best CV {metric}: {best_score:.3f}")
+    if chunksize:
+        n_passes = student_fit.n_passes_
+        print(f"Incremental fit: {n_passes} pass{'' if n_passes == 1 else 'es'} over the training data")
+        if stats_cache:
+            print(statistics_cache.report())
+    elif search == "adaptive" and cv_strategy == "kfold":
+        stop_reason = " (budget exhausted)" if student_fit.stopped_early_ else ""
+        print(f"Adaptive search: {student_fit.n_fits_} fits in {student_fit.elapsed_:.1f}s{stop_reason}")
+    if not chunksize and cv_strategy == "kfold" and search == "adaptive":
+        # the ridge-path search visits every split once, so only adaptive reuses folds
+        print(fold_cache.report())
+    elif not chunksize and cv_strategy == "kfold" and search == "random":
+        print(f"Preprocessor cache: {n_fits - n_misses} hits, {n_misses} misses ({n_fits} pipeline fits)")
+
+    # Data of the hyperparameter tuning plot
+    n_splits = cv if chunksize or cv_strategy == "kfold" else student_fit.n_splits_
     accuracies_grid = pd.DataFrame(student_fit.cv_results_)
+    if "n_resources" in accuracies_grid:
+        # Successive halving scores candidates on different numbers of folds
+        accuracies_grid = (
+            accuracies_grid[accuracies_grid["n_resources"] > 0]
+            .astype({"param_ridge__alpha": float})
+        )
+        n_splits = accuracies_grid["n_resources"]
 
     accuracies_grid = (
         accuracies_grid[[
@@ -127,68 +431,42 @@ def main(training_data: str, preprocessor: str, pipeline_to: str, plot_to: str,
             "std_test_score"
         ]]
         .assign(
-            sem_test_score=accuracies_grid["std_test_score"] / cv**(1/2),
+            sem_test_score=accuracies_grid["std_test_score"] / n_splits**(1/2),
             sem_test_score_lower=lambda df: df["mean_test_score"] - (df["sem_test_score"]/2),
             sem_test_score_upper=lambda df: df["mean_test_score"] + (df["sem_test_score"]/2),
-            neg_mae=lambda df: -df["mean_test_score"]
+            score=lambda df: sign * df["mean_test_score"]
         )
         .rename(columns={"param_ridge__alpha": "alpha"})
         .drop(columns=["std_test_score"])
     )
 
-    # 2. Prepare the best point for the highlight layer
+    # Prepare the best point for the highlight layer
     # We use the variables best_alpha and best_score you calculated earlier
     best_point_df = pd.DataFrame({
         'alpha': [best_alpha],
-        'neg_mae': [best_score],
-        'label': [f"Alpha: {best_alpha:.3f} | MAE: {best_score:.3f}"]
+        'score': [best_score],
+        'label': [f"Alpha: {best_alpha:.3f} | {metric}: {best_score:.3f}"]
     })
 
-    # 3. Base Chart (The line and all points)
-    base = alt.Chart(accuracies_grid, width=600).encode(
-        x=alt.X("alpha:Q", scale=alt.Scale(type='log'), title="Alpha (log scale)"),
-        y=alt.Y("neg_mae:Q", scale=alt.Scale(zero=False), title="Mean Absolute Error")
-    )
-
-    line = base.mark_line(color="black")
-    points = base.mark_circle(color="black", size=30, opacity=0.75)
+    with FigureRenderer(plot_to, enabled=plots) as renderer:
+        # the tuning plot is drawn while the model files are written
+        renderer.submit("student_tune_alpha.png", save_tuning_plot, accuracies_grid, best_point_df, metric)
 
-    # 4. Highlight Layer (Red circle for the best point)
-    best_point = alt.Chart(best_point_df).mark_circle(
-        color="firebrick", 
-        size=60,
-        opacity=1
-    ).encode(
-        x="alpha:Q",
-        y="neg_mae:Q"
-    )
+        print(f"\nSaving model...")
 
-    # 5. Text Annotation Layer 
-    best_text = alt.Chart(best_point_df).mark_text(
-        align='left', 
-        dx=-115,        
-        dy=-25,       
-        fontWeight='bold',
-        fontSize=13,
-        color='firebrick'
-    ).encode(
-        x="alpha:Q",
-        y="neg_mae:Q",
-        text="label:N" 
-    )
-
-    # Combine all layers and add the title
-    plot = (line + points + best_point + best_text).properties(
-        title="Hyperparameter Tuning Results: Optimal Alpha for Ridge Regression"
-    )
+        # Save pipeline
+        os.makedirs(pipeline_to, exist_ok=True)
+        save_object(student_fit, os.path.join(pipeline_to, "student_pipeline.pickle"))
+        print(f"Saved pipeline to {pipeline_to}/student_pipeline.pickle")
 
-    plot.save(os.path.join(plot_to, "student_tune_alpha.png"), scale_factor=2.0)
-    print(f"Saved tuning plot to {plot_to}/student_tune_alpha.png")
+        # Save compact NumPy-only inference artifact
+        export_artifact(student_fit, os.path.join(pipeline_to, "student_model.npz"))
+        print(f"Saved inference artifact to {pipeline_to}/student_model.npz")
 
-    # Save best parameters
-    params_df = pd.DataFrame([{"best_alpha": best_alpha, "best_cv_mae": best_score}])
-    params_df.to_csv(os.path.join(pipeline_to, "best_params.csv"), index=False)
-    print(f"Saved best parameters to {pipeline_to}/best_params.csv")
+        # Save best parameters
+        params_df = pd.DataFrame([{"best_alpha": best_alpha, f"best_cv_{metric.lower()}": best_score}])
+        params_df.to_csv(os.path.join(pipeline_to, "best_params.csv"), index=False)
+        print(f"Saved best parameters to {pipeline_to}/best_params.csv")
 
     print("\nModel fitting complete!")
 
@@ -0,0 +1,294 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.lazy_imports import lazy_import
+
+# scripts import this module for fingerprint_file without fitting anything
+clone = lazy_import("sklearn.base", "clone")
+
+
+def fingerprint_frame(df: pd.DataFrame) -> str:
+    """
+    Return a content hash of a DataFrame, including its index and columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame to fingerprint.
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest that changes whenever a value, the index or the
+        column names change.
+
+    Examples
+    --------
+    >>> fingerprint_frame(student_train)
+    '5f0c...'
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Return a content hash of a file, read in blocks.
+
+    Hashing the bytes of a table is much cheaper than parsing it, so this
+    identifies training data without loading it.
+
+    Parameters
+    ----------
+    path : str
+        File to fingerprint.
+    block_size : int, optional
+        Bytes read at a time (default: 1 MiB).
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_estimator(estimator) -> str:
+    """
+    Return a hash of an unfitted estimator's configuration.
+
+    Nested estimators are described by their class name and their own
+    parameters, so two independently built but identical preprocessors share
+    a fingerprint.
+
+    Parameters
+    ----------
+    estimator : sklearn estimator
+        Estimator whose ``get_params(deep=True)`` describes its configuration.
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest of the configuration.
+    """
+    params = estimator.get_params(deep=True)
+    described = [type(estimator).__name__]
+    for name in sorted(params):
+        value = params[name]
+        if hasattr(value, "get_params"):
+            value = type(value).__name__
+        elif isinstance(value, (list, tuple)) and any(isinstance(v, tuple) for v in value):
+            # Pipeline.steps / ColumnTransformer.transformers: keep names and
+            # columns; the nested estimators are described by their own params
+            value = [
+                tuple(type(item).__name__ if hasattr(item, "get_params") else item for item in v)
+                if isinstance(v, tuple) else v
+                for v in value
+            ]
+        described.append(f"{name}={value!r}")
+    return hashlib.sha256("\n".join(described).encode()).hexdigest()
+
+
+class FoldTransformCache:
+    """
+    LRU cache of fitted preprocessors and transformed cross-validation folds.
+
+    Entries are keyed by the preprocessor configuration, a fingerprint of the
+    full feature frame and the train/test row indices of the split, so a
+    split is preprocessed once no matter how many candidates are scored on it.
+    The least recently used entry is evicted once ``max_entries`` is reached.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of folds kept in memory (default: 32).
+
+    Examples
+    --------
+    >>> cache = FoldTransformCache(max_entries=20)
+    >>> fitted, X_train, X_test = cache.get_or_fit(preprocessor, X, train, test)
+    >>> cache.report()
+    'Fold cache: 0 hits, 1 misses, 1/20 entries'
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict:
+        # Cached folds are process-local; do not bloat pickled search objects.
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        return state
+
+    @staticmethod
+    def make_key(preprocessor_key: str, data_key: str, train: np.ndarray, test: np.ndarray) -> str:
+        """Combine the preprocessor, data and split fingerprints into one key."""
+        digest = hashlib.sha256()
+        digest.update(preprocessor_key.encode())
+        digest.update(data_key.encode())
+        digest.update(np.asarray(train, dtype=np.int64).tobytes())
+        digest.update(b"|")
+        digest.update(np.asarray(test, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def get_or_fit(self, preprocessor, X: pd.DataFrame, train: np.ndarray, test: np.ndarray,
+                   data_key: str = None) -> tuple:
+        """
+        Return the fitted preprocessor and transformed matrices for one split.
+
+        Parameters
+        ----------
+        preprocessor : sklearn transformer
+            Unfitted preprocessor; a clone is fitted on a cache miss.
+        X : pd.DataFrame
+            Full feature frame the indices refer to.
+        train, test : np.ndarray
+            Positional row indices of the split.
+        data_key : str, optional
+            Precomputed ``fingerprint_frame(X)``, to avoid rehashing ``X``
+            for every split.
+
+        Returns
+        -------
+        tuple
+            ``(fitted_preprocessor, X_train, X_test)`` with float matrices.
+        """
+        if data_key is None:
+            data_key = fingerprint_frame(X)
+        key = self.make_key(fingerprint_estimator(preprocessor), data_key, train, test)
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        fitted = clone(preprocessor).fit(X.iloc[train])
+        entry = (
+            fitted,
+            np.asarray(fitted.transform(X.iloc[train]), dtype=float),
+            np.asarray(fitted.transform(X.iloc[test]), dtype=float),
+        )
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        """Return hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+    def report(self) -> str:
+        """Return a one-line summary of the cache counters."""
+        return (f"Fold cache: {self.hits} hits, {self.misses} misses, "
+                f"{len(self._entries)}/{self.max_entries} entries")
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class StatisticsCache:
+    """
+    Single-entry on-disk cache of the statistics a search gathered from its data.
+
+    The entry is pickled together with its key, which combines the data
+    fingerprint, the preprocessor configuration and any other settings the
+    statistics depend on. A lookup with a different key is a miss, so the
+    file is invalidated as soon as any of them change and is overwritten by
+    the next ``save``.
+
+    Parameters
+    ----------
+    path : str
+        Pickle file holding the entry, e.g. next to ``best_params.csv``.
+
+    Examples
+    --------
+    >>> cache = StatisticsCache("results/models/fold_statistics.pickle")
+    >>> key = cache.make_key(fingerprint_file(train_path), preprocessor, 123)
+    >>> cache.load(key) is None
+    True
+    """
+
+    # bump when the layout of cached objects changes
+    VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def make_key(cls, data_key: str, preprocessor, *settings) -> str:
+        """Combine the data fingerprint, preprocessor configuration and other settings into one key."""
+        digest = hashlib.sha256()
+        digest.update(f"v{cls.VERSION}".encode())
+        digest.update(data_key.encode())
+        digest.update(fingerprint_estimator(preprocessor).encode())
+        digest.update(repr(settings).encode())
+        return digest.hexdigest()
+
+    def load(self, key: str):
+        """
+        Return the cached object stored under ``key``.
+
+        Parameters
+        ----------
+        key : str
+            Key from ``make_key``.
+
+        Returns
+        -------
+        object or None
+            The cached object, or None if the file is missing, unreadable or
+            holds a different key.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            entry = None
+        if isinstance(entry, dict) and entry.get("key") == key:
+            self.hits += 1
+            return entry["value"]
+        self.misses += 1
+        return None
+
+    def save(self, key: str, value) -> None:
+        """Store ``value`` under ``key``, replacing the previous entry atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        partial = self.path + ".part"
+        with open(partial, "wb") as f:
+            pickle.dump({"key": key, "value": value}, f)
+        os.replace(partial, self.path)
+
+    def report(self) -> str:
+        """Return a one-line summary of the cache counters."""
+        return f"Statistics cache: {self.hits} hits, {self.misses} misses ({self.path})"
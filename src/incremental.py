@@ -0,0 +1,759 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from src.inference_artifact import LinearModelArtifact
+from src.ridge_path_search import ALPHA_PARAM, POINTWISE_SCORERS, RidgePathSearchCV, get_path_scorer
+from src.fold_cache import StatisticsCache
+from src.streaming import hash_folds, row_hashes
+
+# scorers computed exactly from the validation fold's Gram matrix; the
+# others (MAE) need one more pass over the data for the residuals
+GRAM_SCORERS = ("neg_mean_squared_error", "neg_root_mean_squared_error", "r2")
+
+# rows are hashed into this many buckets and a fold is a run of
+# N_BUCKETS // cv consecutive buckets, so statistics kept per bucket serve
+# every fold count dividing it (2-6, 8, 10, 12, 15, 20, 24, 30, ...)
+N_BUCKETS = 120
+
+
+class RunningMoments:
+    """
+    Streaming column means and variances, mergeable across partitions.
+
+    Chunks are combined with Chan et al.'s pairwise update, which stays
+    accurate where the textbook sum-of-squares formula cancels.
+
+    Parameters
+    ----------
+    n_columns : int
+        Number of columns tracked.
+    """
+
+    def __init__(self, n_columns: int) -> None:
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def _combine(self, count: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, values: np.ndarray) -> None:
+        """Add the rows of a (n_rows, n_columns) array."""
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        mean = values.mean(axis=0)
+        self._combine(len(values), mean, ((values - mean) ** 2).sum(axis=0))
+
+    def merge(self, other: "RunningMoments") -> None:
+        """Add the rows summarised by ``other``."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    @property
+    def var(self) -> np.ndarray:
+        """Population variance of every column."""
+        return self.m2 / self.count
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch of one numeric column.
+
+    The sketch stores distinct values with their counts, so it is exact
+    (identical to ``np.percentile``) while the column has at most
+    ``capacity`` distinct values, as for the integer student columns. Beyond
+    that, values are merged into ``capacity`` buckets of equal weight, each
+    represented by its weighted mean, and quantiles are accurate to about
+    one bucket, ``1 / capacity`` in rank.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Maximum number of stored (value, weight) pairs (default: 4096).
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+
+    def _absorb(self, values: np.ndarray, weights: np.ndarray) -> None:
+        values, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        weights = np.bincount(inverse, weights=np.concatenate([self.weights, weights]))
+        if len(values) > self.capacity:
+            before = np.cumsum(weights) - weights
+            buckets = np.minimum((before / weights.sum() * self.capacity).astype(np.int64), self.capacity - 1)
+            bucket_weights = np.bincount(buckets, weights=weights)
+            bucket_values = np.bincount(buckets, weights=weights * values)
+            used = bucket_weights > 0
+            values, weights = bucket_values[used] / bucket_weights[used], bucket_weights[used]
+            self.exact = False
+        self.values, self.weights = values, weights
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a 1-D array of values; NaNs are ignored, as by ``np.nanpercentile``."""
+        values = np.asarray(values, dtype=float)
+        distinct, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        self._absorb(distinct, counts.astype(float))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the values summarised by ``other``."""
+        self._absorb(other.values, other.weights)
+        self.exact = self.exact and other.exact
+
+    def quantile(self, q: float) -> float:
+        """
+        Return the ``q``-quantile with NumPy's default (linear) interpolation.
+
+        Parameters
+        ----------
+        q : float
+            Quantile in [0, 1].
+
+        Returns
+        -------
+        float
+            Estimated quantile; NaN if the sketch is empty.
+        """
+        if len(self.values) == 0:
+            return np.nan
+        cumulative = np.cumsum(self.weights)
+        position = (cumulative[-1] - 1) * q
+        lower = np.floor(position)
+        ranks = np.searchsorted(cumulative, [lower, lower + 1], side="right")
+        low, high = self.values[np.minimum(ranks, len(self.values) - 1)]
+        return low + (position - lower) * (high - low)
+
+
+def _handle_zeros(scale: np.ndarray) -> np.ndarray:
+    """Replace (near-)zero scales by 1, as sklearn's scalers do."""
+    scale = np.array(scale, dtype=float)
+    scale[scale < 10 * np.finfo(float).eps] = 1.0
+    return scale
+
+
+def preprocessor_blocks(preprocessor, input_columns: list) -> list:
+    """
+    Describe the blocks of an unfitted ``ColumnTransformer``.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer
+        Unfitted transformer such as ``create_preprocessor()``, built from
+        StandardScaler, RobustScaler, OneHotEncoder and passthrough blocks.
+    input_columns : list of str
+        Feature columns of the data, in order.
+
+    Returns
+    -------
+    list of dict
+        One dict per non-empty block with keys "name", "kind" ("standard",
+        "robust", "onehot" or "passthrough"), "transformer", "columns" and
+        "prefix" (of the output feature names);
+        a passthrough remainder comes last, as in ``ColumnTransformer``.
+
+    Raises
+    ------
+    ValueError
+        If a transformer or option has no incremental equivalent.
+    """
+    kinds = {"StandardScaler": "standard", "RobustScaler": "robust", "OneHotEncoder": "onehot"}
+    blocks, covered = [], set()
+    for name, transformer, columns in preprocessor.transformers:
+        prefix = f"{name}__" if preprocessor.verbose_feature_names_out else ""
+        columns = [input_columns[c] if isinstance(c, (int, np.integer)) else c for c in np.atleast_1d(columns)]
+        covered.update(columns)
+        if isinstance(transformer, str):
+            if transformer == "drop":
+                continue
+            if transformer != "passthrough":
+                raise ValueError(f"Unsupported transformer '{transformer}' in block '{name}'.")
+            kind = "passthrough"
+        elif type(transformer).__name__ in kinds:
+            kind = kinds[type(transformer).__name__]
+        else:
+            raise ValueError(
+                f"Cannot fit transformer '{name}' of type {type(transformer).__name__} incrementally. "
+                f"Supported: passthrough, {', '.join(kinds)}."
+            )
+        if kind == "robust" and transformer.unit_variance:
+            raise ValueError(f"RobustScaler(unit_variance=True) in block '{name}' is not supported.")
+        if kind == "onehot" and (transformer.min_frequency is not None or transformer.max_categories is not None
+                                 or not (transformer.drop in (None, "first", "if_binary"))
+                                 or not (isinstance(transformer.categories, str) and transformer.categories == "auto")):
+            raise ValueError(
+                f"OneHotEncoder in block '{name}' must use categories='auto', drop in "
+                f"(None, 'first', 'if_binary') and no infrequent categories."
+            )
+        if columns:
+            blocks.append({"name": name, "kind": kind, "transformer": transformer, "columns": columns,
+                           "prefix": prefix})
+
+    if preprocessor.remainder not in ("drop", "passthrough"):
+        raise ValueError("Only 'drop' and 'passthrough' remainders are supported.")
+    remainder = [column for column in input_columns if column not in covered]
+    if preprocessor.remainder == "passthrough" and remainder:
+        blocks.append({"name": "remainder", "kind": "passthrough", "transformer": "passthrough",
+                       "columns": remainder,
+                       "prefix": "remainder__" if preprocessor.verbose_feature_names_out else ""})
+    return blocks
+
+
+def _observed_categories(values: pd.Series) -> np.ndarray:
+    """Return the distinct values of a column, reading Categoricals by their codes."""
+    if values.isna().any():
+        raise ValueError(f"Column '{values.name}' has missing values, which the incremental fit does not support.")
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = np.unique(values.cat.codes.to_numpy())
+        return np.asarray(values.cat.categories[codes], dtype=object)
+    return np.asarray(pd.unique(values), dtype=object)
+
+
+class PreprocessorStatistics:
+    """
+    One-pass, mergeable statistics that determine a fitted preprocessor.
+
+    StandardScaler blocks keep ``RunningMoments``, RobustScaler blocks a
+    ``QuantileSketch`` per column, and OneHotEncoder blocks the set of
+    categories seen, so statistics gathered on separate partitions (e.g.
+    cross-validation folds) can be merged into those of their union.
+
+    Parameters
+    ----------
+    blocks : list of dict
+        Output of ``preprocessor_blocks``.
+    sketch_capacity : int, optional
+        Capacity of the RobustScaler quantile sketches (default: 4096).
+    """
+
+    def __init__(self, blocks: list, sketch_capacity: int = 4096) -> None:
+        self.blocks = blocks
+        self.n_rows = 0
+        self.states = []
+        for block in blocks:
+            if block["kind"] == "standard":
+                self.states.append(RunningMoments(len(block["columns"])))
+            elif block["kind"] == "robust":
+                self.states.append([QuantileSketch(sketch_capacity) for _ in block["columns"]])
+            elif block["kind"] == "onehot":
+                self.states.append([np.empty(0, dtype=object) for _ in block["columns"]])
+            else:
+                self.states.append(None)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the rows of a raw feature chunk."""
+        self.n_rows += len(chunk)
+        for block, state in zip(self.blocks, self.states):
+            columns = block["columns"]
+            if block["kind"] == "standard":
+                state.update(chunk[columns].to_numpy(dtype=float))
+            elif block["kind"] == "robust":
+                for column, sketch in zip(columns, state):
+                    sketch.update(chunk[column].to_numpy(dtype=float))
+            elif block["kind"] == "onehot":
+                for j, column in enumerate(columns):
+                    state[j] = pd.unique(np.concatenate([state[j], _observed_categories(chunk[column])]))
+
+    def merge(self, other: "PreprocessorStatistics") -> None:
+        """Add the rows summarised by ``other``."""
+        self.n_rows += other.n_rows
+        for block, state, other_state in zip(self.blocks, self.states, other.states):
+            if block["kind"] == "standard":
+                state.merge(other_state)
+            elif block["kind"] == "robust":
+                for sketch, other_sketch in zip(state, other_state):
+                    sketch.merge(other_sketch)
+            elif block["kind"] == "onehot":
+                for j, categories in enumerate(other_state):
+                    state[j] = pd.unique(np.concatenate([state[j], categories]))
+
+    @classmethod
+    def combined(cls, statistics: list) -> "PreprocessorStatistics":
+        """Return the merge of several statistics, leaving them unchanged."""
+        merged = copy.deepcopy(statistics[0])
+        for other in statistics[1:]:
+            merged.merge(other)
+        return merged
+
+    def fitted_blocks(self) -> tuple:
+        """
+        Return the fitted preprocessing as ``LinearModelArtifact`` blocks.
+
+        Returns
+        -------
+        tuple
+            ``(blocks, feature_names)``: the artifact blocks ("scale",
+            "onehot" or "passthrough") with the parameters sklearn would fit
+            on the same rows, and the names of the output features.
+        """
+        fitted, names = [], []
+        for block, state in zip(self.blocks, self.states):
+            transformer, columns = block["transformer"], block["columns"]
+            prefix = block["prefix"]
+            if block["kind"] == "standard":
+                offset = state.mean if transformer.with_mean else np.zeros(len(columns))
+                scale = _handle_zeros(np.sqrt(state.var)) if transformer.with_std else np.ones(len(columns))
+                fitted.append({"kind": "scale", "columns": columns, "offset": offset, "scale": scale})
+                names.extend(prefix + column for column in columns)
+            elif block["kind"] == "robust":
+                low, high = np.asarray(transformer.quantile_range) / 100
+                center = np.array([sketch.quantile(0.5) for sketch in state])
+                spread = np.array([sketch.quantile(high) - sketch.quantile(low) for sketch in state])
+                fitted.append({
+                    "kind": "scale", "columns": columns,
+                    "offset": center if transformer.with_centering else np.zeros(len(columns)),
+                    "scale": _handle_zeros(spread) if transformer.with_scaling else np.ones(len(columns)),
+                })
+                names.extend(prefix + column for column in columns)
+            elif block["kind"] == "onehot":
+                # the artifact matches categories as strings
+                categories = [np.sort(np.asarray(values).astype(str)) for values in state]
+                drop = np.array([
+                    0 if transformer.drop == "first" or (transformer.drop == "if_binary" and len(values) == 2)
+                    else -1
+                    for values in categories
+                ], dtype=np.int64)
+                fitted.append({"kind": "onehot", "columns": columns, "categories": categories, "drop": drop,
+                               "ignore_unknown": transformer.handle_unknown != "error"})
+                for column, values, dropped in zip(columns, categories, drop):
+                    names.extend(f"{prefix}{column}_{value}" for i, value in enumerate(values) if i != dropped)
+            else:
+                fitted.append({"kind": "passthrough", "columns": columns})
+                names.extend(prefix + column for column in columns)
+        return fitted, names
+
+
+def _design_blocks(fitted_blocks: list) -> list:
+    """
+    Turn fitted blocks into the raw design: unscaled values and every category.
+
+    Every fold's preprocessing is an affine map of this design, so one Gram
+    matrix per fold of the design serves all folds.
+    """
+    design = []
+    for block in fitted_blocks:
+        if block["kind"] == "scale":
+            n = len(block["columns"])
+            design.append({**block, "offset": np.zeros(n), "scale": np.ones(n)})
+        elif block["kind"] == "onehot":
+            design.append({**block, "drop": np.full(len(block["columns"]), -1), "ignore_unknown": True})
+        else:
+            design.append(block)
+    return design
+
+
+def affine_map(fitted_blocks: list, design_blocks: list) -> np.ndarray:
+    """
+    Matrix mapping augmented design rows to augmented preprocessed rows.
+
+    With ``u = [z, 1, y]`` a design row and ``x`` the same row preprocessed
+    by ``fitted_blocks``, the result ``M`` satisfies ``[x, 1, y] = M u``.
+    Categories missing from the fitted blocks map to nothing, which is what
+    ``handle_unknown="ignore"`` produces.
+
+    Parameters
+    ----------
+    fitted_blocks : list of dict
+        Blocks from ``PreprocessorStatistics.fitted_blocks``.
+    design_blocks : list of dict
+        Blocks from ``_design_blocks`` covering at least those categories.
+
+    Returns
+    -------
+    np.ndarray
+        Matrix of shape (n_features + 2, n_design + 2).
+    """
+    rows, cols, values, offsets = [], [], [], []
+    x, z = 0, 0
+    for block, design in zip(fitted_blocks, design_blocks):
+        if block["kind"] == "onehot":
+            for j in range(len(block["columns"])):
+                design_categories = design["categories"][j]
+                kept = np.delete(block["categories"][j], block["drop"][j]) if block["drop"][j] >= 0 \
+                    else block["categories"][j]
+                positions = z + np.searchsorted(design_categories, kept)
+                rows.extend(range(x, x + len(kept)))
+                cols.extend(positions)
+                values.extend(np.ones(len(kept)))
+                x += len(kept)
+                z += len(design_categories)
+            continue
+        n = len(block["columns"])
+        scale = block.get("scale", np.ones(n))
+        offset = block.get("offset", np.zeros(n))
+        rows.extend(range(x, x + n))
+        cols.extend(range(z, z + n))
+        values.extend(1 / scale)
+        offsets.extend(zip(range(x, x + n), -offset / scale))
+        x += n
+        z += n
+
+    mapping = np.zeros((x + 2, z + 2))
+    mapping[rows, cols] = values
+    for row, value in offsets:
+        mapping[row, z] = value
+    mapping[x, z] = 1
+    mapping[x + 1, z + 1] = 1
+    return mapping
+
+
+def ridge_from_gram(gram: np.ndarray, alphas: np.ndarray) -> tuple:
+    """
+    Solve Ridge with an unpenalized intercept from an augmented Gram matrix.
+
+    Parameters
+    ----------
+    gram : np.ndarray
+        ``sum u u'`` over the training rows, ``u = [x, 1, y]``.
+    alphas : np.ndarray
+        Regularization strengths.
+
+    Returns
+    -------
+    tuple
+        ``(coef, intercept)`` of shapes (n_features, n_alphas) and
+        (n_alphas,), as ``Ridge(alpha).fit(X, y)`` for every alpha.
+    """
+    p = len(gram) - 2
+    n, x_sum, y_sum = gram[p, p], gram[:p, p], gram[p, p + 1]
+    x_mean, y_mean = x_sum / n, y_sum / n
+    centered_xx = gram[:p, :p] - np.outer(x_sum, x_mean)
+    centered_xy = gram[:p, p + 1] - x_sum * y_mean
+    eigvals, eigvecs = np.linalg.eigh(centered_xx)
+    projected = eigvecs.T @ centered_xy
+    coef = eigvecs @ (projected[:, None] / (np.clip(eigvals, 0, None)[:, None] + alphas[None, :]))
+    return coef, y_mean - x_mean @ coef
+
+
+class SufficientStatistics:
+    """
+    Everything ``IncrementalRidgeCV`` needs from a training table.
+
+    Holds the ``PreprocessorStatistics`` and the Gram matrix of the raw
+    design ``[z, 1, y]`` of each of ``N_BUCKETS`` hash buckets of rows. Any
+    fold count dividing ``N_BUCKETS`` is served by summing buckets, and any
+    alpha range or Gram scorer needs nothing else, so these statistics can be
+    cached and reused without reading the data again.
+
+    Parameters
+    ----------
+    input_columns : list of str
+        Raw feature columns, in order.
+    design_blocks : list of dict
+        Blocks of the raw design the Gram matrices are expressed in.
+    bucket_statistics : list of PreprocessorStatistics
+        Statistics of each bucket's rows.
+    bucket_grams : np.ndarray
+        Design Gram matrix of each bucket's rows, of shape
+        (N_BUCKETS, n_design + 2, n_design + 2).
+    """
+
+    def __init__(self, input_columns: list, design_blocks: list, bucket_statistics: list,
+                 bucket_grams: np.ndarray) -> None:
+        self.input_columns = input_columns
+        self.design_blocks = design_blocks
+        self.bucket_statistics = bucket_statistics
+        self.bucket_grams = bucket_grams
+
+    @property
+    def n_rows(self) -> int:
+        """Number of rows summarised."""
+        return sum(statistics.n_rows for statistics in self.bucket_statistics)
+
+    def folds(self, n_folds: int) -> tuple:
+        """
+        Combine the buckets into ``n_folds`` folds.
+
+        Parameters
+        ----------
+        n_folds : int
+            Number of folds; must divide ``N_BUCKETS``.
+
+        Returns
+        -------
+        tuple
+            ``(fold_statistics, fold_grams)``, the statistics and Gram
+            matrices of the rows ``hash_folds`` assigns to each fold.
+
+        Raises
+        ------
+        ValueError
+            If ``n_folds`` does not divide ``N_BUCKETS``.
+        """
+        if n_folds < 2 or len(self.bucket_statistics) % n_folds:
+            raise ValueError(f"The number of folds must divide {len(self.bucket_statistics)}, got {n_folds}.")
+        size = len(self.bucket_statistics) // n_folds
+        fold_statistics = [PreprocessorStatistics.combined(self.bucket_statistics[f * size:(f + 1) * size])
+                           for f in range(n_folds)]
+        grams = self.bucket_grams
+        return fold_statistics, grams.reshape(n_folds, size, *grams.shape[1:]).sum(axis=1)
+
+
+class IncrementalRidgeCV(RidgePathSearchCV):
+    """
+    Out-of-core cross-validated Ridge over a preprocessor, in O(features^2) memory.
+
+    The training data is read as a stream of chunks, never as a whole:
+
+    1. One pass gathers ``PreprocessorStatistics`` (StandardScaler moments,
+       RobustScaler quantile sketches, one-hot category sets) per hash
+       bucket of rows (see ``N_BUCKETS``).
+    2. A second pass accumulates, per bucket, the Gram matrix of the raw
+       design ``[z, 1, y]`` (unscaled values, one column per category).
+       Each fold's preprocessing is an affine map ``M`` of that design, so
+       its ``X'X``, ``X'y`` and sums are ``M G M'``, and Ridge is solved in
+       closed form for every alpha from one eigendecomposition per fold.
+    3. For scorers that are not Gram functions (MAE), a third pass scores
+       every alpha on every held-out fold.
+
+    The first two passes only depend on the data, the preprocessor and the
+    fold seed; with a ``cache`` they are skipped when those are unchanged,
+    whatever the alpha range, fold count or scorer.
+
+    Rows are assigned to folds by a seeded content hash (``hash_folds``)
+    rather than ``KFold``; with the same folds, the scores equal those of
+    ``RidgePathSearchCV`` up to the RobustScaler sketch, which is exact for
+    columns with at most ``sketch_capacity`` distinct values.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer
+        Unfitted preprocessor, e.g. ``create_preprocessor()``.
+    param_distributions : dict
+        Mapping with the single key ``"ridge__alpha"``.
+    n_iter : int, optional
+        Number of alphas sampled (default: 100).
+    cv : int, optional
+        Number of hash folds, a divisor of ``N_BUCKETS`` (default: 10).
+    scoring : str, optional
+        Name of a vectorized scorer in ``SCORERS``
+        (default: "neg_mean_absolute_error").
+    random_state : int, optional
+        Seed of the alpha sampler and of the fold assignment (default: None,
+        fold seed 0).
+    sketch_capacity : int, optional
+        Capacity of the RobustScaler quantile sketches (default: 4096).
+    cache : StatisticsCache, optional
+        On-disk cache of the ``SufficientStatistics``, used when ``fit`` is
+        given a ``data_key`` (default: None).
+
+    Attributes
+    ----------
+    artifact_ : LinearModelArtifact
+        Preprocessing fitted on all rows and the Ridge fit with the best alpha.
+    statistics_ : SufficientStatistics
+        Per-bucket statistics and Gram matrices of the training data (not
+        pickled with the search).
+    fold_statistics_ : list of PreprocessorStatistics
+        Statistics of each fold's rows.
+    fold_grams_ : np.ndarray
+        Design Gram matrix of each fold's rows.
+    n_passes_ : int
+        Number of passes made over the data.
+
+    Examples
+    --------
+    >>> search = IncrementalRidgeCV(create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)})
+    >>> search.fit(lambda: iter_table("data/processed/student_train.parquet", 100_000), target="G3")
+    >>> search.best_params_
+    """
+
+    def __init__(self, preprocessor, param_distributions: dict, n_iter: int = 100, cv: int = 10,
+                 scoring: str = "neg_mean_absolute_error", random_state: int = None,
+                 sketch_capacity: int = 4096, cache: StatisticsCache = None) -> None:
+        super().__init__(preprocessor, param_distributions, n_iter=n_iter, cv=cv, scoring=scoring,
+                         random_state=random_state, cache=cache)
+        self.sketch_capacity = sketch_capacity
+
+    def __getstate__(self) -> dict:
+        # the per-bucket statistics belong in the cache, not in every pickled model
+        state = self.__dict__.copy()
+        state.pop("statistics_", None)
+        return state
+
+    @property
+    def _seed(self) -> int:
+        return 0 if self.random_state is None else self.random_state
+
+    def _chunks(self, read_chunks, target: str):
+        """Yield ``(features, y, bucket)`` for every chunk of a fresh pass."""
+        self.n_passes_ += 1
+        for chunk in read_chunks():
+            bucket = hash_folds(row_hashes(chunk), N_BUCKETS, self._seed)
+            yield chunk.drop(columns=[target]), chunk[target].to_numpy(dtype=float), bucket
+
+    @staticmethod
+    def _groups(bucket: np.ndarray):
+        """Yield ``(bucket, positions)`` for every bucket present in a chunk."""
+        order = np.argsort(bucket, kind="stable")
+        present, starts = np.unique(bucket[order], return_index=True)
+        yield from zip(present, np.split(order, starts[1:]))
+
+    @staticmethod
+    def _design(design_artifact: LinearModelArtifact, features: pd.DataFrame, y: np.ndarray) -> np.ndarray:
+        design = design_artifact.transform(features)
+        return np.column_stack([design, np.ones(len(design)), y])
+
+    @staticmethod
+    def _design_artifact(input_columns: list, design_blocks: list) -> LinearModelArtifact:
+        n_design = sum(
+            sum(len(c) for c in block["categories"]) if block["kind"] == "onehot" else len(block["columns"])
+            for block in design_blocks
+        )
+        return LinearModelArtifact(np.array(input_columns), np.array([]), np.zeros(n_design), 0.0, design_blocks)
+
+    def accumulate(self, read_chunks, target: str) -> SufficientStatistics:
+        """
+        Gather the sufficient statistics of the training data in two passes.
+
+        Parameters
+        ----------
+        read_chunks : callable
+            Function returning a new iterator over the training chunks
+            (raw features and ``target``), called once per pass, e.g.
+            ``lambda: iter_table(path, chunksize, dtypes=plan)``.
+        target : str
+            Name of the target column.
+
+        Returns
+        -------
+        SufficientStatistics
+            Per-bucket statistics and design Gram matrices.
+
+        Raises
+        ------
+        ValueError
+            If no rows are read.
+        """
+        bucket_statistics, input_columns = None, None
+        for features, y, bucket in self._chunks(read_chunks, target):
+            if bucket_statistics is None:
+                input_columns = list(features.columns)
+                blocks = preprocessor_blocks(self.preprocessor, input_columns)
+                bucket_statistics = [PreprocessorStatistics(blocks, self.sketch_capacity) for _ in range(N_BUCKETS)]
+            for b, positions in self._groups(bucket):
+                bucket_statistics[b].update(features.iloc[positions])
+        if bucket_statistics is None:
+            raise ValueError("No training rows were read.")
+
+        design_blocks = _design_blocks(PreprocessorStatistics.combined(bucket_statistics).fitted_blocks()[0])
+        design_artifact = self._design_artifact(input_columns, design_blocks)
+        n_columns = len(design_artifact.coef) + 2
+        bucket_grams = np.zeros((N_BUCKETS, n_columns, n_columns))
+        for features, y, bucket in self._chunks(read_chunks, target):
+            design = self._design(design_artifact, features, y)
+            for b, positions in self._groups(bucket):
+                rows = design[positions]
+                bucket_grams[b] += rows.T @ rows
+        return SufficientStatistics(input_columns, design_blocks, bucket_statistics, bucket_grams)
+
+    def fit(self, read_chunks, target: str, data_key: str = None) -> "IncrementalRidgeCV":
+        """
+        Tune alpha by hash-fold cross-validation and fit the final model.
+
+        Parameters
+        ----------
+        read_chunks : callable
+            Function returning a new iterator over the training chunks
+            (raw features and ``target``), called once per pass, e.g.
+            ``lambda: iter_table(path, chunksize, dtypes=plan)``.
+        target : str
+            Name of the target column.
+        data_key : str, optional
+            Fingerprint of the training data (e.g. ``fingerprint_file``);
+            required to look the statistics up in ``cache``.
+
+        Returns
+        -------
+        IncrementalRidgeCV
+            The fitted search object.
+        """
+        get_path_scorer(self.scoring)  # rejects unsupported names before reading any data
+        if self.cv < 2 or N_BUCKETS % self.cv:
+            raise ValueError(f"The number of folds must divide {N_BUCKETS}, got {self.cv}.")
+        candidates = self._sample_candidates()
+        alphas = np.array([params[ALPHA_PARAM] for params in candidates], dtype=float)
+        self.n_passes_ = 0
+
+        key = None
+        if self.cache is not None and data_key is not None:
+            key = self.cache.make_key(data_key, self.preprocessor, target, self._seed, self.sketch_capacity,
+                                      N_BUCKETS)
+        statistics = self.cache.load(key) if key is not None else None
+        if statistics is None:
+            statistics = self.accumulate(read_chunks, target)
+            if key is not None:
+                self.cache.save(key, statistics)
+        self.statistics_ = statistics
+
+        self.fold_statistics_, self.fold_grams_ = statistics.folds(self.cv)
+        empty = [f for f, fold in enumerate(self.fold_statistics_) if fold.n_rows == 0]
+        if empty:
+            raise ValueError(f"Folds {empty} received no rows; use fewer folds.")
+        self._score(read_chunks, target, alphas, candidates)
+        return self
+
+    def _score(self, read_chunks, target: str, alphas: np.ndarray, candidates: list) -> None:
+        design_blocks = self.statistics_.design_blocks
+        total = self.fold_grams_.sum(axis=0)
+        maps, weights = [], []
+        for f in range(self.cv):
+            training = PreprocessorStatistics.combined(
+                [statistics for g, statistics in enumerate(self.fold_statistics_) if g != f]
+            )
+            mapping = affine_map(training.fitted_blocks()[0], design_blocks)
+            coef, intercept = ridge_from_gram(mapping @ (total - self.fold_grams_[f]) @ mapping.T, alphas)
+            # residual of [x, 1, y] for every alpha: x.w + b - y
+            maps.append(mapping)
+            weights.append(np.vstack([coef, intercept, -np.ones(len(alphas))]))
+
+        if self.scoring in GRAM_SCORERS:
+            split_scores = []
+            for f in range(self.cv):
+                gram = maps[f] @ self.fold_grams_[f] @ maps[f].T
+                n, y_sum, y_squares = gram[-2, -2], gram[-2, -1], gram[-1, -1]
+                sse = np.einsum("ia,ij,ja->a", weights[f], gram, weights[f])
+                if self.scoring == "neg_mean_squared_error":
+                    split_scores.append(-sse / n)
+                elif self.scoring == "neg_root_mean_squared_error":
+                    split_scores.append(-np.sqrt(sse / n))
+                else:
+                    split_scores.append(1 - sse / (y_squares - y_sum ** 2 / n))
+            split_scores = np.array(split_scores)
+        else:
+            # per-row losses straight from design rows, residual = u' (M' w)
+            pointwise = POINTWISE_SCORERS[self.scoring]
+            design_artifact = self._design_artifact(self.statistics_.input_columns, design_blocks)
+            design_weights = [maps[f].T @ weights[f] for f in range(self.cv)]
+            buckets_per_fold = N_BUCKETS // self.cv
+            score_sums = np.zeros((self.cv, len(alphas)))
+            for features, y, bucket in self._chunks(read_chunks, target):
+                design = self._design(design_artifact, features, y)
+                fold = bucket // buckets_per_fold
+                for f in range(self.cv):
+                    score_sums[f] += pointwise(design[fold == f] @ design_weights[f]).sum(axis=0)
+            split_scores = score_sums / np.array([statistics.n_rows for statistics in self.fold_statistics_])[:, None]
+
+        self._store_results(candidates, alphas, split_scores.mean(axis=0), split_scores.std(axis=0),
+                            n_splits=self.cv, split_scores=split_scores)
+
+        full_blocks, feature_names = PreprocessorStatistics.combined(self.fold_statistics_).fitted_blocks()
+        mapping = affine_map(full_blocks, design_blocks)
+        coef, intercept = ridge_from_gram(mapping @ total @ mapping.T,
+                                          np.array([self.best_params_[ALPHA_PARAM]]))
+        self.artifact_ = LinearModelArtifact(
+            np.array(self.statistics_.input_columns), np.array(feature_names), coef[:, 0], float(intercept[0]),
+            full_blocks
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """Predict with the preprocessing and Ridge fit on all rows."""
+        return self.artifact_.predict(X)
@@ -0,0 +1,322 @@
+import numpy as np
+
+ARTIFACT_VERSION = 1
+SUPPORTED_TRANSFORMERS = ("StandardScaler", "RobustScaler", "OneHotEncoder")
+
+
+def _column_names(column_transformer, columns) -> list:
+    """Resolve ColumnTransformer column selectors (names or indices) to names."""
+    names = list(column_transformer.feature_names_in_)
+    return [names[col] if isinstance(col, (int, np.integer)) else col for col in columns]
+
+
+def artifact_arrays(model) -> dict:
+    """
+    Collect the fitted preprocessing parameters and model weights as arrays.
+
+    Parameters
+    ----------
+    model : sklearn search object, Pipeline or LinearModelArtifact
+        A fitted search exposing ``best_estimator_`` (or ``artifact_``), a
+        fitted ``Pipeline(ColumnTransformer, linear model)``, or an artifact.
+
+    Returns
+    -------
+    dict
+        Mapping of array names to NumPy arrays, in the layout written by
+        ``export_artifact``.
+
+    Raises
+    ------
+    ValueError
+        If the pipeline contains a step the artifact cannot represent.
+    """
+    model = getattr(model, "artifact_", model)
+    if isinstance(model, LinearModelArtifact):
+        return model.to_arrays()
+    pipeline = getattr(model, "best_estimator_", model)
+    if len(pipeline.steps) != 2:
+        raise ValueError("Expected a pipeline of a ColumnTransformer and a linear model.")
+    column_transformer, regressor = pipeline.steps[0][1], pipeline.steps[1][1]
+
+    arrays = {
+        "format_version": np.array(ARTIFACT_VERSION),
+        "input_columns": np.array(column_transformer.feature_names_in_, dtype=str),
+        "feature_names": np.array(column_transformer.get_feature_names_out(), dtype=str),
+        "coef": np.asarray(regressor.coef_, dtype=float),
+        "intercept": np.asarray(regressor.intercept_, dtype=float),
+    }
+
+    kinds = []
+    for name, transformer, columns in column_transformer.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        prefix = f"block{len(kinds)}_"
+        arrays[prefix + "columns"] = np.array(_column_names(column_transformer, columns), dtype=str)
+        kind = transformer if isinstance(transformer, str) else type(transformer).__name__
+
+        if kind == "passthrough" or (kind == "FunctionTransformer" and transformer.func is None):
+            # a fitted 'passthrough' remainder is stored as an identity FunctionTransformer
+            kinds.append("passthrough")
+        elif kind == "StandardScaler":
+            n_columns = len(columns)
+            mean = transformer.mean_ if transformer.mean_ is not None else np.zeros(n_columns)
+            scale = transformer.scale_ if transformer.scale_ is not None else np.ones(n_columns)
+            arrays[prefix + "offset"] = np.asarray(mean, dtype=float)
+            arrays[prefix + "scale"] = np.asarray(scale, dtype=float)
+            kinds.append("scale")
+        elif kind == "RobustScaler":
+            n_columns = len(columns)
+            center = transformer.center_ if transformer.center_ is not None else np.zeros(n_columns)
+            scale = transformer.scale_ if transformer.scale_ is not None else np.ones(n_columns)
+            arrays[prefix + "offset"] = np.asarray(center, dtype=float)
+            arrays[prefix + "scale"] = np.asarray(scale, dtype=float)
+            kinds.append("scale")
+        elif kind == "OneHotEncoder":
+            drop_idx = transformer.drop_idx_
+            for j, categories in enumerate(transformer.categories_):
+                arrays[prefix + f"categories{j}"] = np.asarray(categories).astype(str)
+            arrays[prefix + "drop"] = np.array(
+                [-1 if drop_idx is None or drop_idx[j] is None else int(drop_idx[j])
+                 for j in range(len(transformer.categories_))],
+                dtype=np.int64
+            )
+            arrays[prefix + "ignore_unknown"] = np.array(transformer.handle_unknown != "error")
+            kinds.append("onehot")
+        else:
+            raise ValueError(
+                f"Cannot export transformer '{name}' of type {kind}. "
+                f"Supported: passthrough, {', '.join(SUPPORTED_TRANSFORMERS)}."
+            )
+
+    arrays["block_kinds"] = np.array(kinds, dtype=str)
+    return arrays
+
+
+def export_artifact(model, path: str) -> None:
+    """
+    Write the fitted preprocessing parameters and Ridge weights to a .npz file.
+
+    The artifact holds only NumPy arrays: scaler offsets and scales, one-hot
+    category tables, the output feature names, and the model's ``coef_`` and
+    ``intercept_``. It can be loaded with ``load_artifact`` without sklearn.
+
+    Parameters
+    ----------
+    model : sklearn search object or Pipeline
+        A fitted search exposing ``best_estimator_``, or a fitted
+        ``Pipeline(ColumnTransformer, linear model)``.
+    path : str
+        Destination file path (conventionally ending in ".npz").
+
+    Returns
+    -------
+    None
+        The artifact is written to ``path``.
+
+    Raises
+    ------
+    ValueError
+        If the pipeline contains a step the artifact cannot represent.
+
+    Examples
+    --------
+    >>> export_artifact(student_fit, "results/models/student_model.npz")
+    """
+    arrays = artifact_arrays(model)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+class LinearModelArtifact:
+    """
+    NumPy-only replica of a fitted ``ColumnTransformer`` + linear model.
+
+    Use ``load_artifact`` to build one from a file written by
+    ``export_artifact``. Inputs may be a DataFrame or any mapping from
+    column name to array-like.
+
+    Attributes
+    ----------
+    input_columns : np.ndarray
+        Raw columns the preprocessor was fitted on.
+    feature_names : np.ndarray
+        Names of the transformed features, aligned with ``coef``.
+    coef : np.ndarray
+        Linear model coefficients.
+    intercept : float
+        Linear model intercept.
+    blocks : list of dict
+        Preprocessing blocks in output order.
+    """
+
+    def __init__(self, input_columns: np.ndarray, feature_names: np.ndarray, coef: np.ndarray,
+                 intercept: float, blocks: list) -> None:
+        self.input_columns = input_columns
+        self.feature_names = feature_names
+        self.coef = coef
+        self.intercept = intercept
+        self.blocks = blocks
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "LinearModelArtifact":
+        """
+        Build an artifact from the arrays produced by ``artifact_arrays``.
+
+        Parameters
+        ----------
+        arrays : mapping
+            Dict of arrays, or an open ``np.load`` archive.
+
+        Returns
+        -------
+        LinearModelArtifact
+            The reconstructed model.
+
+        Raises
+        ------
+        ValueError
+            If the arrays use an unsupported format version.
+        """
+        version = int(arrays["format_version"])
+        if version != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact format version {version}.")
+
+        blocks = []
+        for i, kind in enumerate(arrays["block_kinds"]):
+            prefix = f"block{i}_"
+            block = {"kind": str(kind), "columns": [str(c) for c in arrays[prefix + "columns"]]}
+            if kind == "scale":
+                block["offset"] = arrays[prefix + "offset"]
+                block["scale"] = arrays[prefix + "scale"]
+            elif kind == "onehot":
+                block["categories"] = [
+                    arrays[prefix + f"categories{j}"] for j in range(len(block["columns"]))
+                ]
+                block["drop"] = arrays[prefix + "drop"]
+                block["ignore_unknown"] = bool(arrays[prefix + "ignore_unknown"])
+            blocks.append(block)
+
+        return cls(
+            input_columns=arrays["input_columns"],
+            feature_names=arrays["feature_names"],
+            coef=arrays["coef"],
+            intercept=float(arrays["intercept"]),
+            blocks=blocks,
+        )
+
+    @staticmethod
+    def _one_hot(values, categories: np.ndarray, drop: int, ignore_unknown: bool,
+                 column: str) -> np.ndarray:
+        values = np.asarray(values).astype(str)
+        order = np.argsort(categories)
+        sorted_categories = categories[order]
+        positions = np.clip(np.searchsorted(sorted_categories, values), 0, len(categories) - 1)
+        known = sorted_categories[positions] == values
+        if not ignore_unknown and not known.all():
+            unknown = sorted(set(values[~known]))
+            raise ValueError(f"Found unknown categories {unknown} in column '{column}'.")
+
+        encoded = np.zeros((len(values), len(categories)))
+        rows = np.flatnonzero(known)
+        encoded[rows, order[positions[known]]] = 1
+        if drop >= 0:
+            encoded = np.delete(encoded, drop, axis=1)
+        return encoded
+
+    def to_arrays(self) -> dict:
+        """Return the arrays of this artifact, in the layout of ``artifact_arrays``."""
+        arrays = {
+            "format_version": np.array(ARTIFACT_VERSION),
+            "input_columns": np.asarray(self.input_columns, dtype=str),
+            "feature_names": np.asarray(self.feature_names, dtype=str),
+            "coef": np.asarray(self.coef, dtype=float),
+            "intercept": np.asarray(self.intercept, dtype=float),
+            "block_kinds": np.array([block["kind"] for block in self.blocks], dtype=str),
+        }
+        for i, block in enumerate(self.blocks):
+            prefix = f"block{i}_"
+            arrays[prefix + "columns"] = np.array(block["columns"], dtype=str)
+            if block["kind"] == "scale":
+                arrays[prefix + "offset"] = np.asarray(block["offset"], dtype=float)
+                arrays[prefix + "scale"] = np.asarray(block["scale"], dtype=float)
+            elif block["kind"] == "onehot":
+                for j, categories in enumerate(block["categories"]):
+                    arrays[prefix + f"categories{j}"] = np.asarray(categories).astype(str)
+                arrays[prefix + "drop"] = np.asarray(block["drop"], dtype=np.int64)
+                arrays[prefix + "ignore_unknown"] = np.array(block["ignore_unknown"])
+        return arrays
+
+    def transform(self, data) -> np.ndarray:
+        """
+        Apply the fitted preprocessing to raw student records.
+
+        Parameters
+        ----------
+        data : pd.DataFrame or mapping
+            Raw feature columns.
+
+        Returns
+        -------
+        np.ndarray
+            Transformed design matrix, columns ordered like ``feature_names``.
+        """
+        parts = []
+        for block in self.blocks:
+            columns = block["columns"]
+            if block["kind"] == "onehot":
+                for j, column in enumerate(columns):
+                    parts.append(self._one_hot(
+                        data[column], block["categories"][j], block["drop"][j],
+                        block["ignore_unknown"], column
+                    ))
+                continue
+            values = np.column_stack([np.asarray(data[column], dtype=float) for column in columns])
+            if block["kind"] == "scale":
+                values = (values - block["offset"]) / block["scale"]
+            parts.append(values)
+        return np.hstack(parts)
+
+    def predict(self, data) -> np.ndarray:
+        """
+        Predict the target for raw student records.
+
+        Parameters
+        ----------
+        data : pd.DataFrame or mapping
+            Raw feature columns.
+
+        Returns
+        -------
+        np.ndarray
+            Predictions, one per row.
+        """
+        return self.transform(data) @ self.coef + self.intercept
+
+
+def load_artifact(path: str) -> LinearModelArtifact:
+    """
+    Load an artifact written by ``export_artifact``.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .npz artifact.
+
+    Returns
+    -------
+    LinearModelArtifact
+        Model object with ``transform`` and ``predict`` methods.
+
+    Raises
+    ------
+    ValueError
+        If the artifact was written by an unsupported format version.
+
+    Examples
+    --------
+    >>> model = load_artifact("results/models/student_model.npz")
+    >>> model.predict(student_test)
+    """
+    with np.load(path, allow_pickle=False) as arrays:
+        return LinearModelArtifact.from_arrays(arrays)
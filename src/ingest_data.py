@@ -0,0 +1,178 @@
+import click
+import glob
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+
+# imported on first use, so --help starts fast
+pd = lazy_import("pandas")
+fingerprint_file = lazy_import("src.fold_cache", "fingerprint_file")
+table_path = lazy_import("src.storage", "table_path")
+write_table = lazy_import("src.storage", "write_table")
+
+# file the ingested tables are described in, next to them
+MANIFEST = "manifest.json"
+
+# numbers as they appear in a text column: optionally quoted and padded
+INTEGER_PATTERN = r"[+-]?\d+"
+DECIMAL_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def normalize_quoted_numerics(df: "pd.DataFrame") -> tuple:
+    """
+    Convert text columns holding only quoted or padded numbers to numbers.
+
+    The raw student files quote some numeric fields (``"11"`` for ``G1``
+    and ``G2``). ``pd.read_csv`` already reads plainly quoted numbers as
+    numbers, but any stray space or extra quote leaves the whole column as
+    strings. A text column whose every value is a number once surrounding
+    whitespace and quotes are stripped becomes int64, or float64 if some
+    values have decimals; other columns are left alone.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Table as parsed from the raw CSV.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, list of str)
+        Copy of ``df`` with the converted columns, and their names.
+
+    Examples
+    --------
+    >>> df, normalized = normalize_quoted_numerics(pd.DataFrame({"G1": ['" 9"', "'11'"], "school": ["GP", "MS"]}))
+    >>> normalized
+    ['G1']
+    """
+    df = df.copy()
+    normalized = []
+    for name in df.columns:
+        values = df[name]
+        if values.dtype != object or values.empty or values.isna().any():
+            continue
+        text = values.astype(str).str.strip().str.strip("\"'").str.strip()
+        if text.str.fullmatch(INTEGER_PATTERN).all():
+            df[name] = text.astype("int64")
+        elif text.str.fullmatch(DECIMAL_PATTERN).all():
+            df[name] = text.astype("float64")
+        else:
+            continue
+        normalized.append(name)
+    return df, normalized
+
+
+def ingest_file(source: str, table: str) -> dict:
+    """
+    Parse a raw semicolon-separated CSV in full and write it as a typed table.
+
+    Parameters
+    ----------
+    source : str
+        Raw CSV file, e.g. data/raw/student-por.csv.
+    table : str
+        Destination ending in .parquet or .arrow.
+
+    Returns
+    -------
+    dict
+        Manifest entry: the source and table paths with their SHA-256
+        digests, the number of rows, the column dtypes and the columns
+        converted by ``normalize_quoted_numerics``.
+
+    Raises
+    ------
+    ValueError
+        If the CSV cannot be parsed (e.g. a row has too many fields).
+    """
+    try:
+        df = pd.read_csv(source, sep=";")
+    except pd.errors.ParserError as e:
+        raise ValueError(f"File '{source}' is not a valid CSV: {e}")
+    df, normalized = normalize_quoted_numerics(df)
+    write_table(df, table)
+    return {
+        "source": source,
+        "source_sha256": fingerprint_file(source),
+        "table": table,
+        "table_sha256": fingerprint_file(table),
+        "rows": len(df),
+        "columns": {name: str(dtype) for name, dtype in df.dtypes.items()},
+        "normalized": normalized,
+    }
+
+
+def _is_current(entry: dict, source: str, table: str) -> bool:
+    """Whether ``entry`` describes ``table`` as ingested from the current ``source``."""
+    return (entry.get("source") == source and entry.get("table") == table and os.path.exists(table)
+            and entry.get("source_sha256") == fingerprint_file(source)
+            and entry.get("table_sha256") == fingerprint_file(table))
+
+
+@click.command()
+@click.option('--raw-dir', type=str, help="Directory holding the raw semicolon-separated CSV files")
+@click.option('--write-to', type=str, help="Directory the typed tables and their manifest are written to")
+@click.option('--format', 'fmt', type=click.Choice(["parquet", "arrow"]), default="parquet", show_default=True,
+              help="Format of the typed tables")
+def main(raw_dir: str, write_to: str, fmt: str) -> None:
+    """
+    Convert the raw CSV files to typed columnar tables, once.
+
+    Every ``*.csv`` file in ``raw_dir`` is parsed in full (not just its
+    first rows, as ``download_data.read_zip`` checks), its quoted numeric
+    columns are normalized (see ``normalize_quoted_numerics``) and it is
+    written to ``write_to`` as ``<name>.parquet`` (or ``.arrow``). Later
+    stages load that table without parsing any text, e.g.
+    ``preprocess_data.py --raw-data=data/ingested/student-por.parquet``.
+
+    ``manifest.json`` in ``write_to`` records, per table, its source, the
+    SHA-256 of both files, the row count and the column dtypes. A file
+    whose source and table still match the manifest is not ingested again.
+
+    Parameters
+    ----------
+    raw_dir : str
+        Directory with the raw CSV files, e.g. data/raw.
+    write_to : str
+        Directory for the tables and manifest, created if missing.
+    fmt : str, optional
+        "parquet" (default) or "arrow".
+
+    Returns
+    -------
+    None
+        The tables and ``manifest.json`` are written to ``write_to``.
+    """
+    sources = sorted(glob.glob(os.path.join(raw_dir, "*.csv")))
+    if not sources:
+        raise click.BadParameter(f"no CSV files in {raw_dir}", param_hint="--raw-dir")
+    os.makedirs(write_to, exist_ok=True)
+
+    manifest_path = os.path.join(write_to, MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f).get("tables", {})
+
+    tables = {}
+    for source in sources:
+        name = os.path.splitext(os.path.basename(source))[0]
+        table = table_path(write_to, name, fmt)
+        if _is_current(previous.get(name, {}), source, table):
+            tables[name] = previous[name]
+            print(f"Unchanged, not ingested again: {table}")
+            continue
+        tables[name] = ingest_file(source, table)
+        normalized = ", ".join(tables[name]["normalized"]) or "none"
+        print(f"Ingested {source} -> {table} ({tables[name]['rows']} rows; normalized columns: {normalized})")
+
+    with open(manifest_path, "w") as f:
+        json.dump({"format": fmt, "tables": tables}, f, indent=2)
+    print(f"\nWrote {manifest_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import importlib
+
+
+class LazyImport:
+    """
+    Stand-in for a module, or a name in a module, that is imported on first use.
+
+    Scripts bind heavy libraries (altair, deepchecks, matplotlib, pandera,
+    scikit-learn, scipy) to module-level names through ``lazy_import``, so
+    ``--help`` and code paths that never touch a library do not pay for
+    importing it. Attribute access, assignment, deletion, calls and
+    ``isinstance`` checks are forwarded to the target, so
+    ``mocker.patch("src.eda.alt.Chart")`` patches ``altair.Chart`` itself
+    and ``mocker.patch("src.eda.alt")`` replaces the stand-in as usual.
+
+    The target is looked up again on every use (``sys.modules`` makes that
+    a dictionary lookup once imported), so patching the library itself
+    also takes effect.
+
+    Parameters
+    ----------
+    module : str
+        Dotted module name, e.g. "matplotlib.pyplot".
+    name : str, optional
+        Attribute of ``module`` to stand in for, e.g. "Ridge"; the module
+        itself if None.
+    """
+
+    __slots__ = ("_lazy_module", "_lazy_name")
+
+    def __init__(self, module: str, name: str = None) -> None:
+        object.__setattr__(self, "_lazy_module", module)
+        object.__setattr__(self, "_lazy_name", name)
+
+    def _resolve(self):
+        target = importlib.import_module(self._lazy_module)
+        return target if self._lazy_name is None else getattr(target, self._lazy_name)
+
+    @property
+    def __dict__(self) -> dict:
+        return self._resolve().__dict__
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._resolve(), attribute)
+
+    def __setattr__(self, attribute: str, value) -> None:
+        setattr(self._resolve(), attribute, value)
+
+    def __delattr__(self, attribute: str) -> None:
+        delattr(self._resolve(), attribute)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __instancecheck__(self, instance) -> bool:
+        return isinstance(instance, self._resolve())
+
+    def __subclasscheck__(self, subclass) -> bool:
+        return issubclass(subclass, self._resolve())
+
+    def __dir__(self) -> list:
+        return dir(self._resolve())
+
+    def __repr__(self) -> str:
+        target = self._lazy_module if self._lazy_name is None else f"{self._lazy_module}.{self._lazy_name}"
+        return f"<lazy import of {target}>"
+
+
+def lazy_import(module: str, name: str = None) -> LazyImport:
+    """
+    Bind ``module`` (or ``module.name``) without importing it yet.
+
+    Parameters
+    ----------
+    module : str
+        Dotted module name.
+    name : str, optional
+        Attribute of the module, e.g. a class or function.
+
+    Returns
+    -------
+    LazyImport
+        Stand-in that imports the target the first time it is used.
+
+    Examples
+    --------
+    >>> alt = lazy_import("altair")
+    >>> Ridge = lazy_import("sklearn.linear_model", "Ridge")
+    >>> Ridge(alpha=1.0)  # sklearn is imported here
+    """
+    return LazyImport(module, name)
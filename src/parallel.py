@@ -0,0 +1,159 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+# (func, X, out) of the running map_row_shards call. Set before the pool
+# forks, so workers inherit the frame, the fitted estimator and the mapping
+# of the shared output matrix instead of receiving pickled copies.
+_TASK = None
+
+
+def row_ranges(n_rows: int, n_shards: int) -> list:
+    """
+    Split ``range(n_rows)`` into at most ``n_shards`` contiguous, near-equal ranges.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows.
+    n_shards : int
+        Number of ranges wanted.
+
+    Returns
+    -------
+    list of tuple
+        ``(start, stop)`` pairs covering every row once, in order.
+
+    Examples
+    --------
+    >>> row_ranges(10, 3)
+    [(0, 4), (4, 7), (7, 10)]
+    """
+    bounds = np.linspace(0, n_rows, min(n_shards, n_rows) + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def can_fork() -> bool:
+    """Whether the platform supports the 'fork' start method the shard workers rely on."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _run_shard(bounds: tuple) -> None:
+    func, X, out = _TASK
+    start, stop = bounds
+    # one BLAS thread per worker; the processes already use every core
+    with threadpool_limits(limits=1):
+        out[start:stop] = np.asarray(func(X.iloc[start:stop]), dtype=float).reshape(stop - start, -1)
+
+
+def map_row_shards(func, X: pd.DataFrame, n_outputs: int, workers: int) -> np.ndarray:
+    """
+    Apply ``func`` to row shards of ``X`` in a process pool.
+
+    Each worker writes its rows of the result straight into a shared-memory
+    float64 matrix, so neither the input frame nor the output crosses a
+    process boundary as a pickle.
+
+    Parameters
+    ----------
+    func : callable
+        Row-wise function mapping a DataFrame slice to ``n_outputs`` numeric
+        values per row (e.g. a fitted ``transform`` or ``predict``).
+    X : pd.DataFrame
+        Input rows.
+    n_outputs : int
+        Number of values ``func`` returns per row.
+    workers : int
+        Number of worker processes.
+
+    Returns
+    -------
+    np.ndarray
+        ``(len(X), n_outputs)`` float64 matrix in the original row order.
+    """
+    global _TASK
+    n_rows = len(X)
+    shm = SharedMemory(create=True, size=max(n_rows * n_outputs * 8, 1))
+    try:
+        out = np.ndarray((n_rows, n_outputs), dtype=np.float64, buffer=shm.buf)
+        _TASK = (func, X, out)
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            pool.map(_run_shard, row_ranges(n_rows, workers), chunksize=1)
+        result = out.copy()
+        del out
+    finally:
+        _TASK = None
+        shm.close()
+        shm.unlink()
+    return result
+
+
+def parallel_transform(transformer, X: pd.DataFrame, workers: int, sample_rows: int = 256):
+    """
+    Apply a fitted transformer to ``X`` across ``workers`` processes.
+
+    Parameters
+    ----------
+    transformer : sklearn transformer
+        Fitted transformer with numeric output, e.g. the student
+        ``ColumnTransformer``.
+    X : pd.DataFrame
+        Rows to transform.
+    workers : int
+        Number of worker processes; 1 (or a platform without 'fork')
+        transforms in-process.
+    sample_rows : int, optional
+        Rows transformed up front to learn the output columns and dtypes
+        (default: 256).
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Same output as ``transformer.transform(X)``, with the column names,
+        dtypes and index restored when the transformer outputs pandas.
+
+    Raises
+    ------
+    ValueError
+        If the transformer produces non-numeric columns.
+    """
+    if workers <= 1 or len(X) < workers or not can_fork():
+        return transformer.transform(X)
+
+    sample = transformer.transform(X.iloc[:sample_rows])
+    if isinstance(sample, pd.DataFrame):
+        non_numeric = [c for c, dtype in sample.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if non_numeric:
+            raise ValueError(f"Cannot shard a transform with non-numeric output columns: {non_numeric}")
+
+    values = map_row_shards(transformer.transform, X, sample.shape[1], workers)
+    if not isinstance(sample, pd.DataFrame):
+        return values.astype(sample.dtype, copy=False)
+    return pd.DataFrame(values, index=X.index, columns=sample.columns).astype(sample.dtypes.to_dict())
+
+
+def parallel_predict(model, X: pd.DataFrame, workers: int) -> np.ndarray:
+    """
+    Predict ``X`` with a fitted model across ``workers`` processes.
+
+    Parameters
+    ----------
+    model : object
+        Fitted model or pipeline exposing ``predict``.
+    X : pd.DataFrame
+        Raw feature rows.
+    workers : int
+        Number of worker processes; 1 (or a platform without 'fork')
+        predicts in-process.
+
+    Returns
+    -------
+    np.ndarray
+        Predictions in the original row order.
+    """
+    if workers <= 1 or len(X) < workers or not can_fork():
+        return model.predict(X)
+    return map_row_shards(model.predict, X, 1, workers)[:, 0]
@@ -0,0 +1,157 @@
+import click
+import os
+import sys
+import pandas as pd
+import pickle
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.compiled_predictor import compile_predictor
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.fast_validation import VALIDATORS, schema_validator
+from src.inference_artifact import load_artifact
+from src.preprocess_data import create_schema
+
+# imported on first use, so --help starts fast
+pa = lazy_import("pandera.pandas")
+set_config = lazy_import("sklearn", "set_config")
+
+TARGET = "G3"
+PREDICTION = "predicted_G3"
+
+
+def create_feature_schema() -> "pa.DataFrameSchema":
+    """
+    Return the student schema for unlabeled records.
+
+    The ``G3`` column is removed, and so is the duplicate-row check: once
+    the grade is gone two students can legitimately share every feature,
+    and both still need a prediction.
+
+    Returns
+    -------
+    pa.DataFrameSchema
+        Schema validating the feature columns of ``create_schema``.
+    """
+    schema = create_schema().remove_columns([TARGET])
+    schema.checks = [check for check in schema.checks if check.error != "Duplicate rows found."]
+    return schema
+
+
+def load_model(pipeline_from: str):
+    """
+    Load a pickled pipeline, or compile a fused predictor from a .npz artifact.
+
+    Parameters
+    ----------
+    pipeline_from : str
+        Path to ``student_pipeline.pickle`` or ``student_model.npz``.
+
+    Returns
+    -------
+    object
+        Model exposing ``predict`` on raw student records.
+    """
+    if pipeline_from.endswith(".npz"):
+        return compile_predictor(load_artifact(pipeline_from))
+    with open(pipeline_from, 'rb') as f:
+        return pickle.load(f)
+
+
+@click.command()
+@click.option('--input', 'input_path', type=str, help="Path to the CSV of student records to score")
+@click.option('--pipeline-from', type=str,
+              help="Path to the fit pipeline pickle file or the .npz inference artifact")
+@click.option('--output', type=str, help="Path to the CSV file predictions will be written to")
+@click.option('--chunksize', type=int, default=100_000, show_default=True,
+              help="Number of rows read, validated and scored at a time")
+@click.option('--sep', type=str, default=",", show_default=True, help="Field separator of the input CSV")
+@click.option('--keep-columns', type=str, multiple=True,
+              help="Input column copied to the output next to the prediction (repeatable)")
+@click.option('--validator', type=click.Choice(VALIDATORS), default="pandera", show_default=True,
+              help="Schema validator: pandera, or the vectorized fast path reporting the same failure cases")
+def main(input_path: str, pipeline_from: str, output: str, chunksize: int, sep: str,
+         keep_columns: tuple, validator: str) -> None:
+    """
+    Score student records in chunks and stream the predictions to a CSV.
+
+    Only one chunk is held in memory at a time, so memory use does not grow
+    with the input size. Each chunk is validated against the student schema
+    without ``G3`` and cast to the compact dtype plan before it is scored. A ``G3`` column in the input is
+    ignored. Predictions are written to ``<output>.part`` and moved to
+    ``output`` once every chunk has been scored, so a failed run never
+    leaves a truncated file behind.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to the CSV of student records.
+    pipeline_from : str
+        Path to the pickled pipeline object from training, or to the
+        NumPy-only inference artifact (.npz), which is scored with the
+        compiled predictor.
+    output : str
+        Path to the output CSV with a ``row`` column (0-based position in the
+        input), any ``keep_columns`` and ``predicted_G3``.
+    chunksize : int
+        Number of rows per chunk (default: 100000).
+    sep : str
+        Field separator of the input CSV (default: ",").
+    keep_columns : tuple of str
+        Input columns copied to the output.
+    validator : str
+        "pandera" (default) or "fast", the vectorized ``FastValidator``.
+
+    Returns
+    -------
+    None
+        Predictions are written to ``output``.
+    """
+    if chunksize < 1:
+        raise click.BadParameter("must be at least 1", param_hint="--chunksize")
+
+    set_config(transform_output="pandas")
+
+    print(f"Loading pipeline from {pipeline_from}...")
+    model = load_model(pipeline_from)
+    schema = create_feature_schema()
+    validate = schema_validator(schema, validator)
+    plan = dtype_plan(schema)
+
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    partial = output + ".part"
+
+    print(f"Scoring {input_path} in chunks of {chunksize} rows...")
+    n_rows = 0
+    try:
+        with open(partial, "w", newline="") as out:
+            for chunk in pd.read_csv(input_path, sep=sep, chunksize=chunksize):
+                if chunk.empty:
+                    # a header-only input reads as one chunk of untyped, empty columns
+                    continue
+                features = chunk.drop(columns=[TARGET], errors="ignore")
+                # read_csv keeps a running index across chunks, so failure
+                # cases report positions in the whole input
+                validate(features)
+                features = apply_dtype_plan(features, plan)
+
+                predictions = chunk[list(keep_columns)].copy()
+                predictions.insert(0, "row", chunk.index)
+                predictions[PREDICTION] = model.predict(features)
+                predictions.to_csv(out, index=False, header=n_rows == 0)
+                n_rows += len(chunk)
+            if n_rows == 0:
+                # no data rows: still write the header, so readers see the columns
+                pd.DataFrame(columns=["row", *keep_columns, PREDICTION]).to_csv(out, index=False)
+        os.replace(partial, output)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    print(f"Saved {n_rows} predictions to {output}")
+
+
+if __name__ == '__main__':
+    main()
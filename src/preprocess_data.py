@@ -1,16 +1,36 @@
 import click
 import os
+import sys
+from contextlib import ExitStack
 import numpy as np
 import pandas as pd
-import pandera.pandas as pa
-import pickle
-from sklearn.model_selection import train_test_split
-from sklearn import set_config
-from sklearn.preprocessing import StandardScaler, RobustScaler, OneHotEncoder
-from sklearn.compose import make_column_transformer, ColumnTransformer
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.fast_validation import FAILURE_CASE_COLUMNS, VALIDATORS, FastSchemaErrors, schema_validator
+from src.parallel import parallel_transform
+from src.storage import FORMATS, TableWriter, iter_table, read_table, save_object, table_path, write_table
+from src.streaming import HashSet, row_hashes, train_mask
 
-def create_schema() -> pa.DataFrameSchema:
+# imported on first use: the other scripts import this module for
+# create_schema and create_preprocessor, and --help needs neither
+pa = lazy_import("pandera.pandas")
+train_test_split = lazy_import("sklearn.model_selection", "train_test_split")
+set_config = lazy_import("sklearn", "set_config")
+StandardScaler = lazy_import("sklearn.preprocessing", "StandardScaler")
+RobustScaler = lazy_import("sklearn.preprocessing", "RobustScaler")
+OneHotEncoder = lazy_import("sklearn.preprocessing", "OneHotEncoder")
+make_column_transformer = lazy_import("sklearn.compose", "make_column_transformer")
+ColumnTransformer = lazy_import("sklearn.compose", "ColumnTransformer")
+
+TRAIN_SIZE = 0.70
+
+# extensions of the typed tables written by ingest_data.py
+INGESTED_EXTENSIONS = (".parquet", ".arrow", ".feather")
+
+
+def create_schema() -> "pa.DataFrameSchema":
     """
     Create and return the pandera validation schema for student data.
 
@@ -76,7 +96,7 @@ def create_schema() -> pa.DataFrameSchema:
     return schema
 
 
-def create_preprocessor() -> ColumnTransformer:
+def create_preprocessor() -> "ColumnTransformer":
     """
     Create a column transformer for preprocessing student features.
 
@@ -121,76 +141,273 @@ def create_preprocessor() -> ColumnTransformer:
     return preprocessor
 
 
+def read_raw(raw_data: str, chunksize: int = None):
+    """
+    Load the raw student data, whole or in chunks.
+
+    Parameters
+    ----------
+    raw_data : str
+        The semicolon-separated CSV as downloaded, or a Parquet/Arrow table
+        written by ``ingest_data.py``, which is decoded without parsing text.
+    chunksize : int, optional
+        Rows per chunk (default: None, load the whole table).
+
+    Returns
+    -------
+    pd.DataFrame or iterator of pd.DataFrame
+        The table, or its chunks with a running index when ``chunksize``
+        is given.
+    """
+    if os.path.splitext(raw_data)[1].lower() not in INGESTED_EXTENSIONS:
+        return pd.read_csv(raw_data, sep=";", chunksize=chunksize)
+    if chunksize is None:
+        return read_table(raw_data)
+    return iter_table(raw_data, chunksize)
+
+
+def stream_split(raw_data: str, data_to: str, formats: tuple, seed: int, chunksize: int,
+                 validator: str = "pandera") -> tuple:
+    """
+    Validate the raw CSV chunk by chunk and write the train/test splits incrementally.
+
+    Every chunk is validated against the row-level checks of
+    ``create_schema`` and cast to the compact dtype plan. Rows go to train
+    or test by hashing their content with ``seed`` (``train_mask``), so the
+    split does not depend on the chunking. Duplicate rows are detected
+    across chunks with a ``HashSet`` of 64-bit row hashes (8 bytes per
+    row): a repeated hash is reported as a duplicate row, with a chance of
+    about n^2 / 2^65 that two different rows of an n-row file collide.
+
+    Parameters
+    ----------
+    raw_data : str
+        Path to the raw CSV data file (semicolon-separated), or to its
+        ingested table (see ``read_raw``).
+    data_to : str
+        Directory the student_train and student_test tables are written to.
+    formats : tuple of str
+        Formats of the written tables (keys of ``storage.FORMATS``).
+    seed : int
+        Seed of the hash-based split.
+    chunksize : int
+        Number of raw rows read and validated at a time.
+    validator : str, optional
+        "pandera" (default) or "fast" (see ``fast_validation.schema_validator``).
+
+    Returns
+    -------
+    tuple of int
+        Number of train and test rows written.
+
+    Raises
+    ------
+    pandera.errors.SchemaErrors or FastSchemaErrors
+        For the first chunk failing the row-level checks, or (always
+        ``FastSchemaErrors``) when a row repeats an earlier row. No table is
+        written in that case.
+    """
+    schema = create_schema()
+    plan = dtype_plan(schema)
+    duplicate_check = next(
+        number for number, check in enumerate(schema.checks) if check.error == "Duplicate rows found."
+    )
+    # duplicates are checked across chunks below, the other checks per chunk
+    schema.checks = [check for check in schema.checks if check.error != "Duplicate rows found."]
+    validate = schema_validator(schema, validator)
+    seen = HashSet()
+
+    with ExitStack() as stack:
+        writers = {
+            split: [stack.enter_context(TableWriter(table_path(data_to, f"student_{split}", fmt)))
+                    for fmt in formats]
+            for split in ("train", "test")
+        }
+        # chunks keep a running index, so failure cases report positions
+        # in the whole file
+        for chunk in read_raw(raw_data, chunksize):
+            validate(chunk)
+            chunk = apply_dtype_plan(chunk, plan)
+
+            hashes = row_hashes(chunk)
+            if seen.contains(hashes).any() or len(np.unique(hashes)) < len(hashes):
+                raise FastSchemaErrors(pd.DataFrame([{
+                    "schema_context": "DataFrameSchema", "column": None, "check": "Duplicate rows found.",
+                    "check_number": duplicate_check, "failure_case": False, "index": None,
+                }], columns=FAILURE_CASE_COLUMNS, dtype=object))
+            seen.add(hashes)
+
+            in_train = train_mask(hashes, TRAIN_SIZE, seed)
+            for split, rows in (("train", chunk[in_train]), ("test", chunk[~in_train])):
+                for writer in writers[split]:
+                    writer.write(rows)
+        return writers["train"][0].n_rows, writers["test"][0].n_rows
+
+
+def stream_transform(preprocessor: "ColumnTransformer", data_to: str, formats: tuple, chunksize: int,
+                     workers: int = 1) -> None:
+    """
+    Apply a fitted preprocessor to the written splits chunk by chunk.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer
+        Preprocessor fitted on the training split.
+    data_to : str
+        Directory holding the student_train and student_test tables; the
+        transformed_student_* tables are written next to them.
+    formats : tuple of str
+        Formats of the written tables; the splits are read back from the
+        first of them (Parquet if present).
+    chunksize : int
+        Number of rows transformed at a time.
+    workers : int, optional
+        Processes sharing each chunk's transform (default: 1).
+
+    Returns
+    -------
+    None
+        The transformed tables are written to ``data_to``.
+    """
+    source = "parquet" if "parquet" in formats else formats[0]
+    plan = dtype_plan(create_schema())
+    for split in ("train", "test"):
+        with ExitStack() as stack:
+            writers = [stack.enter_context(TableWriter(table_path(data_to, f"transformed_student_{split}", fmt)))
+                       for fmt in formats]
+            for chunk in iter_table(table_path(data_to, f"student_{split}", source), chunksize, dtypes=plan):
+                transformed = parallel_transform(preprocessor, chunk.drop(columns=["G3"]), workers)
+                transformed["G3"] = chunk["G3"].values
+                for writer in writers:
+                    writer.write(transformed)
+
+
 @click.command()
-@click.option('--raw-data', type=str, help="Path to raw data")
+@click.option('--raw-data', type=str,
+              help="Path to raw data: the semicolon-separated CSV, or its Parquet/Arrow table from ingest_data.py")
 @click.option('--data-to', type=str, help="Path to directory where processed data will be written to")
 @click.option('--preprocessor-to', type=str, help="Path to directory where the preprocessor object will be written to")
 @click.option('--seed', type=int, help="Random seed", default=123)
-def main(raw_data: str, data_to: str, preprocessor_to: str, seed: int) -> None:
+@click.option('--workers', type=int, default=1,
+              help="Processes used to apply the fitted preprocessor, sharding rows by range")
+@click.option('--format', 'formats', type=click.Choice(list(FORMATS)), multiple=True, default=["parquet"],
+              help="Format of the processed tables; repeat to write several (default: parquet)")
+@click.option('--validator', type=click.Choice(VALIDATORS), default="pandera", show_default=True,
+              help="Schema validator: pandera, or the vectorized fast path reporting the same failure cases")
+@click.option('--chunksize', type=int, default=None,
+              help="Stream the raw CSV in chunks of this many rows, splitting rows by content hash "
+                   "(default: load it whole and use train_test_split)")
+def main(raw_data: str, data_to: str, preprocessor_to: str, seed: int, workers: int, formats: tuple,
+         validator: str, chunksize: int) -> None:
     """
     Validate, split, and preprocess the student performance data.
 
     This script performs the following operations:
-    1. Loads raw student data from CSV
+    1. Loads raw student data from CSV, or from the typed table written
+       by ``ingest_data.py``
     2. Validates data against a predefined schema
-    3. Splits data into training (70%) and test (30%) sets
-    4. Creates and saves a preprocessor for feature transformation
-    5. Transforms and saves the processed datasets
+    3. Casts columns to the compact dtypes planned from the schema
+       (uint8 ranged integers, fixed-category Categoricals)
+    4. Splits data into training (70%) and test (30%) sets
+    5. Creates and saves a preprocessor for feature transformation
+    6. Transforms and saves the processed datasets
 
     Parameters
     ----------
     raw_data : str
-        Path to the raw CSV data file (semicolon-separated).
+        Path to the raw CSV data file (semicolon-separated), or to its
+        ingested .parquet/.arrow table.
     data_to : str
         Path to directory where processed train/test data will be saved.
     preprocessor_to : str
         Path to directory where the preprocessor pickle file will be saved.
     seed : int, optional
         Random seed for reproducibility (default: 123).
+    workers : int, optional
+        Number of processes that apply the fitted preprocessor to row-range
+        shards of the train and test sets (default: 1, in-process).
+    formats : tuple of str, optional
+        Formats the processed tables are written in: "parquet" (default),
+        "arrow" (Arrow IPC) and/or "csv".
+    validator : str, optional
+        "pandera" (default) or "fast", the vectorized ``FastValidator``
+        generated from the same schema.
+    chunksize : int, optional
+        If given, stream the raw CSV in chunks of this many rows for files
+        larger than memory: see ``stream_split`` and ``stream_transform``.
+        Rows are then assigned to train/test by hashing their content with
+        ``seed`` (about 70/30) rather than by ``train_test_split``, and only
+        the compact training split is loaded to fit the preprocessor
+        (default: None, in-memory).
 
     Returns
     -------
     None
-        Outputs are saved to disk:
-        - student_train.csv, student_test.csv
-        - transformed_student_train.csv, transformed_student_test.csv
+        Outputs are saved to disk, with one file per table and format:
+        - student_train.<ext>, student_test.<ext>
+        - transformed_student_train.<ext>, transformed_student_test.<ext>
         - student_preprocessor.pickle
     """
     np.random.seed(seed)
     set_config(transform_output="pandas")
 
-    print(f"Loading data from {raw_data}...")
-    student_df = pd.read_csv(raw_data, sep=";")
-    print(f"Loaded {len(student_df)} rows")
+    if chunksize is not None:
+        if chunksize < 1:
+            raise click.BadParameter("must be at least 1", param_hint="--chunksize")
+        os.makedirs(data_to, exist_ok=True)
+        print(f"Streaming {raw_data} in chunks of {chunksize} rows...")
+        n_train, n_test = stream_split(raw_data, data_to, formats, seed, chunksize, validator)
+        print("All validation checks passed!")
+        print(f"\nTrain set: {n_train} rows")
+        print(f"Test set: {n_test} rows")
 
-    print("\nValidating data against schema...")
-    schema = create_schema()
-    schema.validate(student_df, lazy=True)
-    print("All validation checks passed!")
+        os.makedirs(preprocessor_to, exist_ok=True)
+        student_preprocessor = create_preprocessor()
+        save_object(student_preprocessor, os.path.join(preprocessor_to, "student_preprocessor.pickle"))
 
-    student_train, student_test = train_test_split(
-        student_df, train_size=0.70, random_state=seed
-    )
-    print(f"\nTrain set: {len(student_train)} rows")
-    print(f"Test set: {len(student_test)} rows")
+        source = "parquet" if "parquet" in formats else formats[0]
+        student_train = read_table(table_path(data_to, "student_train", source), dtypes=dtype_plan(create_schema()))
+        student_preprocessor.fit(student_train.drop(columns=["G3"]))
+        del student_train
+        stream_transform(student_preprocessor, data_to, formats, chunksize, workers)
+    else:
+        print(f"Loading data from {raw_data}...")
+        student_df = read_raw(raw_data)
+        print(f"Loaded {len(student_df)} rows")
+
+        print("\nValidating data against schema...")
+        schema = create_schema()
+        schema_validator(schema, validator)(student_df)
+        print("All validation checks passed!")
+
+        # compact dtypes after validation: pandera's int checks expect int64
+        student_df = apply_dtype_plan(student_df, dtype_plan(schema))
+
+        student_train, student_test = train_test_split(
+            student_df, train_size=TRAIN_SIZE, random_state=seed
+        )
+        print(f"\nTrain set: {len(student_train)} rows")
+        print(f"Test set: {len(student_test)} rows")
 
-    os.makedirs(data_to, exist_ok=True)
-    student_train.to_csv(os.path.join(data_to, "student_train.csv"), index=False)
-    student_test.to_csv(os.path.join(data_to, "student_test.csv"), index=False)
+        os.makedirs(data_to, exist_ok=True)
+        for fmt in formats:
+            write_table(student_train, table_path(data_to, "student_train", fmt))
+            write_table(student_test, table_path(data_to, "student_test", fmt))
 
-    os.makedirs(preprocessor_to, exist_ok=True)
-    student_preprocessor = create_preprocessor()
-    pickle.dump(student_preprocessor, open(os.path.join(preprocessor_to, "student_preprocessor.pickle"), "wb"))
+        os.makedirs(preprocessor_to, exist_ok=True)
+        student_preprocessor = create_preprocessor()
+        save_object(student_preprocessor, os.path.join(preprocessor_to, "student_preprocessor.pickle"))
 
-    student_preprocessor.fit(student_train.drop(columns=["G3"]))
-    transformed_train = student_preprocessor.transform(student_train.drop(columns=["G3"]))
-    transformed_test = student_preprocessor.transform(student_test.drop(columns=["G3"]))
+        student_preprocessor.fit(student_train.drop(columns=["G3"]))
+        transformed_train = parallel_transform(student_preprocessor, student_train.drop(columns=["G3"]), workers)
+        transformed_test = parallel_transform(student_preprocessor, student_test.drop(columns=["G3"]), workers)
 
-    transformed_train["G3"] = student_train["G3"].values
-    transformed_test["G3"] = student_test["G3"].values
+        transformed_train["G3"] = student_train["G3"].values
+        transformed_test["G3"] = student_test["G3"].values
 
-    transformed_train.to_csv(os.path.join(data_to, "transformed_student_train.csv"), index=False)
-    transformed_test.to_csv(os.path.join(data_to, "transformed_student_test.csv"), index=False)
+        for fmt in formats:
+            write_table(transformed_train, table_path(data_to, "transformed_student_train", fmt))
+            write_table(transformed_test, table_path(data_to, "transformed_student_test", fmt))
 
     print(f"\nSaved training data to {data_to}")
     print(f"Saved preprocessor to {preprocessor_to}")
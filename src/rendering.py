@@ -0,0 +1,207 @@
+import hashlib
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# threads rasterizing figures at once; vl-convert and Agg spend most of
+# their time outside the GIL
+RENDER_WORKERS = 2
+
+
+def _update(digest, data) -> None:
+    """Feed the content of a table, array or plain value into ``digest``."""
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr((list(data.columns), [str(dtype) for dtype in data.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        digest.update(repr((data.name, str(data.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        digest.update(repr((data.dtype.str, data.shape)).encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+    else:
+        digest.update(repr(data).encode())
+
+
+def figure_key(draw, *data, **params) -> str:
+    """
+    Return the SHA-256 of everything a figure is drawn from.
+
+    The key covers the drawing function (its qualified name and the source
+    code of its whole module, so that edits to the helpers and style
+    constants it uses count too), the content of every data argument
+    (tables and arrays by value, ignoring the index) and the keyword
+    parameters.
+
+    Parameters
+    ----------
+    draw : callable
+        Function called as ``draw(path, *data, **params)`` to write the figure.
+    *data
+        DataFrames, Series, arrays or plain values the figure is drawn from.
+    **params
+        Further options passed to ``draw``.
+
+    Returns
+    -------
+    str
+        Hex digest.
+    """
+    digest = hashlib.sha256(f"{draw.__module__}.{draw.__qualname__}".encode())
+    try:
+        digest.update(inspect.getsource(inspect.getmodule(draw) or draw).encode())
+    except (OSError, TypeError):
+        pass
+    for item in data:
+        digest.update(b"\0")
+        _update(digest, item)
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def _stamp_path(path: str) -> str:
+    """Hidden file next to ``path`` recording the key it was drawn from."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.sha256")
+
+
+class FigureRenderer:
+    """
+    Render figures on a background thread pool, skipping unchanged ones.
+
+    ``submit`` returns at once, so a script can go on saving its models and
+    tables while its figures are rasterized; leaving the ``with`` block
+    waits for them. After drawing a figure, the renderer writes its
+    ``figure_key`` to a hidden stamp file next to it (``.<name>.sha256``).
+    A figure whose file exists and whose stamp matches the new key is not
+    drawn again.
+
+    With ``enabled=False`` (the scripts' ``--no-plots``), nothing is drawn
+    or written, for retrains where only the models and tables matter.
+
+    Parameters
+    ----------
+    directory : str
+        Directory the figures are written to, created on the first
+        ``submit``; may be None when rendering is disabled.
+    workers : int, optional
+        Figures drawn at once (default: ``RENDER_WORKERS``).
+    enabled : bool, optional
+        Draw figures at all (default: True).
+    echo : callable, optional
+        Called with a message per figure saved or skipped (default: print).
+
+    Attributes
+    ----------
+    rendered : list of str
+        Paths drawn.
+    skipped : list of str
+        Paths left as they were because their inputs were unchanged.
+
+    Examples
+    --------
+    >>> with FigureRenderer("results/figures") as renderer:
+    ...     renderer.submit("target.png", draw_target, student_train)
+    ...     save_object(model, "results/models/model.pickle")  # while the figure renders
+    """
+
+    def __init__(self, directory: str, workers: int = RENDER_WORKERS, enabled: bool = True,
+                 echo=print) -> None:
+        self.directory = directory
+        self.workers = workers
+        self.enabled = enabled
+        self.echo = echo
+        self.rendered = []
+        self.skipped = []
+        self._futures = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") if enabled else None
+
+    def submit(self, name: str, draw, *data, **params):
+        """
+        Draw the figure ``name`` in the background unless its inputs are unchanged.
+
+        Parameters
+        ----------
+        name : str
+            File name of the figure within ``directory``.
+        draw : callable
+            Called in a worker thread as ``draw(path, *data, **params)``
+            with the full path of the figure.
+        *data
+            Inputs of the figure, hashed for the skip check and passed to ``draw``.
+        **params
+            Options, hashed and passed to ``draw``.
+
+        Returns
+        -------
+        concurrent.futures.Future or None
+            Resolves to True if the figure was drawn and False if it was
+            skipped; None when rendering is disabled.
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        future = self._executor.submit(self._render, path, draw, data, params)
+        self._futures.append(future)
+        return future
+
+    def _render(self, path: str, draw, data: tuple, params: dict) -> bool:
+        key = figure_key(draw, *data, **params)
+        stamp = _stamp_path(path)
+        if os.path.exists(path) and os.path.exists(stamp):
+            with open(stamp) as f:
+                if f.read().strip() == key:
+                    with self._lock:
+                        self.skipped.append(path)
+                    self.echo(f"Unchanged, not redrawn: {path}")
+                    return False
+        # a failed draw must not leave a stamp vouching for a stale figure
+        if os.path.exists(stamp):
+            os.remove(stamp)
+        draw(path, *data, **params)
+        with open(stamp, "w") as f:
+            f.write(key)
+        with self._lock:
+            self.rendered.append(path)
+        self.echo(f"Saved: {path}")
+        return True
+
+    def wait(self) -> None:
+        """
+        Wait for every submitted figure.
+
+        Raises
+        ------
+        Exception
+            The first error raised while drawing, once all figures are done.
+        """
+        futures, self._futures = self._futures, []
+        errors = [future.exception() for future in futures]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Wait for the figures and stop the worker threads."""
+        try:
+            self.wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "FigureRenderer":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # keep the original error; drawing errors would only mask it
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
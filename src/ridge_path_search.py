@@ -0,0 +1,367 @@
+import numpy as np
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, clone
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import ParameterSampler, check_cv
+from sklearn.pipeline import make_pipeline
+
+from src.fold_cache import FoldTransformCache, fingerprint_frame
+
+ALPHA_PARAM = "ridge__alpha"
+
+
+def _neg_mean_absolute_error(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return -np.mean(np.abs(y_pred - y_true[:, None]), axis=0)
+
+
+def _neg_mean_squared_error(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return -np.mean((y_pred - y_true[:, None]) ** 2, axis=0)
+
+
+def _neg_root_mean_squared_error(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    return -np.sqrt(np.mean((y_pred - y_true[:, None]) ** 2, axis=0))
+
+
+def _r2(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    ss_res = np.sum((y_pred - y_true[:, None]) ** 2, axis=0)
+    ss_tot = np.sum((y_true - y_true.mean()) ** 2)
+    return 1 - ss_res / ss_tot
+
+
+# Vectorized versions of the sklearn scorers: each maps y_true (n,) and a
+# matrix of predictions (n, n_alphas) to one score per alpha.
+SCORERS = {
+    "neg_mean_absolute_error": _neg_mean_absolute_error,
+    "neg_mean_squared_error": _neg_mean_squared_error,
+    "neg_root_mean_squared_error": _neg_root_mean_squared_error,
+    "r2": _r2,
+}
+
+
+# Per-sample scores for metrics that are averages over samples, used for the
+# spread of leave-one-out scores (sklearn scores one sample per LOO split).
+POINTWISE_SCORERS = {
+    "neg_mean_absolute_error": lambda residuals: -np.abs(residuals),
+    "neg_mean_squared_error": lambda residuals: -residuals ** 2,
+}
+
+
+def get_path_scorer(scoring: str):
+    """
+    Return the vectorized scorer registered under a sklearn scoring name.
+
+    Parameters
+    ----------
+    scoring : str
+        One of the keys of ``SCORERS`` (e.g. "neg_mean_absolute_error").
+
+    Returns
+    -------
+    callable
+        Function mapping ``(y_true, y_pred_matrix)`` to one score per column.
+
+    Raises
+    ------
+    ValueError
+        If the scoring name is not supported.
+    """
+    if scoring not in SCORERS:
+        raise ValueError(
+            f"Unsupported scoring '{scoring}'. Choose one of: {', '.join(SCORERS)}."
+        )
+    return SCORERS[scoring]
+
+
+class RidgeFoldPath:
+    """
+    Eigendecomposition of one training fold, reusable for any Ridge alpha.
+
+    Ridge with an intercept solves ``(Xc'Xc + alpha I) w = Xc'yc`` on the
+    centered data. Decomposing ``Xc'Xc = V diag(lam) V'`` once gives
+    ``w(alpha) = V diag(1 / (lam + alpha)) V'Xc'yc`` for every alpha at the
+    cost of a matrix product.
+
+    Parameters
+    ----------
+    X_train : np.ndarray
+        Transformed training matrix of shape (n_samples, n_features).
+    y_train : np.ndarray
+        Training target of shape (n_samples,).
+    """
+
+    def __init__(self, X_train: np.ndarray, y_train: np.ndarray) -> None:
+        X_train = np.asarray(X_train, dtype=float)
+        y_train = np.asarray(y_train, dtype=float)
+        self.x_mean = X_train.mean(axis=0)
+        self.y_mean = y_train.mean()
+        X_centered = X_train - self.x_mean
+        eigvals, self.eigvecs = np.linalg.eigh(X_centered.T @ X_centered)
+        self.eigvals = np.clip(eigvals, 0, None)
+        self.projected_target = self.eigvecs.T @ (X_centered.T @ (y_train - self.y_mean))
+
+    def coefs(self, alphas: np.ndarray) -> np.ndarray:
+        """Return the Ridge coefficients as a (n_features, n_alphas) matrix."""
+        alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+        shrunk = self.projected_target[:, None] / (self.eigvals[:, None] + alphas[None, :])
+        return self.eigvecs @ shrunk
+
+    def predict(self, X: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+        """Return predictions for ``X`` as a (n_samples, n_alphas) matrix."""
+        X = np.asarray(X, dtype=float)
+        return self.y_mean + (X - self.x_mean) @ self.coefs(alphas)
+
+
+class RidgePathSearchCV(BaseEstimator):
+    """
+    Cross-validated search over Ridge alphas using one factorization per fold.
+
+    A drop-in replacement for ``RandomizedSearchCV`` on a
+    ``make_pipeline(preprocessor, Ridge())`` pipeline when only
+    ``ridge__alpha`` is tuned. Candidates are drawn with the same
+    ``ParameterSampler`` and folds come from the same ``check_cv`` splitter,
+    so ``best_params_``, ``best_score_`` and ``cv_results_`` match the
+    brute-force search while the preprocessor and the decomposition run once
+    per fold instead of once per candidate and fold.
+
+    Parameters
+    ----------
+    preprocessor : sklearn transformer
+        Unfitted preprocessing step placed in front of ``Ridge``.
+    param_distributions : dict
+        Mapping with the single key ``"ridge__alpha"`` to a list of values
+        or a scipy distribution.
+    n_iter : int, optional
+        Number of alphas sampled (default: 100).
+    cv : int or cross-validation generator, optional
+        Cross-validation strategy (default: 10).
+    scoring : str, optional
+        Name of a vectorized scorer in ``SCORERS``
+        (default: "neg_mean_absolute_error").
+    random_state : int, optional
+        Seed passed to ``ParameterSampler`` (default: None).
+    refit : bool, optional
+        Whether to refit the best pipeline on all data (default: True).
+    cache : FoldTransformCache, optional
+        Cache of fitted preprocessors and transformed folds shared between
+        searches; a private cache is used when omitted (default: None).
+
+    Examples
+    --------
+    >>> search = RidgePathSearchCV(preprocessor, {"ridge__alpha": loguniform(1e-3, 1e3)})
+    >>> search.fit(X_train, y_train)
+    >>> search.best_params_
+    {'ridge__alpha': 38.20...}
+    """
+
+    def __init__(self, preprocessor, param_distributions: dict, n_iter: int = 100,
+                 cv=10, scoring: str = "neg_mean_absolute_error",
+                 random_state: int = None, refit: bool = True,
+                 cache: FoldTransformCache = None) -> None:
+        self.preprocessor = preprocessor
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.cv = cv
+        self.scoring = scoring
+        self.random_state = random_state
+        self.refit = refit
+        self.cache = cache
+
+    def _sample_candidates(self) -> list:
+        if set(self.param_distributions) != {ALPHA_PARAM}:
+            raise ValueError(
+                f"RidgePathSearchCV only tunes '{ALPHA_PARAM}', "
+                f"got: {sorted(self.param_distributions)}."
+            )
+        return list(ParameterSampler(
+            self.param_distributions, self.n_iter, random_state=self.random_state
+        ))
+
+    def _fold_paths(self, X, y: np.ndarray, cv):
+        """Yield a ``(RidgeFoldPath, X_test, y_test)`` triple for each split."""
+        cache = self.cache if self.cache is not None else FoldTransformCache()
+        data_key = fingerprint_frame(X)
+        for train, test in cv.split(X, y):
+            _, X_train, X_test = cache.get_or_fit(self.preprocessor, X, train, test, data_key=data_key)
+            yield RidgeFoldPath(X_train, y[train]), X_test, y[test]
+
+    def fit(self, X, y) -> "RidgePathSearchCV":
+        """
+        Score every sampled alpha on every fold and refit the best pipeline.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Raw feature frame accepted by the preprocessor.
+        y : array-like
+            Target values.
+
+        Returns
+        -------
+        RidgePathSearchCV
+            The fitted search object.
+        """
+        scorer = get_path_scorer(self.scoring)
+        candidates = self._sample_candidates()
+        alphas = np.array([params[ALPHA_PARAM] for params in candidates], dtype=float)
+        y = np.asarray(y, dtype=float)
+        cv = check_cv(self.cv)
+
+        split_scores = np.array([
+            scorer(y_test, path.predict(X_test, alphas))
+            for path, X_test, y_test in self._fold_paths(X, y, cv)
+        ])
+        self._store_results(
+            candidates, alphas, split_scores.mean(axis=0), split_scores.std(axis=0),
+            n_splits=len(split_scores), split_scores=split_scores
+        )
+        self._refit(X, y)
+        return self
+
+    def _refit(self, X, y: np.ndarray) -> None:
+        if self.refit:
+            self.best_estimator_ = make_pipeline(
+                clone(self.preprocessor), Ridge(alpha=self.best_params_[ALPHA_PARAM])
+            ).fit(X, y)
+
+    def _store_results(self, candidates: list, alphas: np.ndarray, mean_scores: np.ndarray,
+                       std_scores: np.ndarray, n_splits: int, split_scores: np.ndarray = None) -> None:
+        results = {
+            f"param_{ALPHA_PARAM}": alphas,
+            "params": candidates,
+        }
+        if split_scores is not None:
+            for i, fold_scores in enumerate(split_scores):
+                results[f"split{i}_test_score"] = fold_scores
+        results["mean_test_score"] = mean_scores
+        results["std_test_score"] = std_scores
+        results["rank_test_score"] = rankdata(-mean_scores, method="min").astype(np.int32)
+
+        self.cv_results_ = results
+        self.n_splits_ = n_splits
+        self.best_index_ = int(np.flatnonzero(results["rank_test_score"] == 1)[0])
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(mean_scores[self.best_index_])
+
+    def predict(self, X) -> np.ndarray:
+        """Predict with the refitted best pipeline."""
+        return self.best_estimator_.predict(X)
+
+
+class RidgeLOOSearchCV(RidgePathSearchCV):
+    """
+    Exact leave-one-out or generalized cross-validation over Ridge alphas.
+
+    The preprocessor is fitted once on all rows and the centered design
+    matrix is decomposed once, ``Xc = U diag(s) V'``. Ridge with an
+    unpenalized intercept is a linear smoother with hat matrix
+    ``H = 11'/n + U diag(s^2 / (s^2 + alpha)) U'``, so the leave-one-out
+    residuals are ``(y - Hy) / (1 - diag(H))`` without any refitting. GCV
+    replaces ``diag(H)`` by its average ``trace(H) / n``.
+
+    Parameters
+    ----------
+    preprocessor : sklearn transformer
+        Unfitted preprocessing step placed in front of ``Ridge``.
+    param_distributions : dict
+        Mapping with the single key ``"ridge__alpha"``.
+    n_iter : int, optional
+        Number of alphas sampled (default: 100).
+    mode : str, optional
+        "loo" for exact leave-one-out or "gcv" for generalized
+        cross-validation (default: "loo").
+    scoring : str, optional
+        Name of a vectorized scorer in ``SCORERS``
+        (default: "neg_mean_absolute_error").
+    random_state : int, optional
+        Seed passed to ``ParameterSampler`` (default: None).
+    refit : bool, optional
+        Whether to refit the best pipeline on all data (default: True).
+
+    Notes
+    -----
+    Unlike k-fold search, the preprocessing statistics are computed on all
+    rows, as in ``sklearn.linear_model.RidgeCV``. ``std_test_score`` is the
+    spread of the per-sample scores for MAE and MSE and zero otherwise, and
+    ``n_splits_`` is the number of samples.
+
+    Examples
+    --------
+    >>> search = RidgeLOOSearchCV(preprocessor, {"ridge__alpha": loguniform(1e-3, 1e3)})
+    >>> search.fit(X_train, y_train).best_params_
+    {'ridge__alpha': 31.9...}
+    """
+
+    def __init__(self, preprocessor, param_distributions: dict, n_iter: int = 100,
+                 mode: str = "loo", scoring: str = "neg_mean_absolute_error",
+                 random_state: int = None, refit: bool = True) -> None:
+        super().__init__(
+            preprocessor, param_distributions, n_iter=n_iter, cv=None, scoring=scoring,
+            random_state=random_state, refit=refit
+        )
+        self.mode = mode
+
+    def loo_residuals(self, X_transformed: np.ndarray, y: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+        """
+        Return held-out residuals as a (n_samples, n_alphas) matrix.
+
+        Parameters
+        ----------
+        X_transformed : np.ndarray
+            Preprocessed design matrix.
+        y : np.ndarray
+            Target values.
+        alphas : np.ndarray
+            Regularization strengths.
+
+        Returns
+        -------
+        np.ndarray
+            ``y_i - y_hat_(-i)`` for "loo", or the GCV-scaled residuals.
+        """
+        if self.mode not in ("loo", "gcv"):
+            raise ValueError(f"Unsupported mode '{self.mode}'. Choose 'loo' or 'gcv'.")
+        X_transformed = np.asarray(X_transformed, dtype=float)
+        n_samples = len(y)
+        y_centered = y - y.mean()
+        U, s, _ = np.linalg.svd(X_transformed - X_transformed.mean(axis=0), full_matrices=False)
+
+        shrinkage = s[:, None] ** 2 / (s[:, None] ** 2 + alphas[None, :])
+        fitted = y.mean() + U @ (shrinkage * (U.T @ y_centered)[:, None])
+        if self.mode == "loo":
+            leverage = 1 / n_samples + (U ** 2) @ shrinkage
+        else:
+            leverage = (1 + shrinkage.sum(axis=0)) / n_samples
+        return (y[:, None] - fitted) / (1 - leverage)
+
+    def fit(self, X, y) -> "RidgeLOOSearchCV":
+        """
+        Score every sampled alpha by LOO or GCV and refit the best pipeline.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Raw feature frame accepted by the preprocessor.
+        y : array-like
+            Target values.
+
+        Returns
+        -------
+        RidgeLOOSearchCV
+            The fitted search object.
+        """
+        scorer = get_path_scorer(self.scoring)
+        candidates = self._sample_candidates()
+        alphas = np.array([params[ALPHA_PARAM] for params in candidates], dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        X_transformed = clone(self.preprocessor).fit(X, y).transform(X)
+        residuals = self.loo_residuals(X_transformed, y, alphas)
+
+        mean_scores = scorer(y, y[:, None] - residuals)
+        if self.scoring in POINTWISE_SCORERS:
+            std_scores = POINTWISE_SCORERS[self.scoring](residuals).std(axis=0)
+        else:
+            std_scores = np.zeros_like(mean_scores)
+        self._store_results(candidates, alphas, mean_scores, std_scores, n_splits=len(y))
+        self._refit(X, y)
+        return self
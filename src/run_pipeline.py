@@ -0,0 +1,493 @@
+import ast
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import click
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+
+# only needed once stages are checked or run; they pull in numpy and pandas
+fingerprint_file = lazy_import("src.fold_cache", "fingerprint_file")
+handoff = lazy_import("src.storage", "handoff")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DATA_URL = "https://archive.ics.uci.edu/static/public/320/student+performance.zip"
+
+STAGE_NAMES = ["download", "ingest", "preprocess", "eda", "fit", "evaluate", "report"]
+
+
+class Stage:
+    """
+    One step of the analysis: a command with declared inputs and outputs.
+
+    Parameters
+    ----------
+    name : str
+        Unique stage name.
+    command : list of str
+        Command line; every argument counts as a parameter of the stage.
+    inputs : list of str, optional
+        Data files read by the command, relative to the project root.
+    outputs : list of str, optional
+        Files written by the command, relative to the project root.
+    code : list of str, optional
+        Source files of the command. For Python scripts the ``src`` modules
+        they import are added automatically (see ``code_files``).
+
+    Examples
+    --------
+    >>> Stage("eda", ["python", "src/eda.py", "--plot-to=results/figures"],
+    ...       inputs=["data/processed/student_train.parquet"],
+    ...       outputs=["results/figures/target_distribution.png"], code=["src/eda.py"])
+    """
+
+    def __init__(self, name: str, command: list, inputs: list = (), outputs: list = (), code: list = ()) -> None:
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r})"
+
+
+def code_files(path: str, root: str = ROOT) -> list:
+    """
+    Return a Python script and every ``src`` module it imports, recursively.
+
+    Modules bound with ``lazy_import("src.<module>", ...)`` count as imports.
+
+    Parameters
+    ----------
+    path : str
+        Script path relative to ``root``; non-Python files are returned as is.
+    root : str, optional
+        Project root containing the ``src`` package.
+
+    Returns
+    -------
+    list of str
+        Sorted relative paths of the script and its ``src`` dependencies.
+    """
+    seen, pending = set(), [path]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        if not current.endswith(".py"):
+            continue
+        with open(os.path.join(root, current)) as f:
+            tree = ast.parse(f.read(), filename=current)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "lazy_import"
+                  and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                names = [node.args[0].value]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(*name.split(".")) + ".py"
+                if name.startswith("src.") and os.path.exists(os.path.join(root, module)):
+                    pending.append(module)
+    return sorted(seen)
+
+
+def default_stages(seed: int = 123, plots: bool = True) -> list:
+    """
+    Return the stages of the analysis, mirroring the Makefile.
+
+    Parameters
+    ----------
+    seed : int, optional
+        Random seed passed to every stage that takes one (default: 123).
+    plots : bool, optional
+        Draw the figures (default: True). Without them, fit and evaluate
+        run with ``--no-plots`` and only write models and tables, and the
+        eda and report stages, which exist for the figures, are left out.
+
+    Returns
+    -------
+    list of Stage
+        download, ingest, preprocess, eda, fit, evaluate and report.
+    """
+    python = sys.executable
+    raw = ["data/raw/student-mat.csv", "data/raw/student-por.csv"]
+    ingested = "data/ingested/student-por.parquet"
+    train, test = "data/processed/student_train.parquet", "data/processed/student_test.parquet"
+    preprocessor = "results/models/student_preprocessor.pickle"
+    pipeline = "results/models/student_pipeline.pickle"
+    figures = [
+        "results/figures/target_distribution.png", "results/figures/correlation_heatmap.png",
+        "results/figures/student_tune_alpha.png", "results/figures/prediction_error.png",
+    ]
+    tables = ["results/tables/test_scores.csv", "results/tables/top_coefficients.csv"]
+    # without plots, fit and evaluate only write models and tables
+    plot_options = [] if plots else ["--no-plots"]
+    fit_figures, evaluate_figures = (figures[2:3], figures[3:]) if plots else ([], [])
+    stages = [
+        Stage("download",
+              [python, "src/download_data.py", f"--url={DATA_URL}", "--write-to=data/raw",
+               "--cache-dir=.cache/downloads"],
+              outputs=raw,
+              code=["src/download_data.py"]),
+        Stage("ingest",
+              [python, "src/ingest_data.py", "--raw-dir=data/raw", "--write-to=data/ingested"],
+              inputs=raw,
+              outputs=[ingested, "data/ingested/student-mat.parquet", "data/ingested/manifest.json"],
+              code=["src/ingest_data.py"]),
+        Stage("preprocess",
+              [python, "src/preprocess_data.py", f"--raw-data={ingested}",
+               "--data-to=data/processed", "--preprocessor-to=results/models", f"--seed={seed}"],
+              inputs=[ingested],
+              outputs=[train, test, preprocessor],
+              code=["src/preprocess_data.py"]),
+        Stage("eda",
+              [python, "src/eda.py", f"--processed-training-data={train}", "--plot-to=results/figures"],
+              inputs=[train],
+              outputs=figures[:2],
+              code=["src/eda.py"]),
+        Stage("fit",
+              [python, "src/fit_student_predictor.py", f"--training-data={train}",
+               f"--preprocessor={preprocessor}", "--pipeline-to=results/models",
+               "--plot-to=results/figures", "--search=ridge-path", "--correlation-backend=native",
+               f"--seed={seed}", *plot_options],
+              inputs=[train, preprocessor],
+              outputs=[pipeline, "results/models/student_model.npz", *fit_figures, "results/models/best_params.csv"],
+              code=["src/fit_student_predictor.py"]),
+        Stage("evaluate",
+              [python, "src/evaluate_student_predictor.py", f"--test-data={test}", f"--pipeline-from={pipeline}",
+               "--tables-to=results/tables", "--plot-to=results/figures", f"--seed={seed}", *plot_options],
+              inputs=[test, pipeline],
+              outputs=tables + evaluate_figures,
+              code=["src/evaluate_student_predictor.py"]),
+        Stage("report",
+              ["quarto", "render", "reports/student_grade_predictor_report.qmd"],
+              inputs=[train, test, *figures, *tables, "results/models/best_params.csv"],
+              outputs=["reports/student_grade_predictor_report.html", "reports/student_grade_predictor_report.pdf"],
+              code=["reports/student_grade_predictor_report.qmd"]),
+    ]
+    return stages if plots else [stage for stage in stages if stage.name not in ("eda", "report")]
+
+
+class PipelineRunner:
+    """
+    Run stages in dependency order, skipping those whose outputs are current.
+
+    A stage's key hashes its command line, the contents of its code (with
+    the ``src`` modules it imports) and the contents of its inputs. After a
+    successful run the key and the hashes of the outputs are written to a
+    stamp file; the stage is skipped while its key is unchanged and its
+    outputs still match the stamp. Keys depend on content only, so touching
+    a file or re-downloading identical data does not rerun anything.
+
+    Stages whose inputs are produced by other stages wait for them; the
+    rest run concurrently on up to ``jobs`` worker threads, each launching
+    the stage's command as a subprocess with its output in a log file.
+
+    With ``in_process``, Python script stages instead call the script's
+    click ``main`` in this interpreter, one stage at a time, so heavy
+    imports (pandas, sklearn, altair, deepchecks, pandera) are paid once.
+    Within a ``storage.handoff`` the tables and pickles a stage writes are
+    still written to disk but handed to later stages in memory: tables
+    without being decoded again, pickles as their bytes, which are still
+    unpickled but not read back from disk.
+
+    Parameters
+    ----------
+    stages : list of Stage
+        Stages to run; an output may be produced by at most one stage.
+    root : str, optional
+        Directory the paths and commands are relative to (default: the
+        project root).
+    stamp_dir : str, optional
+        Directory for stamps and logs, relative to ``root``
+        (default: ".pipeline").
+    jobs : int, optional
+        Maximum number of stages running at once (default: 2).
+    force : iterable of str, optional
+        Names of stages to rerun even if they are current.
+    in_process : bool, optional
+        Run Python script stages in this process, sequentially (default:
+        False).
+
+    Raises
+    ------
+    ValueError
+        If two stages write the same output or the stages form a cycle.
+    """
+
+    def __init__(self, stages: list, root: str = ROOT, stamp_dir: str = ".pipeline", jobs: int = 2,
+                 force=(), in_process: bool = False) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        self.root = root
+        self.stamp_dir = os.path.join(root, stamp_dir)
+        # in-process stages share global state (stdout, cwd, random seeds)
+        self.jobs = 1 if in_process else jobs
+        self.in_process = in_process
+        self.force = set(force)
+        unknown = self.force - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}.")
+        self.dependencies = self._dependencies()
+
+    def _dependencies(self) -> dict:
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"'{output}' is written by both '{producers[output]}' and '{stage.name}'.")
+                producers[output] = stage.name
+        dependencies = {
+            name: {producers[path] for path in stage.inputs if path in producers}
+            for name, stage in self.stages.items()
+        }
+        # Kahn's algorithm, only to reject cycles up front
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"The stages {sorted(remaining)} form a cycle.")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return dependencies
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.root, path)
+
+    def stage_key(self, stage: Stage) -> str:
+        """Hash the command, code and input contents of a stage."""
+        code = sorted({path for script in stage.code for path in code_files(script, self.root)})
+        description = {
+            "command": [os.path.basename(arg) if arg == sys.executable else arg for arg in stage.command],
+            "code": {path: fingerprint_file(self._path(path)) for path in code},
+            "inputs": {path: fingerprint_file(self._path(path)) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def _stamp_path(self, stage: Stage) -> str:
+        return os.path.join(self.stamp_dir, f"{stage.name}.json")
+
+    def is_current(self, stage: Stage, key: str) -> bool:
+        """Return whether the stamp of ``stage`` matches ``key`` and its outputs are unchanged."""
+        if stage.name in self.force:
+            return False
+        try:
+            with open(self._stamp_path(stage)) as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if stamp.get("key") != key:
+            return False
+        return all(
+            os.path.exists(self._path(path)) and fingerprint_file(self._path(path)) == stamp["outputs"].get(path)
+            for path in stage.outputs
+        )
+
+    def _execute(self, stage: Stage) -> tuple:
+        """Run one stage unless it is current; return its status, seconds and error."""
+        start = time.perf_counter()
+        try:
+            status = self._run_stage(stage)
+            error = None
+        except Exception as exc:
+            # e.g. a SyntaxError while hashing an edited script: fail this stage, not the run
+            status, error = "failed", f"{type(exc).__name__}: {exc}"
+        return status, time.perf_counter() - start, error
+
+    def _run_stage(self, stage: Stage) -> str:
+        missing = [path for path in stage.inputs if not os.path.exists(self._path(path))]
+        if missing:
+            raise FileNotFoundError(f"Stage '{stage.name}' is missing inputs: {missing}")
+        key = self.stage_key(stage)
+        if self.is_current(stage, key):
+            return "cached"
+
+        os.makedirs(os.path.join(self.stamp_dir, "logs"), exist_ok=True)
+        stamp_path = self._stamp_path(stage)
+        if os.path.exists(stamp_path):
+            os.remove(stamp_path)
+        log_path = os.path.join(self.stamp_dir, "logs", f"{stage.name}.log")
+        with open(log_path, "w") as log:
+            if self.in_process and self._is_script(stage):
+                returncode = self._call_main(stage, log)
+            else:
+                returncode = subprocess.run(stage.command, cwd=self.root, stdout=log,
+                                            stderr=subprocess.STDOUT).returncode
+        if returncode != 0:
+            raise RuntimeError(f"Stage '{stage.name}' exited with code {returncode}; see {log_path}")
+        missing = [path for path in stage.outputs if not os.path.exists(self._path(path))]
+        if missing:
+            raise RuntimeError(f"Stage '{stage.name}' did not write {missing}; see {log_path}")
+
+        stamp = {"key": key, "outputs": {path: fingerprint_file(self._path(path)) for path in stage.outputs}}
+        with open(stamp_path, "w") as f:
+            json.dump(stamp, f, indent=2)
+        return "ran"
+
+    @staticmethod
+    def _is_script(stage: Stage) -> bool:
+        return len(stage.command) > 1 and stage.command[0] == sys.executable and stage.command[1].endswith(".py")
+
+    def _call_main(self, stage: Stage, log) -> int:
+        """Run a script stage's click ``main`` in this process; return its exit code."""
+        script = stage.command[1]
+        module = importlib.import_module(os.path.splitext(script)[0].replace(os.sep, "."))
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            try:
+                module.main.main(args=stage.command[2:], prog_name=os.path.basename(script), standalone_mode=False)
+            except click.exceptions.Exit as exc:
+                return exc.exit_code
+            except Exception:
+                traceback.print_exc()
+                return 1
+        return 0
+
+    def run(self, echo=print) -> list:
+        """
+        Run every stage that is not current, in dependency order.
+
+        Parameters
+        ----------
+        echo : callable, optional
+            Receives one progress line per stage (default: ``print``).
+
+        Returns
+        -------
+        list of dict
+            One record per stage in completion order, with keys "stage",
+            "status" ("ran", "cached", "failed" or "blocked"), "seconds"
+            and "error".
+        """
+        results = []
+        done, failed = set(), set()
+        pending = dict(self.dependencies)
+        running = {}
+        with contextlib.ExitStack() as stack:
+            if self.in_process:
+                # scripts resolve their paths against the working directory
+                stack.enter_context(contextlib.chdir(self.root))
+                stack.enter_context(handoff())
+            pool = stack.enter_context(ThreadPoolExecutor(max_workers=self.jobs))
+            while pending or running:
+                for name in [name for name, deps in pending.items() if deps & failed]:
+                    del pending[name]
+                    failed.add(name)
+                    results.append({"stage": name, "status": "blocked", "seconds": 0.0, "error": None})
+                    echo(f"[{name}] blocked by a failed stage")
+                for name in [name for name, deps in pending.items() if deps <= done]:
+                    del pending[name]
+                    echo(f"[{name}] started")
+                    running[pool.submit(self._execute, self.stages[name])] = name
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    status, seconds, error = future.result()
+                    if error:
+                        failed.add(name)
+                    else:
+                        done.add(name)
+                    results.append({"stage": name, "status": status, "seconds": seconds, "error": error})
+                    echo(f"[{name}] {status}" + (f": {error}" if error else f" in {seconds:.1f}s"))
+        return results
+
+
+def timing_summary(results: list, elapsed: float) -> str:
+    """
+    Format the per-stage results of ``PipelineRunner.run`` as a table.
+
+    Parameters
+    ----------
+    results : list of dict
+        Records returned by ``PipelineRunner.run``.
+    elapsed : float
+        Wall-clock seconds of the whole run.
+
+    Returns
+    -------
+    str
+        One line per stage with its status and seconds, then the total.
+    """
+    width = max([len(result["stage"]) for result in results] + [5])
+    lines = [f"{'stage':<{width}}  {'status':<7}  {'seconds':>8}"]
+    for result in results:
+        lines.append(f"{result['stage']:<{width}}  {result['status']:<7}  {result['seconds']:>8.1f}")
+    busy = sum(result["seconds"] for result in results)
+    lines.append(f"{'total':<{width}}  {'':<7}  {elapsed:>8.1f}  (stage time {busy:.1f}s)")
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option('--jobs', type=int, default=2, show_default=True, help="Maximum number of stages run at once")
+@click.option('--force', type=click.Choice(STAGE_NAMES), multiple=True,
+              help="Rerun this stage even if its outputs are current (repeatable)")
+@click.option('--seed', type=int, default=123, show_default=True, help="Random seed passed to the stages")
+@click.option('--stamp-dir', type=str, default=".pipeline", show_default=True,
+              help="Directory for stage stamps and logs, relative to the project root")
+@click.option('--in-process', is_flag=True,
+              help="Run the Python stages in this process, one at a time, handing tables and models over in memory")
+@click.option('--no-plots', is_flag=True,
+              help="Retrain without figures: skip eda and report, and run fit and evaluate with --no-plots")
+def main(jobs: int, force: tuple, seed: int, stamp_dir: str, in_process: bool, no_plots: bool) -> None:
+    """
+    Run the analysis, skipping stages whose inputs, parameters and code are unchanged.
+
+    Parameters
+    ----------
+    jobs : int
+        Maximum number of stages run concurrently (e.g. eda and fit). Default is 2.
+    force : tuple of str
+        Stages to rerun regardless of their stamps.
+    seed : int
+        Random seed passed to the stages. Default is 123.
+    stamp_dir : str
+        Directory for stage stamps and logs. Default is ".pipeline".
+    in_process : bool
+        Call each script's ``main`` in one warm interpreter instead of a new
+        process per stage, and pass DataFrames and fitted objects between
+        stages in memory; the same files are written. Stages then run
+        one at a time (``jobs`` is ignored).
+    no_plots : bool
+        Only produce the models and tables: the eda and report stages are
+        left out, and fit and evaluate draw no figures.
+
+    Returns
+    -------
+    None
+        Runs the stages and prints a per-stage timing summary.
+
+    Raises
+    ------
+    click.ClickException
+        If a stage fails; stages that do not depend on it still run.
+    """
+    start = time.perf_counter()
+    runner = PipelineRunner(default_stages(seed, plots=not no_plots), root=ROOT, stamp_dir=stamp_dir, jobs=jobs, force=force,
+                            in_process=in_process)
+    results = runner.run(echo=click.echo)
+    click.echo("\n" + timing_summary(results, time.perf_counter() - start))
+    failures = [result for result in results if result["status"] == "failed"]
+    if failures:
+        raise click.ClickException("; ".join(result["error"] for result in failures))
+
+
+if __name__ == '__main__':
+    main()
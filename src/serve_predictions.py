@@ -0,0 +1,459 @@
+import asyncio
+import click
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+from src.predict_students import create_feature_schema, load_model
+
+# imported on first use, so --help starts fast
+config_context = lazy_import("sklearn", "config_context")
+get_config = lazy_import("sklearn", "get_config")
+set_config = lazy_import("sklearn", "set_config")
+
+# largest /predict body accepted, in bytes, unless configured otherwise
+MAX_BODY_BYTES = 16 << 20
+
+
+@lru_cache(maxsize=None)
+def feature_columns() -> list:
+    """Columns of a prediction request, in model order (builds the pandera schema once)."""
+    return list(create_feature_schema().columns)
+
+
+class RequestError(ValueError):
+    """Client error answered with HTTP 400."""
+
+
+# errors the model raises on the values of a record, e.g. an unknown category
+RECORD_ERRORS = (ValueError, TypeError, KeyError)
+
+
+class LatencyStats:
+    """
+    Rolling latency percentiles and lifetime throughput counters.
+
+    Parameters
+    ----------
+    window : int, optional
+        Number of most recent request latencies kept for the percentiles
+        (default: 10000).
+    """
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.batches = 0
+
+    def record_request(self, seconds: float, n_rows: int, ok: bool = True) -> None:
+        """Record one answered /predict request."""
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += n_rows
+        self.errors += not ok
+
+    def snapshot(self) -> dict:
+        """
+        Return the counters as a JSON-serialisable dict.
+
+        Returns
+        -------
+        dict
+            p50/p99 latency in milliseconds over the window, request, row and
+            batch totals, throughput since startup and the mean batch size.
+        """
+        uptime = time.perf_counter() - self.started
+        if self.latencies:
+            p50, p99 = np.percentile(np.fromiter(self.latencies, float), [50, 99]) * 1000
+        else:
+            p50 = p99 = None
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows": self.rows,
+            "batches": self.batches,
+            "mean_batch_rows": self.rows / self.batches if self.batches else None,
+            "latency_p50_ms": p50,
+            "latency_p99_ms": p99,
+            "requests_per_sec": self.requests / uptime,
+            "rows_per_sec": self.rows / uptime,
+            "uptime_s": uptime,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent prediction requests into one vectorized call.
+
+    The first queued request opens a batch; requests arriving within
+    ``max_delay`` seconds join it until ``max_batch_rows`` rows are
+    collected. The batch is scored with a single ``predict`` call on a
+    worker thread, so the event loop keeps accepting requests (which form
+    the next batch) while the model runs. If the batch fails, each request
+    is retried alone so that one bad record only fails its own request;
+    a request whose records the model rejects (``RECORD_ERRORS``) fails
+    with ``RequestError``, any other error is passed on as it is.
+
+    Parameters
+    ----------
+    predict : callable
+        Function mapping a DataFrame of raw records to predictions.
+    max_delay : float, optional
+        Seconds to wait for more requests after the first (default: 0.005).
+    max_batch_rows : int, optional
+        Rows that close a batch early (default: 2048).
+    stats : LatencyStats, optional
+        Counters updated with the number of batches.
+    """
+
+    def __init__(self, predict, max_delay: float = 0.005, max_batch_rows: int = 2048,
+                 stats: LatencyStats = None) -> None:
+        self.predict = predict
+        self.max_delay = max_delay
+        self.max_batch_rows = max_batch_rows
+        self.stats = stats
+        self._queue = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # sklearn's config is thread-local; score under the creating thread's
+        self._config = get_config()
+
+    def start(self) -> None:
+        """Start the batching task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the batching task and release the worker thread."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, records: list) -> np.ndarray:
+        """
+        Queue records for the next batch and wait for their predictions.
+
+        Parameters
+        ----------
+        records : list of dict
+            Raw student records.
+
+        Returns
+        -------
+        np.ndarray
+            One prediction per record.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.max_delay
+            while n_rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+            try:
+                await self._score(batch)
+            except Exception as error:
+                # a failed batch must not stop the requests after it from being scored
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def _predict_records(self, records: list) -> np.ndarray:
+        with config_context(**self._config):
+            return np.asarray(self.predict(pd.DataFrame.from_records(records, columns=feature_columns())))
+
+    async def _score(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        rows = [record for records, _ in batch for record in records]
+        if self.stats is not None:
+            self.stats.batches += 1
+        try:
+            predictions = await loop.run_in_executor(self._executor, self._predict_records, rows)
+        except Exception as error:
+            if len(batch) == 1:
+                future = batch[0][1]
+                if not future.done():
+                    if isinstance(error, RECORD_ERRORS):
+                        error = RequestError(f"Record rejected by the model: {error}")
+                    future.set_exception(error)
+                return
+            for item in batch:
+                await self._score([item])
+            return
+
+        start = 0
+        for records, future in batch:
+            if not future.done():
+                future.set_result(predictions[start:start + len(records)])
+            start += len(records)
+
+
+def parse_records(body: bytes) -> list:
+    """
+    Parse a /predict request body into a list of student records.
+
+    Parameters
+    ----------
+    body : bytes
+        JSON holding one record, a list of records, or ``{"records": [...]}``.
+
+    Returns
+    -------
+    list of dict
+        Records with every feature column of the student schema.
+
+    Raises
+    ------
+    RequestError
+        If the body is not valid JSON or a record misses a feature column.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError as error:
+        raise RequestError(f"Request body is not valid JSON: {error}")
+    if isinstance(payload, dict):
+        payload = payload["records"] if "records" in payload else [payload]
+    if not isinstance(payload, list) or not payload or not all(isinstance(r, dict) for r in payload):
+        raise RequestError("Expected a student record, a list of records or {\"records\": [...]}.")
+    for i, record in enumerate(payload):
+        missing = [column for column in feature_columns() if column not in record]
+        if missing:
+            raise RequestError(f"Record {i} is missing columns: {', '.join(missing)}")
+    return payload
+
+
+class PredictionServer:
+    """
+    Minimal asyncio HTTP/1.1 server scoring student records with a loaded model.
+
+    Routes
+    ------
+    ``POST /predict``
+        JSON records in, ``{"predictions": [...]}`` out.
+    ``GET /metrics``
+        ``LatencyStats.snapshot()`` as JSON.
+    ``GET /health``
+        ``{"status": "ok"}``.
+
+    Parameters
+    ----------
+    model : object
+        Fitted model exposing ``predict`` on a DataFrame of raw records.
+    host : str, optional
+        Interface to bind (default: "127.0.0.1").
+    port : int, optional
+        Port to bind; 0 picks a free port (default: 8000).
+    max_delay : float, optional
+        Micro-batching window in seconds (default: 0.005).
+    max_batch_rows : int, optional
+        Rows that close a batch early (default: 2048).
+    max_body_bytes : int, optional
+        Largest request body accepted; a larger ``Content-Length`` is
+        answered with 413 (default: 16 MiB).
+
+    Examples
+    --------
+    >>> server = PredictionServer(model, port=0)
+    >>> await server.start()
+    >>> server.port
+    53127
+    """
+
+    def __init__(self, model, host: str = "127.0.0.1", port: int = 8000, max_delay: float = 0.005,
+                 max_batch_rows: int = 2048, max_body_bytes: int = MAX_BODY_BYTES) -> None:
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(model.predict, max_delay, max_batch_rows, self.stats)
+        self._server = None
+
+    async def start(self) -> None:
+        """Start the batcher and begin listening; ``port`` is updated if it was 0."""
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Serve requests until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and stop the batcher."""
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if path == "/predict" and method == "POST":
+            start = time.perf_counter()
+            try:
+                records = parse_records(body)
+                predictions = await self.batcher.submit(records)
+            except RequestError as error:
+                self.stats.record_request(time.perf_counter() - start, 0, ok=False)
+                return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+            except Exception as error:
+                self.stats.record_request(time.perf_counter() - start, 0, ok=False)
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Scoring failed: {error}"}
+            self.stats.record_request(time.perf_counter() - start, len(records))
+            return HTTPStatus.OK, {"predictions": predictions.tolist()}
+        if path == "/metrics" and method == "GET":
+            return HTTPStatus.OK, self.stats.snapshot()
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, {"status": "ok"}
+        if path in ("/predict", "/metrics", "/health"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+        return HTTPStatus.NOT_FOUND, {"error": f"No route {path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > self.max_body_bytes:
+                    # the body is never read, so the connection cannot be reused
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {"error": f"Request body exceeds {self.max_body_bytes} bytes"}, False)
+                    break
+                body = await reader.readexactly(length)
+
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                status, payload = await self._route(method, target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict,
+                       keep_alive: bool) -> None:
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+@click.command()
+@click.option('--pipeline-from', type=str,
+              help="Path to the fit pipeline pickle file or the .npz inference artifact")
+@click.option('--host', type=str, default="127.0.0.1", show_default=True, help="Interface to bind")
+@click.option('--port', type=int, default=8000, show_default=True, help="Port to listen on")
+@click.option('--max-delay-ms', type=float, default=5.0, show_default=True,
+              help="Milliseconds to wait for more requests before scoring a batch")
+@click.option('--max-batch-rows', type=int, default=2048, show_default=True,
+              help="Rows that close a batch early")
+@click.option('--max-body-bytes', type=int, default=MAX_BODY_BYTES, show_default=True,
+              help="Largest request body accepted; larger ones are answered with 413")
+def main(pipeline_from: str, host: str, port: int, max_delay_ms: float, max_batch_rows: int,
+         max_body_bytes: int) -> None:
+    """
+    Serve G3 predictions over HTTP with micro-batching.
+
+    The model is loaded once at startup. ``POST /predict`` accepts JSON
+    student records; requests arriving within ``max_delay_ms`` of each other
+    are scored in a single vectorized ``predict`` call. ``GET /metrics``
+    reports p50/p99 latency and throughput, ``GET /health`` liveness.
+
+    Parameters
+    ----------
+    pipeline_from : str
+        Path to the pickled pipeline object from training, or to the
+        NumPy-only inference artifact (.npz).
+    host : str
+        Interface to bind (default: "127.0.0.1").
+    port : int
+        Port to listen on (default: 8000).
+    max_delay_ms : float
+        Micro-batching window in milliseconds (default: 5).
+    max_batch_rows : int
+        Rows that close a batch early (default: 2048).
+    max_body_bytes : int
+        Largest request body accepted (default: 16 MiB).
+
+    Returns
+    -------
+    None
+        Serves until interrupted.
+    """
+    set_config(transform_output="pandas")
+
+    print(f"Loading pipeline from {pipeline_from}...")
+    server = PredictionServer(load_model(pipeline_from), host, port, max_delay_ms / 1000, max_batch_rows,
+                              max_body_bytes)
+
+    async def serve() -> None:
+        await server.start()
+        print(f"Serving predictions on http://{server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+import os
+import pickle
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.dtype_plan import apply_dtype_plan
+
+# file extension of each supported table format
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# path -> (value, file signature) of what this process wrote inside
+# ``handoff()``; None when no handoff is active
+_HANDOFF = None
+
+
+@contextmanager
+def handoff():
+    """
+    Serve reads of files written in this process from memory.
+
+    Inside the context, ``write_table`` (Parquet and Arrow) and
+    ``save_object`` still write their files, but also keep what they wrote;
+    a later ``read_table`` or ``load_object`` of the same path is served
+    from memory instead of reading the file, as long as the file's size and
+    modification time are unchanged. A table is returned as a copy, without
+    decoding; an object is unpickled from the kept bytes, which saves the
+    file read but not the unpickling. CSV tables are always read from
+    disk, since parsing them changes dtypes.
+
+    Examples
+    --------
+    >>> with handoff():
+    ...     write_table(student_train, "data/processed/student_train.parquet")
+    ...     read_table("data/processed/student_train.parquet")  # no decoding
+    """
+    global _HANDOFF
+    previous, _HANDOFF = _HANDOFF, {}
+    try:
+        yield
+    finally:
+        _HANDOFF = previous
+
+
+def _signature(path: str) -> tuple:
+    status = os.stat(path)
+    return status.st_size, status.st_mtime_ns
+
+
+def _remember(path: str, value) -> None:
+    if _HANDOFF is None:
+        return
+    try:
+        _HANDOFF[os.path.abspath(path)] = (value, _signature(path))
+    except OSError:
+        pass
+
+
+def _recall(path: str):
+    """Return the value written to ``path`` in this handoff, or None."""
+    if _HANDOFF is None:
+        return None
+    entry = _HANDOFF.get(os.path.abspath(path))
+    try:
+        if entry is not None and _signature(path) == entry[1]:
+            return entry[0]
+    except OSError:
+        pass
+    return None
+
+
+def save_object(obj, path: str) -> None:
+    """
+    Pickle ``obj`` to ``path``.
+
+    Parameters
+    ----------
+    obj : object
+        Picklable object, e.g. a preprocessor or fitted pipeline.
+    path : str
+        Destination file.
+    """
+    if _HANDOFF is None:
+        with open(path, "wb") as f:
+            pickle.dump(obj, f)
+        return
+    # pickle once and keep the bytes rather than the object, so a handed-off
+    # load is the same fresh, independent copy that unpickling the file gives
+    data = pickle.dumps(obj)
+    with open(path, "wb") as f:
+        f.write(data)
+    _remember(path, data)
+
+
+def load_object(path: str):
+    """
+    Load an object written by ``save_object`` (or any pickle).
+
+    Parameters
+    ----------
+    path : str
+        Pickle file.
+
+    Returns
+    -------
+    object
+        The unpickled object.
+    """
+    data = _recall(path)
+    if data is not None:
+        return pickle.loads(data)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def table_format(path: str) -> str:
+    """
+    Return the table format implied by a file extension.
+
+    Parameters
+    ----------
+    path : str
+        File path ending in .parquet, .arrow (Arrow IPC / Feather v2) or .csv.
+
+    Returns
+    -------
+    str
+        One of the keys of ``FORMATS``.
+
+    Raises
+    ------
+    ValueError
+        If the extension is not a supported table format.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for fmt, fmt_extension in FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    if extension == ".feather":
+        return "arrow"
+    raise ValueError(
+        f"Unsupported table extension '{extension}' in {path}. "
+        f"Supported: {', '.join(FORMATS.values())}."
+    )
+
+
+def table_path(directory: str, name: str, fmt: str) -> str:
+    """Return ``directory/name`` with the extension of ``fmt``."""
+    return os.path.join(directory, name + FORMATS[fmt])
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame in the format given by the path's extension.
+
+    Parquet and Arrow files keep the column dtypes and are compressed with
+    zstd; CSV is written without the index, as before.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Table to write.
+    path : str
+        Destination ending in .parquet, .arrow or .csv.
+
+    Returns
+    -------
+    None
+        The table is written to ``path``.
+
+    Examples
+    --------
+    >>> write_table(student_train, "data/processed/student_train.parquet")
+    """
+    fmt = table_format(path)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False, compression="zstd")
+    elif fmt == "arrow":
+        df.reset_index(drop=True).to_feather(path, compression="zstd")
+    else:
+        df.to_csv(path, index=False)
+    if fmt != "csv" and _HANDOFF is not None:
+        # what reading the file back returns: same dtypes, fresh RangeIndex
+        _remember(path, df.reset_index(drop=True))
+
+
+class TableWriter:
+    """
+    Append DataFrame chunks to a table file, publishing it only on success.
+
+    Chunks go to ``<path>.part``, which is renamed to ``path`` when the
+    ``with`` block exits normally and removed when it raises, so a failed
+    run never leaves a truncated table behind. Parquet chunks become row
+    groups and Arrow chunks record batches, both zstd-compressed; every
+    chunk must have the first chunk's columns and dtypes (a ``dtype_plan``
+    guarantees this, including the categories).
+
+    Parameters
+    ----------
+    path : str
+        Destination ending in .parquet, .arrow or .csv.
+
+    Examples
+    --------
+    >>> with TableWriter("data/processed/student_train.parquet") as writer:
+    ...     for chunk in chunks:
+    ...         writer.write(chunk)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fmt = table_format(path)
+        self.partial = path + ".part"
+        self.n_rows = 0
+        self._file = None
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append the rows of ``df``."""
+        if self.fmt == "csv":
+            if self._file is None:
+                self._file = open(self.partial, "w", newline="")
+            df.to_csv(self._file, index=False, header=self.n_rows == 0)
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.partial, self._schema, compression="zstd")
+                else:
+                    import pyarrow.ipc as ipc
+                    self._writer = ipc.new_file(self.partial, self._schema,
+                                                options=ipc.IpcWriteOptions(compression="zstd"))
+            self._writer.write_table(table)
+        self.n_rows += len(df)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        for handle in (self._writer, self._file):
+            if handle is not None:
+                handle.close()
+        if exc_type is None and os.path.exists(self.partial):
+            os.replace(self.partial, self.path)
+        elif os.path.exists(self.partial):
+            os.remove(self.partial)
+
+
+def read_table(path: str, columns: list = None, dtypes: dict = None) -> pd.DataFrame:
+    """
+    Read a table written by ``write_table``, optionally only some columns.
+
+    Parquet and Arrow files only decode the requested columns. CSV files are
+    still parsed, but only the requested columns are converted. Columnar
+    files keep the dtypes they were written with; ``dtypes`` (a
+    ``dtype_plan``) casts, and checks, the planned columns in every format.
+
+    Parameters
+    ----------
+    path : str
+        File ending in .parquet, .arrow or .csv.
+    columns : list of str, optional
+        Columns to load, in the order returned (default: None, all columns).
+    dtypes : dict, optional
+        Dtype plan applied with ``apply_dtype_plan`` after loading
+        (default: None, keep the stored or inferred dtypes).
+
+    Returns
+    -------
+    pd.DataFrame
+        The loaded table.
+
+    Examples
+    --------
+    >>> read_table("data/processed/student_train.parquet", columns=["G1", "G2", "G3"])
+    """
+    fmt = table_format(path)
+    df = _recall(path) if fmt != "csv" else None
+    if df is not None:
+        df = df.copy()
+    elif fmt == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    elif fmt == "arrow":
+        df = pd.read_feather(path, columns=columns)
+    else:
+        # parse planned string columns straight into categoricals, so the
+        # object-dtype strings are never materialised
+        categorical = {
+            name: "category" for name, dtype in (dtypes or {}).items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+        df = pd.read_csv(path, usecols=columns, dtype=categorical or None)
+    if columns is not None:
+        df = df[list(columns)]
+    return df if dtypes is None else apply_dtype_plan(df, dtypes)
+
+
+def _arrow_chunks(path: str, chunksize: int):
+    """Yield an Arrow IPC file's record batches, sliced to ``chunksize`` rows."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    with pa.memory_map(path) as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+
+
+def iter_table(path: str, chunksize: int, dtypes: dict = None):
+    """
+    Yield a table written by ``write_table`` or ``TableWriter`` in chunks.
+
+    Only about one chunk is decoded at a time, so tables larger than memory
+    can be processed. Chunks keep a running index (0-based row positions in
+    the whole table), as ``pd.read_csv(chunksize=...)`` does.
+
+    Parameters
+    ----------
+    path : str
+        File ending in .parquet, .arrow or .csv.
+    chunksize : int
+        Maximum number of rows per chunk.
+    dtypes : dict, optional
+        Dtype plan applied to each chunk with ``apply_dtype_plan``
+        (default: None, keep the stored or inferred dtypes).
+
+    Yields
+    ------
+    pd.DataFrame
+        Consecutive chunks of the table.
+    """
+    fmt = table_format(path)
+    if fmt == "csv":
+        categorical = {
+            name: "category" for name, dtype in (dtypes or {}).items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+        chunks = pd.read_csv(path, dtype=categorical or None, chunksize=chunksize)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    else:
+        chunks = _arrow_chunks(path, chunksize)
+
+    start = 0
+    for chunk in chunks:
+        if fmt != "csv":
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk if dtypes is None else apply_dtype_plan(chunk, dtypes)
+
+
+def numeric_columns(path: str) -> list:
+    """
+    Return the numeric columns of a columnar table without reading its data.
+
+    Parameters
+    ----------
+    path : str
+        File ending in .parquet, .arrow or .csv.
+
+    Returns
+    -------
+    list of str or None
+        Names of the integer, floating point and boolean columns, from the
+        file's schema. None for CSV, which has no stored schema.
+    """
+    fmt = table_format(path)
+    if fmt == "csv":
+        return None
+
+    import pyarrow.types as pat
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(path)
+    else:
+        import pyarrow.ipc as ipc
+        with ipc.open_file(path) as reader:
+            schema = reader.schema
+    return [
+        field.name for field in schema
+        if pat.is_integer(field.type) or pat.is_floating(field.type) or pat.is_boolean(field.type)
+    ]
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def splitmix64(values: np.ndarray) -> np.ndarray:
+    """
+    Apply the SplitMix64 finalizer, a bijective mix of uint64 values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        uint64 array.
+
+    Returns
+    -------
+    np.ndarray
+        uint64 array of the same shape, with every input bit affecting every
+        output bit.
+    """
+    with np.errstate(over="ignore"):
+        z = values + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return a 64-bit content hash of every row, independent of the index.
+
+    Equal rows hash equally in every chunk, as long as the chunks share
+    their column dtypes (e.g. after ``apply_dtype_plan``).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows to hash.
+
+    Returns
+    -------
+    np.ndarray
+        uint64 array of length ``len(df)``.
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def train_mask(hashes: np.ndarray, train_size: float, seed: int) -> np.ndarray:
+    """
+    Assign rows to the training split from their content hashes.
+
+    The assignment of a row depends only on its content and ``seed``, not
+    on its position or the chunking, so a file is split identically however
+    it is read. Each row lands in train with probability ``train_size``.
+
+    Parameters
+    ----------
+    hashes : np.ndarray
+        uint64 row hashes from ``row_hashes``.
+    train_size : float
+        Expected fraction of rows in the training split, in (0, 1).
+    seed : int
+        Random seed; different seeds give independent splits.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask, True for training rows.
+    """
+    seed_key = splitmix64(np.array([seed], dtype=np.uint64))[0]
+    uniform = (splitmix64(hashes ^ seed_key) >> np.uint64(11)) * (1.0 / (1 << 53))
+    return uniform < train_size
+
+
+def hash_folds(hashes: np.ndarray, n_folds: int, seed: int) -> np.ndarray:
+    """
+    Assign rows to ``n_folds`` cross-validation folds from their content hashes.
+
+    Like ``train_mask``, the assignment only depends on the row content and
+    ``seed``. The hashes are mixed once more than for the split, so the
+    folds of the training rows are balanced even when both use one seed.
+
+    Parameters
+    ----------
+    hashes : np.ndarray
+        uint64 row hashes from ``row_hashes``.
+    n_folds : int
+        Number of folds.
+    seed : int
+        Random seed.
+
+    Returns
+    -------
+    np.ndarray
+        Fold number in ``[0, n_folds)`` of every row.
+    """
+    seed_key = splitmix64(np.array([seed], dtype=np.uint64))[0]
+    # integer arithmetic keeps folds nested: when k divides n,
+    # hash_folds(h, k) == hash_folds(h, n) // (n // k) exactly
+    mixed = splitmix64(splitmix64(hashes ^ seed_key)) >> np.uint64(32)
+    return ((mixed * np.uint64(n_folds)) >> np.uint64(32)).astype(np.int64)
+
+
+def hash_sample(chunks, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Draw a uniform sample of rows from a stream of chunks in one pass.
+
+    Keeps the ``n_rows`` rows with the smallest seeded content hashes, so
+    memory is bounded by the sample size and the sample does not depend on
+    the chunking.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        Chunks with identical columns and dtypes.
+    n_rows : int
+        Sample size; every row is returned if the stream is shorter.
+    seed : int, optional
+        Random seed (default: 0).
+
+    Returns
+    -------
+    pd.DataFrame
+        Sampled rows in stream order, with their original index.
+    """
+    seed_key = splitmix64(np.array([seed], dtype=np.uint64))[0]
+    sample, sample_keys = None, None
+    for chunk in chunks:
+        keys = splitmix64(row_hashes(chunk) ^ seed_key)
+        if sample is not None:
+            chunk = pd.concat([sample, chunk])
+            keys = np.concatenate([sample_keys, keys])
+        if len(chunk) > n_rows:
+            keep = np.sort(np.argpartition(keys, n_rows - 1)[:n_rows])
+            chunk, keys = chunk.iloc[keep], keys[keep]
+        sample, sample_keys = chunk, keys
+    return sample
+
+
+class HashSet:
+    """
+    Compact set of uint64 hashes built for streaming membership tests.
+
+    Hashes are kept in a few sorted NumPy arrays (8 bytes per hash, no
+    per-element objects) whose sizes roughly halve from one to the next.
+    Adding a chunk appends a sorted array and merges neighbours of similar
+    size, so each hash is merged O(log n) times; lookups binary-search
+    every array.
+
+    Examples
+    --------
+    >>> seen = HashSet()
+    >>> seen.add(np.array([3, 1], dtype=np.uint64))
+    >>> seen.contains(np.array([1, 2], dtype=np.uint64))
+    array([ True, False])
+    """
+
+    def __init__(self) -> None:
+        self.levels = []
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored hashes, in bytes."""
+        return sum(level.nbytes for level in self.levels)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of the ``hashes`` already in the set."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for level in self.levels:
+            positions = np.minimum(np.searchsorted(level, hashes), len(level) - 1)
+            found |= level[positions] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Add ``hashes`` (duplicates among them are stored once)."""
+        level = np.unique(hashes.astype(np.uint64, copy=False))
+        if len(level) == 0:
+            return
+        while self.levels and len(self.levels[-1]) <= 2 * len(level):
+            level = np.union1d(self.levels.pop(), level)
+        self.levels.append(level)
@@ -0,0 +1,281 @@
+import click
+import contextlib
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.lazy_imports import lazy_import
+
+# imported on first use (in the workers, for the scripts), so --help starts fast
+pd = lazy_import("pandas")
+threadpool_limits = lazy_import("threadpoolctl", "threadpool_limits")
+read_raw = lazy_import("src.preprocess_data", "read_raw")
+write_table = lazy_import("src.storage", "write_table")
+handoff = lazy_import("src.storage", "handoff")
+preprocess_data = lazy_import("src.preprocess_data")
+fit_student_predictor = lazy_import("src.fit_student_predictor")
+evaluate_student_predictor = lazy_import("src.evaluate_student_predictor")
+
+# columns of the combined results table, in order
+SUMMARY_COLUMNS = ["dataset", "source", "status", "seconds", "train_rows", "test_rows",
+                   "MAE", "RMSE", "R2", "best_alpha", "scoring", "best_cv_score", "error"]
+
+
+def dataset_name(source: str, value=None) -> str:
+    """
+    Name the dataset (and artifacts directory) of a raw file, or of one group of it.
+
+    Examples
+    --------
+    >>> dataset_name("data/ingested/student-por.parquet", "GP")
+    'student-por-GP'
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    if value is not None:
+        name = f"{name}-{value}"
+    return re.sub(r"[^\w.-]+", "_", name)
+
+
+def find_datasets(sources: list, split_by: str = None) -> list:
+    """
+    List the datasets to train: one per raw file, or one per group of rows.
+
+    Parameters
+    ----------
+    sources : list of str
+        Raw files: semicolon-separated CSVs or tables from ``ingest_data.py``.
+    split_by : str, optional
+        Column whose values split every file into separate datasets, e.g.
+        "school" for one model per course and school (default: None).
+
+    Returns
+    -------
+    list of tuple
+        ``(name, source, value)`` per dataset, with ``value`` None when
+        files are not split.
+
+    Raises
+    ------
+    click.BadParameter
+        If two datasets would get the same name.
+    """
+    datasets = []
+    for source in sources:
+        if split_by is None:
+            datasets.append((dataset_name(source), source, None))
+            continue
+        values = read_raw(source)[split_by].drop_duplicates().sort_values()
+        datasets.extend((dataset_name(source, value), source, value) for value in values)
+    names = [name for name, _, _ in datasets]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise click.BadParameter(f"several datasets would be named {', '.join(duplicates)}",
+                                 param_hint="--raw-data")
+    return datasets
+
+
+def _run_script(module, args: list) -> None:
+    """Call a script's click ``main`` in this process, raising on failure."""
+    try:
+        module.main.main(args=args, prog_name=f"{module.__name__.rsplit('.', 1)[-1]}.py", standalone_mode=False)
+    except click.exceptions.Exit as exc:
+        if exc.exit_code:
+            raise RuntimeError(f"{module.__name__} exited with code {exc.exit_code}")
+
+
+def train_dataset(name: str, source: str, value, split_by: str, artifacts_to: str, seed: int,
+                  fit_options: tuple = (), plots: bool = False) -> dict:
+    """
+    Preprocess, tune and evaluate one dataset into its own artifacts directory.
+
+    The three scripts run in this process, within a ``storage.handoff``,
+    so the tables and models they write are passed on in memory. Their
+    output goes to ``train.log`` in the artifacts directory, and BLAS runs
+    single-threaded, since the datasets themselves run in parallel.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name; its artifacts go to ``artifacts_to/name``.
+    source : str
+        Raw file.
+    value : object
+        Value of ``split_by`` selecting this dataset's rows, or None.
+    split_by : str
+        Column the raw file is split by, or None.
+    artifacts_to : str
+        Parent directory of the per-dataset directories.
+    seed : int
+        Random seed passed to every script.
+    fit_options : tuple of str, optional
+        Extra options for ``fit_student_predictor.py``.
+    plots : bool, optional
+        Draw the tuning and prediction error plots (default: False).
+
+    Returns
+    -------
+    dict
+        Row of the combined results table (``SUMMARY_COLUMNS``); "status"
+        is "ok" or "failed", with the error message in "error".
+    """
+    start = time.perf_counter()
+    directory = os.path.join(artifacts_to, name)
+    data, models = os.path.join(directory, "data"), os.path.join(directory, "models")
+    tables, figures = os.path.join(directory, "tables"), os.path.join(directory, "figures")
+    os.makedirs(data, exist_ok=True)
+    record = dict.fromkeys(SUMMARY_COLUMNS)
+    record.update(dataset=name, source=source, status="ok")
+    plot_options = [f"--plot-to={figures}"] + ([] if plots else ["--no-plots"])
+
+    with open(os.path.join(directory, "train.log"), "w") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log), \
+            handoff(), threadpool_limits(limits=1):
+        try:
+            raw_data = source
+            if split_by is not None:
+                raw = read_raw(source)
+                raw_data = os.path.join(data, "raw.parquet")
+                write_table(raw[raw[split_by] == value], raw_data)
+            _run_script(preprocess_data, [f"--raw-data={raw_data}", f"--data-to={data}",
+                                          f"--preprocessor-to={models}", f"--seed={seed}"])
+            _run_script(fit_student_predictor, [
+                f"--training-data={os.path.join(data, 'student_train.parquet')}",
+                f"--preprocessor={os.path.join(models, 'student_preprocessor.pickle')}",
+                f"--pipeline-to={models}", f"--seed={seed}", *fit_options, *plot_options])
+            _run_script(evaluate_student_predictor, [
+                f"--test-data={os.path.join(data, 'student_test.parquet')}",
+                f"--pipeline-from={os.path.join(models, 'student_pipeline.pickle')}",
+                f"--tables-to={tables}", f"--seed={seed}", *plot_options])
+        except Exception as error:
+            traceback.print_exc()
+            record.update(status="failed", error=f"{type(error).__name__}: {error}")
+
+    if record["status"] == "ok":
+        record.update(pd.read_csv(os.path.join(tables, "test_scores.csv")).iloc[0].to_dict())
+        best_params = pd.read_csv(os.path.join(models, "best_params.csv")).iloc[0]
+        # best_params.csv names the score after the metric, e.g. best_cv_r2
+        metric = next(name for name in best_params.index if name.startswith("best_cv_"))
+        record.update(best_alpha=best_params["best_alpha"], scoring=metric.removeprefix("best_cv_").upper(),
+                      best_cv_score=best_params[metric])
+        for split in ("train", "test"):
+            record[f"{split}_rows"] = len(pd.read_parquet(os.path.join(data, f"student_{split}.parquet"),
+                                                          columns=["G3"]))
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+@click.command()
+@click.option('--raw-data', type=str, multiple=True,
+              help="Raw dataset (semicolon-separated CSV or ingested table); repeat, or use a glob pattern")
+@click.option('--artifacts-to', type=str, help="Directory of the per-dataset artifact directories")
+@click.option('--summary-to', type=str, help="Path of the combined results table (CSV)")
+@click.option('--split-by', type=str, default=None,
+              help="Train one model per value of this column in every file, e.g. school")
+@click.option('--jobs', type=int, default=None,
+              help="Datasets trained at once, each in its own process (default: number of CPUs)")
+@click.option('--seed', type=int, default=123, show_default=True, help="Random seed passed to every script")
+@click.option('--fit-option', 'fit_options', type=str, multiple=True,
+              default=["--search=ridge-path", "--correlation-backend=native"], show_default=True,
+              help="Option passed on to fit_student_predictor.py (repeatable; replaces the defaults)")
+@click.option('--plots/--no-plots', default=False, show_default=True,
+              help="Draw each dataset's tuning and prediction error plots")
+def main(raw_data: tuple, artifacts_to: str, summary_to: str, split_by: str, jobs: int, seed: int,
+         fit_options: tuple, plots: bool) -> None:
+    """
+    Preprocess, tune and evaluate many course datasets in parallel.
+
+    Every raw file (or, with ``--split-by``, every group of its rows) is a
+    dataset trained by ``train_dataset``: preprocess_data.py,
+    fit_student_predictor.py and evaluate_student_predictor.py, with their
+    tables, models, figures and log in ``artifacts_to/<dataset>``. Datasets
+    run in a pool of ``jobs`` worker processes, each reusing its imported
+    libraries for dataset after dataset. One dataset failing does not stop
+    the others.
+
+    Parameters
+    ----------
+    raw_data : tuple of str
+        Raw files or glob patterns, e.g. "data/ingested/student-*.parquet".
+    artifacts_to : str
+        Directory of the per-dataset artifact directories.
+    summary_to : str
+        Path of the combined results table: one row per dataset with its
+        status, time, row counts, test scores, best alpha and its
+        cross-validation score ("best_cv_score", in the "scoring" metric).
+    split_by : str
+        Column splitting every file into one dataset per value, or None.
+    jobs : int
+        Worker processes. Default is the number of CPUs; 1 trains the
+        datasets one after another in this process.
+    seed : int
+        Random seed passed to every script. Default is 123.
+    fit_options : tuple of str
+        Options for fit_student_predictor.py. Default is the ridge-path
+        search and the native correlation checks.
+    plots : bool
+        Draw the figures of every dataset. Default is False.
+
+    Returns
+    -------
+    None
+        Writes the artifacts and the summary table, and prints the table.
+
+    Raises
+    ------
+    click.ClickException
+        If any dataset failed (after all have run and the table is written).
+    """
+    sources = []
+    for pattern in raw_data:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+        if not matches:
+            raise click.BadParameter(f"no file matches {pattern}", param_hint="--raw-data")
+        sources.extend(match for match in matches if match not in sources)
+    if not sources:
+        raise click.BadParameter("give at least one raw dataset", param_hint="--raw-data")
+
+    datasets = find_datasets(sources, split_by)
+    jobs = min(jobs or os.cpu_count() or 1, len(datasets))
+    click.echo(f"Training {len(datasets)} datasets with {jobs} worker process(es)...")
+    start = time.perf_counter()
+    arguments = [(name, source, value, split_by, artifacts_to, seed, fit_options, plots)
+                 for name, source, value in datasets]
+
+    records = []
+    if jobs == 1:
+        for args in arguments:
+            records.append(train_dataset(*args))
+            click.echo(f"{records[-1]['dataset']}: {records[-1]['status']} ({records[-1]['seconds']:.1f}s)")
+    else:
+        context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            # import the scripts once here, so the forked workers start warm
+            for module in (preprocess_data, fit_student_predictor, evaluate_student_predictor):
+                module.main
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+            futures = [executor.submit(train_dataset, *args) for args in arguments]
+            for future in as_completed(futures):
+                records.append(future.result())
+                click.echo(f"{records[-1]['dataset']}: {records[-1]['status']} ({records[-1]['seconds']:.1f}s)")
+
+    summary = pd.DataFrame(records, columns=SUMMARY_COLUMNS).sort_values("dataset", ignore_index=True)
+    os.makedirs(os.path.dirname(summary_to) or ".", exist_ok=True)
+    summary.to_csv(summary_to, index=False)
+    click.echo(f"\n{summary.drop(columns=['source', 'error']).to_string(index=False)}")
+    click.echo(f"\nSaved results of {len(summary)} datasets to {summary_to} "
+               f"in {time.perf_counter() - start:.1f}s")
+
+    failed = summary[summary["status"] == "failed"]
+    if len(failed):
+        raise click.ClickException("; ".join(f"{row.dataset}: {row.error}" for row in failed.itertuples()))
+
+
+if __name__ == '__main__':
+    main()
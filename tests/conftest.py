@@ -1,9 +1,27 @@
 import pytest
+import hashlib
 import io
+import threading
 import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pandas as pd
 import numpy as np
 from unittest.mock import MagicMock
+from sklearn import config_context
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+
+# the scripts import these on first use (src/lazy_imports.py); load them up
+# front, since several tests mock builtins.open, which their import reads
+# data files through
+import altair  # noqa: F401
+import altair_ally  # noqa: F401
+import deepchecks.tabular  # noqa: F401
+import matplotlib.pyplot  # noqa: F401
+import pandera.pandas  # noqa: F401
+import sklearn.metrics  # noqa: F401
+
+from src.preprocess_data import create_preprocessor
 
 @pytest.fixture
 def sample_train_df() -> pd.DataFrame:
@@ -224,4 +242,156 @@ def mock_zip_content() -> bytes:
         outer_zip.writestr("student.zip", inner_zip_buffer.read())
     outer_zip_buffer.seek(0)
 
-    return outer_zip_buffer.read()
\ No newline at end of file
+    return outer_zip_buffer.read()
+
+@pytest.fixture
+def synthetic_student_df() -> pd.DataFrame:
+    """
+    Create a larger random DataFrame that satisfies the student schema.
+
+    Large enough for k-fold cross-validation, unlike the five-row samples.
+
+    Returns
+    -------
+    pd.DataFrame
+        120 schema-valid rows with G3 correlated to G1 and G2.
+    """
+    rng = np.random.default_rng(123)
+    n = 120
+    categories = {
+        'school': ['GP', 'MS'], 'sex': ['F', 'M'], 'address': ['U', 'R'],
+        'famsize': ['GT3', 'LE3'], 'Pstatus': ['T', 'A'],
+        'Mjob': ['teacher', 'health', 'services', 'at_home', 'other'],
+        'Fjob': ['teacher', 'health', 'services', 'at_home', 'other'],
+        'reason': ['home', 'reputation', 'course', 'other'],
+        'guardian': ['mother', 'father', 'other'],
+    }
+    ranges = {
+        'age': (15, 22), 'Medu': (0, 4), 'Fedu': (0, 4), 'traveltime': (1, 4),
+        'studytime': (1, 4), 'failures': (0, 4), 'famrel': (1, 5),
+        'freetime': (1, 5), 'goout': (1, 5), 'Dalc': (1, 5), 'Walc': (1, 5),
+        'health': (1, 5), 'absences': (0, 30),
+    }
+    binary = ['schoolsup', 'famsup', 'paid', 'activities', 'nursery',
+              'higher', 'internet', 'romantic']
+
+    data = {col: rng.choice(values, n) for col, values in categories.items()}
+    data.update({col: rng.choice(['yes', 'no'], n) for col in binary})
+    data.update({col: rng.integers(low, high + 1, n) for col, (low, high) in ranges.items()})
+    g1 = rng.integers(4, 19, n)
+    g2 = np.clip(g1 + rng.integers(-2, 3, n), 0, 20)
+    data['G1'] = g1
+    data['G2'] = g2
+    data['G3'] = np.clip(g2 + rng.integers(-2, 3, n), 0, 20)
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def fitted_pipeline(synthetic_student_df: pd.DataFrame):
+    """
+    Student Ridge pipeline fitted on the synthetic data, with pandas transform output.
+
+    The output setting is scoped to the test with ``config_context`` so that
+    it does not leak into later tests.
+
+    Yields
+    ------
+    sklearn.pipeline.Pipeline
+        Fitted ``create_preprocessor()`` + ``Ridge(alpha=3.0)`` pipeline.
+    """
+    with config_context(transform_output="pandas"):
+        yield make_pipeline(create_preprocessor(), Ridge(alpha=3.0)).fit(
+            synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"]
+        )
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve ``server.files`` by path, honouring single ``Range: bytes=N-`` requests.
+
+    Responses carry an ``ETag`` (the SHA-256 of the body, unless
+    ``server.send_etag`` is off) and ``server.last_modified``, and
+    conditional requests and ``If-Range`` are answered against them.
+    """
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.requests.append({"path": self.path, **dict(self.headers)})
+        body = server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{hashlib.sha256(body).hexdigest()}"' if server.send_etag else None
+        if self._not_modified(etag):
+            self.send_response(304)
+            self._send_validators(etag)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and server.honour_ranges and if_range in (None, etag, server.last_modified):
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        payload = body[start:]
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Accept-Ranges", "bytes")
+        self._send_validators(etag)
+        self.end_headers()
+        if server.drop_after is not None:
+            # simulate a dropped connection part-way through the body
+            cut, server.drop_after = server.drop_after, None
+            self.wfile.write(payload[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+    def _not_modified(self, etag: str) -> bool:
+        if "If-None-Match" in self.headers:
+            return etag is not None and self.headers["If-None-Match"] == etag
+        return "If-Modified-Since" in self.headers and self.headers["If-Modified-Since"] == self.server.last_modified
+
+    def _send_validators(self, etag: str) -> None:
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.server.last_modified)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def archive_server():
+    """
+    Start a local HTTP server standing in for the dataset host.
+
+    Yields
+    ------
+    ThreadingHTTPServer
+        With ``files`` (path to bytes served), ``requests`` (headers of
+        every request received, plus its path), ``honour_ranges`` (answer
+        ``Range`` requests with 206; default True), ``drop_after`` (cut the
+        next response after this many body bytes; default None),
+        ``send_etag`` (default True), ``last_modified`` (HTTP date sent
+        and compared as is) and ``url(path)``.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveRequestHandler)
+    server.files, server.requests = {}, []
+    server.honour_ranges, server.drop_after = True, None
+    server.send_etag, server.last_modified = True, "Wed, 01 Jan 2025 00:00:00 GMT"
+    server.url = lambda path: f"http://127.0.0.1:{server.server_port}{path}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,104 @@
+import pytest
+import pandas as pd
+import numpy as np
+from scipy.stats import loguniform
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+
+from src.adaptive_search import SuccessiveHalvingSearchCV
+from src.fold_cache import FoldTransformCache
+from src.preprocess_data import create_preprocessor
+from src.ridge_path_search import RidgePathSearchCV
+
+
+def make_search(**kwargs) -> SuccessiveHalvingSearchCV:
+    """Build a halving search over the student Ridge pipeline."""
+    params = dict(
+        estimator=make_pipeline(create_preprocessor(), Ridge()),
+        param_distributions={"ridge__alpha": loguniform(1e-3, 1e3)},
+        n_candidates=12, cv=6, factor=3, min_folds=2, random_state=123,
+    )
+    params.update(kwargs)
+    return SuccessiveHalvingSearchCV(**params)
+
+
+class TestSuccessiveHalvingSearchCV:
+    """Tests for the adaptive successive-halving search."""
+
+    def test_halves_candidates_between_rungs(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that only the top third of candidates reach the next rung.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        search = make_search().fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+        n_resources = search.cv_results_["n_resources"]
+        assert sorted(np.unique(n_resources)) == [2, 6]
+        assert np.sum(n_resources == 6) == 4
+        assert search.n_fits_ == 12 * 2 + 4 * 4
+        assert search.cv_results_["rank_test_score"][search.best_index_] == 1
+        assert n_resources[search.best_index_] == 6
+
+    def test_winner_matches_full_search_on_final_rung(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that final-rung scores equal full cross-validation scores.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        y = synthetic_student_df["G3"]
+        search = make_search().fit(X, y)
+        full = RidgePathSearchCV(
+            create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)},
+            n_iter=12, cv=6, random_state=123
+        ).fit(X, y)
+
+        final_rung = search.cv_results_["n_resources"] == 6
+        np.testing.assert_allclose(
+            search.cv_results_["mean_test_score"][final_rung],
+            full.cv_results_["mean_test_score"][final_rung],
+            rtol=1e-9
+        )
+
+    def test_max_fits_stops_search(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the fit budget is respected and flagged.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        search = make_search(max_fits=15).fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+        assert search.n_fits_ == 15
+        assert search.stopped_early_
+        assert np.isnan(search.cv_results_["mean_test_score"]).sum() == 0
+        assert search.predict(synthetic_student_df.drop(columns=["G3"])).shape == (120,)
+
+    def test_zero_time_budget_raises(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a budget too small to score anything raises ValueError."""
+        with pytest.raises(ValueError, match="budget ran out"):
+            make_search(time_budget=0).fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+    def test_preprocessing_runs_once_per_fold(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that candidates share the cached fold preprocessing.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        cache = FoldTransformCache()
+        search = make_search(cache=cache).fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+        assert cache.misses == 6
+        assert cache.hits == search.n_fits_ - 6
@@ -0,0 +1,101 @@
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.compiled_predictor import CompiledPredictor, compile_predictor
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.inference_artifact import LinearModelArtifact, artifact_arrays
+from src.preprocess_data import create_schema
+
+
+class TestCompiledPredictor:
+    """Tests for the fused predictor compiled from a linear pipeline."""
+
+    def test_matches_pipeline(self, fitted_pipeline, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the compiled predictor reproduces the pipeline's predictions.
+
+        Parameters
+        ----------
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        predictor = compile_predictor(fitted_pipeline)
+
+        assert isinstance(predictor, CompiledPredictor)
+        np.testing.assert_allclose(predictor.predict(X), fitted_pipeline.predict(X), rtol=1e-10, atol=1e-10)
+
+    def test_accepts_artifact_and_mapping(self, fitted_pipeline, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test compiling from a loaded artifact and predicting on a dict of columns.
+
+        Parameters
+        ----------
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        artifact = LinearModelArtifact.from_arrays(artifact_arrays(fitted_pipeline))
+        X = synthetic_student_df.drop(columns=["G3"]).head(5)
+        records = {column: X[column].tolist() for column in X.columns}
+
+        np.testing.assert_allclose(compile_predictor(artifact).predict(records), fitted_pipeline.predict(X))
+
+    @pytest.mark.parametrize("column,value,raises", [
+        ("Mjob", "astronaut", False),
+        ("school", "XX", True),
+    ])
+    def test_unknown_categories_follow_handle_unknown(
+        self, fitted_pipeline, synthetic_student_df: pd.DataFrame, column: str, value: str, raises: bool
+    ) -> None:
+        """
+        Test that unknown nominal levels are ignored and unknown binary levels raise.
+
+        Parameters
+        ----------
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        column : str
+            Column receiving the unseen value.
+        value : str
+            Unseen category.
+        raises : bool
+            Whether the encoder uses handle_unknown="error".
+        """
+        predictor = compile_predictor(fitted_pipeline)
+        X = synthetic_student_df.drop(columns=["G3"]).head(4).copy()
+        X.loc[X.index[:2], column] = value
+
+        if raises:
+            with pytest.raises(ValueError, match="unknown categories"):
+                predictor.predict(X)
+        else:
+            np.testing.assert_allclose(predictor.predict(X), fitted_pipeline.predict(X))
+
+    def test_categorical_codes_match_strings(self, fitted_pipeline, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that compact-typed input gives the same predictions as object columns.
+
+        Parameters
+        ----------
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        compact = apply_dtype_plan(X, dtype_plan(create_schema()))
+        # a declared category that never occurs must not count as unknown
+        compact["school"] = compact["school"].cat.add_categories(["XX"])
+        predictor = compile_predictor(fitted_pipeline)
+
+        np.testing.assert_allclose(predictor.predict(compact), predictor.predict(X), rtol=1e-12)
+        compact.loc[compact.index[0], "school"] = "XX"
+        with pytest.raises(ValueError, match="unknown categories"):
+            predictor.predict(compact)
@@ -0,0 +1,177 @@
+import pytest
+import numpy as np
+import pandas as pd
+from deepchecks.tabular import Dataset
+from deepchecks.tabular.checks import FeatureFeatureCorrelation, FeatureLabelCorrelation
+from sklearn.metrics import f1_score
+from sklearn.model_selection import KFold, StratifiedKFold
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from src.correlation_checks import (association_matrix, correlated_pairs, correlation_failures, infer_task,
+                                    predictive_power_scores)
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.preprocess_data import create_schema
+
+# the reference trees score grade classes that have only a few students each
+pytestmark = [pytest.mark.filterwarnings("ignore:The number of unique classes:UserWarning"),
+              pytest.mark.filterwarnings("ignore:The least populated class:UserWarning")]
+
+
+def tree_scores(df: pd.DataFrame, target: str, seed: int) -> pd.Series:
+    """PPS from one decision tree per feature and fold, on the folds and baseline ``predictive_power_scores`` uses."""
+    n, n_folds = len(df), 4
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    classification = infer_task(df[target]) == "classification"
+    if classification:
+        y = np.unique(df[target].to_numpy(), return_inverse=True)[1]
+        splits = StratifiedKFold(n_folds).split(np.zeros((n, 1)), y[order])
+    else:
+        y = df[target].to_numpy(dtype=float)
+        splits = KFold(n_folds).split(np.zeros((n, 1)))
+    folds = np.empty(n, dtype=int)
+    for k, (_, test) in enumerate(splits):
+        folds[order[test]] = k
+    shuffled = y[rng.permutation(n)]
+
+    scores = {}
+    for column in df.columns.drop(target):
+        numeric = pd.api.types.is_numeric_dtype(df[column])
+        X = (df[[column]].to_numpy() if numeric
+             else OneHotEncoder(sparse_output=False).fit_transform(df[[column]].astype(object)))
+        tree = DecisionTreeClassifier if classification else DecisionTreeRegressor
+        predictions = [(y[folds == k], tree().fit(X[folds != k], y[folds != k]).predict(X[folds == k]))
+                       for k in range(n_folds)]
+        if classification:
+            model = np.mean([f1_score(truth, predicted, average="weighted") for truth, predicted in predictions])
+            baseline = max(f1_score(y, np.full(n, np.bincount(y).argmax()), average="weighted"),
+                           f1_score(y, shuffled, average="weighted"))
+            scores[column] = max(0.0, (model - baseline) / (1 - baseline))
+        else:
+            model_mae = np.mean([np.abs(predicted - truth).mean() for truth, predicted in predictions])
+            scores[column] = max(0.0, 1 - model_mae / np.abs(y - np.median(y)).mean())
+    return pd.Series(scores)
+
+
+def deepchecks_outcome(df: pd.DataFrame) -> tuple:
+    """Pass/fail of the fit script's deepchecks gates."""
+    dataset = Dataset(df, label="G3", cat_features=[])
+    feature_label = FeatureLabelCorrelation().add_condition_feature_pps_less_than(0.9).run(dataset=dataset)
+    feature_feature = FeatureFeatureCorrelation().add_condition_max_number_of_pairs_above_threshold(
+        threshold=0.92, n_pairs=0).run(dataset=dataset)
+    return feature_label.passed_conditions(), feature_feature.passed_conditions()
+
+
+@pytest.fixture
+def student_train(synthetic_student_df: pd.DataFrame) -> pd.DataFrame:
+    """The synthetic students with the dtypes the fit script loads them with."""
+    return apply_dtype_plan(synthetic_student_df, dtype_plan(create_schema()))
+
+
+class TestPredictivePowerScores:
+    """Tests for the vectorized PPS approximation."""
+
+    @pytest.mark.parametrize("seed", [0, 7])
+    def test_matches_decision_trees(self, student_train: pd.DataFrame, seed: int) -> None:
+        """Test that the grouped scores equal cross-validated trees on numeric and categorical features."""
+        scores = predictive_power_scores(student_train, "G3", seed=seed)
+        expected = tree_scores(student_train, "G3", seed)
+
+        pd.testing.assert_series_equal(scores[expected.index], expected, check_names=False, atol=1e-12)
+        assert scores.index[0] == "G2"
+        assert scores.is_monotonic_decreasing
+
+    @pytest.mark.parametrize("noise", [1.0, 0.0])
+    def test_unseen_values_follow_tree_thresholds(self, noise: float) -> None:
+        """Test that values missing from a training fold are routed like a tree would, for both tasks."""
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({"x": rng.integers(0, 150, 200), "noise": rng.normal(size=200).round(2)})
+        df["y"] = df["x"] // 10 + noise * rng.normal(size=200)
+
+        assert infer_task(df["y"]) == ("regression" if noise else "classification")
+        scores = predictive_power_scores(df, "y", seed=3)
+
+        pd.testing.assert_series_equal(scores[["x", "noise"]], tree_scores(df, "y", 3)[["x", "noise"]],
+                                       check_names=False, atol=1e-12)
+
+    def test_degenerate_columns_score_zero(self, student_train: pd.DataFrame) -> None:
+        """Test that a constant target and an identifier feature have no predictive power."""
+        constant = student_train.assign(G3=10)
+        with_id = student_train.assign(student_id=[f"s{i}" for i in range(len(student_train))])
+
+        assert (predictive_power_scores(constant, "G3") == 0).all()
+        assert predictive_power_scores(with_id, "G3")["student_id"] == 0
+
+    def test_task_inference(self, student_train: pd.DataFrame) -> None:
+        """Test that grades are class labels for deepchecks while a continuous target is not."""
+        assert infer_task(student_train["G3"]) == "classification"
+        assert infer_task(student_train["school"]) == "classification"
+        assert infer_task(student_train["G3"] + 0.5 * np.arange(len(student_train))) == "regression"
+
+    def test_sample_and_errors(self, student_train: pd.DataFrame) -> None:
+        """Test that sampling is seeded and that non-numeric regression targets and missing values are rejected."""
+        first = predictive_power_scores(student_train, "G3", sample_rows=60, seed=4)
+        second = predictive_power_scores(student_train, "G3", sample_rows=60, seed=4)
+        pd.testing.assert_series_equal(first, second)
+
+        with pytest.raises(ValueError, match="must be numeric"):
+            predictive_power_scores(student_train, "school", task="regression")
+        with pytest.raises(ValueError, match="missing values"):
+            predictive_power_scores(student_train.assign(G1=np.nan), "G3")
+
+
+class TestAssociationMatrix:
+    """Tests for the feature-feature association matrix."""
+
+    def test_spearman_matches_pandas(self, student_train: pd.DataFrame) -> None:
+        """Test that numeric pairs get pandas' Spearman correlation and categoricals are left out by default."""
+        features = student_train.drop(columns=["G3"])
+        numeric = features.select_dtypes("number")
+
+        matrix = association_matrix(features)
+
+        assert list(matrix.index) == list(numeric.columns)
+        np.testing.assert_allclose(matrix.to_numpy(dtype=float), numeric.corr(method="spearman").to_numpy(), atol=1e-12)
+
+    def test_categorical_associations(self, student_train: pd.DataFrame) -> None:
+        """Test Cramér's V and the correlation ratio for categorical features."""
+        df = student_train[["G1", "Mjob", "Fjob"]].assign(Mjob_copy=student_train["Mjob"])
+
+        matrix = association_matrix(df, categorical_features=["Mjob", "Fjob", "Mjob_copy"])
+
+        assert matrix.loc["Mjob", "Mjob_copy"] == pytest.approx(1.0)
+        assert 0 <= matrix.loc["Mjob", "Fjob"] < 0.5
+        assert matrix.loc["Mjob", "Fjob"] == matrix.loc["Fjob", "Mjob"]
+        assert 0 <= matrix.loc["G1", "Mjob"] == matrix.loc["Mjob", "G1"] <= 1
+
+    def test_correlated_pairs_are_signed_and_listed_once(self) -> None:
+        """Test that only positive associations above the threshold count, once per pair."""
+        matrix = pd.DataFrame([[1.0, 0.95, -0.99], [0.95, 1.0, 0.1], [-0.99, 0.1, 1.0]],
+                              index=["b", "a", "c"], columns=["b", "a", "c"])
+
+        assert correlated_pairs(matrix, 0.92) == [("a", "b")]
+
+
+class TestCorrelationFailures:
+    """Tests that the native gates reach deepchecks' verdicts."""
+
+    @pytest.mark.parametrize("case", ["clean", "leaked_label", "duplicated_feature", "anticorrelated_feature"])
+    def test_same_outcome_as_deepchecks(self, student_train: pd.DataFrame, case: str) -> None:
+        """Test pass/fail against deepchecks on clean data and on data each gate must reject (or not)."""
+        df = student_train.copy()
+        if case == "leaked_label":
+            df["Walc"] = df["G3"]
+        elif case == "duplicated_feature":
+            df["G2"] = df["G1"]
+        elif case == "anticorrelated_feature":
+            df["G2"] = 20 - df["G1"]
+
+        failures = correlation_failures(df, "G3")
+
+        native = (not failures["feature_label"], not failures["feature_feature"])
+        assert native == deepchecks_outcome(df)
+        if case == "leaked_label":
+            assert failures["feature_label"] == ["Walc"]
+        if case == "duplicated_feature":
+            assert failures["feature_feature"] == [("G1", "G2")]
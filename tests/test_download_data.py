@@ -1,12 +1,71 @@
 import pytest
+import hashlib
 import os
 import io
+import shutil
+import threading
+import time
 import zipfile
+import numpy as np
+import requests
 from pathlib import Path
 from click.testing import CliRunner
 from pytest_mock import MockerFixture
 
-from src.download_data import read_zip, main
+from src import download_data
+from src.download_data import cached_download, extract_members, fetch_archive, file_sha256, read_zip, main
+
+
+@pytest.fixture
+def large_zip_content() -> bytes:
+    """
+    A nested student archive of about 300 KB, big enough to be cut part-way.
+
+    Returns
+    -------
+    bytes
+        Bytes content of the outer zip file (stored, so it stays that size).
+    """
+    rng = np.random.default_rng(0)
+    rows = "\n".join(";".join(map(str, row)) for row in rng.integers(0, 20, (20_000, 5)))
+    csv_content = f'"G1";"G2";"G3";"age";"absences"\n{rows}'.encode()
+    inner_zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(inner_zip_buffer, 'w') as inner_zip:
+        inner_zip.writestr("student-mat.csv", csv_content)
+        inner_zip.writestr("student-por.csv", csv_content)
+    outer_zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(outer_zip_buffer, 'w') as outer_zip:
+        outer_zip.writestr("student.zip", inner_zip_buffer.getvalue())
+    return outer_zip_buffer.getvalue()
+
+
+@pytest.fixture
+def school_archive() -> tuple:
+    """
+    An archive of per-school CSVs in a stored and a compressed nested zip, plus a loose file.
+
+    Returns
+    -------
+    tuple of (bytes, dict)
+        The outer zip file, and the content of each file by the path it
+        should be extracted to.
+    """
+    files = {f"school-{i:02d}.csv": f"school;G3\nS{i};{i % 20}\n".encode() * 500 for i in range(12)}
+    stored, deflated = io.BytesIO(), io.BytesIO()
+    with zipfile.ZipFile(stored, 'w', zipfile.ZIP_DEFLATED) as nested:
+        for name in list(files)[:8]:
+            nested.writestr(name, files[name])
+    with zipfile.ZipFile(deflated, 'w', zipfile.ZIP_DEFLATED) as nested:
+        for name in list(files)[8:]:
+            nested.writestr(f"extra/{name}", files[name])
+    outer = io.BytesIO()
+    with zipfile.ZipFile(outer, 'w') as archive:
+        archive.writestr("README.txt", b"per-school exports")
+        archive.writestr("schools.zip", stored.getvalue(), compress_type=zipfile.ZIP_STORED)
+        archive.writestr("extra.zip", deflated.getvalue(), compress_type=zipfile.ZIP_DEFLATED)
+    expected = {("extra/" if i >= 8 else "") + name: content for i, (name, content) in enumerate(files.items())}
+    expected["README.txt"] = b"per-school exports"
+    return outer.getvalue(), expected
 
 
 class TestReadZip:
@@ -78,6 +137,254 @@ class TestReadZip:
         assert (tmp_path / "student-por.csv").exists()
 
 
+class TestFetchArchive:
+    """Tests for streaming, resumable, checksummed downloads against a local server."""
+
+    def test_streams_verifies_and_skips_matching_copy(self, tmp_path: Path, archive_server,
+                                                      large_zip_content: bytes) -> None:
+        """Test that the file is streamed in chunks and not requested again while its digest matches."""
+        archive_server.files["/data.zip"] = large_zip_content
+        sha256 = hashlib.sha256(large_zip_content).hexdigest()
+        path = tmp_path / "data.zip"
+
+        assert fetch_archive(archive_server.url("/data.zip"), str(path), sha256=sha256, chunk_size=4096)
+        assert path.read_bytes() == large_zip_content
+        assert not (tmp_path / "data.zip.part").exists()
+
+        assert not fetch_archive(archive_server.url("/data.zip"), str(path), sha256=sha256.upper())
+        assert len(archive_server.requests) == 1
+
+    def test_resumes_dropped_connection_with_range(self, tmp_path: Path, archive_server,
+                                                   large_zip_content: bytes) -> None:
+        """Test that a connection cut part-way is resumed from the bytes already on disk."""
+        archive_server.files["/data.zip"] = large_zip_content
+        archive_server.drop_after = 100_000
+        path = tmp_path / "data.zip"
+
+        fetch_archive(archive_server.url("/data.zip"), str(path), chunk_size=4096)
+
+        assert path.read_bytes() == large_zip_content
+        assert "Range" not in archive_server.requests[0]
+        # bytes of the chunk being read when the connection dropped are fetched again
+        resumed_at = int(archive_server.requests[1]["Range"].removeprefix("bytes=").rstrip("-"))
+        assert 0 < resumed_at <= 100_000
+        # the resumption only applies to the version of the file started on
+        assert archive_server.requests[1]["If-Range"] == f'"{hashlib.sha256(large_zip_content).hexdigest()}"'
+
+    def test_resumes_partial_file_from_earlier_run(self, tmp_path: Path, archive_server,
+                                                   large_zip_content: bytes) -> None:
+        """Test that a leftover .part file is completed, and a complete one is only checked."""
+        archive_server.files["/data.zip"] = large_zip_content
+        sha256 = hashlib.sha256(large_zip_content).hexdigest()
+        (tmp_path / "data.zip.part").write_bytes(large_zip_content[:12_345])
+        (tmp_path / "full.zip.part").write_bytes(large_zip_content)
+
+        fetch_archive(archive_server.url("/data.zip"), str(tmp_path / "data.zip"), sha256=sha256)
+        fetch_archive(archive_server.url("/data.zip"), str(tmp_path / "full.zip"), sha256=sha256)
+
+        assert (tmp_path / "data.zip").read_bytes() == large_zip_content
+        assert (tmp_path / "full.zip").read_bytes() == large_zip_content
+        assert [request["Range"] for request in archive_server.requests] == [
+            "bytes=12345-", f"bytes={len(large_zip_content)}-"]
+
+    def test_partial_file_of_an_older_version_is_not_spliced(self, tmp_path: Path, archive_server,
+                                                            large_zip_content: bytes,
+                                                            mock_zip_content: bytes) -> None:
+        """Test that a run interrupted on one version resumes with If-Range and gets a newer version whole."""
+        archive_server.files["/data.zip"] = large_zip_content
+        archive_server.drop_after = 100_000
+        path = tmp_path / "data.zip"
+        with pytest.raises(requests.exceptions.RequestException):
+            fetch_archive(archive_server.url("/data.zip"), str(path), chunk_size=4096, retries=0)
+        assert (tmp_path / "data.zip.part").exists() and (tmp_path / "data.zip.part.json").exists()
+
+        archive_server.files["/data.zip"] = mock_zip_content
+        archive_server.last_modified = "Thu, 02 Jan 2025 00:00:00 GMT"
+        assert fetch_archive(archive_server.url("/data.zip"), str(path))
+
+        assert path.read_bytes() == mock_zip_content
+        assert archive_server.requests[1]["If-Range"] == f'"{hashlib.sha256(large_zip_content).hexdigest()}"'
+        assert sorted(os.listdir(tmp_path)) == ["data.zip"]
+
+    def test_partial_file_of_unknown_version_is_discarded(self, tmp_path: Path, archive_server,
+                                                          large_zip_content: bytes) -> None:
+        """Test that without saved validators or a checksum, a leftover .part file is downloaded again."""
+        archive_server.files["/data.zip"] = large_zip_content
+        (tmp_path / "data.zip.part").write_bytes(b"bytes of an unknown version")
+
+        fetch_archive(archive_server.url("/data.zip"), str(tmp_path / "data.zip"))
+
+        assert (tmp_path / "data.zip").read_bytes() == large_zip_content
+        assert "Range" not in archive_server.requests[0]
+
+    def test_server_ignoring_range_restarts(self, tmp_path: Path, archive_server,
+                                            large_zip_content: bytes) -> None:
+        """Test that a full 200 response to a range request replaces the partial file."""
+        archive_server.files["/data.zip"] = large_zip_content
+        archive_server.honour_ranges = False
+        (tmp_path / "data.zip.part").write_bytes(b"stale bytes from another version")
+
+        fetch_archive(archive_server.url("/data.zip"), str(tmp_path / "data.zip"))
+
+        assert (tmp_path / "data.zip").read_bytes() == large_zip_content
+
+    def test_checksum_mismatch_and_missing_url(self, tmp_path: Path, archive_server,
+                                               large_zip_content: bytes) -> None:
+        """Test that a wrong digest or a 404 raises ValueError and leaves no file behind."""
+        archive_server.files["/data.zip"] = large_zip_content
+        path = tmp_path / "data.zip"
+
+        with pytest.raises(ValueError, match="Checksum mismatch"):
+            fetch_archive(archive_server.url("/data.zip"), str(path), sha256="0" * 64)
+        with pytest.raises(ValueError, match="does not exist"):
+            fetch_archive(archive_server.url("/missing.zip"), str(path))
+
+        assert os.listdir(tmp_path) == []
+
+    def test_read_zip_extracts_from_streamed_archive(self, tmp_path: Path, archive_server,
+                                                     large_zip_content: bytes) -> None:
+        """Test that read_zip with a checksum keeps the archive and extracts the nested CSVs from it."""
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        sha256 = hashlib.sha256(large_zip_content).hexdigest()
+
+        read_zip(archive_server.url("/student+performance.zip"), str(tmp_path), sha256=sha256)
+
+        assert file_sha256(str(tmp_path / "student+performance.zip")) == sha256
+        assert (tmp_path / "student-por.csv").read_text().startswith('"G1";"G2"')
+
+
+class TestExtractMembers:
+    """Tests for the selective, concurrent extraction of nested archives."""
+
+    def test_extracts_nested_members_without_the_nested_archives(self, tmp_path: Path, school_archive: tuple) -> None:
+        """Test that every file of both nested archives is written, and no nested zip or partial file is."""
+        content, expected = school_archive
+        (tmp_path / "schools.zip").write_bytes(content)
+
+        written = extract_members(str(tmp_path / "schools.zip"), str(tmp_path / "out"))
+
+        assert written == sorted(str(tmp_path / "out" / name) for name in expected)
+        for name, data in expected.items():
+            assert (tmp_path / "out" / name).read_bytes() == data
+        assert not list((tmp_path / "out").rglob("*.zip")) and not list((tmp_path / "out").rglob("*.part"))
+
+    def test_selects_members_by_name_and_pattern(self, tmp_path: Path, school_archive: tuple) -> None:
+        """Test that only the requested members are written, from bytes as from a file."""
+        content, expected = school_archive
+
+        written = extract_members(content, str(tmp_path), members=("school-0[0-2].csv", "school-10.csv"))
+
+        assert written == [str(tmp_path / "extra" / "school-10.csv")] + [
+            str(tmp_path / f"school-0{i}.csv") for i in range(3)]
+        assert (tmp_path / "extra" / "school-10.csv").read_bytes() == expected["extra/school-10.csv"]
+        assert extract_members(content, str(tmp_path / "zip"), members=("extra.zip",)) == [str(tmp_path / "zip" / "extra.zip")]
+
+    def test_stored_archive_members_are_extracted_concurrently(self, tmp_path: Path, school_archive: tuple,
+                                                               mocker: MockerFixture) -> None:
+        """Test that members of a stored nested archive are read in place by separate workers."""
+        content, _ = school_archive
+        addressable, streamed = download_data._plan_extraction(content, None)
+        window = next(window for window, names in addressable.items() if "school-00.csv" in names)
+        assert window is not None and streamed == [(None, "extra.zip")]
+
+        barrier = threading.Barrier(2, timeout=10)
+        extract_names = download_data._extract_names
+
+        def extract_together(source, window, names: list, directory: str) -> list:
+            barrier.wait()
+            return extract_names(source, window, names, directory)
+
+        extract = mocker.patch("src.download_data._extract_names", side_effect=extract_together)
+        written = extract_members(content, str(tmp_path), members=("school-0[01].csv",), workers=2)
+
+        assert len(written) == 2 and extract.call_count == 2
+
+    def test_many_members_open_each_archive_once_per_batch(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that thousands of members are written in batches, in time close to ``ZipFile.extractall``."""
+        flat = tmp_path / "flat.zip"
+        with zipfile.ZipFile(flat, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for i in range(3000):
+                archive.writestr(f"school-{i:04d}.csv", f"school;G3\n{i};10\n")
+        start = time.perf_counter()
+        zipfile.ZipFile(flat).extractall(tmp_path / "baseline")
+        baseline = time.perf_counter() - start
+
+        open_container = mocker.spy(download_data, "_open_container")
+        start = time.perf_counter()
+        written = extract_members(str(flat), str(tmp_path / "out"), workers=4)
+        elapsed = time.perf_counter() - start
+
+        assert len(written) == 3000 and (tmp_path / "out" / "school-2999.csv").read_text() == "school;G3\n2999;10\n"
+        assert open_container.call_count == 4
+        # one central-directory parse per member took about 360 times as long
+        assert elapsed < 10 * baseline + 2
+
+    def test_rejects_unknown_members_and_unsafe_paths(self, tmp_path: Path, school_archive: tuple) -> None:
+        """Test that a pattern matching nothing and a member escaping the directory raise ValueError."""
+        content, _ = school_archive
+        with pytest.raises(ValueError, match="No archive member matches 'student-por.csv'"):
+            extract_members(content, str(tmp_path), members=("school-01.csv", "student-por.csv"))
+
+        unsafe = io.BytesIO()
+        with zipfile.ZipFile(unsafe, 'w') as archive:
+            archive.writestr("../escape.txt", b"outside")
+        with pytest.raises(ValueError, match="outside the target directory"):
+            extract_members(unsafe.getvalue(), str(tmp_path / "out"))
+        assert not (tmp_path / "escape.txt").exists()
+
+
+class TestCachedDownload:
+    """Tests for the URL-keyed download cache and its conditional requests."""
+
+    def test_unchanged_archive_is_revalidated_not_downloaded(self, tmp_path: Path, archive_server,
+                                                             large_zip_content: bytes) -> None:
+        """Test that a second run sends one conditional request and reuses the extracted files."""
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        url = archive_server.url("/student+performance.zip")
+
+        extracted, downloaded = cached_download(url, str(tmp_path / "cache"))
+        assert downloaded
+        assert sorted(os.listdir(extracted)) == ["student-mat.csv", "student-por.csv"]
+        (Path(extracted) / "marker").write_text("left by the first run")
+
+        assert cached_download(url, str(tmp_path / "cache")) == (extracted, False)
+        conditional = archive_server.requests[1]
+        assert conditional["If-None-Match"] == f'"{hashlib.sha256(large_zip_content).hexdigest()}"'
+        assert conditional["If-Modified-Since"] == archive_server.last_modified
+        assert (Path(extracted) / "marker").exists()
+        assert len(os.listdir(tmp_path / "cache")) == 1
+
+    def test_changed_archive_is_downloaded_and_extracted(self, tmp_path: Path, archive_server,
+                                                         large_zip_content: bytes, mock_zip_content: bytes) -> None:
+        """Test that a new version on the server replaces the cached archive and its extracted files."""
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        url = archive_server.url("/student+performance.zip")
+        extracted, _ = cached_download(url, str(tmp_path / "cache"))
+        (Path(extracted) / "marker").write_text("left by the first run")
+
+        archive_server.files["/student+performance.zip"] = mock_zip_content
+        archive_server.last_modified = "Thu, 02 Jan 2025 00:00:00 GMT"
+
+        assert cached_download(url, str(tmp_path / "cache")) == (extracted, True)
+        assert (Path(extracted) / "student-mat.csv").read_text().startswith('"school"')
+        assert not (Path(extracted) / "marker").exists()
+        assert not os.path.exists(extracted + ".new")
+
+    def test_last_modified_only_and_missing_extraction(self, tmp_path: Path, archive_server,
+                                                       large_zip_content: bytes) -> None:
+        """Test revalidation without an ETag, and re-extraction of a deleted directory from the cached archive."""
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        archive_server.send_etag = False
+        url = archive_server.url("/student+performance.zip")
+        extracted, _ = cached_download(url, str(tmp_path / "cache"))
+        shutil.rmtree(extracted)
+
+        assert cached_download(url, str(tmp_path / "cache")) == (extracted, False)
+        assert "If-None-Match" not in archive_server.requests[1]
+        assert archive_server.requests[1]["If-Modified-Since"] == archive_server.last_modified
+        assert (Path(extracted) / "student-por.csv").exists()
+
+
 class TestMain:
     """Tests for the CLI main function."""
 
@@ -132,3 +439,93 @@ class TestMain:
 
         assert result.exit_code == 0
         assert output_dir.exists()
+
+    def test_main_streams_with_checksum(self, tmp_path: Path, archive_server, large_zip_content: bytes) -> None:
+        """
+        Test that --archive-to and --sha256 download once and skip the unchanged archive on the next run.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        archive_server : ThreadingHTTPServer
+            Local HTTP server fixture.
+        large_zip_content : bytes
+            Nested student archive fixture.
+        """
+        archive_server.files["/data.zip"] = large_zip_content
+        arguments = [
+            '--url', archive_server.url("/data.zip"),
+            '--write-to', str(tmp_path / "raw"),
+            '--archive-to', str(tmp_path / "data.zip"),
+            '--sha256', hashlib.sha256(large_zip_content).hexdigest()
+        ]
+
+        first = CliRunner().invoke(main, arguments)
+        second = CliRunner().invoke(main, arguments)
+
+        assert first.exit_code == 0, first.output
+        assert second.exit_code == 0, second.output
+        assert "Up to date" in second.output
+        assert len(archive_server.requests) == 1
+        assert (tmp_path / "raw" / "student-por.csv").exists()
+
+    def test_main_cache_dir_reuses_unchanged_download(self, tmp_path: Path, archive_server,
+                                                      large_zip_content: bytes) -> None:
+        """
+        Test that --cache-dir fills the output directory on every run but downloads the archive once.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        archive_server : ThreadingHTTPServer
+            Local HTTP server fixture.
+        large_zip_content : bytes
+            Nested student archive fixture.
+        """
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        arguments = [
+            '--url', archive_server.url("/student+performance.zip"),
+            '--write-to', str(tmp_path / "raw"),
+            '--cache-dir', str(tmp_path / "cache")
+        ]
+
+        first = CliRunner().invoke(main, arguments)
+        shutil.rmtree(tmp_path / "raw")
+        second = CliRunner().invoke(main, arguments)
+
+        assert first.exit_code == 0, first.output
+        assert second.exit_code == 0, second.output
+        assert "Not modified" in second.output
+        assert (tmp_path / "raw" / "student-mat.csv").exists()
+        assert "If-None-Match" in archive_server.requests[1]
+
+    def test_main_extracts_only_requested_members(self, tmp_path: Path, archive_server,
+                                                  large_zip_content: bytes) -> None:
+        """
+        Test that --members writes only the named CSV, with and without the cache.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        archive_server : ThreadingHTTPServer
+            Local HTTP server fixture.
+        large_zip_content : bytes
+            Nested student archive fixture.
+        """
+        archive_server.files["/student+performance.zip"] = large_zip_content
+        url = archive_server.url("/student+performance.zip")
+
+        direct = CliRunner().invoke(main, ['--url', url, '--write-to', str(tmp_path / "direct"),
+                                           '--members', 'student-por.csv'])
+        cached = CliRunner().invoke(main, ['--url', url, '--write-to', str(tmp_path / "cached"),
+                                           '--cache-dir', str(tmp_path / "cache"), '--members', 'student-por.csv'])
+        missing = CliRunner().invoke(main, ['--url', url, '--write-to', str(tmp_path / "missing"),
+                                            '--cache-dir', str(tmp_path / "cache"), '--members', 'student-xyz.csv'])
+
+        assert direct.exit_code == 0, direct.output
+        assert cached.exit_code == 0, cached.output
+        assert os.listdir(tmp_path / "direct") == os.listdir(tmp_path / "cached") == ["student-por.csv"]
+        assert isinstance(missing.exception, ValueError)
@@ -0,0 +1,73 @@
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.dtype_plan import apply_dtype_plan, dtype_plan, smallest_int_dtype
+from src.preprocess_data import create_schema
+
+
+@pytest.fixture
+def plan() -> dict:
+    """Dtype plan of the student schema."""
+    return dtype_plan(create_schema())
+
+
+class TestDtypePlan:
+    """Tests for deriving compact dtypes from the schema."""
+
+    @pytest.mark.parametrize("bounds,expected", [
+        ((0, 4), "uint8"),
+        ((0, 255), "uint8"),
+        ((-5, 5), "int8"),
+        ((0, 256), "uint16"),
+        ((-1, 40_000), "int32"),
+    ])
+    def test_smallest_int_dtype(self, bounds: tuple, expected: str) -> None:
+        """Test that the smallest dtype covering the range is chosen."""
+        assert smallest_int_dtype(*bounds) == expected
+
+    def test_plan_covers_every_column(self, plan: dict) -> None:
+        """Test that every student column gets a compact dtype."""
+        assert set(plan) == set(create_schema().columns)
+        assert plan["absences"] == "uint8"
+        assert plan["reason"] == pd.CategoricalDtype(["course", "home", "other", "reputation"])
+        assert list(plan["schoolsup"].categories) == ["no", "yes"]
+
+    def test_apply_shrinks_memory_and_keeps_values(self, plan: dict, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the cast is lossless and uses several times less memory.
+
+        Parameters
+        ----------
+        plan : dict
+            Student dtype plan fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        compact = apply_dtype_plan(synthetic_student_df, plan)
+
+        assert compact["G3"].dtype == np.uint8
+        assert isinstance(compact["Mjob"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(compact.astype(synthetic_student_df.dtypes.to_dict()), synthetic_student_df)
+        assert compact.memory_usage(deep=True).sum() * 5 < synthetic_student_df.memory_usage(deep=True).sum()
+
+    @pytest.mark.parametrize("column,value,match", [
+        ("Medu", 300, "Medu"),
+        ("Medu", 1.5, "integers"),
+        ("Mjob", "astronaut", "astronaut"),
+        ("Mjob", None, "missing"),
+    ])
+    def test_apply_rejects_lossy_casts(self, plan: dict, synthetic_student_df: pd.DataFrame,
+                                       column: str, value, match: str) -> None:
+        """Test that out-of-range, fractional, unknown and missing values raise."""
+        df = synthetic_student_df.astype({column: object})
+        df.loc[0, column] = value
+
+        with pytest.raises(ValueError, match=match):
+            apply_dtype_plan(df, plan)
+
+    def test_apply_is_idempotent(self, plan: dict, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that already compact frames pass through unchanged."""
+        compact = apply_dtype_plan(synthetic_student_df, plan)
+
+        pd.testing.assert_frame_equal(apply_dtype_plan(compact, plan), compact)
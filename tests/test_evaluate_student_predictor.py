@@ -187,4 +187,73 @@ class TestMain:
         ])
 
         mock_savefig.assert_called_once()
-        assert 'prediction_error.png' in str(mock_savefig.call_args)
\ No newline at end of file
+        assert 'prediction_error.png' in str(mock_savefig.call_args)
+
+    def test_main_evaluates_npz_artifact(self, mocker: MockerFixture, tmp_path: Path, sample_test_df: pd.DataFrame, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that main() scores a NumPy-only artifact without unpickling.
+        """
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from src.inference_artifact import export_artifact
+        from src.preprocess_data import create_preprocessor
+
+        pipeline = make_pipeline(create_preprocessor(), Ridge()).fit(
+            synthetic_student_df.drop(columns=['G3']), synthetic_student_df['G3']
+        )
+        artifact_path = tmp_path / "student_model.npz"
+        export_artifact(pipeline, str(artifact_path))
+
+        mocker.patch('pandas.read_csv', return_value=sample_test_df)
+        mock_pickle_load = mocker.patch('pickle.load')
+        mocker.patch('src.evaluate_student_predictor.plt.savefig')
+
+        tables_dir = tmp_path / "tables"
+        figures_dir = tmp_path / "figures"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--test-data', 'data/processed/student_test.csv',
+            '--pipeline-from', str(artifact_path),
+            '--tables-to', str(tables_dir),
+            '--plot-to', str(figures_dir),
+        ])
+
+        assert result.exit_code == 0, result.output
+        mock_pickle_load.assert_not_called()
+        coefficient_rows = (tables_dir / "top_coefficients.csv").read_text().strip().splitlines()
+        assert len(coefficient_rows) == 6
+        assert (tables_dir / "test_scores.csv").exists()
+
+    def test_main_no_plots_writes_only_tables(self, mocker: MockerFixture, tmp_path: Path, sample_test_df: pd.DataFrame, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that --no-plots skips the prediction error plot and still writes the tables.
+        """
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from src.inference_artifact import export_artifact
+        from src.preprocess_data import create_preprocessor
+
+        pipeline = make_pipeline(create_preprocessor(), Ridge()).fit(
+            synthetic_student_df.drop(columns=['G3']), synthetic_student_df['G3']
+        )
+        artifact_path = tmp_path / "student_model.npz"
+        export_artifact(pipeline, str(artifact_path))
+
+        mocker.patch('pandas.read_csv', return_value=sample_test_df)
+        mock_savefig = mocker.patch('src.evaluate_student_predictor.plt.savefig')
+
+        tables_dir = tmp_path / "tables"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--test-data', 'data/processed/student_test.csv',
+            '--pipeline-from', str(artifact_path),
+            '--tables-to', str(tables_dir),
+            '--no-plots',
+        ])
+
+        assert result.exit_code == 0, result.output
+        mock_savefig.assert_not_called()
+        assert (tables_dir / "test_scores.csv").exists()
+        assert (tables_dir / "top_coefficients.csv").exists()
@@ -0,0 +1,188 @@
+import pytest
+import pandas as pd
+import numpy as np
+import pandera.pandas as pa
+from click.testing import CliRunner
+from pathlib import Path
+
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.fast_validation import FAILURE_CASE_COLUMNS, FastSchemaErrors, FastValidator, schema_validator
+from src.preprocess_data import create_schema, main
+
+
+def normalized(cases: pd.DataFrame) -> list:
+    """
+    Failure cases as sorted tuples of strings, missing values as None.
+
+    pandera's row order, column order and int/float check numbers vary with
+    the mix of failures, so only the content is compared.
+    """
+    def text(value):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
+    return sorted(tuple(text(value) for value in row) for row in cases[FAILURE_CASE_COLUMNS].itertuples(index=False))
+
+
+def pandera_cases(df: pd.DataFrame) -> list:
+    """Normalized failure cases of pandera's lazy validation."""
+    try:
+        create_schema().validate(df, lazy=True)
+    except pa.errors.SchemaErrors as error:
+        return normalized(error.failure_cases)
+    return []
+
+
+def corrupt(df: pd.DataFrame, case: str) -> pd.DataFrame:
+    """Return a copy of ``df`` with one kind of schema violation."""
+    df = df.copy()
+    if case == "out_of_range_and_unknown":
+        df.loc[3, "G1"] = 25
+        df.loc[4, "absences"] = -1
+        df.loc[5, "Mjob"] = "pilot"
+    elif case == "null_in_int_column":
+        df["age"] = df["age"].astype(float)
+        df.loc[7, "age"] = np.nan
+    elif case == "missing_column":
+        df = df.drop(columns=["Fjob"])
+    elif case == "duplicate_rows":
+        df = pd.concat([df, df.iloc[:2]])
+    elif case == "empty_row":
+        df = df.astype(object)
+        df.loc[10, :] = None
+    elif case == "int_in_str_column":
+        df["sex"] = 1
+    elif case == "mixed_object_column":
+        df["sex"] = df["sex"].astype(object)
+        df.loc[2, "sex"] = 5
+        df.loc[4, "sex"] = None
+    elif case == "uncomparable_values":
+        df["G2"] = df["G2"].astype(object)
+        df.loc[1, "G2"] = "x"
+    elif case == "compact_dtypes":
+        df = apply_dtype_plan(df, dtype_plan(create_schema()))
+    elif case == "unknown_category":
+        df["Mjob"] = df["Mjob"].astype("category").cat.add_categories(["pilot"])
+        df.loc[9, "Mjob"] = "pilot"
+    return df
+
+
+class TestFastValidator:
+    """Tests for the vectorized validator generated from the student schema."""
+
+    def test_valid_data_passes(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that schema-valid data has no failure cases and is returned unchanged."""
+        validator = FastValidator(create_schema())
+
+        assert validator.failure_cases(synthetic_student_df).empty
+        assert validator.validate(synthetic_student_df) is synthetic_student_df
+
+    @pytest.mark.parametrize("case", [
+        "out_of_range_and_unknown", "null_in_int_column", "missing_column", "duplicate_rows",
+        "empty_row", "int_in_str_column", "mixed_object_column", "uncomparable_values",
+        "compact_dtypes", "unknown_category",
+    ])
+    def test_reports_same_failure_cases_as_pandera(self, synthetic_student_df: pd.DataFrame, case: str) -> None:
+        """
+        Test that every failure case of pandera's lazy report is reproduced exactly.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        case : str
+            Kind of schema violation introduced.
+        """
+        df = corrupt(synthetic_student_df, case)
+        expected = pandera_cases(df)
+
+        with pytest.raises(FastSchemaErrors) as error:
+            FastValidator(create_schema()).validate(df)
+
+        assert expected
+        assert normalized(error.value.failure_cases) == expected
+
+    def test_duplicate_detection_survives_hash_collisions(self, synthetic_student_df: pd.DataFrame,
+                                                          mocker) -> None:
+        """
+        Test that rows sharing a row hash are only duplicates if they are equal.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        mocker : MockerFixture
+            Pytest-mock fixture.
+        """
+        mocker.patch("src.fast_validation._row_key", side_effect=lambda keys: np.zeros(len(keys[0]), np.uint64))
+        validator = FastValidator(create_schema())
+
+        assert validator.failure_cases(synthetic_student_df).empty
+        duplicated = pd.concat([synthetic_student_df, synthetic_student_df.iloc[[5]]])
+        assert validator.failure_cases(duplicated)["check"].tolist() == ["Duplicate rows found."]
+
+    def test_error_message_summarises_failures(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that the raised error names the failing columns and checks."""
+        df = corrupt(synthetic_student_df, "out_of_range_and_unknown")
+
+        with pytest.raises(FastSchemaErrors, match=r"3 failure cases[\s\S]*G1: in_range\(0, 20\)"):
+            schema_validator(create_schema(), "fast")(df)
+
+    def test_schema_validator_rejects_unknown_names(self) -> None:
+        """Test that only the pandera and fast validators exist."""
+        with pytest.raises(ValueError, match="Unknown validator"):
+            schema_validator(create_schema(), "slow")
+
+
+class TestPreprocessValidatorOption:
+    """Tests for preprocess_data's --validator option."""
+
+    @pytest.mark.parametrize("validator,error", [("pandera", pa.errors.SchemaErrors), ("fast", FastSchemaErrors)])
+    def test_invalid_raw_data_is_rejected(self, tmp_path: Path, synthetic_student_df: pd.DataFrame,
+                                          validator: str, error: type) -> None:
+        """
+        Test that both validators stop preprocessing on the same failure.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        validator : str
+            Value of --validator.
+        error : type
+            Exception the validator raises.
+        """
+        raw_path = tmp_path / "student-por.csv"
+        corrupt(synthetic_student_df, "out_of_range_and_unknown").to_csv(raw_path, sep=";", index=False)
+
+        result = CliRunner().invoke(main, [
+            '--raw-data', str(raw_path),
+            '--data-to', str(tmp_path / "processed"),
+            '--preprocessor-to', str(tmp_path / "models"),
+            '--validator', validator
+        ])
+
+        assert isinstance(result.exception, error)
+        assert set(result.exception.failure_cases["index"].dropna()) == {3, 4, 5}
+        assert not (tmp_path / "processed").exists()
+
+    def test_fast_validator_writes_same_tables(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that valid data is processed identically with --validator fast."""
+        raw_path = tmp_path / "student-por.csv"
+        synthetic_student_df.to_csv(raw_path, sep=";", index=False)
+
+        for validator in ("pandera", "fast"):
+            result = CliRunner().invoke(main, [
+                '--raw-data', str(raw_path),
+                '--data-to', str(tmp_path / validator),
+                '--preprocessor-to', str(tmp_path / "models"),
+                '--validator', validator
+            ])
+            assert result.exit_code == 0, result.output
+
+        pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "fast" / "student_train.parquet"),
+                                      pd.read_parquet(tmp_path / "pandera" / "student_train.parquet"))
@@ -1,4 +1,5 @@
 import pytest
+import pickle
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -7,6 +8,7 @@ from unittest.mock import MagicMock, mock_open
 from pytest_mock import MockerFixture
 
 from src.fit_student_predictor import main
+from src.preprocess_data import create_preprocessor
 
 
 class TestMain:
@@ -234,4 +236,223 @@ class TestMain:
         ])
 
         # Should fail due to correlation check
-        assert result.exit_code != 0 or "correlation" in str(result.output).lower()
\ No newline at end of file
+        assert result.exit_code != 0 or "correlation" in str(result.output).lower()
+
+    @pytest.mark.parametrize("cv_strategy", ["loo", "gcv"])
+    def test_main_uses_hat_matrix_search_for_cv_strategy(
+        self, mocker: MockerFixture, tmp_path: Path, sample_train_df: pd.DataFrame,
+        mock_preprocessor: MagicMock, cv_strategy: str
+    ) -> None:
+        """
+        Test that --cv-strategy loo/gcv tunes with RidgeLOOSearchCV and saves outputs.
+        """
+        mocker.patch('pandas.read_csv', return_value=sample_train_df)
+        mocker.patch('pickle.load', return_value=mock_preprocessor)
+        mocker.patch('pickle.dump')
+        mocker.patch('src.fit_student_predictor.export_artifact')
+
+        mock_check = MagicMock()
+        mock_check.add_condition_feature_pps_less_than.return_value = mock_check
+        mock_check.add_condition_max_number_of_pairs_above_threshold.return_value = mock_check
+        mock_check.run.return_value.passed_conditions.return_value = True
+        mocker.patch('src.fit_student_predictor.FeatureLabelCorrelation', return_value=mock_check)
+        mocker.patch('src.fit_student_predictor.FeatureFeatureCorrelation', return_value=mock_check)
+        mocker.patch('src.fit_student_predictor.Dataset')
+
+        mock_search = MagicMock()
+        mock_search.fit.return_value = mock_search
+        mock_search.best_params_ = {'ridge__alpha': 1.0}
+        mock_search.best_score_ = -2.5
+        mock_search.n_splits_ = 5
+        mock_search.cv_results_ = {
+            'param_ridge__alpha': [0.1, 1.0, 10.0],
+            'mean_test_score': [-3.0, -2.5, -2.8],
+            'std_test_score': [0.5, 0.4, 0.6]
+        }
+        mock_loo = mocker.patch('src.fit_student_predictor.RidgeLOOSearchCV', return_value=mock_search)
+        mock_random = mocker.patch('src.fit_student_predictor.RandomizedSearchCV')
+        mock_chart = MagicMock()
+        mock_chart.mark_line.return_value = mock_chart
+        mock_chart.mark_circle.return_value = mock_chart
+        mock_chart.mark_text.return_value = mock_chart
+        mock_chart.encode.return_value = mock_chart
+        mock_chart.__add__ = lambda self, other: mock_chart
+        mocker.patch('src.fit_student_predictor.alt.Chart', return_value=mock_chart)
+
+        pipeline_dir = tmp_path / "models"
+        plot_dir = tmp_path / "figures"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--training-data', 'data/processed/student_train.csv',
+            '--preprocessor', 'results/models/student_preprocessor.pickle',
+            '--pipeline-to', str(pipeline_dir),
+            '--plot-to', str(plot_dir),
+            '--cv-strategy', cv_strategy
+        ])
+
+        assert mock_loo.call_args.kwargs['mode'] == cv_strategy
+        mock_random.assert_not_called()
+        assert (pipeline_dir / "student_pipeline.pickle").exists()
+        assert (pipeline_dir / "best_params.csv").exists()
+
+    def test_main_fits_out_of_core_with_chunksize(
+        self, mocker: MockerFixture, tmp_path: Path, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that --chunksize streams the training data into IncrementalRidgeCV and caches its statistics.
+
+        Parameters
+        ----------
+        mocker : pytest_mock.MockerFixture
+            The pytest-mock mocker fixture.
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        train_path = tmp_path / "student_train.parquet"
+        synthetic_student_df.to_parquet(train_path, index=False)
+        preprocessor_path = tmp_path / "student_preprocessor.pickle"
+        with open(preprocessor_path, "wb") as f:
+            pickle.dump(create_preprocessor(), f)
+        mock_read_table = mocker.patch('src.fit_student_predictor.read_table')
+
+        mock_check = MagicMock()
+        mock_check.add_condition_feature_pps_less_than.return_value = mock_check
+        mock_check.add_condition_max_number_of_pairs_above_threshold.return_value = mock_check
+        mock_check.run.return_value.passed_conditions.return_value = True
+        mocker.patch('src.fit_student_predictor.FeatureLabelCorrelation', return_value=mock_check)
+        mocker.patch('src.fit_student_predictor.FeatureFeatureCorrelation', return_value=mock_check)
+        mock_dataset = mocker.patch('src.fit_student_predictor.Dataset')
+        mock_chart = MagicMock()
+        mock_chart.mark_line.return_value = mock_chart
+        mock_chart.mark_circle.return_value = mock_chart
+        mock_chart.mark_text.return_value = mock_chart
+        mock_chart.encode.return_value = mock_chart
+        mock_chart.__add__ = lambda self, other: mock_chart
+        mocker.patch('src.fit_student_predictor.alt.Chart', return_value=mock_chart)
+
+        pipeline_dir = tmp_path / "models"
+        result = CliRunner().invoke(main, [
+            '--training-data', str(train_path),
+            '--preprocessor', str(preprocessor_path),
+            '--pipeline-to', str(pipeline_dir),
+            '--plot-to', str(tmp_path / "figures"),
+            '--chunksize', '25'
+        ])
+
+        assert result.exit_code == 0, result.output
+        mock_read_table.assert_not_called()
+        assert len(mock_dataset.call_args.args[0]) == len(synthetic_student_df)
+        assert "Incremental fit: 3 passes" in result.output
+        assert (pipeline_dir / "student_model.npz").exists()
+        assert pd.read_csv(pipeline_dir / "best_params.csv")["best_cv_mae"].iloc[0] > 0
+
+        # re-tuning with other folds and alphas reuses the cached statistics
+        rerun = CliRunner().invoke(main, [
+            '--training-data', str(train_path),
+            '--preprocessor', str(preprocessor_path),
+            '--pipeline-to', str(pipeline_dir),
+            '--plot-to', str(tmp_path / "figures"),
+            '--chunksize', '25',
+            '--n-folds', '5',
+            '--alpha-range', '0.1', '100'
+        ])
+
+        assert rerun.exit_code == 0, rerun.output
+        assert "Incremental fit: 1 pass over" in rerun.output
+        assert "Statistics cache: 1 hits, 0 misses" in rerun.output
+        assert 0.1 <= pd.read_csv(pipeline_dir / "best_params.csv")["best_alpha"].iloc[0] <= 100
+        assert "Reusing the cached correlation check results" in rerun.output
+        assert mock_dataset.call_count == 1
+
+        # a Gram scorer on cached statistics and checks reads no data at all
+        iter_table = mocker.patch('src.fit_student_predictor.iter_table')
+        r2_run = CliRunner().invoke(main, [
+            '--training-data', str(train_path),
+            '--preprocessor', str(preprocessor_path),
+            '--pipeline-to', str(pipeline_dir),
+            '--plot-to', str(tmp_path / "figures"),
+            '--chunksize', '25',
+            '--scoring', 'r2'
+        ])
+
+        assert r2_run.exit_code == 0, r2_run.output
+        iter_table.assert_not_called()
+        assert "Incremental fit: 0 passes" in r2_run.output and "Best CV R2:" in r2_run.output
+        assert list(pd.read_csv(pipeline_dir / "best_params.csv").columns) == ["best_alpha", "best_cv_r2"]
+
+    def test_main_random_search_fits_preprocessor_once_per_fold(
+        self, mocker: MockerFixture, tmp_path: Path, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that the random search shares each fold's fitted preprocessor between candidates.
+
+        Parameters
+        ----------
+        mocker : pytest_mock.MockerFixture
+            The pytest-mock mocker fixture.
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        train_path = tmp_path / "student_train.parquet"
+        synthetic_student_df.to_parquet(train_path, index=False)
+        preprocessor_path = tmp_path / "student_preprocessor.pickle"
+        with open(preprocessor_path, "wb") as f:
+            pickle.dump(create_preprocessor(), f)
+        mocker.patch('src.fit_student_predictor.correlation_gates',
+                     return_value={"feature_label": True, "feature_feature": True})
+
+        pipeline_dir = tmp_path / "models"
+        result = CliRunner().invoke(main, [
+            '--training-data', str(train_path),
+            '--preprocessor', str(preprocessor_path),
+            '--pipeline-to', str(pipeline_dir),
+            '--n-folds', '3',
+            '--no-plots'
+        ])
+
+        assert result.exit_code == 0, result.output
+        # one fit per fold plus the refit on all rows; every other fit is a hit
+        assert "Preprocessor cache: 297 hits, 4 misses (301 pipeline fits)" in result.output
+        with open(pipeline_dir / "student_pipeline.pickle", "rb") as f:
+            assert pickle.load(f).best_estimator_.memory is None
+
+    def test_main_native_correlation_backend_rejects_leaked_label(
+        self, mocker: MockerFixture, tmp_path: Path, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that --correlation-backend native gates the data without deepchecks.
+
+        Parameters
+        ----------
+        mocker : pytest_mock.MockerFixture
+            The pytest-mock mocker fixture.
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        train_path = tmp_path / "student_train.parquet"
+        synthetic_student_df.assign(Walc=synthetic_student_df["G3"]).to_parquet(train_path, index=False)
+        preprocessor_path = tmp_path / "student_preprocessor.pickle"
+        with open(preprocessor_path, "wb") as f:
+            pickle.dump(create_preprocessor(), f)
+        mock_dataset = mocker.patch('src.fit_student_predictor.Dataset')
+        mock_search = mocker.patch('src.fit_student_predictor.RandomizedSearchCV')
+
+        result = CliRunner().invoke(main, [
+            '--training-data', str(train_path),
+            '--preprocessor', str(preprocessor_path),
+            '--pipeline-to', str(tmp_path / "models"),
+            '--plot-to', str(tmp_path / "figures"),
+            '--correlation-backend', 'native'
+        ])
+
+        assert isinstance(result.exception, ValueError)
+        assert "Feature-Label correlation" in str(result.exception)
+        mock_dataset.assert_not_called()
+        mock_search.assert_not_called()
@@ -0,0 +1,123 @@
+import pickle
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from sklearn.model_selection import KFold
+
+from src.fold_cache import FoldTransformCache, StatisticsCache, fingerprint_estimator, fingerprint_file, fingerprint_frame
+from src.preprocess_data import create_preprocessor
+from src.ridge_path_search import RidgePathSearchCV
+
+
+@pytest.fixture
+def features(synthetic_student_df: pd.DataFrame) -> pd.DataFrame:
+    """Feature columns of the synthetic student data."""
+    return synthetic_student_df.drop(columns=["G3"])
+
+
+class TestFingerprints:
+    """Tests for the content fingerprints used as cache keys."""
+
+    def test_identical_preprocessors_share_fingerprint(self) -> None:
+        """Test that two freshly built preprocessors hash identically."""
+        assert fingerprint_estimator(create_preprocessor()) == fingerprint_estimator(create_preprocessor())
+
+    def test_preprocessor_config_changes_fingerprint(self) -> None:
+        """Test that changing a nested parameter changes the fingerprint."""
+        changed = create_preprocessor().set_params(standardscaler__with_mean=False)
+        assert fingerprint_estimator(changed) != fingerprint_estimator(create_preprocessor())
+
+    def test_data_change_changes_fingerprint(self, features: pd.DataFrame) -> None:
+        """Test that editing one value changes the frame fingerprint."""
+        edited = features.copy()
+        edited.loc[edited.index[0], "absences"] += 1
+        assert fingerprint_frame(edited) != fingerprint_frame(features)
+
+
+class TestFoldTransformCache:
+    """Tests for the LRU fold cache."""
+
+    def test_counts_hits_and_misses(self, features: pd.DataFrame) -> None:
+        """Test that a repeated split is served from the cache."""
+        cache = FoldTransformCache()
+        train, test = np.arange(0, 80), np.arange(80, 120)
+
+        first = cache.get_or_fit(create_preprocessor(), features, train, test)
+        second = cache.get_or_fit(create_preprocessor(), features, train, test)
+
+        assert second is first
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "max_entries": 32}
+        assert first[1].shape[0] == 80 and first[2].shape[0] == 40
+
+    def test_evicts_least_recently_used(self, features: pd.DataFrame) -> None:
+        """Test that the oldest untouched split is evicted first."""
+        cache = FoldTransformCache(max_entries=2)
+        splits = list(KFold(n_splits=3).split(features))
+
+        cache.get_or_fit(create_preprocessor(), features, *splits[0])
+        cache.get_or_fit(create_preprocessor(), features, *splits[1])
+        cache.get_or_fit(create_preprocessor(), features, *splits[0])
+        cache.get_or_fit(create_preprocessor(), features, *splits[2])
+        cache.get_or_fit(create_preprocessor(), features, *splits[0])
+        cache.get_or_fit(create_preprocessor(), features, *splits[1])
+
+        assert len(cache) == 2
+        assert cache.hits == 2
+        assert cache.misses == 4
+
+    def test_pickle_drops_entries(self, features: pd.DataFrame) -> None:
+        """Test that pickling keeps the configuration but not the folds."""
+        cache = FoldTransformCache(max_entries=5)
+        cache.get_or_fit(create_preprocessor(), features, np.arange(60), np.arange(60, 120))
+
+        restored = pickle.loads(pickle.dumps(cache))
+
+        assert len(restored) == 0
+        assert restored.max_entries == 5
+
+    def test_search_reuses_cached_folds(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a second search over the same folds only hits the cache."""
+        cache = FoldTransformCache()
+        X = synthetic_student_df.drop(columns=["G3"])
+        y = synthetic_student_df["G3"]
+
+        for scoring in ["neg_mean_absolute_error", "r2"]:
+            RidgePathSearchCV(
+                create_preprocessor(), {"ridge__alpha": [0.1, 1.0]},
+                n_iter=2, cv=4, scoring=scoring, cache=cache
+            ).fit(X, y)
+
+        assert cache.misses == 4
+        assert cache.hits == 4
+
+
+class TestStatisticsCache:
+    """Tests for the on-disk cache of sufficient statistics."""
+
+    def test_file_fingerprint_follows_content(self, tmp_path: Path) -> None:
+        """Test that files hash by content, not by name."""
+        for name, content in (("a.csv", b"x;y\n1;2\n"), ("b.csv", b"x;y\n1;2\n"), ("c.csv", b"x;y\n1;3\n")):
+            (tmp_path / name).write_bytes(content)
+
+        assert fingerprint_file(tmp_path / "a.csv") == fingerprint_file(tmp_path / "b.csv", block_size=3)
+        assert fingerprint_file(tmp_path / "a.csv") != fingerprint_file(tmp_path / "c.csv")
+
+    def test_changed_inputs_invalidate_the_entry(self, tmp_path: Path) -> None:
+        """Test that new data, a new preprocessor or a new seed are cache misses."""
+        cache = StatisticsCache(str(tmp_path / "fold_statistics.pickle"))
+        preprocessor = create_preprocessor()
+        cache.save(cache.make_key("data", preprocessor, "G3", 7), "statistics")
+
+        assert cache.load(cache.make_key("data", create_preprocessor(), "G3", 7)) == "statistics"
+        assert cache.load(cache.make_key("other data", preprocessor, "G3", 7)) is None
+        assert cache.load(cache.make_key("data", preprocessor.set_params(remainder="drop"), "G3", 7)) is None
+        assert cache.load(cache.make_key("data", create_preprocessor(), "G3", 8)) is None
+        assert cache.hits == 1 and cache.misses == 3
+
+    def test_unreadable_file_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that a corrupt cache file is ignored rather than raised."""
+        path = tmp_path / "fold_statistics.pickle"
+        path.write_bytes(b"not a pickle")
+
+        assert StatisticsCache(str(path)).load("key") is None
@@ -0,0 +1,207 @@
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from scipy.stats import loguniform
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import PredefinedSplit, cross_val_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from src.fold_cache import StatisticsCache
+from src.incremental import (
+    IncrementalRidgeCV, PreprocessorStatistics, QuantileSketch, RunningMoments, preprocessor_blocks
+)
+from src.inference_artifact import export_artifact, load_artifact
+from src.preprocess_data import create_preprocessor
+from src.streaming import hash_folds, row_hashes
+
+
+def chunked(df: pd.DataFrame, size: int):
+    """Return a function yielding ``df`` in chunks of ``size`` rows, as ``iter_table`` does."""
+    return lambda: (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+class TestStatistics:
+    """Tests for the mergeable one-pass statistics."""
+
+    def test_moments_match_numpy(self) -> None:
+        """Test that chunked and merged moments equal the full-data mean and variance."""
+        values = np.random.default_rng(0).normal(5, 3, size=(1000, 3))
+        left, right = RunningMoments(3), RunningMoments(3)
+        for chunk in np.array_split(values[:600], 7):
+            left.update(chunk)
+        right.update(values[600:])
+
+        left.merge(right)
+
+        np.testing.assert_allclose(left.mean, values.mean(axis=0))
+        np.testing.assert_allclose(left.var, values.var(axis=0))
+
+    def test_sketch_is_exact_for_few_distinct_values(self) -> None:
+        """Test that the sketch reproduces np.percentile while it holds every distinct value."""
+        values = np.random.default_rng(0).integers(0, 40, 1001).astype(float)
+        sketch, other = QuantileSketch(capacity=64), QuantileSketch(capacity=64)
+        for chunk in np.array_split(values[:500], 9):
+            sketch.update(chunk)
+        other.update(values[500:])
+
+        sketch.merge(other)
+
+        assert sketch.exact
+        for q in (0, 0.25, 0.5, 0.75, 1):
+            assert sketch.quantile(q) == pytest.approx(np.percentile(values, 100 * q))
+
+    def test_sketch_is_close_beyond_capacity(self) -> None:
+        """Test that a compressed sketch stays within about one bucket of the true quantile."""
+        values = np.random.default_rng(0).normal(size=100_000)
+        sketch = QuantileSketch(capacity=256)
+        for chunk in np.array_split(values, 50):
+            sketch.update(chunk)
+
+        assert not sketch.exact
+        for q in (0.25, 0.5, 0.75):
+            assert np.mean(values <= sketch.quantile(q)) == pytest.approx(q, abs=2 / 256)
+
+    def test_fitted_blocks_match_sklearn(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that statistics gathered in chunks give the parameters sklearn fits."""
+        X = synthetic_student_df.drop(columns=["G3"])
+        statistics = PreprocessorStatistics(preprocessor_blocks(create_preprocessor(), list(X.columns)))
+        for i in range(0, len(X), 17):
+            statistics.update(X.iloc[i:i + 17])
+
+        blocks, names = statistics.fitted_blocks()
+        fitted = create_preprocessor().fit(X)
+
+        assert names == list(fitted.get_feature_names_out())
+        scaler = fitted.named_transformers_["robustscaler"]
+        robust = next(block for block in blocks if block["columns"] == ["absences"])
+        np.testing.assert_allclose(robust["offset"], scaler.center_)
+        np.testing.assert_allclose(robust["scale"], scaler.scale_)
+
+    def test_unsupported_transformer_is_rejected(self) -> None:
+        """Test that transformers without an incremental equivalent raise."""
+        preprocessor = ColumnTransformer([("poly", PolynomialFeatures(), ["G1"])])
+
+        with pytest.raises(ValueError, match="Cannot fit transformer 'poly'"):
+            preprocessor_blocks(preprocessor, ["G1", "G2"])
+
+
+class TestIncrementalRidgeCV:
+    """Tests for the out-of-core cross-validated Ridge."""
+
+    @pytest.mark.parametrize("scoring", ["neg_mean_absolute_error", "neg_root_mean_squared_error", "r2"])
+    def test_matches_sklearn_on_hash_folds(self, synthetic_student_df: pd.DataFrame, scoring: str) -> None:
+        """
+        Test that fold scores and the final model equal sklearn's on the same folds.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        scoring : str
+            Scorer compared.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        y = synthetic_student_df["G3"]
+        search = IncrementalRidgeCV(
+            create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)},
+            n_iter=5, cv=4, scoring=scoring, random_state=7
+        ).fit(chunked(synthetic_student_df, 25), "G3")
+
+        folds = PredefinedSplit(hash_folds(row_hashes(synthetic_student_df), 4, 7))
+        for i, alpha in enumerate(search.cv_results_["param_ridge__alpha"]):
+            pipeline = make_pipeline(create_preprocessor(), Ridge(alpha=alpha))
+            expected = cross_val_score(pipeline, X, y, cv=folds, scoring=scoring)
+            scores = [search.cv_results_[f"split{f}_test_score"][i] for f in range(4)]
+            np.testing.assert_allclose(scores, expected, rtol=1e-8)
+
+        best = make_pipeline(create_preprocessor(), Ridge(alpha=search.best_params_["ridge__alpha"])).fit(X, y)
+        np.testing.assert_allclose(search.predict(X), best.predict(X), rtol=1e-8)
+        assert search.n_passes_ == (3 if scoring == "neg_mean_absolute_error" else 2)
+
+    def test_results_do_not_depend_on_chunking(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that any chunk size gives the same scores, Gram matrices and model."""
+        def fit(size: int) -> IncrementalRidgeCV:
+            return IncrementalRidgeCV(
+                create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)}, n_iter=5, cv=4, random_state=7
+            ).fit(chunked(synthetic_student_df, size), "G3")
+
+        small, large = fit(7), fit(120)
+
+        np.testing.assert_allclose(small.cv_results_["mean_test_score"], large.cv_results_["mean_test_score"])
+        np.testing.assert_allclose(small.fold_grams_, large.fold_grams_)
+        np.testing.assert_allclose(small.artifact_.coef, large.artifact_.coef)
+
+    def test_exports_a_loadable_artifact(self, synthetic_student_df: pd.DataFrame, tmp_path: Path) -> None:
+        """Test that export_artifact writes the fitted model of the search."""
+        search = IncrementalRidgeCV(
+            create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)}, n_iter=3, cv=3, random_state=0
+        ).fit(chunked(synthetic_student_df, 50), "G3")
+
+        export_artifact(search, tmp_path / "model.npz")
+
+        X = synthetic_student_df.drop(columns=["G3"])
+        np.testing.assert_allclose(load_artifact(tmp_path / "model.npz").predict(X), search.predict(X))
+
+    @pytest.mark.parametrize("cv,message", [(60, "received no rows"), (7, "must divide 120")])
+    def test_unusable_fold_counts_are_rejected(self, synthetic_student_df: pd.DataFrame, cv: int,
+                                               message: str) -> None:
+        """
+        Test that empty folds and fold counts the buckets cannot form fail clearly.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        cv : int
+            Number of folds requested.
+        message : str
+            Expected error message.
+        """
+        search = IncrementalRidgeCV(create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)}, cv=cv)
+
+        with pytest.raises(ValueError, match=message):
+            search.fit(chunked(synthetic_student_df.iloc[:10], 5), "G3")
+
+
+class TestStatisticsCache:
+    """Tests for reusing the sufficient statistics across searches."""
+
+    def test_retuning_reuses_statistics(self, synthetic_student_df: pd.DataFrame, tmp_path: Path,
+                                        mocker) -> None:
+        """
+        Test that another fold count and scorer are tuned without reading the data.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        mocker : MockerFixture
+            Pytest-mock fixture.
+        """
+        cache = StatisticsCache(str(tmp_path / "fold_statistics.pickle"))
+        read_chunks = mocker.Mock(side_effect=chunked(synthetic_student_df, 30))
+
+        def fit(cv: int, scoring: str, alphas) -> IncrementalRidgeCV:
+            return IncrementalRidgeCV(
+                create_preprocessor(), {"ridge__alpha": alphas}, n_iter=5, cv=cv, scoring=scoring,
+                random_state=7, cache=cache
+            ).fit(read_chunks, "G3", data_key="data")
+
+        fit(10, "r2", loguniform(1e-3, 1e3))
+        assert read_chunks.call_count == 2
+        cached = fit(4, "neg_root_mean_squared_error", loguniform(1e-1, 1e2))
+        assert read_chunks.call_count == 2
+        assert cached.n_passes_ == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        fresh = IncrementalRidgeCV(
+            create_preprocessor(), {"ridge__alpha": loguniform(1e-1, 1e2)}, n_iter=5, cv=4,
+            scoring="neg_root_mean_squared_error", random_state=7
+        ).fit(chunked(synthetic_student_df, 30), "G3")
+        np.testing.assert_allclose(cached.cv_results_["mean_test_score"], fresh.cv_results_["mean_test_score"])
+        np.testing.assert_allclose(cached.artifact_.coef, fresh.artifact_.coef)
@@ -0,0 +1,105 @@
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from src.inference_artifact import LinearModelArtifact, export_artifact, load_artifact
+
+
+class TestInferenceArtifact:
+    """Tests for exporting and loading the NumPy-only artifact."""
+
+    def test_round_trip_matches_pipeline(self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the loaded artifact reproduces the pipeline's outputs.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        path = tmp_path / "student_model.npz"
+        export_artifact(fitted_pipeline, str(path))
+        artifact = load_artifact(str(path))
+        X = synthetic_student_df.drop(columns=["G3"])
+
+        assert isinstance(artifact, LinearModelArtifact)
+        np.testing.assert_allclose(artifact.transform(X), fitted_pipeline[:-1].transform(X).to_numpy(), atol=1e-12)
+        np.testing.assert_allclose(artifact.predict(X), fitted_pipeline.predict(X), rtol=1e-12)
+        assert list(artifact.feature_names) == list(fitted_pipeline[:-1].get_feature_names_out())
+
+    def test_accepts_column_mapping(self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that predict works on a plain dict of columns.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        path = tmp_path / "student_model.npz"
+        export_artifact(fitted_pipeline, str(path))
+        X = synthetic_student_df.drop(columns=["G3"]).head(3)
+
+        records = {column: X[column].tolist() for column in X.columns}
+
+        np.testing.assert_allclose(load_artifact(str(path)).predict(records), fitted_pipeline.predict(X))
+
+    @pytest.mark.parametrize("column,value,raises", [
+        ("Mjob", "astronaut", False),
+        ("school", "XX", True),
+    ])
+    def test_unknown_categories_follow_handle_unknown(
+        self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame,
+        column: str, value: str, raises: bool
+    ) -> None:
+        """
+        Test that unknown nominal levels are ignored and unknown binary levels raise.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        column : str
+            Column receiving the unseen value.
+        value : str
+            Unseen category.
+        raises : bool
+            Whether the encoder uses handle_unknown="error".
+        """
+        path = tmp_path / "student_model.npz"
+        export_artifact(fitted_pipeline, str(path))
+        artifact = load_artifact(str(path))
+        X = synthetic_student_df.drop(columns=["G3"]).head(2).copy()
+        X[column] = value
+
+        if raises:
+            with pytest.raises(ValueError, match="unknown categories"):
+                artifact.predict(X)
+        else:
+            np.testing.assert_allclose(artifact.predict(X), fitted_pipeline.predict(X))
+
+    def test_rejects_unsupported_transformer(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that non-linear preprocessing steps cannot be exported."""
+        pipeline = make_pipeline(
+            make_column_transformer((PolynomialFeatures(), ["G1", "G2"])), Ridge()
+        ).fit(synthetic_student_df, synthetic_student_df["G3"])
+
+        with pytest.raises(ValueError, match="Cannot export"):
+            export_artifact(pipeline, str(tmp_path / "model.npz"))
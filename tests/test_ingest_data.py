@@ -0,0 +1,117 @@
+import pytest
+import csv
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from click.testing import CliRunner
+
+from src.ingest_data import main, normalize_quoted_numerics
+from src.preprocess_data import main as preprocess_main
+
+
+@pytest.fixture
+def raw_dir(tmp_path: Path, synthetic_student_df: pd.DataFrame) -> Path:
+    """
+    Raw files written like the UCI ones: strings and the G1/G2 grades quoted.
+
+    Returns
+    -------
+    Path
+        Directory holding student-por.csv and student-mat.csv.
+    """
+    directory = tmp_path / "raw"
+    directory.mkdir()
+    quoted = synthetic_student_df.astype({"G1": str, "G2": str})
+    quoted.to_csv(directory / "student-por.csv", sep=";", index=False, quoting=csv.QUOTE_NONNUMERIC)
+    quoted.head(50).to_csv(directory / "student-mat.csv", sep=";", index=False, quoting=csv.QUOTE_NONNUMERIC)
+    return directory
+
+
+class TestNormalizeQuotedNumerics:
+    """Tests for the numeric clean-up of text columns."""
+
+    def test_converts_only_all_numeric_text(self) -> None:
+        """Test that padded or doubly quoted numbers become numbers and other text columns stay."""
+        df = pd.DataFrame({
+            "G1": ['" 9"', "'11'", " 0 "],
+            "ratio": ["0.5", '"1e-3"', "2"],
+            "school": ["GP", "MS", "GP"],
+            "mixed": ["1", "two", "3"],
+            "missing": ["1", None, "3"],
+            "age": [15, 16, 17],
+        })
+
+        normalized_df, normalized = normalize_quoted_numerics(df)
+
+        assert normalized == ["G1", "ratio"]
+        assert normalized_df["G1"].tolist() == [9, 11, 0] and normalized_df["G1"].dtype == np.int64
+        assert normalized_df["ratio"].tolist() == [0.5, 0.001, 2.0]
+        pd.testing.assert_frame_equal(normalized_df[["school", "mixed", "missing", "age"]],
+                                      df[["school", "mixed", "missing", "age"]])
+        assert df["G1"].dtype == object
+
+
+class TestMain:
+    """Tests for the ingest command."""
+
+    def test_writes_typed_tables_and_manifest(self, tmp_path: Path, raw_dir: Path,
+                                              synthetic_student_df: pd.DataFrame) -> None:
+        """Test that every raw CSV becomes a Parquet table equal to the parsed file, described in the manifest."""
+        result = CliRunner().invoke(main, ['--raw-dir', str(raw_dir), '--write-to', str(tmp_path / "ingested")])
+
+        assert result.exit_code == 0, result.output
+        table = pd.read_parquet(tmp_path / "ingested" / "student-por.parquet")
+        pd.testing.assert_frame_equal(table, synthetic_student_df)
+        manifest = json.loads((tmp_path / "ingested" / "manifest.json").read_text())
+        assert manifest["format"] == "parquet"
+        assert sorted(manifest["tables"]) == ["student-mat", "student-por"]
+        entry = manifest["tables"]["student-por"]
+        assert entry["rows"] == len(synthetic_student_df)
+        assert entry["columns"]["G1"] == "int64" and entry["columns"]["school"] == "object"
+        assert manifest["tables"]["student-mat"]["rows"] == 50
+
+    def test_unchanged_files_are_not_ingested_again(self, tmp_path: Path, raw_dir: Path) -> None:
+        """Test that a second run keeps matching tables and re-ingests only a changed source or a deleted table."""
+        arguments = ['--raw-dir', str(raw_dir), '--write-to', str(tmp_path / "ingested")]
+        CliRunner().invoke(main, arguments)
+
+        second = CliRunner().invoke(main, arguments)
+        assert second.output.count("Unchanged, not ingested again") == 2
+
+        (raw_dir / "student-mat.csv").write_text((raw_dir / "student-mat.csv").read_text().rsplit("\n", 2)[0])
+        (tmp_path / "ingested" / "student-por.parquet").unlink()
+        third = CliRunner().invoke(main, arguments)
+
+        assert third.exit_code == 0, third.output
+        assert "Unchanged" not in third.output
+        manifest = json.loads((tmp_path / "ingested" / "manifest.json").read_text())
+        assert manifest["tables"]["student-mat"]["rows"] == 49
+
+    def test_rejects_missing_and_malformed_input(self, tmp_path: Path) -> None:
+        """Test that an empty raw directory and a CSV with a malformed row fail."""
+        (tmp_path / "raw").mkdir()
+        empty = CliRunner().invoke(main, ['--raw-dir', str(tmp_path / "raw"), '--write-to', str(tmp_path / "out")])
+        assert empty.exit_code != 0 and "no CSV files" in empty.output
+
+        (tmp_path / "raw" / "student-por.csv").write_text("a;b\n1;2\n3;4;5\n")
+        malformed = CliRunner().invoke(main, ['--raw-dir', str(tmp_path / "raw"), '--write-to', str(tmp_path / "out")])
+        assert isinstance(malformed.exception, ValueError) and "not a valid CSV" in str(malformed.exception)
+
+    def test_preprocess_reads_ingested_table(self, tmp_path: Path, raw_dir: Path) -> None:
+        """Test that preprocessing the ingested table writes the same splits as preprocessing the raw CSV."""
+        CliRunner().invoke(main, ['--raw-dir', str(raw_dir), '--write-to', str(tmp_path / "ingested")])
+
+        for name, raw_data in (("from_csv", raw_dir / "student-por.csv"),
+                               ("from_table", tmp_path / "ingested" / "student-por.parquet")):
+            for chunking in ([], ['--chunksize', '40']):
+                result = CliRunner().invoke(preprocess_main, [
+                    '--raw-data', str(raw_data), '--data-to', str(tmp_path / name / str(len(chunking))),
+                    '--preprocessor-to', str(tmp_path / "models"), *chunking
+                ])
+                assert result.exit_code == 0, result.output
+
+        for chunked in ("0", "2"):
+            for table in ("student_train.parquet", "transformed_student_test.parquet"):
+                pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "from_table" / chunked / table),
+                                              pd.read_parquet(tmp_path / "from_csv" / chunked / table))
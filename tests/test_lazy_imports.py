@@ -0,0 +1,100 @@
+import pytest
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from src.lazy_imports import lazy_import
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# libraries that no script may import just to print --help
+HEAVY = ["altair", "altair_ally", "deepchecks", "matplotlib", "pandera", "requests", "scipy", "sklearn"]
+
+# seconds of import time allowed for ``<script> --help``: pandas (about
+# 0.5 s) plus headroom for slow machines; the scripts loading every library
+# eagerly took 2-7.5 s
+BUDGETS = {
+    "download_data.py": 0.5,
+    "run_pipeline.py": 0.5,
+    "train_many.py": 0.5,
+    "ingest_data.py": 0.5,
+    "preprocess_data.py": 2.0,
+    "eda.py": 2.0,
+    "fit_student_predictor.py": 2.0,
+    "evaluate_student_predictor.py": 2.0,
+    "predict_students.py": 2.0,
+    "serve_predictions.py": 2.0,
+}
+
+
+def import_profile(script: str) -> tuple:
+    """
+    Run ``script --help`` under ``python -X importtime``.
+
+    Returns
+    -------
+    tuple of (float, set)
+        Seconds spent importing top-level modules, and the names of every
+        module imported.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", os.path.join("src", script), "--help"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    seconds, modules = 0.0, set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        # nested imports are indented below their importer
+        if not name.startswith("  "):
+            seconds += int(cumulative) / 1e6
+    return seconds, modules
+
+
+class TestLazyImport:
+    """Tests for the lazy module and attribute stand-ins."""
+
+    def test_module_is_imported_on_first_use(self) -> None:
+        """Test that binding does not import and the first attribute access does."""
+        code = ("from src.lazy_imports import lazy_import; import sys; mod = lazy_import('colorsys'); "
+                "before = 'colorsys' in sys.modules; mod.rgb_to_hsv(0, 0, 0); print(before, 'colorsys' in sys.modules)")
+        completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+        assert completed.stdout.split() == ["False", "True"]
+
+    def test_attribute_stands_in_for_class(self) -> None:
+        """Test that calls and isinstance checks reach the class."""
+        Fraction = lazy_import("fractions", "Fraction")
+
+        assert Fraction(1, 2) + Fraction(1, 2) == 1
+        assert isinstance(Fraction(1, 3), Fraction)
+        assert "fractions.Fraction" in repr(Fraction)
+
+    def test_patching_through_the_stand_in(self) -> None:
+        """Test that mock.patch through a stand-in patches and restores the library itself."""
+        import colorsys
+        original = colorsys.rgb_to_hsv
+        holder = mock.Mock(colorsys=lazy_import("colorsys"))
+
+        with mock.patch.object(holder.colorsys, "rgb_to_hsv", return_value="patched"):
+            assert colorsys.rgb_to_hsv(0, 0, 0) == "patched"
+
+        assert colorsys.rgb_to_hsv is original
+
+    def test_patching_the_library_is_seen(self) -> None:
+        """Test that the target is looked up on every use, not cached."""
+        hsv = lazy_import("colorsys", "rgb_to_hsv")
+
+        with mock.patch("colorsys.rgb_to_hsv", return_value="patched"):
+            assert hsv(0, 0, 0) == "patched"
+        assert hsv(0, 0, 0) == (0, 0, 0)
+
+
+@pytest.mark.parametrize("script", sorted(BUDGETS))
+def test_help_startup_budget(script: str) -> None:
+    """Test that --help loads no heavy library and stays within its import-time budget."""
+    seconds, modules = import_profile(script)
+
+    assert not modules & set(HEAVY), f"{script} imports {sorted(modules & set(HEAVY))} at startup"
+    assert seconds < BUDGETS[script], f"{script} spent {seconds:.2f}s importing (budget {BUDGETS[script]}s)"
@@ -0,0 +1,81 @@
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn import config_context
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+
+from src.parallel import can_fork, parallel_predict, parallel_transform, row_ranges
+from src.preprocess_data import create_preprocessor
+
+needs_fork = pytest.mark.skipif(not can_fork(), reason="row sharding needs the 'fork' start method")
+
+
+@pytest.fixture
+def shuffled_features(synthetic_student_df: pd.DataFrame) -> pd.DataFrame:
+    """Synthetic features with a shuffled, non-contiguous index, as after a train/test split."""
+    return synthetic_student_df.drop(columns=["G3"]).sample(frac=1, random_state=1)
+
+
+class TestRowRanges:
+    """Tests for splitting rows into contiguous shards."""
+
+    @pytest.mark.parametrize("n_rows,n_shards", [(10, 3), (7, 7), (3, 8), (1000, 32)])
+    def test_covers_rows_in_order(self, n_rows: int, n_shards: int) -> None:
+        """Test that the ranges tile every row exactly once and are balanced."""
+        ranges = row_ranges(n_rows, n_shards)
+        sizes = [stop - start for start, stop in ranges]
+
+        assert ranges[0][0] == 0 and ranges[-1][1] == n_rows
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        assert len(ranges) == min(n_rows, n_shards)
+        assert max(sizes) - min(sizes) <= 1
+
+
+@needs_fork
+class TestParallel:
+    """Tests for sharded transform and predict across worker processes."""
+
+    def test_transform_matches_serial(self, shuffled_features: pd.DataFrame) -> None:
+        """
+        Test that the sharded transform restores values, dtypes, columns and index.
+
+        Parameters
+        ----------
+        shuffled_features : pd.DataFrame
+            Synthetic features with a shuffled index.
+        """
+        with config_context(transform_output="pandas"):
+            preprocessor = create_preprocessor().fit(shuffled_features)
+            expected = preprocessor.transform(shuffled_features)
+            result = parallel_transform(preprocessor, shuffled_features, workers=3, sample_rows=16)
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_transform_numpy_output(self, shuffled_features: pd.DataFrame) -> None:
+        """Test that a transformer with default NumPy output is sharded too."""
+        with config_context(transform_output="default"):
+            preprocessor = create_preprocessor().fit(shuffled_features)
+            result = parallel_transform(preprocessor, shuffled_features, workers=2)
+
+            np.testing.assert_array_equal(result, preprocessor.transform(shuffled_features))
+
+    def test_predict_matches_serial(self, shuffled_features: pd.DataFrame,
+                                    synthetic_student_df: pd.DataFrame) -> None:
+        """Test that sharded predictions come back in the original row order."""
+        y = synthetic_student_df.loc[shuffled_features.index, "G3"]
+        pipeline = make_pipeline(create_preprocessor(), Ridge()).fit(shuffled_features, y)
+
+        result = parallel_predict(pipeline, shuffled_features, workers=4)
+
+        np.testing.assert_allclose(result, pipeline.predict(shuffled_features), rtol=1e-12)
+
+    def test_worker_errors_propagate(self, shuffled_features: pd.DataFrame) -> None:
+        """Test that an exception raised in a worker reaches the caller."""
+        preprocessor = create_preprocessor().fit(shuffled_features)
+        broken = shuffled_features.copy()
+        # only the last shard is bad, so the error is raised inside a worker
+        broken.iloc[-5:, broken.columns.get_loc("school")] = "XX"
+
+        with pytest.raises(ValueError, match="unknown categor"):
+            parallel_transform(preprocessor, broken, workers=2, sample_rows=16)
@@ -0,0 +1,192 @@
+import pytest
+import pandas as pd
+import numpy as np
+import pickle
+from pathlib import Path
+from click.testing import CliRunner
+from pandera.errors import SchemaErrors
+
+from src.fast_validation import FastSchemaErrors
+from src.inference_artifact import export_artifact
+from src.predict_students import create_feature_schema, main
+
+
+class TestCreateFeatureSchema:
+    """Tests for the schema of unlabeled records."""
+
+    def test_drops_target_and_duplicate_check(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that duplicated unlabeled rows pass and G3 is not required."""
+        features = synthetic_student_df.drop(columns=["G3"])
+        duplicated = pd.concat([features, features.head(3)], ignore_index=True)
+
+        schema = create_feature_schema()
+
+        assert "G3" not in schema.columns
+        schema.validate(duplicated, lazy=True)
+
+
+class TestMain:
+    """Tests for the chunked batch prediction CLI."""
+
+    @pytest.mark.parametrize("model_file", ["student_pipeline.pickle", "student_model.npz"])
+    def test_chunked_predictions_match_pipeline(
+        self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame, model_file: str
+    ) -> None:
+        """
+        Test that chunked scoring writes one prediction per input row, in order.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        model_file : str
+            Pickled pipeline or .npz artifact to score with.
+        """
+        model_path = tmp_path / model_file
+        if model_file.endswith(".npz"):
+            export_artifact(fitted_pipeline, str(model_path))
+        else:
+            with open(model_path, "wb") as f:
+                pickle.dump(fitted_pipeline, f)
+        input_path = tmp_path / "new_students.csv"
+        synthetic_student_df.to_csv(input_path, index=False)
+        output_path = tmp_path / "predictions" / "predictions.csv"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--input', str(input_path),
+            '--pipeline-from', str(model_path),
+            '--output', str(output_path),
+            '--chunksize', '7',
+            '--keep-columns', 'school'
+        ])
+
+        assert result.exit_code == 0, result.output
+        predictions = pd.read_csv(output_path)
+        expected = fitted_pipeline.predict(synthetic_student_df.drop(columns=["G3"]))
+        assert list(predictions.columns) == ["row", "school", "predicted_G3"]
+        assert predictions["row"].tolist() == list(range(len(synthetic_student_df)))
+        assert predictions["school"].tolist() == synthetic_student_df["school"].tolist()
+        np.testing.assert_allclose(predictions["predicted_G3"], expected, rtol=1e-9)
+        assert not (tmp_path / "predictions" / "predictions.csv.part").exists()
+
+    def test_header_only_input_writes_header(
+        self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that an input without data rows gives an output with only the header row.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        model_path = tmp_path / "student_pipeline.pickle"
+        with open(model_path, "wb") as f:
+            pickle.dump(fitted_pipeline, f)
+        input_path = tmp_path / "new_students.csv"
+        synthetic_student_df.head(0).to_csv(input_path, index=False)
+        output_path = tmp_path / "predictions.csv"
+
+        result = CliRunner().invoke(main, [
+            '--input', str(input_path),
+            '--pipeline-from', str(model_path),
+            '--output', str(output_path),
+            '--keep-columns', 'school'
+        ])
+
+        assert result.exit_code == 0, result.output
+        predictions = pd.read_csv(output_path)
+        assert list(predictions.columns) == ["row", "school", "predicted_G3"] and predictions.empty
+        assert "Saved 0 predictions" in result.output
+
+    def test_invalid_chunk_fails_without_output(
+        self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that a schema violation in a later chunk aborts without a partial file.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        model_path = tmp_path / "student_pipeline.pickle"
+        with open(model_path, "wb") as f:
+            pickle.dump(fitted_pipeline, f)
+        records = synthetic_student_df.drop(columns=["G3"])
+        records.loc[100, "age"] = 99
+        input_path = tmp_path / "new_students.csv"
+        records.to_csv(input_path, index=False)
+        output_path = tmp_path / "predictions.csv"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--input', str(input_path),
+            '--pipeline-from', str(model_path),
+            '--output', str(output_path),
+            '--chunksize', '50'
+        ])
+
+        assert result.exit_code != 0
+        assert isinstance(result.exception, SchemaErrors)
+        assert 100 in result.exception.failure_cases["index"].tolist()
+        assert not output_path.exists()
+        assert not (tmp_path / "predictions.csv.part").exists()
+
+    def test_fast_validator_matches_pandera(
+        self, tmp_path: Path, fitted_pipeline, synthetic_student_df: pd.DataFrame
+    ) -> None:
+        """
+        Test that --validator fast scores valid chunks and rejects the same rows.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        model_path = tmp_path / "student_pipeline.pickle"
+        with open(model_path, "wb") as f:
+            pickle.dump(fitted_pipeline, f)
+        records = synthetic_student_df.drop(columns=["G3"])
+        valid_path = tmp_path / "valid.csv"
+        records.to_csv(valid_path, index=False)
+        records.loc[100, "age"] = 99
+        invalid_path = tmp_path / "invalid.csv"
+        records.to_csv(invalid_path, index=False)
+
+        def run(input_path: Path, output_name: str):
+            return CliRunner().invoke(main, [
+                '--input', str(input_path),
+                '--pipeline-from', str(model_path),
+                '--output', str(tmp_path / output_name),
+                '--chunksize', '50',
+                '--validator', 'fast'
+            ])
+
+        result = run(valid_path, "predictions.csv")
+        assert result.exit_code == 0, result.output
+        np.testing.assert_allclose(pd.read_csv(tmp_path / "predictions.csv")["predicted_G3"],
+                                   fitted_pipeline.predict(synthetic_student_df.drop(columns=["G3"])),
+                                   rtol=1e-9)
+
+        result = run(invalid_path, "rejected.csv")
+        assert isinstance(result.exception, FastSchemaErrors)
+        assert result.exception.failure_cases["index"].tolist() == [100]
+        assert not (tmp_path / "rejected.csv").exists()
@@ -5,6 +5,7 @@ from pathlib import Path
 from click.testing import CliRunner
 from pytest_mock import MockerFixture
 
+from src.fast_validation import FastSchemaErrors
 from src.preprocess_data import main
 
 
@@ -84,7 +85,7 @@ class TestMain:
     ])
     def test_main_saves_train_test_splits(self, mocker: MockerFixture, tmp_path: Path, sample_raw_df: pd.DataFrame, output_file: str) -> None:
         """
-        Test that main() saves train and test CSV files.
+        Test that main() saves train and test CSV files when CSV is requested.
 
         Parameters
         ----------
@@ -111,7 +112,8 @@ class TestMain:
             '--raw-data', 'data/raw/student-por.csv',
             '--data-to', str(data_dir),
             '--preprocessor-to', str(preprocessor_dir),
-            '--seed', '123'
+            '--seed', '123',
+            '--format', 'csv'
         ])
 
         # Check to_csv was called multiple times (train and test files)
@@ -154,4 +156,112 @@ class TestMain:
         # Verify train_test_split was called with random_state
         if mock_train_test_split.called:
             call_kwargs = mock_train_test_split.call_args[1]
-            assert call_kwargs.get('random_state') == 42
\ No newline at end of file
+            assert call_kwargs.get('random_state') == 42
+
+    def test_main_writes_parquet_by_default(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that main() writes compact-typed Parquet tables and no CSV unless asked.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        raw_path = tmp_path / "student-por.csv"
+        synthetic_student_df.to_csv(raw_path, sep=";", index=False)
+        data_dir = tmp_path / "processed"
+
+        runner = CliRunner()
+        result = runner.invoke(main, [
+            '--raw-data', str(raw_path),
+            '--data-to', str(data_dir),
+            '--preprocessor-to', str(tmp_path / "models"),
+            '--seed', '123'
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert sorted(p.name for p in data_dir.iterdir()) == [
+            "student_test.parquet", "student_train.parquet",
+            "transformed_student_test.parquet", "transformed_student_train.parquet",
+        ]
+        train = pd.read_parquet(data_dir / "student_train.parquet")
+        assert len(train) == 84
+        assert train["Medu"].dtype == np.uint8
+        assert train["Mjob"].dtype == pd.CategoricalDtype(["at_home", "health", "other", "services", "teacher"])
+
+
+class TestStreamingMain:
+    """Tests for preprocess_data's --chunksize streaming mode."""
+
+    @staticmethod
+    def run(raw_path: Path, out_dir: Path, *options: str):
+        """Invoke main on ``raw_path`` writing under ``out_dir``."""
+        return CliRunner().invoke(main, [
+            '--raw-data', str(raw_path),
+            '--data-to', str(out_dir / "processed"),
+            '--preprocessor-to', str(out_dir / "models"),
+            '--seed', '123',
+            *options
+        ])
+
+    def test_split_does_not_depend_on_chunksize(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that every chunk size writes the same compact, transformed splits.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        raw_path = tmp_path / "student-por.csv"
+        synthetic_student_df.to_csv(raw_path, sep=";", index=False)
+
+        tables = {}
+        for chunksize in ("7", "1000"):
+            result = self.run(raw_path, tmp_path / chunksize, '--chunksize', chunksize, '--format', 'parquet',
+                              '--format', 'csv')
+            assert result.exit_code == 0, result.output
+            processed = tmp_path / chunksize / "processed"
+            assert not list(processed.glob("*.part"))
+            tables[chunksize] = {name: pd.read_parquet(processed / f"{name}.parquet")
+                                 for name in ("student_train", "student_test", "transformed_student_train")}
+
+        for name, table in tables["7"].items():
+            pd.testing.assert_frame_equal(table, tables["1000"][name])
+        train, test = tables["7"]["student_train"], tables["7"]["student_test"]
+        assert len(train) + len(test) == len(synthetic_student_df)
+        assert 0.55 < len(train) / len(synthetic_student_df) < 0.85
+        assert train["Medu"].dtype == np.uint8
+        transformed = tables["7"]["transformed_student_train"]
+        assert len(transformed) == len(train)
+        assert transformed["G3"].tolist() == train["G3"].tolist()
+
+    def test_duplicates_across_chunks_are_rejected(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a row repeated in a later chunk fails without leaving tables behind."""
+        raw_path = tmp_path / "student-por.csv"
+        pd.concat([synthetic_student_df, synthetic_student_df.iloc[[3]]]).to_csv(raw_path, sep=";", index=False)
+
+        result = self.run(raw_path, tmp_path, '--chunksize', '50')
+
+        assert isinstance(result.exception, FastSchemaErrors)
+        assert result.exception.failure_cases["check"].tolist() == ["Duplicate rows found."]
+        assert list((tmp_path / "processed").iterdir()) == []
+        assert not (tmp_path / "models").exists()
+
+    @pytest.mark.parametrize("validator", ["pandera", "fast"])
+    def test_invalid_chunk_reports_file_positions(self, tmp_path: Path, synthetic_student_df: pd.DataFrame,
+                                                  validator: str) -> None:
+        """Test that a failing later chunk reports row positions in the whole file."""
+        raw_path = tmp_path / "student-por.csv"
+        df = synthetic_student_df.copy()
+        df.loc[110, "G1"] = 25
+        df.to_csv(raw_path, sep=";", index=False)
+
+        result = self.run(raw_path, tmp_path, '--chunksize', '50', '--validator', validator)
+
+        assert result.exit_code != 0
+        assert result.exception.failure_cases["index"].tolist() == [110]
@@ -0,0 +1,117 @@
+import pytest
+import importlib.util
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.rendering import FigureRenderer, figure_key
+
+
+def draw_text(path: str, frame: pd.DataFrame, title: str = "") -> None:
+    """Write a stand-in figure: the title and the column sums."""
+    with open(path, "w") as f:
+        f.write(f"{title} {frame.sum().tolist()}")
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    """Grades of three students."""
+    return pd.DataFrame({"G3": [10, 12, 15], "G2": [9, 12, 14]})
+
+
+class TestFigureKey:
+    """Tests for the hash figures are skipped by."""
+
+    def test_depends_on_content_not_index(self, frame: pd.DataFrame) -> None:
+        """Test that the key follows the values and parameters but not the row labels."""
+        key = figure_key(draw_text, frame, title="a")
+
+        assert figure_key(draw_text, frame.set_index(pd.Index([7, 8, 9])), title="a") == key
+        assert figure_key(draw_text, frame.assign(G3=[10, 12, 16]), title="a") != key
+        assert figure_key(draw_text, frame.astype("float64"), title="a") != key
+        assert figure_key(draw_text, frame, title="b") != key
+        assert figure_key(draw_text, frame["G3"], np.arange(3)) != figure_key(draw_text, frame["G3"], np.arange(1, 4))
+
+
+    def test_depends_on_the_drawing_module(self, tmp_path: Path, frame: pd.DataFrame, monkeypatch) -> None:
+        """Test that editing a helper or constant the drawing function uses changes the key."""
+        def load(source: str):
+            (tmp_path / "figures_module.py").write_text(source)
+            spec = importlib.util.spec_from_file_location("figures_module", tmp_path / "figures_module.py")
+            module = importlib.util.module_from_spec(spec)
+            monkeypatch.setitem(sys.modules, "figures_module", module)
+            spec.loader.exec_module(module)
+            return module
+
+        template = "COLOR = {!r}\n\ndef style():\n    return COLOR\n\ndef draw(path, frame):\n    open(path, 'w').write(style())\n"
+        key = figure_key(load(template.format("black")).draw, frame)
+
+        assert figure_key(load(template.format("black")).draw, frame) == key
+        assert figure_key(load(template.format("firebrick")).draw, frame) != key
+
+class TestFigureRenderer:
+    """Tests for background rendering and the unchanged-input skip."""
+
+    def test_skips_unchanged_and_redraws_changed(self, tmp_path: Path, frame: pd.DataFrame) -> None:
+        """Test that a figure is redrawn only when its data changes or its file is gone."""
+        with FigureRenderer(str(tmp_path / "figures"), echo=lambda message: None) as renderer:
+            assert renderer.submit("grades.png", draw_text, frame).result() is True
+        path = tmp_path / "figures" / "grades.png"
+        assert path.read_text() == " [37, 35]"
+        assert (tmp_path / "figures" / ".grades.png.sha256").exists()
+
+        with FigureRenderer(str(tmp_path / "figures"), echo=lambda message: None) as renderer:
+            renderer.submit("grades.png", draw_text, frame.copy())
+        assert renderer.skipped == [str(path)] and renderer.rendered == []
+
+        with FigureRenderer(str(tmp_path / "figures"), echo=lambda message: None) as renderer:
+            renderer.submit("grades.png", draw_text, frame.assign(G3=[0, 0, 0]))
+        assert path.read_text() == " [0, 35]"
+
+        path.unlink()
+        with FigureRenderer(str(tmp_path / "figures"), echo=lambda message: None) as renderer:
+            renderer.submit("grades.png", draw_text, frame.assign(G3=[0, 0, 0]))
+        assert renderer.rendered == [str(path)]
+
+    def test_draws_figures_concurrently(self, tmp_path: Path, frame: pd.DataFrame) -> None:
+        """Test that two figures are drawn at the same time, after submit has returned."""
+        barrier = threading.Barrier(3, timeout=10)
+
+        def draw_together(path: str, frame: pd.DataFrame) -> None:
+            barrier.wait()
+            draw_text(path, frame)
+
+        with FigureRenderer(str(tmp_path), workers=2, echo=lambda message: None) as renderer:
+            renderer.submit("a.png", draw_together, frame)
+            renderer.submit("b.png", draw_together, frame)
+            # both draws are blocked on the barrier until the caller arrives too
+            barrier.wait()
+
+        assert sorted(os.listdir(tmp_path)) == [".a.png.sha256", ".b.png.sha256", "a.png", "b.png"]
+
+    def test_disabled_draws_nothing(self, tmp_path: Path, frame: pd.DataFrame) -> None:
+        """Test that --no-plots mode neither draws nor creates the directory."""
+        with FigureRenderer(str(tmp_path / "figures"), enabled=False) as renderer:
+            assert renderer.submit("grades.png", draw_text, frame) is None
+
+        assert not (tmp_path / "figures").exists()
+
+    def test_failed_draw_raises_and_is_redrawn(self, tmp_path: Path, frame: pd.DataFrame) -> None:
+        """Test that a drawing error reaches the caller and leaves no stamp behind."""
+        def draw_broken(path: str, frame: pd.DataFrame) -> None:
+            Path(path).write_text("partial")
+            raise RuntimeError("renderer crashed")
+
+        with FigureRenderer(str(tmp_path), echo=lambda message: None) as renderer:
+            renderer.submit("grades.png", draw_text, frame)
+        with pytest.raises(RuntimeError, match="renderer crashed"):
+            with FigureRenderer(str(tmp_path), echo=lambda message: None) as renderer:
+                renderer.submit("grades.png", draw_broken, frame)
+
+        assert not (tmp_path / ".grades.png.sha256").exists()
+        with FigureRenderer(str(tmp_path), echo=lambda message: None) as renderer:
+            renderer.submit("grades.png", draw_text, frame)
+        assert renderer.rendered == [str(tmp_path / "grades.png")]
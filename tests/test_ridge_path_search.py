@@ -0,0 +1,155 @@
+import pytest
+import pandas as pd
+import numpy as np
+from scipy.stats import loguniform
+from sklearn import config_context
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import LeaveOneOut, RandomizedSearchCV, cross_val_score
+from sklearn.pipeline import make_pipeline
+
+from src.preprocess_data import create_preprocessor
+from src.ridge_path_search import RidgeFoldPath, RidgeLOOSearchCV, RidgePathSearchCV, get_path_scorer
+
+
+class TestRidgeFoldPath:
+    """Tests for the per-fold eigendecomposition."""
+
+    @pytest.mark.parametrize("alpha", [1e-3, 1.0, 500.0])
+    def test_coefs_match_sklearn_ridge(self, alpha: float) -> None:
+        """
+        Test that the closed-form path reproduces Ridge coefficients.
+
+        Parameters
+        ----------
+        alpha : float
+            Regularization strength to compare.
+        """
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(50, 6))
+        y = X @ rng.normal(size=6) + rng.normal(size=50)
+
+        path = RidgeFoldPath(X, y)
+        ridge = Ridge(alpha=alpha).fit(X, y)
+
+        np.testing.assert_allclose(path.coefs([alpha])[:, 0], ridge.coef_, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(path.predict(X, [alpha])[:, 0], ridge.predict(X), rtol=1e-8)
+
+
+class TestRidgePathSearchCV:
+    """Tests for the closed-form alpha search."""
+
+    def test_matches_randomized_search(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the search agrees with the brute-force RandomizedSearchCV.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        with config_context(transform_output="pandas"):
+            X = synthetic_student_df.drop(columns=["G3"])
+            y = synthetic_student_df["G3"]
+            param_dist = {"ridge__alpha": loguniform(1e-3, 1e3)}
+
+            brute = RandomizedSearchCV(
+                make_pipeline(create_preprocessor(), Ridge()), param_dist,
+                n_iter=15, cv=5, scoring="neg_mean_absolute_error", random_state=123
+            ).fit(X, y)
+            path = RidgePathSearchCV(
+                create_preprocessor(), param_dist,
+                n_iter=15, cv=5, scoring="neg_mean_absolute_error", random_state=123
+            ).fit(X, y)
+
+            assert path.best_params_ == brute.best_params_
+            assert path.best_score_ == pytest.approx(brute.best_score_, rel=1e-9)
+            np.testing.assert_allclose(
+                path.cv_results_["mean_test_score"], brute.cv_results_["mean_test_score"], rtol=1e-9
+            )
+            np.testing.assert_allclose(
+                path.cv_results_["std_test_score"], brute.cv_results_["std_test_score"], rtol=1e-6
+            )
+            np.testing.assert_array_equal(path.cv_results_["rank_test_score"], brute.cv_results_["rank_test_score"])
+            np.testing.assert_allclose(path.predict(X), brute.predict(X), rtol=1e-8)
+
+    def test_exposes_best_estimator_steps(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that the refitted pipeline has the step names evaluation relies on.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        search = RidgePathSearchCV(
+            create_preprocessor(), {"ridge__alpha": [0.1, 1.0, 10.0]}, n_iter=3, cv=3
+        ).fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+        assert "ridge" in search.best_estimator_.named_steps
+        assert search.best_estimator_.named_steps["ridge"].alpha == search.best_params_["ridge__alpha"]
+        assert search.n_splits_ == 3
+
+    def test_rejects_parameters_other_than_alpha(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that tuning anything other than ridge__alpha raises ValueError."""
+        search = RidgePathSearchCV(create_preprocessor(), {"ridge__fit_intercept": [True, False]})
+
+        with pytest.raises(ValueError, match="only tunes"):
+            search.fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
+
+    def test_rejects_unknown_scoring(self) -> None:
+        """Test that unsupported scoring names raise ValueError."""
+        with pytest.raises(ValueError, match="Unsupported scoring"):
+            get_path_scorer("accuracy")
+
+
+class TestRidgeLOOSearchCV:
+    """Tests for the hat-matrix leave-one-out and GCV search."""
+
+    def test_loo_matches_refitting(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that hat-matrix LOO scores equal explicit leave-one-out refits.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        y = synthetic_student_df["G3"]
+        alphas = [0.01, 3.0, 300.0]
+        search = RidgeLOOSearchCV(create_preprocessor(), {"ridge__alpha": alphas}, n_iter=3).fit(X, y)
+
+        X_transformed = create_preprocessor().fit_transform(X)
+        for alpha, score in zip(search.cv_results_["param_ridge__alpha"], search.cv_results_["mean_test_score"]):
+            brute = cross_val_score(
+                Ridge(alpha=alpha), X_transformed, y, cv=LeaveOneOut(), scoring="neg_mean_absolute_error"
+            )
+            assert score == pytest.approx(brute.mean(), rel=1e-9)
+        assert search.n_splits_ == len(y)
+
+    def test_gcv_selects_an_alpha_and_refits(self, synthetic_student_df: pd.DataFrame) -> None:
+        """
+        Test that GCV mode produces cv_results_ and a usable best estimator.
+
+        Parameters
+        ----------
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        """
+        X = synthetic_student_df.drop(columns=["G3"])
+        y = synthetic_student_df["G3"]
+        search = RidgeLOOSearchCV(
+            create_preprocessor(), {"ridge__alpha": loguniform(1e-3, 1e3)},
+            n_iter=20, mode="gcv", random_state=123
+        ).fit(X, y)
+
+        assert len(search.cv_results_["mean_test_score"]) == 20
+        assert search.best_score_ == search.cv_results_["mean_test_score"].max()
+        assert search.predict(X).shape == (len(y),)
+
+    def test_rejects_unknown_mode(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that an unsupported mode raises ValueError."""
+        search = RidgeLOOSearchCV(create_preprocessor(), {"ridge__alpha": [1.0]}, n_iter=1, mode="kfold")
+
+        with pytest.raises(ValueError, match="Unsupported mode"):
+            search.fit(synthetic_student_df.drop(columns=["G3"]), synthetic_student_df["G3"])
@@ -0,0 +1,256 @@
+import pytest
+import os
+import sys
+import pandas as pd
+from pathlib import Path
+from click.testing import CliRunner
+
+from src.run_pipeline import PipelineRunner, Stage, code_files, default_stages, main, timing_summary
+
+# copies its input to its output, appending a line, and counts its runs
+COPY = (
+    "import sys; src, dst, log = sys.argv[1:4]; "
+    "open(dst, 'w').write(open(src).read() + 'x\\n'); open(log, 'a').write('run\\n')"
+)
+
+# waits until another stage has started, to prove both run at once
+WAIT_FOR = (
+    "import os, sys, time; mine, other, out = sys.argv[1:]; open(mine, 'w').close(); "
+    "deadline = time.time() + 10\n"
+    "while not os.path.exists(other) and time.time() < deadline: time.sleep(0.01)\n"
+    "open(out, 'w').write(str(os.path.exists(other)))"
+)
+
+# a click script writing a table and the id of the process it ran in
+TOY_SCRIPT = """
+import os
+import click
+import pandas as pd
+from src.storage import read_table, write_table
+
+@click.command()
+@click.option('--source')
+@click.option('--target')
+def main(source, target):
+    df = read_table(source) if source.endswith('.parquet') else pd.DataFrame({'x': [1, 2, 3]})
+    write_table(df.assign(x=df['x'] + 1), target)
+    print(os.getpid())
+"""
+
+
+def copy_stage(name: str, source: str, target: str) -> Stage:
+    """A stage copying ``source`` to ``target`` and logging each run to ``<name>.runs``."""
+    return Stage(name, [sys.executable, "-c", COPY, source, target, f"{name}.runs"],
+                 inputs=[source], outputs=[target])
+
+
+def runs(root: Path, name: str) -> int:
+    """Number of times the stage ``name`` actually ran."""
+    log = root / f"{name}.runs"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+@pytest.fixture
+def chain(tmp_path: Path) -> list:
+    """A raw -> clean -> model chain of copy stages in ``tmp_path``."""
+    (tmp_path / "raw.txt").write_text("data\n")
+    return [copy_stage("clean", "raw.txt", "clean.txt"), copy_stage("model", "clean.txt", "model.txt")]
+
+
+class TestPipelineRunner:
+    """Tests for the content-hash pipeline runner."""
+
+    def test_second_run_is_cached(self, tmp_path: Path, chain: list) -> None:
+        """Test that unchanged stages are skipped on the next run."""
+        first = PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+        second = PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+
+        assert [r["status"] for r in first] == ["ran", "ran"]
+        assert [r["status"] for r in second] == ["cached", "cached"]
+        assert runs(tmp_path, "clean") == runs(tmp_path, "model") == 1
+        assert (tmp_path / "model.txt").read_text() == "data\nx\nx\n"
+
+    def test_rewriting_identical_input_does_not_rerun(self, tmp_path: Path, chain: list) -> None:
+        """Test that only content, not modification times, triggers a rerun."""
+        PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+        (tmp_path / "raw.txt").write_text("data\n")
+
+        results = PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+
+        assert [r["status"] for r in results] == ["cached", "cached"]
+
+    def test_changed_input_reruns_downstream(self, tmp_path: Path, chain: list) -> None:
+        """Test that new content reruns the stage and everything depending on it."""
+        PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+        (tmp_path / "raw.txt").write_text("new data\n")
+
+        results = PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+
+        assert [r["status"] for r in results] == ["ran", "ran"]
+        assert (tmp_path / "model.txt").read_text() == "new data\nx\nx\n"
+
+    def test_edited_output_reruns_its_stage(self, tmp_path: Path, chain: list) -> None:
+        """Test that an output changed by hand no longer matches the stamp."""
+        PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+        (tmp_path / "model.txt").write_text("edited by hand\n")
+
+        results = {r["stage"]: r["status"] for r in PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)}
+
+        assert results == {"clean": "cached", "model": "ran"}
+        assert (tmp_path / "model.txt").read_text() == "data\nx\nx\n"
+
+    def test_changed_parameters_and_force_rerun(self, tmp_path: Path, chain: list) -> None:
+        """Test that a new command-line argument or --force reruns a current stage."""
+        PipelineRunner(chain, root=str(tmp_path)).run(echo=lambda line: None)
+        # COPY ignores arguments after its three paths
+        changed = [chain[0], Stage("model", chain[1].command + ["--alpha=2"], chain[1].inputs, chain[1].outputs)]
+
+        reparametrized = PipelineRunner(changed, root=str(tmp_path)).run(echo=lambda line: None)
+        forced = PipelineRunner(changed, root=str(tmp_path), force=["clean"]).run(echo=lambda line: None)
+
+        assert {r["stage"]: r["status"] for r in reparametrized} == {"clean": "cached", "model": "ran"}
+        assert {r["stage"]: r["status"] for r in forced} == {"clean": "ran", "model": "cached"}
+
+    def test_independent_stages_run_concurrently(self, tmp_path: Path) -> None:
+        """Test that stages without a dependency between them overlap."""
+        (tmp_path / "raw.txt").write_text("data\n")
+        stages = [
+            Stage("eda", [sys.executable, "-c", WAIT_FOR, "eda.started", "fit.started", "eda.out"],
+                  inputs=["raw.txt"], outputs=["eda.out"]),
+            Stage("fit", [sys.executable, "-c", WAIT_FOR, "fit.started", "eda.started", "fit.out"],
+                  inputs=["raw.txt"], outputs=["fit.out"]),
+        ]
+
+        results = PipelineRunner(stages, root=str(tmp_path), jobs=2).run(echo=lambda line: None)
+
+        assert {r["status"] for r in results} == {"ran"}
+        assert (tmp_path / "eda.out").read_text() == (tmp_path / "fit.out").read_text() == "True"
+
+    def test_failure_blocks_dependents_only(self, tmp_path: Path, chain: list) -> None:
+        """Test that a failing stage stops its dependents but not independent stages."""
+        (tmp_path / "other.txt").write_text("other\n")
+        failing = Stage("clean", [sys.executable, "-c", "raise SystemExit(3)"], ["raw.txt"], ["clean.txt"])
+        stages = [failing, chain[1], copy_stage("side", "other.txt", "side.txt")]
+
+        results = {r["stage"]: r for r in PipelineRunner(stages, root=str(tmp_path)).run(echo=lambda line: None)}
+
+        assert results["clean"]["status"] == "failed"
+        assert "exited with code 3" in results["clean"]["error"]
+        assert results["model"]["status"] == "blocked"
+        assert results["side"]["status"] == "ran"
+
+    def test_unexpected_errors_fail_only_their_stage(self, tmp_path: Path, chain: list) -> None:
+        """Test that an exception other than OSError, e.g. from hashing a broken script, is recorded."""
+        (tmp_path / "broken.py").write_text("def main(:\n")
+        (tmp_path / "other.txt").write_text("other\n")
+        broken = copy_stage("clean", "raw.txt", "clean.txt")
+        broken.code = ["broken.py"]
+        stages = [broken, chain[1], copy_stage("side", "other.txt", "side.txt")]
+
+        results = {r["stage"]: r for r in PipelineRunner(stages, root=str(tmp_path)).run(echo=lambda line: None)}
+
+        assert results["clean"]["status"] == "failed"
+        assert results["clean"]["error"].startswith("SyntaxError: ")
+        assert results["model"]["status"] == "blocked"
+        assert results["side"]["status"] == "ran"
+
+    def test_invalid_graphs_are_rejected(self, tmp_path: Path) -> None:
+        """Test that shared outputs and cycles are reported before running anything."""
+        with pytest.raises(ValueError, match="written by both"):
+            PipelineRunner([copy_stage("a", "x", "y"), copy_stage("b", "z", "y")], root=str(tmp_path))
+        with pytest.raises(ValueError, match="form a cycle"):
+            PipelineRunner([copy_stage("a", "x", "y"), copy_stage("b", "y", "x")], root=str(tmp_path))
+
+    def test_in_process_runs_in_this_interpreter(self, mocker, monkeypatch, tmp_path: Path) -> None:
+        """Test that in-process stages share the process and hand their tables over in memory."""
+        (tmp_path / "toy_stage.py").write_text(TOY_SCRIPT)
+        (tmp_path / "raw.txt").write_text("data\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        stages = [
+            Stage("first", [sys.executable, "toy_stage.py", "--source=raw.txt", "--target=a.parquet"],
+                  inputs=["raw.txt"], outputs=["a.parquet"]),
+            Stage("second", [sys.executable, "toy_stage.py", "--source=a.parquet", "--target=b.parquet"],
+                  inputs=["a.parquet"], outputs=["b.parquet"]),
+        ]
+        read_parquet = mocker.spy(pd, "read_parquet")
+
+        results = PipelineRunner(stages, root=str(tmp_path), jobs=2, in_process=True).run(echo=lambda line: None)
+
+        assert [r["status"] for r in results] == ["ran", "ran"]
+        assert pd.read_parquet(tmp_path / "b.parquet")["x"].tolist() == [3, 4, 5]
+        assert read_parquet.call_count == 1  # only the check above
+        logs = tmp_path / ".pipeline" / "logs"
+        assert (logs / "first.log").read_text().strip() == (logs / "second.log").read_text().strip() == str(os.getpid())
+
+    def test_in_process_failure_is_reported(self, monkeypatch, tmp_path: Path) -> None:
+        """Test that an exception in an in-process stage fails only that stage."""
+        (tmp_path / "toy_stage.py").write_text(TOY_SCRIPT)
+        (tmp_path / "raw.parquet").write_text("not a table")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        stage = Stage("broken", [sys.executable, "toy_stage.py", "--source=raw.parquet", "--target=out.parquet"],
+                      inputs=["raw.parquet"], outputs=["out.parquet"])
+
+        results = PipelineRunner([stage], root=str(tmp_path), in_process=True).run(echo=lambda line: None)
+
+        assert results[0]["status"] == "failed"
+        assert "exited with code 1" in results[0]["error"]
+        assert "Traceback" in (tmp_path / ".pipeline" / "logs" / "broken.log").read_text()
+
+
+class TestDefaultStages:
+    """Tests for the stages mirroring the Makefile."""
+
+    def test_code_includes_imported_modules(self) -> None:
+        """Test that a script's key covers the src modules it imports."""
+        files = code_files("src/fit_student_predictor.py")
+
+        assert "src/ridge_path_search.py" in files
+        assert "src/fold_cache.py" in files
+        assert "src/eda.py" not in files
+
+    def test_eda_and_fit_only_wait_for_preprocessing(self) -> None:
+        """Test that the dependency graph lets eda and fit run side by side."""
+        runner = PipelineRunner(default_stages())
+
+        assert runner.dependencies["eda"] == {"preprocess"}
+        assert runner.dependencies["fit"] == {"preprocess"}
+        assert runner.dependencies["evaluate"] == {"preprocess", "fit"}
+        assert runner.dependencies["report"] == {"preprocess", "eda", "fit", "evaluate"}
+
+    def test_no_plots_keeps_only_model_and_table_stages(self) -> None:
+        """Test that --no-plots drops the figure stages and outputs and passes the flag on."""
+        stages = {stage.name: stage for stage in default_stages(plots=False)}
+
+        assert list(stages) == ["download", "ingest", "preprocess", "fit", "evaluate"]
+        for name in ("fit", "evaluate"):
+            assert "--no-plots" in stages[name].command
+            assert not any(output.endswith(".png") for output in stages[name].outputs)
+        assert PipelineRunner(list(stages.values())).dependencies["evaluate"] == {"preprocess", "fit"}
+
+
+def test_timing_summary_lists_every_stage() -> None:
+    """Test that the summary has one row per stage and the total."""
+    summary = timing_summary([
+        {"stage": "preprocess", "status": "cached", "seconds": 0.02, "error": None},
+        {"stage": "fit", "status": "ran", "seconds": 12.5, "error": None},
+    ], elapsed=12.6)
+
+    lines = summary.splitlines()
+    assert len(lines) == 4
+    assert lines[2].split() == ["fit", "ran", "12.5"]
+    assert lines[3].startswith("total")
+
+
+def test_main_reports_failures(mocker, tmp_path: Path) -> None:
+    """Test that the CLI prints the summary and exits non-zero when a stage fails."""
+    (tmp_path / "raw.txt").write_text("data\n")
+    mocker.patch("src.run_pipeline.ROOT", str(tmp_path))
+    mocker.patch("src.run_pipeline.default_stages", return_value=[
+        Stage("preprocess", [sys.executable, "-c", "raise SystemExit(1)"], ["raw.txt"], ["clean.txt"]),
+    ])
+
+    result = CliRunner().invoke(main, ["--jobs", "1"])
+
+    assert result.exit_code == 1
+    assert "preprocess  failed" in result.output
+    assert "exited with code 1" in result.output
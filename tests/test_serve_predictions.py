@@ -0,0 +1,202 @@
+import asyncio
+import contextlib
+import http.client
+import json
+import socket
+import threading
+import pytest
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from src.serve_predictions import LatencyStats, MicroBatcher, PredictionServer, RequestError, parse_records
+
+
+@pytest.fixture
+def records(synthetic_student_df: pd.DataFrame) -> list:
+    """Synthetic student records as JSON-ready dicts."""
+    return synthetic_student_df.drop(columns=["G3"]).to_dict(orient="records")
+
+
+@contextlib.contextmanager
+def serving(model, max_delay: float = 0.05):
+    """Run a PredictionServer for ``model`` on a free port, from a background event loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = PredictionServer(model, port=0, max_delay=max_delay)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=5)
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+@pytest.fixture
+def running_server(fitted_pipeline):
+    """PredictionServer on a free port, served from a background event loop."""
+    with serving(fitted_pipeline) as server:
+        yield server
+
+
+def request(server: PredictionServer, method: str, path: str, payload=None) -> tuple:
+    """Send one request and return the status and decoded JSON body."""
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=10)
+    body = None if payload is None else json.dumps(payload)
+    connection.request(method, path, body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+class TestParseRecords:
+    """Tests for the /predict body parser."""
+
+    def test_accepts_single_list_and_wrapped(self, records: list) -> None:
+        """Test the three accepted payload shapes."""
+        assert parse_records(json.dumps(records[0]).encode()) == records[:1]
+        assert parse_records(json.dumps(records[:2]).encode()) == records[:2]
+        assert parse_records(json.dumps({"records": records[:3]}).encode()) == records[:3]
+
+    @pytest.mark.parametrize("body,match", [
+        (b"{not json", "not valid JSON"),
+        (b"[]", "Expected"),
+        (json.dumps([{"age": 16}]).encode(), "missing columns"),
+    ])
+    def test_rejects_bad_bodies(self, body: bytes, match: str) -> None:
+        """Test that malformed bodies raise RequestError."""
+        with pytest.raises(RequestError, match=match):
+            parse_records(body)
+
+
+class TestLatencyStats:
+    """Tests for the latency and throughput counters."""
+
+    def test_percentiles(self) -> None:
+        """Test that p50/p99 are reported in milliseconds."""
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record_request(ms / 1000, 1)
+        stats.batches = 10
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["latency_p50_ms"] == pytest.approx(50.5)
+        assert snapshot["latency_p99_ms"] == pytest.approx(99.01)
+        assert snapshot["requests"] == 100
+        assert snapshot["mean_batch_rows"] == 10
+
+
+class TestMicroBatcher:
+    """Tests for the batching task's error handling."""
+
+    def test_cancelled_waiter_does_not_stop_batching(self, records: list) -> None:
+        """Test that a request cancelled while its failing batch is scored leaves the batcher running."""
+        def predict(df: pd.DataFrame) -> np.ndarray:
+            if (df["age"] == 99).any():
+                raise ValueError("age out of range")
+            return np.zeros(len(df))
+
+        async def scenario() -> tuple:
+            batcher = MicroBatcher(predict, max_delay=0.05)
+            batcher.start()
+            cancelled = asyncio.ensure_future(batcher.submit([dict(records[0], age=99)]))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            try:
+                after = await asyncio.wait_for(batcher.submit([records[1]]), 5)
+                with pytest.raises(RequestError, match="rejected by the model"):
+                    await asyncio.wait_for(batcher.submit([dict(records[2], age=99)]), 5)
+                return cancelled.cancelled(), after
+            finally:
+                await batcher.stop()
+
+        was_cancelled, after = asyncio.run(scenario())
+
+        assert was_cancelled and after.tolist() == [0.0]
+
+class TestPredictionServer:
+    """Tests for the HTTP prediction service."""
+
+    def test_concurrent_requests_are_batched(self, running_server: PredictionServer, fitted_pipeline,
+                                             records: list) -> None:
+        """
+        Test that concurrent requests get their own predictions from shared batches.
+
+        Parameters
+        ----------
+        running_server : PredictionServer
+            Server fixture with a 50 ms batching window.
+        fitted_pipeline : sklearn.pipeline.Pipeline
+            Fitted student pipeline fixture.
+        records : list of dict
+            Synthetic student records.
+        """
+        payloads = [records[i:i + 2] for i in range(0, 40, 2)]
+        with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+            responses = list(pool.map(
+                lambda payload: request(running_server, "POST", "/predict", payload), payloads
+            ))
+
+        expected = fitted_pipeline.predict(pd.DataFrame(records[:40]))
+        predictions = np.concatenate([body["predictions"] for _, body in responses])
+        assert all(status == 200 for status, _ in responses)
+        np.testing.assert_allclose(predictions, expected)
+
+        status, metrics = request(running_server, "GET", "/metrics")
+        assert status == 200
+        assert metrics["requests"] == len(payloads)
+        assert metrics["rows"] == 40
+        assert metrics["batches"] < len(payloads)
+        assert metrics["latency_p99_ms"] >= metrics["latency_p50_ms"] > 0
+
+    def test_bad_record_only_fails_its_request(self, running_server: PredictionServer,
+                                               records: list) -> None:
+        """Test that a record the model rejects does not fail the rest of its batch."""
+        bad = dict(records[0], school="XX")
+        payloads = [[records[1]], [bad], [records[2]]]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            statuses = [status for status, _ in pool.map(
+                lambda payload: request(running_server, "POST", "/predict", payload), payloads
+            )]
+
+        assert statuses == [200, 400, 200]
+
+    @pytest.mark.parametrize("method,path,status", [
+        ("GET", "/health", 200),
+        ("GET", "/predict", 405),
+        ("GET", "/nope", 404),
+    ])
+    def test_routes(self, running_server: PredictionServer, method: str, path: str, status: int) -> None:
+        """Test the status codes of the non-predict routes."""
+        assert request(running_server, method, path)[0] == status
+
+    @pytest.mark.parametrize("content_length,status", [("abc", 400), ("-5", 400), (str(64 << 20), 413)])
+    def test_rejects_bad_content_length(self, running_server: PredictionServer, content_length: str,
+                                        status: int) -> None:
+        """Test that a non-numeric, negative or oversized Content-Length is answered, not dropped."""
+        with socket.create_connection((running_server.host, running_server.port), timeout=10) as sock:
+            sock.sendall(f"POST /predict HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode())
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+            payload = json.loads(response.read())
+
+        assert response.status == status and "error" in payload
+        assert response.getheader("Connection") == "close"
+        assert request(running_server, "GET", "/health")[0] == 200
+
+    def test_model_failure_is_a_server_error(self, records: list) -> None:
+        """Test that an error of the model itself, not of the records, is answered with 500."""
+        class BrokenModel:
+            def predict(self, df: pd.DataFrame) -> np.ndarray:
+                raise RuntimeError("model file is corrupt")
+
+        with serving(BrokenModel(), max_delay=0.001) as server:
+            status, payload = request(server, "POST", "/predict", [records[0]])
+            assert request(server, "POST", "/predict", {"no": "records"})[0] == 400
+
+        assert status == 500 and "model file is corrupt" in payload["error"]
@@ -0,0 +1,186 @@
+import pytest
+import pickle
+import pandas as pd
+from pathlib import Path
+
+from src.dtype_plan import apply_dtype_plan, dtype_plan
+from src.preprocess_data import create_schema
+from src.storage import (TableWriter, handoff, iter_table, load_object, numeric_columns, read_table, save_object,
+                         table_format, table_path, write_table)
+
+
+class TestTableFormat:
+    """Tests for mapping file extensions to table formats."""
+
+    @pytest.mark.parametrize("path,fmt", [
+        ("data/student_train.parquet", "parquet"),
+        ("data/student_train.arrow", "arrow"),
+        ("data/student_train.feather", "arrow"),
+        ("data/student_train.CSV", "csv"),
+    ])
+    def test_known_extensions(self, path: str, fmt: str) -> None:
+        """Test that each supported extension maps to its format."""
+        assert table_format(path) == fmt
+
+    def test_unknown_extension(self) -> None:
+        """Test that unsupported extensions are rejected."""
+        with pytest.raises(ValueError, match="Unsupported table extension"):
+            table_format("data/student_train.xlsx")
+
+
+class TestReadWriteTable:
+    """Tests for the columnar storage round trip."""
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv"])
+    def test_round_trip(self, tmp_path: Path, synthetic_student_df: pd.DataFrame, fmt: str) -> None:
+        """
+        Test that every format reads back the frame that was written.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        fmt : str
+            Table format under test.
+        """
+        df = synthetic_student_df.sample(frac=1, random_state=0)
+        path = table_path(str(tmp_path), "student_train", fmt)
+
+        write_table(df, path)
+
+        pd.testing.assert_frame_equal(read_table(path), df.reset_index(drop=True))
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv"])
+    def test_column_projection(self, tmp_path: Path, synthetic_student_df: pd.DataFrame, fmt: str) -> None:
+        """Test that only the requested columns are returned, in the requested order."""
+        path = table_path(str(tmp_path), "student_train", fmt)
+        write_table(synthetic_student_df, path)
+
+        result = read_table(path, columns=["G3", "school", "G1"])
+
+        assert list(result.columns) == ["G3", "school", "G1"]
+        pd.testing.assert_frame_equal(result, synthetic_student_df[["G3", "school", "G1"]])
+
+    def test_parquet_keeps_dtypes(self, tmp_path: Path) -> None:
+        """Test that columnar files keep dtypes that CSV would re-infer."""
+        df = pd.DataFrame({"code": ["001", "002"], "flag": [True, False], "small": pd.Series([1, 2], dtype="int8")})
+        path = str(tmp_path / "table.parquet")
+
+        write_table(df, path)
+
+        pd.testing.assert_frame_equal(read_table(path), df)
+
+    @pytest.mark.parametrize("fmt,expected", [
+        ("parquet", ["age", "G1", "G3"]),
+        ("arrow", ["age", "G1", "G3"]),
+        ("csv", None),
+    ])
+    def test_numeric_columns(self, tmp_path: Path, fmt: str, expected: list) -> None:
+        """Test that numeric columns come from the stored schema, when there is one."""
+        df = pd.DataFrame({"school": ["GP"], "age": [17], "G1": [12.5], "G3": [13]})
+        path = table_path(str(tmp_path), "table", fmt)
+        write_table(df, path)
+
+        assert numeric_columns(path) == expected
+
+
+class TestTableWriter:
+    """Tests for incremental table writes and chunked reads."""
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv"])
+    def test_chunks_round_trip(self, tmp_path: Path, synthetic_student_df: pd.DataFrame, fmt: str) -> None:
+        """
+        Test that chunks appended by TableWriter read back as one table, in chunks too.
+
+        Parameters
+        ----------
+        tmp_path : Path
+            Pytest fixture for temporary directory.
+        synthetic_student_df : pd.DataFrame
+            Synthetic schema-valid DataFrame fixture.
+        fmt : str
+            Table format under test.
+        """
+        plan = dtype_plan(create_schema())
+        df = apply_dtype_plan(synthetic_student_df, plan)
+        path = table_path(str(tmp_path), "student_train", fmt)
+
+        with TableWriter(path) as writer:
+            for start in range(0, len(df), 50):
+                writer.write(df.iloc[start:start + 50])
+
+        assert writer.n_rows == len(df)
+        assert not (tmp_path / f"student_train.{fmt}.part").exists()
+        pd.testing.assert_frame_equal(read_table(path, dtypes=plan), df)
+        chunks = list(iter_table(path, 32, dtypes=plan))
+        assert max(len(chunk) for chunk in chunks) == 32
+        pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+    def test_failure_leaves_no_file(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that an exception inside the with block discards the partial table."""
+        path = table_path(str(tmp_path), "student_train", "parquet")
+
+        with pytest.raises(RuntimeError):
+            with TableWriter(path) as writer:
+                writer.write(synthetic_student_df)
+                raise RuntimeError("interrupted")
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestHandoff:
+    """Tests for serving files written in this process from memory."""
+
+    def test_reads_skip_decoding(self, mocker, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a table and an object written inside the handoff are not read back from disk."""
+        table, model = str(tmp_path / "train.parquet"), str(tmp_path / "model.pickle")
+        with handoff():
+            write_table(synthetic_student_df, table)
+            save_object({"alpha": 1.0}, model)
+            read_parquet = mocker.patch("src.storage.pd.read_parquet")
+
+            df = read_table(table, columns=["G1", "G3"])
+            loaded = load_object(model)
+
+        read_parquet.assert_not_called()
+        pd.testing.assert_frame_equal(df, synthetic_student_df[["G1", "G3"]])
+        assert loaded == {"alpha": 1.0}
+        # each read is an independent copy
+        df.loc[0, "G1"] = -1
+        loaded["alpha"] = 2.0
+        assert synthetic_student_df.loc[0, "G1"] != -1
+        with handoff():
+            save_object({"alpha": 1.0}, model)
+            assert load_object(model) is not load_object(model)
+
+    def test_objects_are_pickled_once(self, mocker, tmp_path: Path) -> None:
+        """Test that a handed-off save pickles the object once for the file and the memory copy."""
+        path = str(tmp_path / "model.pickle")
+        dumps = mocker.spy(pickle, "dumps")
+        dump = mocker.spy(pickle, "dump")
+        with handoff():
+            save_object({"alpha": 1.0}, path)
+
+        assert dumps.call_count + dump.call_count == 1
+        with open(path, "rb") as f:
+            assert pickle.load(f) == {"alpha": 1.0}
+
+    def test_changed_file_is_read_from_disk(self, tmp_path: Path, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a file rewritten by someone else is not served from memory."""
+        path = str(tmp_path / "train.parquet")
+        with handoff():
+            write_table(synthetic_student_df, path)
+            synthetic_student_df.head(5).to_parquet(path)
+
+            assert len(read_table(path)) == 5
+
+    def test_nothing_is_kept_outside(self, tmp_path: Path) -> None:
+        """Test that without a handoff, objects always come from the file."""
+        path = str(tmp_path / "model.pickle")
+        save_object([1, 2], path)
+
+        assert load_object(path) == [1, 2]
+        with handoff():
+            assert load_object(path) == [1, 2]
@@ -0,0 +1,98 @@
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.streaming import HashSet, hash_folds, hash_sample, row_hashes, splitmix64, train_mask
+
+
+class TestRowHashes:
+    """Tests for content hashing of rows."""
+
+    def test_hash_ignores_index_and_chunking(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a row hashes the same in any chunk and position."""
+        whole = row_hashes(synthetic_student_df)
+        chunks = np.concatenate([row_hashes(synthetic_student_df.iloc[i:i + 7]) for i in range(0, 120, 7)])
+
+        np.testing.assert_array_equal(whole, chunks)
+        assert len(np.unique(whole)) == len(whole)
+
+    def test_splitmix64_is_a_bijection_sample(self) -> None:
+        """Test that distinct inputs stay distinct after mixing."""
+        values = np.arange(100_000, dtype=np.uint64)
+        assert len(np.unique(splitmix64(values))) == len(values)
+
+
+class TestTrainMask:
+    """Tests for the hash-based train/test split."""
+
+    def test_fraction_and_determinism(self) -> None:
+        """Test that about train_size of the rows go to train, reproducibly per seed."""
+        hashes = splitmix64(np.arange(200_000, dtype=np.uint64))
+
+        mask = train_mask(hashes, 0.7, seed=123)
+
+        assert mask.mean() == pytest.approx(0.7, abs=0.005)
+        np.testing.assert_array_equal(mask, train_mask(hashes, 0.7, seed=123))
+        assert (mask != train_mask(hashes, 0.7, seed=124)).mean() > 0.3
+
+
+class TestHashFolds:
+    """Tests for hash-based fold assignment and sampling."""
+
+    def test_folds_are_balanced_within_the_training_split(self) -> None:
+        """Test that folds are even, also among the rows train_mask selects with the same seed."""
+        hashes = splitmix64(np.arange(200_000, dtype=np.uint64))
+
+        folds = hash_folds(hashes, 10, seed=123)
+        train_folds = folds[train_mask(hashes, 0.7, seed=123)]
+
+        assert folds.min() == 0 and folds.max() == 9
+        np.testing.assert_allclose(np.bincount(train_folds) / len(train_folds), 0.1, atol=0.005)
+
+    def test_folds_nest_into_finer_folds(self) -> None:
+        """Test that k folds are unions of consecutive folds of any multiple of k."""
+        hashes = splitmix64(np.arange(100_000, dtype=np.uint64))
+
+        buckets = hash_folds(hashes, 120, seed=5)
+
+        for k in (2, 3, 8, 10, 40):
+            np.testing.assert_array_equal(hash_folds(hashes, k, seed=5), buckets // (120 // k))
+
+    def test_sample_ignores_chunking(self, synthetic_student_df: pd.DataFrame) -> None:
+        """Test that the sample is the same however the rows are chunked, and in stream order."""
+        whole = hash_sample([synthetic_student_df], 50, seed=1)
+        chunked = hash_sample((synthetic_student_df.iloc[i:i + 7] for i in range(0, 120, 7)), 50, seed=1)
+
+        pd.testing.assert_frame_equal(whole, chunked)
+        assert len(whole) == 50
+        assert whole.index.is_monotonic_increasing
+        assert len(hash_sample([synthetic_student_df], 500)) == 120
+
+
+class TestHashSet:
+    """Tests for the compact streaming hash set."""
+
+    def test_membership_across_many_chunks(self) -> None:
+        """Test that every added hash is found and others are not, with few sorted levels."""
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 2**63, 50_000, dtype=np.uint64)
+        seen = HashSet()
+
+        for chunk in np.array_split(values[:40_000], 100):
+            assert not seen.contains(chunk).any()
+            seen.add(chunk)
+
+        assert len(seen) == 40_000
+        assert seen.nbytes == 40_000 * 8
+        assert len(seen.levels) <= 17
+        assert all(np.all(np.diff(level.astype(np.float64)) >= 0) for level in seen.levels)
+        assert seen.contains(values[:40_000]).all()
+        assert not seen.contains(values[40_000:]).any()
+
+    def test_empty_set_and_chunks(self) -> None:
+        """Test that lookups in an empty set and empty additions are harmless."""
+        seen = HashSet()
+        seen.add(np.array([], dtype=np.uint64))
+
+        assert seen.contains(np.array([1, 2], dtype=np.uint64)).tolist() == [False, False]
+        assert len(seen) == 0
@@ -0,0 +1,146 @@
+import pytest
+import click
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from click.testing import CliRunner
+
+from src.train_many import SUMMARY_COLUMNS, dataset_name, find_datasets, main
+
+
+@pytest.fixture
+def raw_files(tmp_path: Path, synthetic_student_df: pd.DataFrame) -> Path:
+    """
+    Two course files in the raw format, the second with shifted grades.
+
+    G2 is noisier than in ``synthetic_student_df``, so that the fit
+    script's correlation checks pass.
+
+    Returns
+    -------
+    Path
+        Directory holding student-por.csv and student-mat.csv.
+    """
+    directory = tmp_path / "raw"
+    directory.mkdir()
+    rng = np.random.default_rng(0)
+    students = synthetic_student_df.assign(
+        G2=(synthetic_student_df["G1"] + rng.integers(-5, 6, len(synthetic_student_df))).clip(0, 20))
+    students["G3"] = (students["G2"] + rng.integers(-2, 3, len(students))).clip(0, 20)
+    students.to_csv(directory / "student-por.csv", sep=";", index=False)
+    students.assign(G3=(students["G3"] - 2).clip(0, 20)).to_csv(directory / "student-mat.csv", sep=";", index=False)
+    return directory
+
+
+class TestFindDatasets:
+    """Tests for naming and listing the datasets."""
+
+    def test_one_dataset_per_file_or_group(self, raw_files: Path) -> None:
+        """Test that files are datasets by name and that --split-by makes one per value."""
+        sources = [str(raw_files / "student-mat.csv"), str(raw_files / "student-por.csv")]
+
+        assert [name for name, _, _ in find_datasets(sources)] == ["student-mat", "student-por"]
+        split = find_datasets(sources, "school")
+        assert [(name, value) for name, _, value in split] == [
+            ("student-mat-GP", "GP"), ("student-mat-MS", "MS"), ("student-por-GP", "GP"), ("student-por-MS", "MS")]
+        assert dataset_name("exports/course 7.parquet", "São Bento") == "course_7-São_Bento"
+
+    def test_rejects_clashing_names(self, tmp_path: Path, raw_files: Path) -> None:
+        """Test that two files with the same name in different directories are refused."""
+        (tmp_path / "other").mkdir()
+        (tmp_path / "other" / "student-por.csv").write_text((raw_files / "student-por.csv").read_text())
+
+        with pytest.raises(click.BadParameter, match="student-por"):
+            find_datasets([str(raw_files / "student-por.csv"), str(tmp_path / "other" / "student-por.csv")])
+
+
+class TestMain:
+    """Tests for training many datasets."""
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_trains_each_dataset_into_its_own_directory(self, tmp_path: Path, raw_files: Path, jobs: str) -> None:
+        """Test that every dataset gets its artifacts and a row of the combined table, in and out of process."""
+        result = CliRunner().invoke(main, [
+            '--raw-data', str(raw_files / "*.csv"),
+            '--artifacts-to', str(tmp_path / "datasets"),
+            '--summary-to', str(tmp_path / "summary.csv"),
+            '--jobs', jobs
+        ])
+
+        assert result.exit_code == 0, result.output
+        summary = pd.read_csv(tmp_path / "summary.csv")
+        assert list(summary.columns) == SUMMARY_COLUMNS
+        assert summary["dataset"].tolist() == ["student-mat", "student-por"]
+        assert (summary["status"] == "ok").all()
+        assert (summary["train_rows"] == 84).all() and (summary["test_rows"] == 36).all()
+        assert summary["MAE"].nunique() == 2
+        assert (summary["scoring"] == "MAE").all() and summary["best_cv_score"].notna().all()
+        for name in summary["dataset"]:
+            directory = tmp_path / "datasets" / name
+            assert (directory / "models" / "student_pipeline.pickle").exists()
+            assert (directory / "tables" / "test_scores.csv").exists()
+            assert not (directory / "figures").exists()
+            assert "Model evaluation complete!" in (directory / "train.log").read_text()
+
+    def test_summary_keeps_the_score_of_any_metric(self, tmp_path: Path, raw_files: Path) -> None:
+        """Test that a fit tuned on R2 still fills the cross-validation score column."""
+        result = CliRunner().invoke(main, [
+            '--raw-data', str(raw_files / "student-por.csv"),
+            '--artifacts-to', str(tmp_path / "datasets"),
+            '--summary-to', str(tmp_path / "summary.csv"),
+            '--jobs', '1',
+            '--fit-option=--search=ridge-path', '--fit-option=--correlation-backend=native',
+            '--fit-option=--scoring=r2'
+        ])
+
+        assert result.exit_code == 0, result.output
+        row = pd.read_csv(tmp_path / "summary.csv").iloc[0]
+        best_params = pd.read_csv(tmp_path / "datasets" / "student-por" / "models" / "best_params.csv")
+        assert row["scoring"] == "R2" and row["best_cv_score"] == pytest.approx(best_params["best_cv_r2"].iloc[0])
+
+    def test_failed_dataset_is_reported_without_stopping_the_others(self, tmp_path: Path, raw_files: Path,
+                                                                    synthetic_student_df: pd.DataFrame) -> None:
+        """Test that a dataset failing validation gets a failed row and a non-zero exit, after the rest ran."""
+        synthetic_student_df.assign(age=99).to_csv(raw_files / "student-bad.csv", sep=";", index=False)
+
+        result = CliRunner().invoke(main, [
+            '--raw-data', str(raw_files / "student-bad.csv"),
+            '--raw-data', str(raw_files / "student-por.csv"),
+            '--artifacts-to', str(tmp_path / "datasets"),
+            '--summary-to', str(tmp_path / "summary.csv"),
+            '--jobs', '1'
+        ])
+
+        assert result.exit_code == 1
+        assert "student-bad: " in result.output
+        summary = pd.read_csv(tmp_path / "summary.csv").set_index("dataset")
+        assert summary.loc["student-bad", "status"] == "failed"
+        assert summary.loc["student-por", "status"] == "ok"
+        assert "Traceback" in (tmp_path / "datasets" / "student-bad" / "train.log").read_text()
+
+    def test_split_by_writes_each_group(self, tmp_path: Path, raw_files: Path) -> None:
+        """Test that --split-by trains one model on each group's rows only."""
+        result = CliRunner().invoke(main, [
+            '--raw-data', str(raw_files / "student-por.csv"),
+            '--artifacts-to', str(tmp_path / "datasets"),
+            '--summary-to', str(tmp_path / "summary.csv"),
+            '--split-by', 'school',
+            '--jobs', '1'
+        ])
+
+        assert result.exit_code == 0, result.output
+        summary = pd.read_csv(tmp_path / "summary.csv").set_index("dataset")
+        assert list(summary.index) == ["student-por-GP", "student-por-MS"]
+        students = pd.read_csv(raw_files / "student-por.csv", sep=";")
+        for school in ("GP", "MS"):
+            raw = pd.read_parquet(tmp_path / "datasets" / f"student-por-{school}" / "data" / "raw.parquet")
+            assert (raw["school"] == school).all() and len(raw) == (students["school"] == school).sum()
+            row = summary.loc[f"student-por-{school}"]
+            assert row["train_rows"] + row["test_rows"] == len(raw)
+
+    def test_rejects_missing_input(self, tmp_path: Path) -> None:
+        """Test that a pattern matching no file is a usage error."""
+        result = CliRunner().invoke(main, ['--raw-data', str(tmp_path / "*.csv"),
+                                           '--artifacts-to', str(tmp_path), '--summary-to', str(tmp_path / "s.csv")])
+
+        assert result.exit_code == 2 and "no file matches" in result.output